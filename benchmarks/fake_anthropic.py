@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""A local stand-in for the Anthropic Messages API, for load tests.
+
+Two modes:
+
+  - echo (default): answers after a fixed latency with a plain text reply
+    that says how many messages the request carried ("seen 3 messages"),
+    so a load test can check that every conversation kept its history,
+    whichever worker served the turn;
+  - scripted (--script, or start(script=...)): replays recorded responses
+    with their recorded delays. The latest plain-text user message picks
+    the scripted turn, and the number of assistant messages after it picks
+    the round, so a turn can call tools before it answers. Requests that
+    match no turn (a tool's own API call, such as analyze_scam_risk) get
+    the first "other" response whose "match" text is in the prompt. See
+    data/load_conversations.json for the format.
+
+One thread per connection, stdlib only.
+
+Usage:
+    python benchmarks/fake_anthropic.py --port 8787 --latency 0.2
+    python benchmarks/fake_anthropic.py --script benchmarks/data/load_conversations.json
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8787 ANTHROPIC_API_KEY=fake python frontend/app.py
+"""
+
+import argparse
+import itertools
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+_ids = itertools.count(1)
+
+
+def _message(request: dict, content: list, stop_reason: str = "end_turn") -> dict:
+    output = sum(len(json.dumps(block)) for block in content)
+    return {
+        "id": f"msg_fake{next(_ids)}",
+        "type": "message",
+        "role": "assistant",
+        "model": request.get("model", "fake"),
+        "content": content,
+        "stop_reason": stop_reason,
+        "stop_sequence": None,
+        "usage": {"input_tokens": len(json.dumps(request)) // 4, "output_tokens": output // 4},
+    }
+
+
+def reply(request: dict) -> dict:
+    """The echo-mode response for one request."""
+    text = f"seen {len(request.get('messages', []))} messages"
+    return _message(request, [{"type": "text", "text": text}])
+
+
+def load_script(path: Path) -> dict:
+    """A scripted-mode script: {"conversations", "family", "other"} as in load_conversations.json."""
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def _script_turns(script: dict) -> dict:
+    """User message -> its rounds, for every conversation turn and family text."""
+    turns = {turn["user"]: turn["rounds"]
+             for conversation in script.get("conversations", []) for turn in conversation["turns"]}
+    turns.update((text["user"], text["rounds"]) for text in script.get("family", []))
+    return turns
+
+
+def _latest_user_text(messages: list) -> tuple[int, str]:
+    for i in range(len(messages) - 1, -1, -1):
+        if messages[i]["role"] == "user" and isinstance(messages[i].get("content"), str):
+            return i, messages[i]["content"]
+    return -1, ""
+
+
+def _round_content(scripted: dict) -> tuple[list, str]:
+    if "tool" in scripted:
+        call = scripted["tool"]
+        return [{"type": "tool_use", "id": f"toolu_fake{next(_ids)}",
+                 "name": call["name"], "input": call.get("input", {})}], "tool_use"
+    content = []
+    if scripted.get("thinking"):
+        content.append({"type": "thinking", "thinking": scripted["thinking"], "signature": "fake"})
+    content.append({"type": "text", "text": scripted["text"]})
+    return content, "end_turn"
+
+
+def scripted_reply(request: dict, script: dict, turns: dict) -> tuple[float, dict, str]:
+    """(recorded delay, response, "tool"/"text"/"other") for one request."""
+    messages = request.get("messages", [])
+    index, text = _latest_user_text(messages)
+    rounds = turns.get(text)
+    if rounds is None:
+        # Family texts arrive wrapped in a context header
+        rounds = next((r for user, r in turns.items() if user in text), None)
+    if rounds is None:
+        scripted = next(o for o in script["other"] if o["match"] in text)
+        kind = "other"
+    else:
+        done = sum(1 for m in messages[index + 1:] if m["role"] == "assistant")
+        scripted = rounds[min(done, len(rounds) - 1)]
+        kind = "tool" if "tool" in scripted else "text"
+    content, stop_reason = _round_content(scripted)
+    return scripted.get("delay", 0.0), _message(request, content, stop_reason), kind
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, like the real API
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        request = json.loads(body or b"{}")
+        server = self.server
+        if server.script is None:
+            delay, response, kind = server.latency, reply(request), "text"
+        else:
+            delay, response, kind = scripted_reply(request, server.script, server.turns)
+            delay *= server.time_scale
+        time.sleep(delay)
+        data = json.dumps(response).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        with server.count_lock:
+            server.requests += 1
+            server.kinds[kind] += 1
+
+    def log_message(self, *args):
+        pass
+
+
+def start(port: int = 0, latency: float = 0.2, script: dict | None = None,
+          time_scale: float = 1.0) -> ThreadingHTTPServer:
+    """Serve in a background thread; the base URL is server.url.
+
+    With a script, recorded delays are multiplied by time_scale (0.1 = ten
+    times faster than the real API).
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.script = script
+    server.turns = _script_turns(script) if script else {}
+    server.time_scale = time_scale
+    server.requests = 0
+    server.kinds = Counter()
+    server.count_lock = threading.Lock()
+    server.url = f"http://127.0.0.1:{server.server_port}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Anthropic Messages API")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per API call (echo mode)")
+    parser.add_argument("--script", type=Path, help="replay recorded responses from this file")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="multiply recorded delays")
+    args = parser.parse_args()
+    script = load_script(args.script) if args.script else None
+    server = start(args.port, args.latency, script, args.time_scale)
+    mode = f"replaying {args.script}" if script else f"{args.latency:g}s per call"
+    print(f"Fake Anthropic API on {server.url} ({mode})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
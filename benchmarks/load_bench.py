@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""TechBuddy Load Benchmark — how many households can one server hold?
+
+Serves the Flask app in this process (threaded, as in production) against
+a fake Anthropic API that replays recorded responses with their recorded
+delays (data/load_conversations.json; fake_anthropic.py). Tools really
+run, against a throwaway home folder with demo files and notes. A second
+process plays HOUSEHOLDS households for DURATION seconds. Each household:
+
+  - opens the page and works through a scripted conversation on /chat,
+    where most turns call a tool (email, notes, files, system health)
+    before answering, then starts the next conversation
+  - gets one family text on /sms/simulate per conversation
+  - polls /family/messages every 1.5 s, like the chat page
+
+Then reports:
+
+  - throughput and p50 / p95 / p99 latency per endpoint, and errors
+  - family texts sent vs. delivered to a poll
+  - server threads (start / peak / end), which grow with connections and
+    with /sms/simulate's thread per text
+  - process memory (RSS) and the stored conversation histories: how many,
+    how big, and bytes per conversation
+
+The load runs in its own process so it doesn't compete with the server
+for the GIL. Use --time-scale to replay faster than the real API.
+
+Usage:
+    python benchmarks/load_bench.py
+    python benchmarks/load_bench.py --households 50 --duration 60 --time-scale 0.2
+    python benchmarks/load_bench.py --state-db /tmp/state.db    # shared SQLite store
+    python benchmarks/load_bench.py --save load_baseline.json
+    python benchmarks/load_bench.py --compare load_baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks import fake_anthropic  # noqa: E402
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
+SCRIPT = DATA_DIR / "load_conversations.json"
+
+ENDPOINTS = ("/chat", "/sms/simulate", "/family/messages")
+POLL_INTERVAL = 1.5       # seconds, as in chat.html
+SAMPLE_EVERY = 0.1        # seconds between thread/memory samples
+
+# How much worse a run may be than its baseline before --compare fails
+TOLERANCES = {
+    "throughput_ratio": 0.8,   # requests/s may fall to this fraction
+    "latency_ratio": 1.5,      # p50/p95/p99 may grow by this factor
+    "memory_ratio": 1.5,       # RSS growth and history bytes per conversation
+    "threads_ratio": 1.5,      # peak server threads
+}
+
+DEMO_FILES = {
+    "Desktop/Grocery List.txt": "Grocery List\n\n- Milk\n- Bread\n- Eggs\n- Bananas\n",
+    "Desktop/Doctors Appointment Notes.txt": "Dr. Johnson - Feb 13\n- Lisinopril renewed, 10mg daily\n",
+    "Desktop/Important Phone Numbers.txt": "Sarah (daughter): 555-123-4567\n",
+    "Documents/Recipes/Apple Pie.txt": "Apple pie\n6 apples, 1 cup sugar, 2 crusts\n",
+    "Pictures/Emily drawing.jpg": "",
+    "TechBuddy Notes/health.md": "# Health\n- Takes Lisinopril 10mg daily (medicine)\n- Doctor is Dr. Johnson\n",
+    "TechBuddy Notes/family.md": "# Family\n- Sarah is her daughter\n- Emily is her granddaughter\n",
+}
+
+
+# ---------------------------------------------------------------------------
+# Server side (this process)
+# ---------------------------------------------------------------------------
+
+def make_household(root: Path):
+    """Demo files and notes for the tools to work on."""
+    for name, text in DEMO_FILES.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+    for folder in ("Downloads", "Videos"):
+        (root / folder).mkdir(exist_ok=True)
+
+
+def _rss_mb() -> float:
+    """This process's resident memory in MB."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1048576
+    except OSError:
+        import psutil
+        return psutil.Process().memory_info().rss / 1048576
+
+
+def _sampler(stop: threading.Event, peaks: dict):
+    while not stop.is_set():
+        peaks["threads"] = max(peaks["threads"], threading.active_count())
+        peaks["rss_mb"] = max(peaks["rss_mb"], _rss_mb())
+        stop.wait(SAMPLE_EVERY)
+
+
+def _server_state() -> dict:
+    from frontend import state_store
+    return {"threads": threading.active_count(), "rss_mb": round(_rss_mb(), 1),
+            "histories": state_store.history_stats()}
+
+
+class _Setup:
+    """Point the app and its tools at the fake API and a throwaway home, and undo it after."""
+
+    def __init__(self, api_url: str, home: Path, state_db: Path | None):
+        import anthropic
+        from frontend import app as shared
+        from frontend import state_store
+        from mcp_servers import screen_dispatch as sd
+        self.shared, self.sd, self.state_store = shared, sd, state_store
+        self.saved = {"client": shared.client, "sd": {name: getattr(sd, name) for name in
+                                                      ("WIN_HOME", "USER_FOLDERS", "NOTES_DIR")},
+                      "shared_state": state_store.shared()}
+        fake = anthropic.Anthropic(base_url=api_url, api_key="fake", max_retries=0)
+        shared.client = fake
+        sd.set_anthropic_client(fake)
+        sd.WIN_HOME = home
+        sd.USER_FOLDERS = [home / name for name in ("Desktop", "Documents", "Downloads", "Pictures", "Videos")]
+        sd.NOTES_DIR = home / "TechBuddy Notes"
+        if state_db:
+            state_store.configure(state_db)
+
+    def restore(self):
+        self.shared.client = self.saved["client"]
+        self.sd.set_anthropic_client(self.saved["client"])
+        for name, value in self.saved["sd"].items():
+            setattr(self.sd, name, value)
+        if not self.saved["shared_state"]:
+            self.state_store.configure(None)
+
+
+# ---------------------------------------------------------------------------
+# Load side (a separate process)
+# ---------------------------------------------------------------------------
+
+async def _timed(results: dict, endpoint: str, call) -> dict | None:
+    start = time.perf_counter()
+    try:
+        resp = await call
+        resp.raise_for_status()
+        data = resp.json()
+    except (httpx.HTTPError, ValueError):
+        results["errors"][endpoint] += 1
+        return None
+    results["latencies"][endpoint].append(time.perf_counter() - start)
+    return data
+
+
+async def _poll(client, interval: float, stop: asyncio.Event, results: dict):
+    while not stop.is_set():
+        data = await _timed(results, "/family/messages", client.get("/family/messages"))
+        if data:
+            results["delivered"] += len(data["messages"])
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def _household(n: int, base: str, script: dict, deadline: float, think: float,
+                     poll: float, results: dict):
+    conversations, family = script["conversations"], script["family"]
+    async with httpx.AsyncClient(base_url=base, timeout=300) as client:
+        stop = asyncio.Event()
+        poller = asyncio.create_task(_poll(client, poll, stop, results))
+        i = n
+        while time.monotonic() < deadline:
+            await client.get("/")
+            for t, turn in enumerate(conversations[i % len(conversations)]["turns"]):
+                if time.monotonic() >= deadline:
+                    break
+                data = await _timed(results, "/chat", client.post("/chat", json={"message": turn["user"]}))
+                if data and data["reply"] != turn["rounds"][-1]["text"]:
+                    results["wrong_replies"] += 1
+                if t == 0:
+                    text = family[i % len(family)]
+                    sent = await _timed(results, "/sms/simulate", client.post(
+                        "/sms/simulate", json={"from_number": text["from_number"], "message": text["user"]}))
+                    results["sent"] += sent is not None
+                await asyncio.sleep(think)
+            else:
+                results["conversations"] += 1
+            i += 1
+        stop.set()
+        await poller
+
+
+async def drive(base: str, script: dict, households: int, duration: float,
+                think: float = 1.0, poll: float = POLL_INTERVAL) -> dict:
+    """Run the households against the server at `base`; raw latencies and counters."""
+    results = {"latencies": defaultdict(list), "errors": defaultdict(int), "wrong_replies": 0,
+               "sent": 0, "delivered": 0, "conversations": 0}
+    start = time.perf_counter()
+    deadline = time.monotonic() + duration
+    await asyncio.gather(*(_household(n, base, script, deadline, think, poll, results)
+                           for n in range(households)))
+    results["seconds"] = time.perf_counter() - start
+    results["latencies"] = dict(results["latencies"])
+    results["errors"] = dict(results["errors"])
+    return results
+
+
+def _drive_process(queue, base, script, households, duration, think, poll):
+    queue.put(asyncio.run(drive(base, script, households, duration, think, poll)))
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _endpoint_report(latencies: list[float], errors: int, seconds: float) -> dict:
+    return {
+        "requests": len(latencies),
+        "per_s": round(len(latencies) / seconds, 2) if seconds else 0.0,
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 1),
+        "errors": errors,
+    }
+
+
+def run_benchmark(households: int = 20, duration: float = 30.0, think: float = 1.0,
+                  time_scale: float = 1.0, poll: float = POLL_INTERVAL,
+                  state_db: Path | None = None, script_path: Path = SCRIPT) -> dict:
+    from werkzeug.serving import make_server
+    from frontend import app as shared
+
+    script = fake_anthropic.load_script(script_path)
+    api = fake_anthropic.start(script=script, time_scale=time_scale)
+    home = tempfile.TemporaryDirectory()
+    make_household(Path(home.name))
+    setup = _Setup(api.url, Path(home.name), state_db)
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)   # no line per request
+    server = make_server("127.0.0.1", 0, shared.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    try:
+        # Load the SDK and warm the tools before anything is measured
+        with httpx.Client(base_url=base, timeout=300) as warm:
+            warm.get("/")
+            warm.post("/chat", json={"message": script["conversations"][0]["turns"][0]["user"]})
+        api_before = dict(api.kinds)
+        before = _server_state()
+        peaks = {"threads": before["threads"], "rss_mb": before["rss_mb"]}
+        stop = threading.Event()
+        sampler = threading.Thread(target=_sampler, args=(stop, peaks), daemon=True)
+        sampler.start()
+
+        ctx = multiprocessing.get_context("spawn")
+        queue = ctx.Queue()
+        load = ctx.Process(target=_drive_process,
+                           args=(queue, base, script, households, duration, think, poll))
+        load.start()
+        results = queue.get(timeout=duration + 600)
+        load.join()
+        stop.set()
+        sampler.join()
+        after = _server_state()
+    finally:
+        server.shutdown()
+        api.shutdown()
+        setup.restore()
+        home.cleanup()
+
+    seconds = results["seconds"]
+    grown = after["histories"]["conversations"] - before["histories"]["conversations"]
+    return {
+        "config": {"households": households, "duration": duration, "think": think,
+                   "time_scale": time_scale, "state": "sqlite" if state_db else "in-process"},
+        "endpoints": {ep: _endpoint_report(results["latencies"].get(ep, []), results["errors"].get(ep, 0),
+                                           seconds) for ep in ENDPOINTS},
+        "conversations": results["conversations"],
+        "wrong_replies": results["wrong_replies"],
+        "family": {"sent": results["sent"], "delivered": results["delivered"]},
+        "api_calls": {kind: api.kinds[kind] - api_before.get(kind, 0) for kind in ("tool", "text", "other")},
+        "server": {
+            "threads": {"start": before["threads"], "peak": peaks["threads"], "end": after["threads"]},
+            "rss_mb": {"start": before["rss_mb"], "peak": round(peaks["rss_mb"], 1),
+                       "end": after["rss_mb"], "growth": round(after["rss_mb"] - before["rss_mb"], 1)},
+            "histories": {"start": before["histories"], "end": after["histories"],
+                          "bytes_per_conversation": round(
+                              (after["histories"]["bytes"] - before["histories"]["bytes"]) / grown)
+                          if grown else 0},
+        },
+    }
+
+
+def compare(report: dict, baseline: dict) -> list[str]:
+    """List every metric where report is worse than baseline beyond TOLERANCES."""
+    problems = []
+    if report["config"] != baseline["config"]:
+        problems.append(f"config differs from baseline: {baseline['config']} -> {report['config']}")
+        return problems
+    for endpoint, then in baseline["endpoints"].items():
+        now = report["endpoints"][endpoint]
+        if now["per_s"] < then["per_s"] * TOLERANCES["throughput_ratio"]:
+            problems.append(f"{endpoint} throughput: {then['per_s']}/s -> {now['per_s']}/s")
+        for pct in ("p50_ms", "p95_ms", "p99_ms"):
+            if then[pct] and now[pct] > then[pct] * TOLERANCES["latency_ratio"]:
+                problems.append(f"{endpoint} {pct}: {then[pct]} -> {now[pct]}")
+        if now["errors"] > then["errors"]:
+            problems.append(f"{endpoint} errors: {then['errors']} -> {now['errors']}")
+    if report["wrong_replies"] > baseline["wrong_replies"]:
+        problems.append(f"wrong replies: {baseline['wrong_replies']} -> {report['wrong_replies']}")
+
+    now, then = report["server"], baseline["server"]
+    if now["threads"]["peak"] > then["threads"]["peak"] * TOLERANCES["threads_ratio"]:
+        problems.append(f"peak threads: {then['threads']['peak']} -> {now['threads']['peak']}")
+    if then["rss_mb"]["growth"] > 0 and \
+            now["rss_mb"]["growth"] > then["rss_mb"]["growth"] * TOLERANCES["memory_ratio"]:
+        problems.append(f"RSS growth: {then['rss_mb']['growth']} MB -> {now['rss_mb']['growth']} MB")
+    per_conv_then = then["histories"]["bytes_per_conversation"]
+    per_conv_now = now["histories"]["bytes_per_conversation"]
+    if per_conv_then and per_conv_now > per_conv_then * TOLERANCES["memory_ratio"]:
+        problems.append(f"history bytes per conversation: {per_conv_then} -> {per_conv_now}")
+    return problems
+
+
+def format_report(report: dict) -> str:
+    c, s = report["config"], report["server"]
+    lines = ["", "=" * 70, "  TechBuddy Load Benchmark", "=" * 70,
+             f"  {c['households']} households, {c['duration']:g}s, think {c['think']:g}s, "
+             f"API delays x{c['time_scale']:g}, state {c['state']}", "",
+             f"  {'endpoint':<18}{'requests':>9}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}"]
+    for endpoint, r in report["endpoints"].items():
+        lines.append(f"  {endpoint:<18}{r['requests']:>9}{r['per_s']:>8}{r['p50_ms']:>9}"
+                     f"{r['p95_ms']:>9}{r['p99_ms']:>9}{r['errors']:>8}")
+    calls = report["api_calls"]
+    lines += ["",
+              f"  Conversations finished: {report['conversations']}   wrong replies: {report['wrong_replies']}",
+              f"  API calls: {calls['tool']} tool rounds, {calls['text']} answers, {calls['other']} from tools",
+              f"  Family texts: {report['family']['sent']} sent, {report['family']['delivered']} delivered",
+              f"  Threads: {s['threads']['start']} -> peak {s['threads']['peak']} -> {s['threads']['end']}",
+              f"  Memory: {s['rss_mb']['start']} MB -> peak {s['rss_mb']['peak']} MB -> "
+              f"{s['rss_mb']['end']} MB ({s['rss_mb']['growth']:+} MB)",
+              f"  Histories: {s['histories']['start']['conversations']} -> "
+              f"{s['histories']['end']['conversations']} stored, "
+              f"{s['histories']['end']['bytes'] / 1024:.1f} KB "
+              f"({s['histories']['bytes_per_conversation']} bytes per conversation)", ""]
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load benchmark for /chat, /sms/simulate, /family/messages")
+    parser.add_argument("--households", type=int, default=20, help="households chatting at once")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of load")
+    parser.add_argument("--think", type=float, default=1.0, help="seconds between a household's turns")
+    parser.add_argument("--time-scale", type=float, default=1.0,
+                        help="multiply the recorded API delays (0.1 = ten times faster)")
+    parser.add_argument("--state-db", type=Path, help="use the shared SQLite state store at this path")
+    parser.add_argument("--script", type=Path, default=SCRIPT, help="recorded conversations")
+    parser.add_argument("--save", type=Path, help="write the report as JSON")
+    parser.add_argument("--compare", type=Path, help="fail if worse than this saved report")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.households, args.duration, args.think, args.time_scale,
+                           state_db=args.state_db, script_path=args.script)
+    print(format_report(report))
+
+    if args.save:
+        args.save.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"  Saved report to {args.save}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        problems = compare(report, baseline)
+        if problems:
+            print("  REGRESSIONS vs baseline:")
+            for p in problems:
+                print(f"    - {p}")
+            sys.exit(1)
+        print("  No regressions vs baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""TechBuddy Scam Shield Benchmark — accuracy, latency, and LLM escalation, fully offline.
+
+Runs every message in a labeled corpus through _scan_for_scam and
+analyze_scam_risk with the Anthropic client replaced by a recorded-response
+stub (and web search disabled), then reports:
+
+  - precision / recall per category (email, popup, sms, phone) and overall
+  - per-message scan latency (p50 / p99)
+  - LLM escalation rate (Opus calls per message the scanner flagged)
+
+Usage:
+    python benchmarks/scam_bench.py
+    python benchmarks/scam_bench.py --save bench_output.json
+    python benchmarks/scam_bench.py --compare bench_output.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import mcp_servers.screen_dispatch as sd  # noqa: E402
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
+EVAL_CORPUS = DATA_DIR / "scam_eval.jsonl"
+RECORDED_RESPONSES = DATA_DIR / "recorded_responses.json"
+
+# How much worse a run may be than its baseline before --compare fails
+TOLERANCES = {
+    "precision": 0.02,        # absolute drop
+    "recall": 0.02,           # absolute drop
+    "escalation_rate": 0.05,  # absolute rise
+    "latency_ratio": 1.5,     # p50/p99 may grow by this factor
+}
+
+
+class RecordedClient:
+    """Stand-in for anthropic.Anthropic that replays recorded responses.
+
+    Counts calls so the benchmark can report escalation. Prompts that ask
+    for a JSON array (triage_inbox) get the recorded triage reply; all
+    others get the recorded analyze_scam_risk reply.
+    """
+
+    def __init__(self, responses: dict):
+        self.responses = responses
+        self.calls = 0
+        self.messages = SimpleNamespace(create=self._create)
+
+    def _create(self, **kwargs):
+        self.calls += 1
+        delay = self.responses.get("delay_seconds", 0.0)
+        if delay:
+            time.sleep(delay)
+        prompt = kwargs["messages"][-1]["content"]
+        if "JSON array" in prompt:
+            return SimpleNamespace(content=[
+                SimpleNamespace(type="text", text=self.responses["triage_inbox"]),
+            ])
+        recorded = self.responses["analyze_scam_risk"]
+        return SimpleNamespace(content=[
+            SimpleNamespace(type="thinking", thinking=recorded["thinking"]),
+            SimpleNamespace(type="text", text=recorded["text"]),
+        ])
+
+
+def load_eval_corpus(path: Path = EVAL_CORPUS) -> list[dict]:
+    """Labeled messages: one {"text", "label", "kind"} object per line."""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+def _precision_recall(pairs: list[tuple[int, int]]) -> dict:
+    tp = sum(1 for label, pred in pairs if label and pred)
+    fp = sum(1 for label, pred in pairs if not label and pred)
+    fn = sum(1 for label, pred in pairs if label and not pred)
+    return {
+        "n": len(pairs),
+        "precision": round(tp / (tp + fp), 3) if tp + fp else 1.0,
+        "recall": round(tp / (tp + fn), 3) if tp + fn else 1.0,
+        "false_positives": fp,
+        "false_negatives": fn,
+    }
+
+
+def run_benchmark(rows: list[dict], repeats: int = 5) -> dict:
+    """Score every row and time the scanner. Returns the report dict."""
+    with open(RECORDED_RESPONSES, encoding="utf-8") as f:
+        client = RecordedClient(json.load(f))
+
+    # Train the classifier outside the timed loop
+    sd._scan_for_scam("warm up")
+
+    latencies_ms = []
+    pairs_by_kind = {}
+    misses = []
+    for row in rows:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            scan = sd._scan_for_scam(row["text"])
+            latencies_ms.append((time.perf_counter() - start) * 1000)
+        predicted = int(scan["risk"] != "SAFE")
+        pairs_by_kind.setdefault(row["kind"], []).append((int(row["label"]), predicted))
+        if predicted != int(row["label"]):
+            misses.append({"kind": row["kind"], "label": row["label"], "risk": scan["risk"],
+                           "probability": scan["probability"], "text": row["text"][:80]})
+
+    # Escalation: full analyze_scam_risk path with the recorded client, no web search
+    original_client = sd._anthropic_client
+    sd.set_anthropic_client(client)
+    try:
+        with patch.object(sd, "_search_web_raw", return_value=[]):
+            for row in rows:
+                sd.analyze_scam_risk(row["text"], row["kind"])
+    finally:
+        sd.set_anthropic_client(original_client)
+
+    all_pairs = [p for pairs in pairs_by_kind.values() for p in pairs]
+    flagged = sum(1 for _, pred in all_pairs if pred)
+    return {
+        "overall": _precision_recall(all_pairs),
+        "by_kind": {kind: _precision_recall(pairs) for kind, pairs in sorted(pairs_by_kind.items())},
+        "latency_ms": {
+            "p50": round(_percentile(latencies_ms, 50), 4),
+            "p99": round(_percentile(latencies_ms, 99), 4),
+        },
+        "llm_calls": client.calls,
+        "escalation_rate": round(client.calls / flagged, 3) if flagged else 0.0,
+        "misses": misses,
+    }
+
+
+def compare(report: dict, baseline: dict) -> list[str]:
+    """List every metric where report is worse than baseline beyond TOLERANCES."""
+    problems = []
+    for scope in ["overall"] + [f"by_kind.{k}" for k in baseline.get("by_kind", {})]:
+        if scope == "overall":
+            now, then = report["overall"], baseline["overall"]
+        else:
+            kind = scope.split(".", 1)[1]
+            now, then = report["by_kind"].get(kind), baseline["by_kind"][kind]
+            if now is None:
+                problems.append(f"{scope}: missing from this run")
+                continue
+        for metric in ("precision", "recall"):
+            if now[metric] < then[metric] - TOLERANCES[metric]:
+                problems.append(f"{scope} {metric}: {then[metric]} -> {now[metric]}")
+
+    if report["escalation_rate"] > baseline["escalation_rate"] + TOLERANCES["escalation_rate"]:
+        problems.append(f"escalation_rate: {baseline['escalation_rate']} -> {report['escalation_rate']}")
+    for pct in ("p50", "p99"):
+        then = baseline["latency_ms"][pct]
+        now = report["latency_ms"][pct]
+        if then and now > then * TOLERANCES["latency_ratio"]:
+            problems.append(f"latency {pct}: {then} ms -> {now} ms")
+    return problems
+
+
+def format_report(report: dict) -> str:
+    lines = ["", "=" * 60, "  TechBuddy Scam Shield Benchmark", "=" * 60, ""]
+    lines.append(f"  {'category':<10}{'n':>5}{'precision':>12}{'recall':>9}{'FP':>5}{'FN':>5}")
+    for kind, m in list(report["by_kind"].items()) + [("ALL", report["overall"])]:
+        lines.append(f"  {kind:<10}{m['n']:>5}{m['precision']:>12.3f}{m['recall']:>9.3f}"
+                     f"{m['false_positives']:>5}{m['false_negatives']:>5}")
+    lines.append("")
+    lines.append(f"  Scan latency: p50 {report['latency_ms']['p50']:.3f} ms, "
+                 f"p99 {report['latency_ms']['p99']:.3f} ms")
+    lines.append(f"  LLM escalation: {report['llm_calls']} calls "
+                 f"({report['escalation_rate']:.0%} of flagged messages)")
+    if report["misses"]:
+        lines.append("")
+        lines.append("  Misclassified:")
+        for m in report["misses"]:
+            lines.append(f"    [{m['kind']}] label={m['label']} risk={m['risk']} "
+                         f"p={m['probability']}: {m['text']}")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline Scam Shield benchmark")
+    parser.add_argument("--corpus", type=Path, default=EVAL_CORPUS, help="labeled JSONL corpus")
+    parser.add_argument("--repeats", type=int, default=5, help="timed scans per message")
+    parser.add_argument("--save", type=Path, help="write the report as JSON")
+    parser.add_argument("--compare", type=Path, help="fail if worse than this saved report")
+    args = parser.parse_args()
+
+    report = run_benchmark(load_eval_corpus(args.corpus), repeats=args.repeats)
+    print(format_report(report))
+
+    if args.save:
+        args.save.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"  Saved report to {args.save}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        problems = compare(report, baseline)
+        if problems:
+            print("  REGRESSIONS vs baseline:")
+            for p in problems:
+                print(f"    - {p}")
+            sys.exit(1)
+        print("  No regressions vs baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""TechBuddy Screenshot Encoding Benchmark — size, tokens, and encode time per tier.
+
+Encodes one screenshot with every tier in screen_capture.ENCODE_TIERS (plus
+the old full-size PNG optimize=True path for reference) and prints a table,
+so the tier with the best latency per accuracy can be chosen on real
+screens.
+
+Usage:
+    python benchmarks/screen_encode_bench.py                  # synthetic 2560x1440 desktop
+    python benchmarks/screen_encode_bench.py --image shot.png # a real screenshot
+    python benchmarks/screen_encode_bench.py --grab           # capture now (Windows)
+"""
+
+import argparse
+import io
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from PIL import Image, ImageDraw  # noqa: E402
+
+from mcp_servers.screen_capture import ENCODE_TIERS, encode_image, estimate_tokens, grab_screen  # noqa: E402
+
+
+def synthetic_desktop(width: int = 2560, height: int = 1440, seed: int = 0):
+    """A desktop-like test image: photo-ish wallpaper, windows, and text."""
+    rng = random.Random(seed)
+    image = Image.effect_noise((width, height), 40).convert("RGB")
+    image = Image.blend(image, Image.linear_gradient("L").resize((width, height)).convert("RGB"), 0.5)
+    draw = ImageDraw.Draw(image)
+    for _ in range(4):
+        x, y = rng.randrange(0, width - 900), rng.randrange(0, height - 600)
+        draw.rectangle([x, y, x + 900, y + 600], fill="white", outline="gray")
+        draw.rectangle([x, y, x + 900, y + 32], fill=(0, 120, 215))
+        for line in range(20):
+            draw.text((x + 20, y + 50 + line * 26), f"Line {line}: your order #{rng.randrange(10**6)} has shipped",
+                      fill="black")
+    return image
+
+
+def _legacy_png(image) -> dict:
+    """The pre-tier encoder: cap at 1920 px wide, PNG with optimize=True."""
+    start = time.perf_counter()
+    if image.width > 1920:
+        image = image.resize((1920, int(image.height * 1920 / image.width)))
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", optimize=True)
+    return {
+        "width": image.width, "height": image.height, "bytes": len(buffer.getvalue()),
+        "encode_ms": round((time.perf_counter() - start) * 1000, 1),
+        "tokens": estimate_tokens(image.width, image.height),
+    }
+
+
+def run_benchmark(image, repeats: int = 3) -> dict:
+    """Median encode time plus size/tokens for the legacy path and every tier."""
+    results = {}
+    encoders = {"legacy-png": _legacy_png}
+    encoders.update({tier: (lambda img, t=tier: encode_image(img, t)) for tier in ENCODE_TIERS})
+    for name, encode in encoders.items():
+        runs = [encode(image) for _ in range(repeats)]
+        last = runs[-1]
+        results[name] = {
+            "size": f"{last['width']}x{last['height']}",
+            "kb": round(last["bytes"] / 1024, 1),
+            "base64_kb": round(last["bytes"] * 4 / 3 / 1024, 1),
+            "tokens": last["tokens"],
+            "encode_ms": statistics.median(r["encode_ms"] for r in runs),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Screenshot encoding tiers")
+    parser.add_argument("--image", type=Path, help="screenshot file to encode")
+    parser.add_argument("--grab", action="store_true", help="capture the current screen")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.grab:
+        image = grab_screen()
+    elif args.image:
+        image = Image.open(args.image)
+        image.load()
+    else:
+        image = synthetic_desktop()
+
+    print()
+    print("=" * 66)
+    print(f"  Screenshot encoding — source {image.width}x{image.height}")
+    print("=" * 66)
+    print(f"  {'tier':<12}{'size':>11}{'KB':>9}{'base64 KB':>11}{'tokens':>8}{'ms':>9}")
+    for name, r in run_benchmark(image, args.repeats).items():
+        print(f"  {name:<12}{r['size']:>11}{r['kb']:>9}{r['base64_kb']:>11}{r['tokens']:>8}{r['encode_ms']:>9}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""TechBuddy Tool Benchmark — the file, notes and scam tools on big synthetic homes.
+
+Builds synthetic home folders of 10k, 100k and (opt-in) 1M files, then
+times the tools that walk them:
+
+  - find_file        a common word, and a name that isn't there (full walk)
+  - find_photos      by name, and everything from the last 30 days
+  - list_folder      a cluttered Desktop
+  - read_notes       the note list, and one large note
+  - _scan_for_scam   the held-out eval messages, and one long email
+
+Each tree is shaped like a real home: a cluttered Desktop, Documents
+nested up to eight folders deep, Pictures sorted into year/event folders
+(about a third of all files are photos), a flat Downloads, and TechBuddy
+Notes holding a few large notes (about 20 bytes of notes per file in the
+tree). File times are spread over three years. Files are empty; only
+names, folders and times matter to these tools. Trees are kept in
+--tree-dir and reused while their size and layout version match (writing
+the 1M-file tree takes most of a minute on a fast disk).
+
+Each tool runs once to warm the filesystem cache, then REPEATS timed runs
+(median and min reported), then once more under tracemalloc for peak
+Python memory.
+
+Usage:
+    python benchmarks/tool_bench.py
+    python benchmarks/tool_bench.py --sizes 10k 100k 1m --repeats 3
+    python benchmarks/tool_bench.py --save tool_baseline.json
+    python benchmarks/tool_bench.py --compare tool_baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import mcp_servers.screen_dispatch as sd  # noqa: E402
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
+EVAL_CORPUS = DATA_DIR / "scam_eval.jsonl"
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+DEFAULT_SIZES = ("10k", "100k")
+TREE_VERSION = 1          # bump when the layout changes, so saved trees are rebuilt
+MARKER = ".techbuddy-bench-tree.json"
+NOTE_BYTES_PER_FILE = 20
+MAX_DEPTH = 8
+
+# How much worse a run may be than its baseline before --compare fails
+TOLERANCES = {
+    "time_ratio": 1.5,        # median may grow by this factor...
+    "time_floor_ms": 2.0,     # ...and by at least this much (timer noise)
+    "memory_ratio": 1.5,      # peak traced memory may grow by this factor...
+    "memory_floor_kb": 256,   # ...and by at least this much
+}
+
+# Share of the tree per top-level folder
+LAYOUT = {"Desktop": 0.01, "Documents": 0.40, "Pictures": 0.30, "Downloads": 0.25, "Videos": 0.04}
+
+WORDS = ("receipt", "letter", "tax", "recipe", "insurance", "medicare", "bank", "statement",
+         "birthday", "vacation", "christmas", "grandkids", "garden", "church", "doctor",
+         "pharmacy", "warranty", "manual", "invitation", "budget", "card", "photo", "scan")
+DOC_EXTENSIONS = (".docx", ".pdf", ".txt", ".xlsx", ".doc", ".rtf")
+PHOTO_EXTENSIONS = (".jpg", ".jpeg", ".png", ".heic")
+DOWNLOAD_EXTENSIONS = (".pdf", ".zip", ".exe", ".jpg", ".docx", ".msi")
+VIDEO_EXTENSIONS = (".mp4", ".mov")
+
+
+# ---------------------------------------------------------------------------
+# Synthetic home folders
+# ---------------------------------------------------------------------------
+
+def _touch(path: Path, mtime: float):
+    os.close(os.open(path, os.O_CREAT | os.O_WRONLY, 0o644))
+    os.utime(path, (mtime, mtime))
+
+
+def _name(rng: random.Random, i: int, extensions: tuple) -> str:
+    return f"{rng.choice(WORDS)} {rng.choice(WORDS)} {i}{rng.choice(extensions)}"
+
+
+def _write_notes(notes: Path, rng: random.Random, total_bytes: int):
+    """A few large notes: most of the bytes in sessions.md, as after years of use."""
+    notes.mkdir(parents=True, exist_ok=True)
+    shares = {"sessions.md": 0.7, "health.md": 0.1, "family.md": 0.1, "preferences.md": 0.1}
+    for name, share in shares.items():
+        lines, size, n = [f"# {name[:-3].title()}\n"], 0, 0
+        while size < total_bytes * share:
+            line = (f"- 20{rng.randint(23, 26)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}: "
+                    f"helped with {rng.choice(WORDS)} and {rng.choice(WORDS)} ({n})\n")
+            lines.append(line)
+            size += len(line)
+            n += 1
+        (notes / name).write_text("".join(lines), encoding="utf-8")
+
+
+def build_tree(root: Path, files: int, seed: int = 0) -> Path:
+    """Write a synthetic home of about `files` files under root (reused if already there)."""
+    marker = root / MARKER
+    spec = {"files": files, "seed": seed, "version": TREE_VERSION}
+    if marker.exists():
+        saved = json.loads(marker.read_text(encoding="utf-8"))
+        if {key: saved.get(key) for key in spec} == spec:
+            return root
+    if root.exists() and any(root.iterdir()):
+        raise FileExistsError(f"{root} exists and isn't a tree for {spec}; remove it first")
+
+    rng = random.Random(seed)
+    now = time.time()
+    three_years = 3 * 365 * 86400
+    made = 0
+    for top, share in LAYOUT.items():
+        count = max(1, int(files * share))
+        base = root / top
+        base.mkdir(parents=True, exist_ok=True)
+        folders = [base]
+        for i in range(count):
+            mtime = now - rng.random() * three_years
+            if top == "Desktop":
+                parent, ext = base, DOC_EXTENSIONS + PHOTO_EXTENSIONS
+            elif top == "Documents":
+                # A new folder every ~40 files, at a random depth below an existing one
+                if i % 40 == 0:
+                    parent_folder = rng.choice(folders)
+                    if len(parent_folder.relative_to(base).parts) < MAX_DEPTH:
+                        new = parent_folder / f"{rng.choice(WORDS)} {len(folders)}"
+                        new.mkdir(exist_ok=True)
+                        folders.append(new)
+                parent, ext = rng.choice(folders), DOC_EXTENSIONS
+            elif top == "Pictures":
+                year = time.localtime(mtime).tm_year
+                parent = base / str(year) / f"{rng.choice(WORDS)} {i // 200}"
+                parent.mkdir(parents=True, exist_ok=True)
+                ext = PHOTO_EXTENSIONS
+            elif top == "Downloads":
+                parent = base if i % 10 else base / f"unzipped {i // 500}"
+                parent.mkdir(exist_ok=True)
+                ext = DOWNLOAD_EXTENSIONS
+            else:
+                parent, ext = base, VIDEO_EXTENSIONS
+            _touch(parent / _name(rng, i, ext), mtime)
+            made += 1
+
+    _write_notes(root / "TechBuddy Notes", rng, files * NOTE_BYTES_PER_FILE)
+    spec["made"] = made
+    marker.write_text(json.dumps(spec), encoding="utf-8")
+    return root
+
+
+@contextmanager
+def home_at(root: Path):
+    """Point the tools at a synthetic home for the duration of a with block."""
+    saved = {name: getattr(sd, name) for name in ("WIN_HOME", "USER_FOLDERS", "NOTES_DIR")}
+    sd.WIN_HOME = root
+    sd.USER_FOLDERS = [root / top for top in LAYOUT]
+    sd.NOTES_DIR = root / "TechBuddy Notes"
+    try:
+        yield root
+    finally:
+        for name, value in saved.items():
+            setattr(sd, name, value)
+
+
+# ---------------------------------------------------------------------------
+# Cases
+# ---------------------------------------------------------------------------
+
+def _load_messages() -> list[str]:
+    with open(EVAL_CORPUS, encoding="utf-8") as f:
+        return [json.loads(line)["text"] for line in f if line.strip()]
+
+
+def _long_email(files: int) -> str:
+    """A long newsletter-style email that grows with the tree (2 bytes per file)."""
+    rng = random.Random(files)
+    paragraph = ("Dear member, here is this month's news from the {0} club. Visit "
+                 "https://www.example-{1}.org/news or call 555-01{2:02d} with questions about {3}. ")
+    parts, size = [], 0
+    while size < files * 2:
+        text = paragraph.format(rng.choice(WORDS), rng.choice(WORDS), rng.randint(0, 99), rng.choice(WORDS))
+        parts.append(text)
+        size += len(text)
+    return "".join(parts)
+
+
+def cases(files: int) -> dict:
+    """Case name -> zero-argument callable, for a tree of `files` files."""
+    messages = _load_messages()
+    long_email = _long_email(files)
+    return {
+        "find_file": lambda: sd.find_file("receipt"),
+        "find_file_missing": lambda: sd.find_file("no such file anywhere"),
+        "find_photos": lambda: sd.find_photos("birthday"),
+        "find_photos_recent": lambda: sd.find_photos(days_back=30),
+        "list_folder": lambda: sd.list_folder("Desktop"),
+        "read_notes_list": lambda: sd.read_notes(),
+        "read_notes": lambda: sd.read_notes("sessions"),
+        "_scan_for_scam": lambda: [sd._scan_for_scam(text) for text in messages],
+        "_scan_for_scam_long": lambda: sd._scan_for_scam(long_email),
+    }
+
+
+def measure(fn, repeats: int) -> dict:
+    """Median/min milliseconds over `repeats` runs after a warm-up, and peak traced KB."""
+    fn()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"median_ms": round(statistics.median(times), 3), "min_ms": round(min(times), 3),
+            "peak_kb": round(peak / 1024, 1)}
+
+
+def run_benchmark(sizes: dict, tree_dir: Path, repeats: int = 5, only: list | None = None) -> dict:
+    """{"machine", "sizes": {label: {"files", "build_s", "tools": {case: timings}}}}."""
+    report = {"machine": {"python": platform.python_version(), "platform": platform.platform(),
+                          "cpus": os.cpu_count()},
+              "repeats": repeats, "sizes": {}}
+    for label, files in sizes.items():
+        start = time.perf_counter()
+        root = build_tree(tree_dir / label, files)
+        built = time.perf_counter() - start
+        tools = {}
+        with home_at(root):
+            for name, fn in cases(files).items():
+                if only and name not in only:
+                    continue
+                tools[name] = measure(fn, repeats)
+        report["sizes"][label] = {"files": files, "build_s": round(built, 1), "tools": tools}
+    return report
+
+
+def compare(report: dict, baseline: dict) -> list[str]:
+    """List every tool and size where report is slower or bigger than baseline beyond TOLERANCES."""
+    problems = []
+    for label, then_size in baseline["sizes"].items():
+        now_size = report["sizes"].get(label)
+        if now_size is None:
+            problems.append(f"{label}: missing from this run")
+            continue
+        for name, then in then_size["tools"].items():
+            now = now_size["tools"].get(name)
+            if now is None:
+                problems.append(f"{label} {name}: missing from this run")
+                continue
+            if (now["median_ms"] > then["median_ms"] * TOLERANCES["time_ratio"]
+                    and now["median_ms"] - then["median_ms"] > TOLERANCES["time_floor_ms"]):
+                problems.append(f"{label} {name} median: {then['median_ms']} ms -> {now['median_ms']} ms")
+            if (now["peak_kb"] > then["peak_kb"] * TOLERANCES["memory_ratio"]
+                    and now["peak_kb"] - then["peak_kb"] > TOLERANCES["memory_floor_kb"]):
+                problems.append(f"{label} {name} peak memory: {then['peak_kb']} KB -> {now['peak_kb']} KB")
+    return problems
+
+
+def format_report(report: dict) -> str:
+    lines = ["", "=" * 66, "  TechBuddy Tool Benchmark", "=" * 66]
+    for label, size in report["sizes"].items():
+        lines += ["", f"  {label}: {size['files']:,} files (tree ready in {size['build_s']}s)",
+                  f"  {'tool':<22}{'median ms':>12}{'min ms':>12}{'peak KB':>12}"]
+        for name, t in size["tools"].items():
+            lines.append(f"  {name:<22}{t['median_ms']:>12}{t['min_ms']:>12}{t['peak_kb']:>12}")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-tool benchmark on synthetic home folders")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(DEFAULT_SIZES))
+    parser.add_argument("--tree-dir", type=Path, default=Path(tempfile.gettempdir()) / "techbuddy-bench-trees",
+                        help="where synthetic trees are written and reused")
+    parser.add_argument("--repeats", type=int, default=5, help="timed runs per tool")
+    parser.add_argument("--tools", nargs="+", help="only these cases (e.g. find_file read_notes)")
+    parser.add_argument("--save", type=Path, help="write the report as JSON")
+    parser.add_argument("--compare", type=Path, help="fail if slower than this saved report")
+    args = parser.parse_args()
+
+    report = run_benchmark({label: SIZES[label] for label in args.sizes}, args.tree_dir,
+                           args.repeats, args.tools)
+    print(format_report(report))
+
+    if args.save:
+        args.save.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"  Saved report to {args.save}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        problems = compare(report, baseline)
+        if problems:
+            print("  REGRESSIONS vs baseline:")
+            for p in problems:
+                print(f"    - {p}")
+            sys.exit(1)
+        print("  No regressions vs baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""TechBuddy worker scaling — /chat throughput at 1, 2, 4... server workers.
+
+Starts a fake Anthropic API (fake_anthropic.py), then for each worker count
+launches the production server against it, with the shared state store
+and a fixed session key, and drives /chat with USERS simulated people for
+DURATION seconds after a short warm-up. Each person opens the page, keeps
+their cookie and chats turn after turn. Reports per worker count:
+
+  - completed chats per second, and the speed-up over the first count
+  - chat latency (p50 / p95)
+  - history errors: a second turn that arrived at a worker without the
+    conversation ("seen 1 messages"), i.e. state that wasn't shared
+
+The API wait is real sleeping in another process, so throughput grows
+with workers until the machine's cores are busy; on a one-core machine
+the numbers stay flat.
+
+Usage:
+    python benchmarks/worker_scaling.py
+    python benchmarks/worker_scaling.py --workers 1 2 4 8 --users 128
+    python benchmarks/worker_scaling.py --server gunicorn     # Flask under gunicorn
+    python benchmarks/worker_scaling.py --save scaling.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks import fake_anthropic  # noqa: E402
+
+READY_TIMEOUT = 60
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def server_command(server: str, workers: int, port: int) -> list[str]:
+    """The command line for the production server with this many workers."""
+    if server == "gunicorn":
+        return [sys.executable, "-m", "gunicorn", "-c", "frontend/gunicorn.conf.py",
+                "--bind", f"127.0.0.1:{port}", "--workers", str(workers),
+                "--access-logfile", "/dev/null", "frontend.app:app"]
+    return [sys.executable, "frontend/serve.py", "--host", "127.0.0.1",
+            "--port", str(port), "--workers", str(workers)]
+
+
+def launch(server: str, workers: int, api_url: str, state_db: Path) -> tuple[subprocess.Popen, str]:
+    """Start the server and wait until it answers; (process, base URL)."""
+    port = _free_port()
+    env = {**os.environ,
+           "ANTHROPIC_BASE_URL": api_url,
+           "ANTHROPIC_API_KEY": "fake",
+           "TECHBUDDY_SECRET_KEY": "worker-scaling-benchmark",
+           "TECHBUDDY_STATE_DB": str(state_db),
+           "TECHBUDDY_HEALTH_INTERVAL": "0"}
+    proc = subprocess.Popen(server_command(server, workers, port), cwd=PROJECT_ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + READY_TIMEOUT
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{server} exited: {proc.stderr.read()[-2000:]}")
+        try:
+            if httpx.get(base + "/", timeout=2).status_code == 200:
+                return proc, base
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    stop(proc)
+    raise RuntimeError(f"{server} didn't answer within {READY_TIMEOUT}s")
+
+
+def stop(proc: subprocess.Popen):
+    proc.terminate()
+    try:
+        proc.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+async def _person(base: str, measure_from: float, deadline: float, stats: dict):
+    async with httpx.AsyncClient(base_url=base, timeout=60) as client:
+        await client.get("/")
+        turn = 0
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                resp = await client.post("/chat", json={"message": f"hello number {turn}"})
+                reply = resp.json()["reply"]
+            except (httpx.HTTPError, ValueError, KeyError):
+                stats["errors"] += 1
+                continue
+            if start >= measure_from:
+                stats["latencies"].append(time.perf_counter() - start)
+            if turn > 0 and reply == "seen 1 messages":
+                stats["history_errors"] += 1
+            turn += 1
+
+
+async def drive(base: str, users: int, duration: float, warmup: float = 3.0) -> dict:
+    """Chat from `users` people; latencies of the turns started after `warmup` seconds."""
+    stats = {"latencies": [], "errors": 0, "history_errors": 0}
+    # Each worker loads the API client on its first chat; keep that out of the numbers
+    measure_from = time.perf_counter() + warmup
+    deadline = time.monotonic() + warmup + duration
+    await asyncio.gather(*(_person(base, measure_from, deadline, stats) for _ in range(users)))
+    stats["seconds"] = time.perf_counter() - measure_from
+    return stats
+
+
+def run_scaling(worker_counts: list[int], server: str = "uvicorn", users: int = 64,
+                duration: float = 10.0, latency: float = 0.05) -> list[dict]:
+    api = fake_anthropic.start(latency=latency)
+    rows = []
+    try:
+        for workers in worker_counts:
+            with tempfile.TemporaryDirectory() as tmp:
+                proc, base = launch(server, workers, api.url, Path(tmp) / "state.db")
+                try:
+                    stats = asyncio.run(drive(base, users, duration))
+                finally:
+                    stop(proc)
+            latencies = stats["latencies"]
+            rows.append({
+                "workers": workers,
+                "chats": len(latencies),
+                "chats_per_s": round(len(latencies) / stats["seconds"], 1),
+                "p50_ms": round(_percentile(latencies, 50) * 1000, 1),
+                "p95_ms": round(_percentile(latencies, 95) * 1000, 1),
+                "errors": stats["errors"],
+                "history_errors": stats["history_errors"],
+            })
+    finally:
+        api.shutdown()
+    for row in rows:
+        row["speedup"] = round(row["chats_per_s"] / rows[0]["chats_per_s"], 2) if rows[0]["chats_per_s"] else 0
+    return rows
+
+
+def format_report(rows: list[dict], server: str) -> str:
+    lines = ["", "=" * 72, f"  /chat throughput by worker count ({server}, {os.cpu_count()} CPUs)", "=" * 72,
+             f"  {'workers':>7}{'chats':>8}{'chats/s':>10}{'speedup':>9}{'p50 ms':>9}{'p95 ms':>9}"
+             f"{'errors':>8}{'history':>9}"]
+    for r in rows:
+        lines.append(f"  {r['workers']:>7}{r['chats']:>8}{r['chats_per_s']:>10}{r['speedup']:>9}"
+                     f"{r['p50_ms']:>9}{r['p95_ms']:>9}{r['errors']:>8}{r['history_errors']:>9}")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/chat throughput vs. server workers")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--server", choices=["uvicorn", "gunicorn"], default="uvicorn")
+    parser.add_argument("--users", type=int, default=64, help="simultaneous people chatting")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per worker count")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake API seconds per call")
+    parser.add_argument("--save", type=Path, help="write the results as JSON")
+    args = parser.parse_args()
+
+    rows = run_scaling(args.workers, args.server, args.users, args.duration, args.latency)
+    print(format_report(rows, args.server))
+    if args.save:
+        args.save.write_text(json.dumps(rows, indent=2) + "\n", encoding="utf-8")
+    if any(r["history_errors"] for r in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
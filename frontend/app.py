@@ -1,6 +1,6 @@
 """app.py -- TechBuddy Flask chat server and Claude API integration.
 
-Routes user messages through Claude Opus 4.6 with 35 tools, extended
+Routes user messages through Claude Opus 4.6 with 36 tools, extended
 thinking, prompt caching, and Family SMS Remote Control. Handles
 conversation history, tool dispatch, scam detection display, and
 server-side session management.
@@ -20,8 +20,6 @@ from pathlib import Path
 from dotenv import load_dotenv
 from flask import Flask, render_template, request, jsonify, session
 
-import anthropic
-
 # Load .env from project root
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 load_dotenv(PROJECT_ROOT / ".env")
@@ -29,49 +27,40 @@ load_dotenv(PROJECT_ROOT / ".env")
 # Add project root to path so we can import mcp_servers
 sys.path.insert(0, str(PROJECT_ROOT))
 
-from mcp_servers.screen_dispatch import (
-    find_file,
-    find_recent_files,
-    open_file,
-    open_application,
-    list_folder,
-    print_document,
-    troubleshoot_printer,
-    analyze_scam_risk,
-    click_button,
-    type_text,
-    save_document_as_pdf,
-    save_document_as_word,
-    describe_screen_action,
-    read_my_screen,
-    verify_screen_step,
-    check_system_health,
-    fix_frozen_program,
-    check_internet,
-    smart_save_document,
-    check_email,
-    read_email,
-    send_email,
-    delete_email,
-    download_attachment,
-    find_photos,
-    share_photo,
-    check_for_meeting_links,
-    join_video_call,
-    set_anthropic_client,
-    search_web,
-    save_note,
-    read_notes,
-    recall_user_context,
-    capture_phone_screen,
-    tap_phone_screen,
-    open_phone_app,
-)
+from frontend import state_store
+from mcp_servers import tool_registry
+from mcp_servers.screen_dispatch import set_anthropic_client  # also registers every tool
 
 app = Flask(__name__)
-app.secret_key = os.urandom(24)
+# A fixed key keeps sessions valid across restarts and lets every worker read every cookie
+app.secret_key = os.getenv("TECHBUDDY_SECRET_KEY") or os.urandom(24)
+if not os.getenv("TECHBUDDY_SECRET_KEY") and state_store.shared():
+    print("[TechBuddy] TECHBUDDY_SECRET_KEY is not set: sessions won't survive a restart "
+          "or carry between workers", flush=True)
+
+
+class _LazyAnthropic:
+    """Stands in for anthropic.Anthropic() (or AsyncAnthropic) until the first API call.
+
+    Importing the anthropic SDK takes over a second, most of the server's
+    cold start, and nothing needs it until a message arrives.
+    """
 
-client = anthropic.Anthropic()
+    def __init__(self, client_class: str = "Anthropic"):
+        self._client_class = client_class
+        self._client = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    import anthropic
+                    self._client = getattr(anthropic, self._client_class)()
+        return getattr(self._client, name)
+
+
+client = _LazyAnthropic()
 
 # Share the client with screen_dispatch for extended thinking (scam analysis, vision)
 set_anthropic_client(client)
@@ -95,13 +84,12 @@ FAMILY_CONTACTS = {
     },
 }
 
-# Server-side conversation history (avoids Flask 4KB cookie limit)
-_conversation_histories = {}
-
-# In-memory queues for family SMS (demo-friendly, no database needed)
-_family_msg_lock = threading.Lock()
-_pending_family_messages = []
-_family_sms_log = []
+# Server-side conversation history (avoids Flask 4KB cookie limit) and the
+# family SMS queues. These are the in-process store; with TECHBUDDY_STATE_DB
+# set, every worker shares one SQLite file instead (see state_store.py)
+_conversation_histories = state_store.histories
+_pending_family_messages = state_store.family_messages
+_family_sms_log = state_store.sms_log
 
 _SYSTEM_PROMPT_BASE = """You are TechBuddy, a warm and patient AI assistant that helps elderly people use their computer.
 
@@ -164,6 +152,7 @@ LOCAL MEMORY (stored on their computer, NOT in the cloud):
 - Save observations: "User prefers large text", "Daughter Sarah visits on Sundays", "Doctor is Dr. Johnson"
 - Use save_note("preferences", "...") for preferences, save_note("contacts", "...") for people
 - Use save_note("session-{session_date}", "...") for what you worked on today
+- Use search_notes("doctor") to look up a specific fact instead of reading whole note files
 - Files are plain text on their PC — family can read them anytime
 - NEVER store passwords, financial info, or sensitive data in notes
 
@@ -212,446 +201,12 @@ def _build_system_prompt() -> str:
     session_date = f"{now.month}_{now.day}_{now.strftime('%y')}"
     return _SYSTEM_PROMPT_BASE.format(today_date=today_date, session_date=session_date)
 
-# Tool definitions for Claude API
-TOOLS = [
-    {
-        "name": "find_file",
-        "description": "Find a file by partial name. Searches Desktop, Documents, Downloads, Pictures. Use when the user says they saved something and can't find it.",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "name": {"type": "string", "description": "Partial filename to search for (e.g., 'grocery', 'receipt', 'photo')"},
-                "search_in": {"type": "string", "description": "Where to search — 'common' for standard folders, or a specific path", "default": "common"},
-            },
-            "required": ["name"],
-        },
-    },
-    {
-        "name": "find_recent_files",
-        "description": "Find files recently saved or changed. Use when someone says 'I just saved it' or 'where did it go?'",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "hours": {"type": "integer", "description": "How far back to look in hours", "default": 24},
-                "file_type": {"type": "string", "description": "Filter: 'all', 'documents', 'pictures', 'spreadsheets'", "default": "all"},
-            },
-        },
-    },
-    {
-        "name": "open_file",
-        "description": "Open a file with the default application. Works for documents, pictures, PDFs.",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "file_path": {"type": "string", "description": "Full path to the file to open"},
-            },
-            "required": ["file_path"],
-        },
-    },
-    {
-        "name": "open_application",
-        "description": "Open an application by name. Use when the user wants to open Word, Notepad, Calculator, Excel, or Paint. For Word, this creates a blank document automatically so they can start typing right away.",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "app_name": {"type": "string", "description": "Name of the app to open (e.g., 'word', 'notepad', 'calculator', 'excel', 'paint')"},
-            },
-            "required": ["app_name"],
-        },
-    },
-    {
-        "name": "list_folder",
-        "description": "Show what's in a folder. Use when someone wants to see their files. Defaults to Desktop.",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "folder_path": {"type": "string", "description": "'Desktop', 'Documents', 'Downloads', 'Pictures', or a full path", "default": "Desktop"},
-            },
-        },
-    },
-    {
-        "name": "print_document",
-        "description": "Send a document to the printer. Always confirm with user before printing.",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "file_path": {"type": "string", "description": "Full path to the file to print"},
-                "copies": {"type": "integer", "description": "Number of copies", "default": 1},
-            },
-            "required": ["file_path"],
-        },
-    },
-    {
-        "name": "analyze_scam_risk",
-        "description": "Analyze any content for scam indicators. Use this on suspicious emails, links, phone messages, or popups. Returns risk level and plain-language explanation.",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "content": {"type": "string", "description": "The text to analyze (email body, URL, phone message, popup text)"},
-                "content_type": {"type": "string", "description": "What kind of content: 'email', 'link', 'phone', 'popup'", "default": "email"},
-            },
-            "required": ["content"],
-        },
-    },
-    {
-        "name": "troubleshoot_printer",
-        "description": "Check why the printer isn't working. Diagnoses offline printer, stuck jobs, wrong default printer. Use when the user says 'my printer isn't working' or 'I can't print'.",
-        "input_schema": {
-            "type": "object",
-            "properties": {},
-        },
-    },
-    {
-        "name": "save_document_as_pdf",
-        "description": "Save the currently open Word document as a PDF. The document must already be open in Word. Use when the user wants to convert a Word doc to PDF.",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "save_path": {"type": "string", "description": "Full path where to save the PDF (e.g., 'C:\\Users\\grego\\Desktop\\Letter.pdf')"},
-            },
-            "required": ["save_path"],
-        },
-    },
-    {
-        "name": "save_document_as_word",
-        "description": "Save the currently open Word document as a Word (.docx) file. The document must already be open in Word. Use when the user wants to save their document as a Word file.",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "save_path": {"type": "string", "description": "Full path where to save the .docx (e.g., 'C:\\Users\\grego\\Desktop\\Letter.docx')"},
-            },
-            "required": ["save_path"],
-        },
-    },
-    {
-        "name": "click_button",
-        "description": "Click a button in any open window. Use for Zoom 'Join', Outlook 'Send', etc.",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "window_title": {"type": "string", "description": "Title of the window (e.g., 'Outlook', 'Zoom')"},
-                "button_name": {"type": "string", "description": "Name of the button to click (e.g., 'Send', 'Join Meeting')"},
-            },
-            "required": ["window_title", "button_name"],
-        },
-    },
-    {
-        "name": "type_text",
-        "description": "Type text into a field in any open window. Use for filling in email recipients, search boxes, etc.",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "window_title": {"type": "string", "description": "Title of the window"},
-                "text": {"type": "string", "description": "The text to type"},
-                "field_name": {"type": "string", "description": "Name of the text field (optional)", "default": ""},
-            },
-            "required": ["window_title", "text"],
-        },
-    },
-    {
-        "name": "describe_screen_action",
-        "description": "Give step-by-step instructions for a task in an app. Use when you can't automate it directly.",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "task": {"type": "string", "description": "What the user wants to do (e.g., 'join zoom meeting')"},
-                "app_name": {"type": "string", "description": "Which app (e.g., 'Zoom', 'Outlook', 'Chrome')"},
-            },
-            "required": ["task", "app_name"],
-        },
-    },
-    {
-        "name": "read_my_screen",
-        "description": "Take a screenshot of the user's screen so you can SEE what they see. Use when they say 'what's on my screen?', 'I see a popup', 'something appeared', 'what does this error say?', 'what should I click?', or 'I don't know what I'm looking at'. This lets you actually look at their screen and give specific help.",
-        "input_schema": {
-            "type": "object",
-            "properties": {},
-        },
-    },
-    {
-        "name": "verify_screen_step",
-        "description": "Take a screenshot to verify the user completed a step. Use after giving instructions to check it worked — like looking over their shoulder. For example, after saying 'click Send', verify the email was sent. Returns what's on screen with verification guidance.",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "expected": {
-                    "type": "string",
-                    "description": "What should be visible (e.g., 'Word document is open', 'email was sent', 'printer dialog appeared')",
-                },
-            },
-            "required": ["expected"],
-        },
-    },
-    {
-        "name": "check_system_health",
-        "description": "Check why the computer is slow or acting up. Shows memory usage, hard drive space, and which programs are using the most resources. Use when they say 'my computer is slow' or 'everything is freezing'.",
-        "input_schema": {
-            "type": "object",
-            "properties": {},
-        },
-    },
-    {
-        "name": "fix_frozen_program",
-        "description": "Close a program that is frozen or not responding. ALWAYS confirm with the user first — they may lose unsaved work. Call without confirm first to check, then with confirm=True to close.",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "program_name": {
-                    "type": "string",
-                    "description": "Name of the frozen program (e.g., 'Word', 'Chrome', 'Notepad')",
-                },
-                "confirm": {
-                    "type": "boolean",
-                    "description": "Set to true to actually close the program. False just checks if it's running.",
-                    "default": False,
-                },
-            },
-            "required": ["program_name"],
-        },
-    },
-    {
-        "name": "check_internet",
-        "description": "Check if the internet is working and diagnose WiFi problems. Use when they say 'internet isn't working', 'WiFi is down', or 'pages won't load'.",
-        "input_schema": {
-            "type": "object",
-            "properties": {},
-        },
-    },
-    {
-        "name": "smart_save_document",
-        "description": "Save content as a clearly named document with date and time stamp. Use whenever the user creates, downloads, or works on a document. Puts it in Documents/TechBuddy Saved with a clear name they can find later.",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "content": {
-                    "type": "string",
-                    "description": "The text content to save",
-                },
-                "doc_type": {
-                    "type": "string",
-                    "description": "Type: 'note', 'letter', 'list', 'instructions', 'recipe', 'other'",
-                    "default": "note",
-                },
-                "title": {
-                    "type": "string",
-                    "description": "Short title (e.g., 'Grocery List', 'Letter to Sarah'). Auto-generates if empty.",
-                    "default": "",
-                },
-            },
-            "required": ["content"],
-        },
-    },
-    {
-        "name": "check_email",
-        "description": "Check the email inbox. Shows recent emails with who sent them and what they're about. Use when the user says 'check my email' or 'do I have messages?'",
-        "input_schema": {
-            "type": "object",
-            "properties": {},
-        },
-    },
-    {
-        "name": "read_email",
-        "description": "Read a specific email by its number. Shows the full message. Use after check_email when the user wants to read one.",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "email_id": {"type": "integer", "description": "The number of the email to read (from the inbox list)"},
-            },
-            "required": ["email_id"],
-        },
-    },
-    {
-        "name": "send_email",
-        "description": "Send an email to someone. Can include a file attachment. Always confirm the recipient and message with the user before sending.",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "to": {"type": "string", "description": "Email address to send to"},
-                "subject": {"type": "string", "description": "Subject line"},
-                "body": {"type": "string", "description": "The message to send"},
-                "attachment": {"type": "string", "description": "Full path to a file to attach (optional)", "default": ""},
-            },
-            "required": ["to", "subject", "body"],
-        },
-    },
-    {
-        "name": "delete_email",
-        "description": "Delete an email from the inbox. Always confirm with the user before deleting.",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "email_id": {"type": "integer", "description": "The number of the email to delete"},
-            },
-            "required": ["email_id"],
-        },
-    },
-    {
-        "name": "download_attachment",
-        "description": "Download an attachment from an email and save it to Downloads folder. Use when the user wants to open or save a file from an email.",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "email_id": {"type": "integer", "description": "The email number that has the attachment"},
-                "attachment_name": {"type": "string", "description": "Name of the attachment to download (optional — downloads first one if not specified)", "default": ""},
-            },
-            "required": ["email_id"],
-        },
-    },
-    {
-        "name": "find_photos",
-        "description": "Find photos on the computer by name or date. Use when the user says 'find my photos' or 'where are my vacation pictures?'",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "search_term": {"type": "string", "description": "What to search for (e.g., 'vacation', 'grandkids')", "default": ""},
-                "days_back": {"type": "integer", "description": "How many days back to look (0 = search by name only)", "default": 0},
-            },
-        },
-    },
-    {
-        "name": "share_photo",
-        "description": "Email a photo to someone. Always confirm with the user before sending.",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "photo_path": {"type": "string", "description": "Full path to the photo"},
-                "to_email": {"type": "string", "description": "Email address to send the photo to"},
-            },
-            "required": ["photo_path", "to_email"],
-        },
-    },
-    {
-        "name": "check_for_meeting_links",
-        "description": "Check emails for video call links (Zoom, Google Meet, Teams). Use when the user asks about meetings or calls.",
-        "input_schema": {
-            "type": "object",
-            "properties": {},
-        },
-    },
-    {
-        "name": "join_video_call",
-        "description": "Help the user join a video call by opening the meeting link and giving step-by-step instructions.",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "meeting_link": {"type": "string", "description": "The meeting URL (Zoom, Meet, or Teams link)"},
-            },
-            "required": ["meeting_link"],
-        },
-    },
-    {
-        "name": "search_web",
-        "description": "Search the internet for information. Use when you need to look something up — phone numbers, organizations, how-to info, scam reports, or anything the user asks about. Always summarize results in simple language.",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "query": {"type": "string", "description": "What to search for (e.g., 'IRS phone number', 'CVS pharmacy hours')"},
-                "num_results": {"type": "integer", "description": "How many results (1-5)", "default": 3},
-            },
-            "required": ["query"],
-        },
-    },
-    {
-        "name": "save_note",
-        "description": "Save a note about the user on their computer. Use to remember preferences, contacts, routines, and session history. Notes are private — stored locally, never in the cloud.",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "filename": {"type": "string", "description": "Note name (e.g., 'preferences', 'contacts', 'session-2_12_26')"},
-                "content": {"type": "string", "description": "What to save (plain text)"},
-            },
-            "required": ["filename", "content"],
-        },
-    },
-    {
-        "name": "read_notes",
-        "description": "Read a saved note file, or list all available notes. Use to recall what you know about this person.",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "filename": {"type": "string", "description": "Note to read (e.g., 'preferences'). Leave empty to list all.", "default": ""},
-            },
-        },
-    },
-    {
-        "name": "recall_user_context",
-        "description": "Remember what you know about this person by reading saved notes. Call this at the start of each conversation to restore context — preferences, contacts, and recent session history.",
-        "input_schema": {
-            "type": "object",
-            "properties": {},
-        },
-    },
-    {
-        "name": "capture_phone_screen",
-        "description": "Take a screenshot of the user's iPhone screen so you can SEE what's on their phone. Use when they say 'look at my phone', 'what's on my phone screen?', 'I got a weird text', or 'help me with my iPhone'. This captures the phone screen and lets you see exactly what they see.",
-        "input_schema": {
-            "type": "object",
-            "properties": {},
-        },
-    },
-    {
-        "name": "tap_phone_screen",
-        "description": "Tap a specific location on the user's iPhone screen. Use AFTER viewing a phone screenshot with capture_phone_screen. Provide x,y coordinates based on where you want to tap in the screenshot. Top-left corner is (0, 0).",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "x": {"type": "integer", "description": "X coordinate to tap (pixels from left edge of phone screen)"},
-                "y": {"type": "integer", "description": "Y coordinate to tap (pixels from top edge of phone screen)"},
-            },
-            "required": ["x", "y"],
-        },
-    },
-    {
-        "name": "open_phone_app",
-        "description": "Open an app on the user's iPhone. Use when they say 'open Settings on my phone', 'go to Messages', 'open Safari', etc. Available apps: Settings, Messages, Safari, Photos, Mail, Phone, Calendar, Maps, Camera, Notes.",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "app_name": {"type": "string", "description": "Name of the app to open (e.g., 'Settings', 'Messages', 'Safari')"},
-            },
-            "required": ["app_name"],
-        },
-    },
-]
+# Tool definitions for Claude API, built from the tool functions' signatures
+# and docstrings (see mcp_servers/tool_registry.py); each conversation sends a subset
+TOOLS = tool_registry.schemas()
 
 # Map tool names to actual functions
-TOOL_FUNCTIONS = {
-    "find_file": find_file,
-    "find_recent_files": find_recent_files,
-    "open_file": open_file,
-    "open_application": open_application,
-    "list_folder": list_folder,
-    "print_document": print_document,
-    "troubleshoot_printer": troubleshoot_printer,
-    "analyze_scam_risk": analyze_scam_risk,
-    "click_button": click_button,
-    "type_text": type_text,
-    "save_document_as_pdf": save_document_as_pdf,
-    "save_document_as_word": save_document_as_word,
-    "describe_screen_action": describe_screen_action,
-    "read_my_screen": read_my_screen,
-    "verify_screen_step": verify_screen_step,
-    "check_system_health": check_system_health,
-    "fix_frozen_program": fix_frozen_program,
-    "check_internet": check_internet,
-    "smart_save_document": smart_save_document,
-    "check_email": check_email,
-    "read_email": read_email,
-    "send_email": send_email,
-    "delete_email": delete_email,
-    "download_attachment": download_attachment,
-    "find_photos": find_photos,
-    "share_photo": share_photo,
-    "check_for_meeting_links": check_for_meeting_links,
-    "join_video_call": join_video_call,
-    "search_web": search_web,
-    "save_note": save_note,
-    "read_notes": read_notes,
-    "recall_user_context": recall_user_context,
-    "capture_phone_screen": capture_phone_screen,
-    "tap_phone_screen": tap_phone_screen,
-    "open_phone_app": open_phone_app,
-}
+TOOL_FUNCTIONS = tool_registry.functions()
 
 
 def execute_tool(name: str, input_data: dict) -> str | list:
@@ -722,6 +277,55 @@ def _strip_image_data(content):
     return content
 
 
+def _retire_old_screenshots(history: list) -> list:
+    """Keep only the newest round's screenshots as images; describe older ones in text.
+
+    Within one call_claude turn every tool round resends the whole history,
+    so a screenshot the model has already looked at would otherwise be
+    uploaded (and billed) again on each later round. Screenshots from
+    earlier rounds are swapped for a one-line note naming the tool that took
+    them. Every image in the newest tool-result message stays, since several
+    screen tools can run in the same round and the model hasn't seen any yet.
+    """
+    # Which tool produced each tool_result, for the replacement note
+    tool_calls = {}
+    for msg in history:
+        if msg["role"] == "assistant" and isinstance(msg.get("content"), list):
+            for block in msg["content"]:
+                if block.get("type") == "tool_use":
+                    tool_calls[block["id"]] = block
+
+    # Positions of every image inside a tool_result: (message, block, inner)
+    images = []
+    for i, msg in enumerate(history):
+        if msg["role"] != "user" or not isinstance(msg.get("content"), list):
+            continue
+        for j, block in enumerate(msg["content"]):
+            if block.get("type") == "tool_result" and isinstance(block.get("content"), list):
+                for k, inner in enumerate(block["content"]):
+                    if isinstance(inner, dict) and inner.get("type") == "image":
+                        images.append((i, j, k))
+
+    newest = images[-1][0] if images else None
+    for i, j, k in images:
+        if i == newest:
+            break
+        msg = history[i]
+        block = msg["content"][j]
+        call = tool_calls.get(block["tool_use_id"], {})
+        note = f"[Earlier screenshot from {call.get('name', 'a screen tool')}"
+        if call.get("input"):
+            details = ", ".join(f"{key}: {value}" for key, value in call["input"].items())
+            note += f" ({details})"
+        note += " — you already looked at this; a newer screenshot follows.]"
+        inner = [*block["content"]]
+        inner[k] = {"type": "text", "text": note}
+        content = [*msg["content"]]
+        content[j] = {**block, "content": inner}
+        history[i] = {**msg, "content": content}
+    return history
+
+
 def _compact_history(history: list) -> list:
     """Compact history to fit in session cookie (~4KB limit).
 
@@ -772,6 +376,40 @@ def _compact_history(history: list) -> list:
     return compact
 
 
+MAX_TOOL_ROUNDS = 10
+STILL_WORKING_REPLY = "I'm still working on that. Could you tell me more about what you need?"
+
+
+def _claude_request(history: list, tools: list) -> dict:
+    """Arguments for messages.create (shared by the Flask and ASGI loops)."""
+    return {
+        "model": "claude-opus-4-6",
+        "max_tokens": 16000,
+        "thinking": {"type": "adaptive"},
+        "system": [{
+            "type": "text",
+            "text": _build_system_prompt(),
+            "cache_control": {"type": "ephemeral"},
+        }],
+        "tools": tools,
+        "messages": history,
+    }
+
+
+def _final_reply(assistant_content) -> tuple[str, str]:
+    """(reply text, thinking text) from a response that made no tool calls."""
+    text_blocks = [b.text for b in assistant_content if b.type == "text"]
+    thinking_blocks = [b.thinking for b in assistant_content if b.type == "thinking"]
+    reply_text = " ".join(text_blocks) if text_blocks else "Done!"
+    thinking_text = "\n".join(thinking_blocks) if thinking_blocks else ""
+    return reply_text, thinking_text
+
+
+def _tool_result(tool_use, result: str | list) -> dict:
+    # result is a string, or a list of content blocks (vision returns image + text)
+    return {"type": "tool_result", "tool_use_id": tool_use.id, "content": result}
+
+
 def call_claude(history: list) -> tuple[str, str, list]:
     """Call Claude API with tool use and extended thinking.
 
@@ -779,95 +417,78 @@ def call_claude(history: list) -> tuple[str, str, list]:
 
     Uses extended thinking so Claude reasons before responding.
     Uses prompt caching for the system prompt.
+    Sends only the tool groups this conversation needs (tool_registry.select).
     Handles structured tool results (vision returns image content blocks).
     """
-    MAX_TOOL_ROUNDS = 10
+    # Chosen once per turn so every round shares one prompt-cache prefix
+    tools = tool_registry.select(history)
 
     for _ in range(MAX_TOOL_ROUNDS):
-        response = client.messages.create(
-            model="claude-opus-4-6",
-            max_tokens=16000,
-            thinking={"type": "adaptive"},
-            system=[{
-                "type": "text",
-                "text": _build_system_prompt(),
-                "cache_control": {"type": "ephemeral"},
-            }],
-            tools=TOOLS,
-            messages=history,
-        )
+        response = client.messages.create(**_claude_request(history, tools))
 
         assistant_content = response.content
-        serialized = serialize_content(assistant_content)
-
-        history.append({"role": "assistant", "content": serialized})
+        history.append({"role": "assistant", "content": serialize_content(assistant_content)})
 
         tool_uses = [b for b in assistant_content if b.type == "tool_use"]
-
         if not tool_uses:
-            text_blocks = [b.text for b in assistant_content if b.type == "text"]
-            thinking_blocks = [b.thinking for b in assistant_content if b.type == "thinking"]
-            reply_text = " ".join(text_blocks) if text_blocks else "Done!"
-            thinking_text = "\n".join(thinking_blocks) if thinking_blocks else ""
+            reply_text, thinking_text = _final_reply(assistant_content)
             return reply_text, thinking_text, history
 
-        tool_results = []
-        for tool_use in tool_uses:
-            result = execute_tool(tool_use.name, tool_use.input)
-
-            # Handle structured content (vision tool returns list of blocks)
-            if isinstance(result, list):
-                tool_results.append({
-                    "type": "tool_result",
-                    "tool_use_id": tool_use.id,
-                    "content": result,
-                })
-            else:
-                tool_results.append({
-                    "type": "tool_result",
-                    "tool_use_id": tool_use.id,
-                    "content": result,
-                })
-
+        tool_results = [_tool_result(tool_use, execute_tool(tool_use.name, tool_use.input))
+                        for tool_use in tool_uses]
         history.append({"role": "user", "content": tool_results})
+        _retire_old_screenshots(history)
 
-    return "I'm still working on that. Could you tell me more about what you need?", "", history
+    return STILL_WORKING_REPLY, "", history
+
+
+def _new_conversation(sess):
+    sid = str(uuid.uuid4())
+    sess["sid"] = sid
+    state_store.put_history(sid, [])
 
 
 @app.route("/")
 def index():
-    sid = str(uuid.uuid4())
-    session["sid"] = sid
-    _conversation_histories[sid] = []
+    _new_conversation(session)
     return render_template("chat.html")
 
 
-@app.route("/chat", methods=["POST"])
-def chat():
-    data = request.get_json()
-    user_message = data.get("message", "").strip()
-    if not user_message:
-        return jsonify({"reply": "I didn't catch that. Could you say it again?"})
+def _auth_error() -> type:
+    """anthropic.AuthenticationError, imported only once a call has failed."""
+    import anthropic
+    return anthropic.AuthenticationError
+
+
+EMPTY_MESSAGE_REPLY = "I didn't catch that. Could you say it again?"
+
 
-    # Retrieve or init conversation history (server-side, not in cookie)
-    sid = session.get("sid")
-    if not sid or sid not in _conversation_histories:
+def _start_chat_turn(sess, user_message: str) -> tuple[str, list]:
+    """Find or create the session's history and add the user's message."""
+    # Conversation history lives server-side, not in the cookie
+    sid = sess.get("sid")
+    history = state_store.get_history(sid) if sid else None
+    if history is None:
         sid = str(uuid.uuid4())
-        session["sid"] = sid
-        _conversation_histories[sid] = []
-    history = _conversation_histories[sid]
+        sess["sid"] = sid
+        history = []
+        state_store.put_history(sid, history)
     history.append({"role": "user", "content": user_message})
+    return sid, history
 
-    thinking_text = ""
-    try:
-        assistant_text, thinking_text, history = call_claude(history)
-    except anthropic.AuthenticationError:
+
+def _failed_turn(history: list, error: Exception) -> str:
+    """Plain-language reply for a failed Claude call, added to the history."""
+    if isinstance(error, _auth_error()):
         assistant_text = "I'm having trouble connecting right now. Let's try again in a moment."
-        history.append({"role": "assistant", "content": assistant_text})
-    except Exception:
+    else:
         assistant_text = "Something went wrong on my end. Let's try that again."
-        history.append({"role": "assistant", "content": assistant_text})
+    history.append({"role": "assistant", "content": assistant_text})
+    return assistant_text
+
 
+def _finish_chat_turn(sid: str, history: list, assistant_text: str, thinking_text: str) -> dict:
+    """Store the compacted history and build the /chat JSON response."""
     # Extract thinking traces embedded in tool results (scam analysis)
     tool_thinking = _extract_tool_thinking(assistant_text)
     if tool_thinking:
@@ -875,36 +496,50 @@ def chat():
         if not thinking_text:
             thinking_text = tool_thinking
 
-    _conversation_histories[sid] = _compact_history(history)
+    state_store.put_history(sid, _compact_history(history))
 
     response_data = {"reply": assistant_text}
     if thinking_text:
         response_data["thinking"] = thinking_text
-    return jsonify(response_data)
+    return response_data
 
 
-# --- Family SMS Remote Control ---
+@app.route("/chat", methods=["POST"])
+def chat():
+    data = request.get_json()
+    user_message = data.get("message", "").strip()
+    if not user_message:
+        return jsonify({"reply": EMPTY_MESSAGE_REPLY})
 
-DESTRUCTIVE_KEYWORDS = ["delete", "remove", "cancel", "unsubscribe", "erase"]
+    sid, history = _start_chat_turn(session, user_message)
+    thinking_text = ""
+    try:
+        assistant_text, thinking_text, history = call_claude(history)
+    except Exception as e:
+        assistant_text = _failed_turn(history, e)
+    return jsonify(_finish_chat_turn(sid, history, assistant_text, thinking_text))
 
 
-def process_family_sms(contact: dict, message: str) -> str:
-    """Process an SMS from a family member through the Claude tool-use loop.
+# --- Family SMS Remote Control ---
 
-    Returns the reply text to send back to the family member via SMS.
-    Also pushes the interaction to the elderly person's chat window.
-    """
-    name = contact["name"]
-    relationship = contact["relationship"]
+DESTRUCTIVE_KEYWORDS = ["delete", "remove", "cancel", "unsubscribe", "erase"]
 
-    # Block destructive actions if not authorized
+
+def _family_refusal(contact: dict, message: str) -> str | None:
+    """The refusal to send if an SMS asks for something destructive it may not do."""
     if any(kw in message.lower() for kw in DESTRUCTIVE_KEYWORDS):
         if not contact.get("can_delete", False):
             return (
-                f"Hi {name}, I can't do that through SMS for safety reasons. "
+                f"Hi {contact['name']}, I can't do that through SMS for safety reasons. "
                 f"Please help your mom in person or ask her directly."
             )
+    return None
+
 
+def _family_history(contact: dict, message: str) -> list:
+    """A standalone conversation for one family SMS (not tied to the elderly user's session)."""
+    name = contact["name"]
+    relationship = contact["relationship"]
     # Build context-enriched message for Claude
     context_prefix = (
         f"[FAMILY REMOTE REQUEST from {name} ({relationship}) via SMS]\n"
@@ -917,20 +552,22 @@ def process_family_sms(contact: dict, message: str) -> str:
         f"Keep it brief — this goes back as an SMS (under 300 chars ideal). "
         f"Also tell the elderly user what happened in a warm, reassuring way."
     )
+    return [{"role": "user", "content": context_prefix}]
 
-    # Each SMS is a standalone conversation (not tied to elderly's session)
-    history = [{"role": "user", "content": context_prefix}]
 
-    try:
-        assistant_text, _, history = call_claude(history)
-    except Exception:
-        assistant_text = (
-            f"Hi {name}, I had trouble with that request. "
-            f"I'll let your mom know you tried to help."
-        )
+def _family_failure(contact: dict) -> str:
+    return (
+        f"Hi {contact['name']}, I had trouble with that request. "
+        f"I'll let your mom know you tried to help."
+    )
 
+
+def _record_family_reply(contact: dict, message: str, assistant_text: str):
+    """Log a family SMS exchange and queue it for the elderly user's chat window."""
+    name = contact["name"]
+    relationship = contact["relationship"]
     # Log for audit trail
-    _family_sms_log.append({
+    state_store.log_family_sms({
         "from": name,
         "relationship": relationship,
         "message": message,
@@ -938,62 +575,100 @@ def process_family_sms(contact: dict, message: str) -> str:
         "timestamp": datetime.now().isoformat(),
     })
 
-    # Push to elderly person's chat window (thread-safe)
-    with _family_msg_lock:
-        _pending_family_messages.append({
-            "from_name": name,
-            "from_relationship": relationship,
-            "original_message": message,
-            "result": assistant_text,
-        })
+    # Push to elderly person's chat window (whichever worker it polls)
+    state_store.push_family_message({
+        "from_name": name,
+        "from_relationship": relationship,
+        "original_message": message,
+        "result": assistant_text,
+    })
+
+
+def process_family_sms(contact: dict, message: str) -> str:
+    """Process an SMS from a family member through the Claude tool-use loop.
 
+    Returns the reply text to send back to the family member via SMS.
+    Also pushes the interaction to the elderly person's chat window.
+    """
+    refusal = _family_refusal(contact, message)
+    if refusal:
+        return refusal
+    try:
+        assistant_text, _, _ = call_claude(_family_history(contact, message))
+    except Exception:
+        assistant_text = _family_failure(contact)
+    _record_family_reply(contact, message, assistant_text)
     return assistant_text
 
 
-@app.route("/sms/simulate", methods=["POST"])
-def sms_simulate():
-    """Simulated SMS endpoint for demo mode — bypasses Twilio entirely.
+SMS_ACK_REPLY = (
+    "Got it! I'm helping your mom with that now. "
+    "She'll see it on her screen shortly."
+)
 
-    Returns immediately with an acknowledgment while processing in a
-    background thread.  The result appears in the elderly user's chat
-    via the /family/messages polling endpoint.
-    """
-    data = request.get_json()
-    from_number = data.get("from_number", "")
-    body = data.get("message", "").strip()
 
+def _check_simulated_sms(from_number: str, body: str) -> tuple[dict | None, dict | None]:
+    """(contact, None) when a simulated SMS should be processed, else (None, JSON reply)."""
     if not body:
-        return jsonify({"reply": "I didn't get a message. Try again?", "error": True})
+        return None, {"reply": "I didn't get a message. Try again?", "error": True}
 
     contact = FAMILY_CONTACTS.get(from_number)
     if not contact:
-        return jsonify({
+        return None, {
             "reply": "Sorry, this number isn't authorized for TechBuddy.",
             "error": True,
-        })
+        }
 
     # Quick permission check (instant — no Claude needed)
-    if any(kw in body.lower() for kw in DESTRUCTIVE_KEYWORDS):
-        if not contact.get("can_delete", False):
-            return jsonify({
-                "reply": (
-                    f"Hi {contact['name']}, I can't do that through SMS "
-                    f"for safety reasons. Please help your mom in person "
-                    f"or ask her directly."
-                ),
-            })
+    refusal = _family_refusal(contact, body)
+    if refusal:
+        return None, {"reply": refusal}
+    return contact, None
+
+
+def _check_incoming_sms(from_number: str, body: str) -> tuple[dict | None, str | None]:
+    """(contact, None) when a Twilio SMS should be processed, else (None, reply text)."""
+    if not body:
+        return None, "I didn't get a message. Try again?"
+
+    contact = FAMILY_CONTACTS.get(from_number)
+    if not contact:
+        return None, (
+            "Sorry, this number isn't authorized for TechBuddy. "
+            "Ask your family member to add you."
+        )
+    return contact, None
+
+
+def _twiml(msg: str) -> str:
+    if len(msg) > 1500:
+        msg = msg[:1497] + "..."
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f"<Response><Message>{msg}</Message></Response>"
+    )
+
+
+@app.route("/sms/simulate", methods=["POST"])
+def sms_simulate():
+    """Simulated SMS endpoint for demo mode — bypasses Twilio entirely.
+
+    Returns immediately with an acknowledgment while processing in a
+    background thread.  The result appears in the elderly user's chat
+    via the /family/messages polling endpoint.
+    """
+    data = request.get_json()
+    body = data.get("message", "").strip()
+    contact, reply = _check_simulated_sms(data.get("from_number", ""), body)
+    if reply:
+        return jsonify(reply)
 
     # Process in background thread — return immediately
     def _process():
         process_family_sms(contact, body)
 
     threading.Thread(target=_process, daemon=True).start()
-    return jsonify({
-        "reply": (
-            f"Got it! I'm helping your mom with that now. "
-            f"She'll see it on her screen shortly."
-        ),
-    })
+    return jsonify({"reply": SMS_ACK_REPLY})
 
 
 @app.route("/sms/incoming", methods=["POST"])
@@ -1003,42 +678,22 @@ def sms_incoming():
     Expects form-encoded POST from Twilio. Returns TwiML XML.
     Only works when Twilio is configured; otherwise use /sms/simulate.
     """
-    from_number = request.form.get("From", "")
     body = request.form.get("Body", "").strip()
-
-    # Build TwiML response
-    def twiml_reply(msg):
-        return (
-            '<?xml version="1.0" encoding="UTF-8"?>'
-            f"<Response><Message>{msg}</Message></Response>"
-        ), 200, {"Content-Type": "text/xml"}
-
-    if not body:
-        return twiml_reply("I didn't get a message. Try again?")
-
-    contact = FAMILY_CONTACTS.get(from_number)
-    if not contact:
-        return twiml_reply(
-            "Sorry, this number isn't authorized for TechBuddy. "
-            "Ask your family member to add you."
-        )
-
-    reply_text = process_family_sms(contact, body)
-
-    if len(reply_text) > 1500:
-        reply_text = reply_text[:1497] + "..."
-
-    return twiml_reply(reply_text)
+    contact, reply = _check_incoming_sms(request.form.get("From", ""), body)
+    if contact:
+        reply = process_family_sms(contact, body)
+    return _twiml(reply), 200, {"Content-Type": "text/xml"}
 
 
 @app.route("/family/messages", methods=["GET"])
 def family_messages():
     """Polling endpoint — returns pending family messages for the chat UI."""
-    with _family_msg_lock:
-        messages = list(_pending_family_messages)
-        _pending_family_messages.clear()
-    return jsonify({"messages": messages})
+    return jsonify({"messages": state_store.take_family_messages()})
 
 
 if __name__ == "__main__":
+    # The reloader runs this file twice; only the serving process samples health
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        from mcp_servers import health_history
+        health_history.start()
     app.run(debug=True, host="0.0.0.0", port=5000)
@@ -0,0 +1,198 @@
+"""asgi.py -- Async (ASGI) serving mode for the TechBuddy chat backend.
+
+Under Flask every /chat request holds a worker thread for the whole
+multi-round Claude loop, which is mostly waiting on the network. This
+module serves the same routes from one asyncio event loop instead:
+
+- Claude calls go through AsyncAnthropic, so a conversation waiting on the
+  API costs a coroutine, not a thread;
+- tool calls run on a bounded thread pool (TOOL_THREADS), because the tools
+  themselves block on PowerShell, COM, IMAP and the filesystem. A tool
+  registered as an `async def` is awaited directly;
+- /sms/simulate schedules its work as a task on the loop rather than
+  starting a thread per text;
+- reads and writes of the shared state store run on a small thread pool
+  of their own (STATE_THREADS): with several workers they are SQLite
+  calls that can wait on another worker's write, and that wait must not
+  stall every other conversation on the loop.
+
+Routes, prompts, history handling and the shared state (conversation
+histories, family SMS queue, in state_store) all come from app.py, so both
+modes behave the same. One process can hold hundreds of conversations in
+flight.
+
+Run:
+    uvicorn frontend.asgi:app --host 0.0.0.0 --port 5000
+    python frontend/serve.py        # production: several workers, one state store
+
+Author: Gregory E. Schwartz
+Event:  Anthropic's Built with Opus 4.6: a Claude Code Hackathon
+Date:   February 2026
+"""
+import asyncio
+import inspect
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from pathlib import Path
+from urllib.parse import parse_qs
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.sessions import SessionMiddleware
+from starlette.responses import HTMLResponse, JSONResponse, Response
+from starlette.routing import Route
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from frontend import app as shared
+from frontend import state_store
+from mcp_servers import tool_registry
+
+TOOL_THREADS = int(os.getenv("TECHBUDDY_TOOL_THREADS", "16"))
+STATE_THREADS = 4
+
+_tool_pool = ThreadPoolExecutor(max_workers=TOOL_THREADS, thread_name_prefix="tools")
+_state_pool = ThreadPoolExecutor(max_workers=STATE_THREADS, thread_name_prefix="state")
+_background = set()      # running /sms/simulate tasks (the loop only keeps weak references)
+
+async_client = shared._LazyAnthropic("AsyncAnthropic")
+
+
+async def execute_tool_async(name: str, input_data: dict) -> str | list:
+    """Run a tool without blocking the event loop (same results as app.execute_tool)."""
+    func = shared.TOOL_FUNCTIONS.get(name)
+    if func is not None and inspect.iscoroutinefunction(func):
+        try:
+            return await func(**input_data)
+        except Exception:
+            return "I had trouble with that. Let's try a different approach."
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_tool_pool, shared.execute_tool, name, input_data)
+
+
+async def _state(func, *args):
+    """Run a state_store call (or an app.py helper that makes one) off the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(_state_pool, func, *args)
+
+
+async def call_claude_async(history: list) -> tuple[str, str, list]:
+    """app.call_claude on AsyncAnthropic: (final_text, thinking_text, updated_history)."""
+    # Chosen once per turn so every round shares one prompt-cache prefix
+    tools = tool_registry.select(history)
+
+    for _ in range(shared.MAX_TOOL_ROUNDS):
+        response = await async_client.messages.create(**shared._claude_request(history, tools))
+
+        assistant_content = response.content
+        history.append({"role": "assistant", "content": shared.serialize_content(assistant_content)})
+
+        tool_uses = [b for b in assistant_content if b.type == "tool_use"]
+        if not tool_uses:
+            reply_text, thinking_text = shared._final_reply(assistant_content)
+            return reply_text, thinking_text, history
+
+        # One at a time: later tool calls often depend on earlier ones (open, then type)
+        tool_results = []
+        for tool_use in tool_uses:
+            result = await execute_tool_async(tool_use.name, tool_use.input)
+            tool_results.append(shared._tool_result(tool_use, result))
+        history.append({"role": "user", "content": tool_results})
+        shared._retire_old_screenshots(history)
+
+    return shared.STILL_WORKING_REPLY, "", history
+
+
+async def process_family_sms_async(contact: dict, message: str) -> str:
+    """app.process_family_sms on the event loop."""
+    refusal = shared._family_refusal(contact, message)
+    if refusal:
+        return refusal
+    try:
+        assistant_text, _, _ = await call_claude_async(shared._family_history(contact, message))
+    except Exception:
+        assistant_text = shared._family_failure(contact)
+    await _state(shared._record_family_reply, contact, message, assistant_text)
+    return assistant_text
+
+
+_page = {"html": None}
+
+
+async def index(request):
+    await _state(shared._new_conversation, request.session)
+    if _page["html"] is None:
+        template = Path(shared.app.root_path) / shared.app.template_folder / "chat.html"
+        _page["html"] = template.read_text(encoding="utf-8")
+    return HTMLResponse(_page["html"])
+
+
+async def chat(request):
+    data = await request.json()
+    user_message = data.get("message", "").strip()
+    if not user_message:
+        return JSONResponse({"reply": shared.EMPTY_MESSAGE_REPLY})
+
+    sid, history = await _state(shared._start_chat_turn, request.session, user_message)
+    thinking_text = ""
+    try:
+        assistant_text, thinking_text, history = await call_claude_async(history)
+    except Exception as e:
+        assistant_text = shared._failed_turn(history, e)
+    return JSONResponse(await _state(shared._finish_chat_turn, sid, history, assistant_text, thinking_text))
+
+
+async def sms_simulate(request):
+    """Simulated SMS: acknowledge now, handle the request in a background task."""
+    data = await request.json()
+    body = data.get("message", "").strip()
+    contact, reply = shared._check_simulated_sms(data.get("from_number", ""), body)
+    if reply:
+        return JSONResponse(reply)
+
+    task = asyncio.create_task(process_family_sms_async(contact, body))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+    return JSONResponse({"reply": shared.SMS_ACK_REPLY})
+
+
+async def sms_incoming(request):
+    """Twilio webhook (form-encoded POST); replies with TwiML."""
+    form = parse_qs((await request.body()).decode("utf-8"))
+    body = form.get("Body", [""])[0].strip()
+    contact, reply = shared._check_incoming_sms(form.get("From", [""])[0], body)
+    if contact:
+        reply = await process_family_sms_async(contact, body)
+    return Response(shared._twiml(reply), media_type="text/xml")
+
+
+async def family_messages(request):
+    return JSONResponse({"messages": await _state(state_store.take_family_messages)})
+
+
+@asynccontextmanager
+async def lifespan(app):
+    from mcp_servers import health_history
+    health_history.start()
+    yield
+    health_history.stop()
+
+
+def _session_secret() -> str:
+    secret = shared.app.secret_key
+    return secret.hex() if isinstance(secret, bytes) else str(secret)
+
+
+app = Starlette(
+    routes=[
+        Route("/", index),
+        Route("/chat", chat, methods=["POST"]),
+        Route("/sms/simulate", sms_simulate, methods=["POST"]),
+        Route("/sms/incoming", sms_incoming, methods=["POST"]),
+        Route("/family/messages", family_messages, methods=["GET"]),
+    ],
+    middleware=[Middleware(SessionMiddleware, secret_key=_session_secret())],
+    lifespan=lifespan,
+)
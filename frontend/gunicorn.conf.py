@@ -0,0 +1,38 @@
+"""gunicorn.conf.py -- Production settings for the Flask (WSGI) server on Linux/macOS.
+
+    TECHBUDDY_SECRET_KEY=... gunicorn -c frontend/gunicorn.conf.py frontend.app:app
+
+A Flask worker thread is held for a whole chat turn (up to ten Claude
+calls), almost all of it waiting on the network, so workers run threads
+("gthread") and there are WORKERS_PER_CORE of them per CPU. Every worker
+shares the session key and the state store (see serve.py, which applies
+the same rules to uvicorn).
+
+Settings (environment): TECHBUDDY_SECRET_KEY (required), TECHBUDDY_WORKERS,
+TECHBUDDY_THREADS, TECHBUDDY_BIND, TECHBUDDY_STATE_DB.
+
+Author: Gregory E. Schwartz
+Event:  Anthropic's Built with Opus 4.6: a Claude Code Hackathon
+Date:   February 2026
+"""
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from frontend.serve import default_workers, production_env  # noqa: E402
+
+WORKERS_PER_CORE = 2
+
+bind = os.getenv("TECHBUDDY_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("TECHBUDDY_WORKERS", default_workers(WORKERS_PER_CORE)))
+worker_class = "gthread"
+threads = int(os.getenv("TECHBUDDY_THREADS", "16"))
+timeout = 300              # a turn of ten tool rounds can take minutes
+graceful_timeout = 30
+keepalive = 5
+accesslog = "-"
+
+# Before the app is imported in any worker
+production_env(workers)
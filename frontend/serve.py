@@ -0,0 +1,83 @@
+"""serve.py -- Production run mode: several uvicorn workers sharing one state store.
+
+`python frontend/app.py` is the Werkzeug debug server: one process, a
+random session key per start, state in memory. This starts the ASGI app
+(asgi.py) under uvicorn with WORKERS processes instead, and sets up what
+multiple workers need:
+
+- TECHBUDDY_SECRET_KEY must be set (in the environment or .env), so a
+  session cookie signed by one worker (or before a restart) is valid on
+  all of them;
+- TECHBUDDY_STATE_DB defaults to ~/.techbuddy/state.db, so conversation
+  histories and the family SMS queue are shared (see state_store.py);
+- with more than one worker the health sampler is off unless
+  TECHBUDDY_HEALTH_INTERVAL is set: each worker would sample the same
+  machine into the same file. check_system_health probes live instead.
+
+Works on Windows too. On Linux/macOS the Flask app can run under
+gunicorn with frontend/gunicorn.conf.py, which applies the same rules.
+
+Run:
+    TECHBUDDY_SECRET_KEY=... python frontend/serve.py
+    TECHBUDDY_SECRET_KEY=... python frontend/serve.py --workers 8 --port 8000
+
+Settings (environment):
+    TECHBUDDY_SECRET_KEY    session signing key (required)
+    TECHBUDDY_WORKERS       worker processes (default WORKERS_PER_CORE per CPU)
+    TECHBUDDY_BIND          host:port (default 0.0.0.0:5000)
+    TECHBUDDY_STATE_DB      shared state file (default ~/.techbuddy/state.db)
+
+Author: Gregory E. Schwartz
+Event:  Anthropic's Built with Opus 4.6: a Claude Code Hackathon
+Date:   February 2026
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+# Before production_env checks it: .env.example puts TECHBUDDY_SECRET_KEY in .env
+load_dotenv(PROJECT_ROOT / ".env")
+
+# An async worker isn't tied up by a waiting conversation, so it needs only
+# enough siblings to keep every core busy with JSON, prompts and SQLite
+WORKERS_PER_CORE = 1
+DEFAULT_STATE_DB = Path.home() / ".techbuddy" / "state.db"
+
+
+def default_workers(per_core: int = WORKERS_PER_CORE) -> int:
+    return max(1, per_core * (os.cpu_count() or 1))
+
+
+def production_env(workers: int):
+    """Check and fill in the environment every worker inherits. Exits if the secret is missing."""
+    if not os.environ.get("TECHBUDDY_SECRET_KEY"):
+        sys.exit("[TechBuddy] Set TECHBUDDY_SECRET_KEY to a long random string before running "
+                 "in production (python -c \"import secrets; print(secrets.token_hex(32))\").")
+    os.environ.setdefault("TECHBUDDY_STATE_DB", str(DEFAULT_STATE_DB))
+    if workers > 1:
+        os.environ.setdefault("TECHBUDDY_HEALTH_INTERVAL", "0")
+
+
+def main(argv=None):
+    host, _, port = os.getenv("TECHBUDDY_BIND", "0.0.0.0:5000").rpartition(":")
+    parser = argparse.ArgumentParser(description="Run TechBuddy with several workers.")
+    parser.add_argument("--workers", type=int,
+                        default=int(os.getenv("TECHBUDDY_WORKERS", default_workers())))
+    parser.add_argument("--host", default=host)
+    parser.add_argument("--port", type=int, default=int(port))
+    args = parser.parse_args(argv)
+
+    production_env(args.workers)
+    import uvicorn
+    print(f"[TechBuddy] {args.workers} workers on {args.host}:{args.port}, "
+          f"state in {os.environ['TECHBUDDY_STATE_DB']}", flush=True)
+    uvicorn.run("frontend.asgi:app", host=args.host, port=args.port, workers=args.workers,
+                app_dir=str(PROJECT_ROOT), log_level="warning", proxy_headers=True)
+
+
+if __name__ == "__main__":
+    main()
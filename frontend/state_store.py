@@ -0,0 +1,170 @@
+"""state_store.py -- Conversation histories and the family SMS queue, shareable across workers.
+
+app.py kept this state in module globals. That is right for the single
+`python frontend/app.py` process and wrong as soon as there is a second
+worker: a chat whose next message lands on another worker starts over,
+and a family reply queued by one worker is polled from another and never
+shown. With TECHBUDDY_STATE_DB set, the same functions keep the state in
+one SQLite file that every worker on the machine opens:
+
+- WAL journal, so readers don't wait for the writer, and a turn's history
+  is written in one short statement;
+- one connection per thread and process (a connection can't be used from
+  another thread or survive a fork, so each opens on first use);
+- the family queue is drained in one IMMEDIATE transaction, so each
+  message reaches exactly one poll however many workers are polling;
+- histories untouched for HISTORY_TTL are dropped now and then on write.
+
+Without it, state lives in this process as before: the histories,
+family_messages and sms_log objects below, which app.py re-exports.
+
+Settings (environment):
+    TECHBUDDY_STATE_DB    SQLite file shared by all workers (default: in-process)
+
+Author: Gregory E. Schwartz
+Event:  Anthropic's Built with Opus 4.6: a Claude Code Hackathon
+Date:   February 2026
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+DB_PATH = os.environ.get("TECHBUDDY_STATE_DB") or None
+HISTORY_TTL = 7 * 24 * 3600   # seconds a conversation is kept after its last turn
+PRUNE_EVERY = 200             # history writes between sweeps for expired ones
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS histories (
+    sid TEXT PRIMARY KEY, history TEXT NOT NULL, updated REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS family_messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, message TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS family_sms_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, entry TEXT NOT NULL, logged REAL NOT NULL);
+"""
+
+# In-process state (used when no database is configured)
+_lock = threading.Lock()
+histories = {}          # sid -> history list
+family_messages = []    # waiting for the chat window's next /family/messages poll
+sms_log = []            # audit trail of family SMS exchanges
+
+_db = {"path": Path(DB_PATH) if DB_PATH else None, "writes": 0}
+_local = threading.local()
+
+
+def configure(path: Path | str | None):
+    """Switch to a SQLite file shared between processes (None = in-process)."""
+    _db["path"] = Path(path) if path else None
+
+
+def shared() -> bool:
+    """True when state is in a file other processes can see."""
+    return _db["path"] is not None
+
+
+def _conn() -> sqlite3.Connection:
+    key = (os.getpid(), _db["path"])
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.key != key:
+        if conn is not None and _local.key[0] == key[0]:
+            conn.close()
+        _db["path"].parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit; the one multi-statement change opens its own transaction
+        conn = sqlite3.connect(_db["path"], timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        _local.conn, _local.key = conn, key
+    return conn
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+# ---------------------------------------------------------------------------
+# Conversation histories
+# ---------------------------------------------------------------------------
+
+def get_history(sid: str) -> list | None:
+    """The stored history for a session, or None if there isn't one."""
+    if not shared():
+        with _lock:
+            return histories.get(sid)
+    row = _conn().execute("SELECT history FROM histories WHERE sid = ?", (sid,)).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def put_history(sid: str, history: list):
+    """Store a session's history (replacing what was there)."""
+    if not shared():
+        with _lock:
+            histories[sid] = history
+        return
+    now = time.time()
+    conn = _conn()
+    conn.execute(
+        "INSERT INTO histories (sid, history, updated) VALUES (?, ?, ?) "
+        "ON CONFLICT(sid) DO UPDATE SET history = excluded.history, updated = excluded.updated",
+        (sid, _dumps(history), now))
+    _db["writes"] += 1
+    if _db["writes"] % PRUNE_EVERY == 0:
+        conn.execute("DELETE FROM histories WHERE updated < ?", (now - HISTORY_TTL,))
+
+
+def history_stats() -> dict:
+    """{"conversations", "bytes"}: how many histories are stored and their size as JSON."""
+    if not shared():
+        with _lock:
+            stored = list(histories.values())
+        return {"conversations": len(stored),
+                "bytes": sum(len(_dumps(h).encode("utf-8")) for h in stored)}
+    count, size = _conn().execute(
+        "SELECT COUNT(*), COALESCE(SUM(LENGTH(CAST(history AS BLOB))), 0) FROM histories").fetchone()
+    return {"conversations": count, "bytes": size}
+
+
+# ---------------------------------------------------------------------------
+# Family SMS
+# ---------------------------------------------------------------------------
+
+def push_family_message(message: dict):
+    """Queue a family SMS result for the elderly user's chat window."""
+    if not shared():
+        with _lock:
+            family_messages.append(message)
+        return
+    _conn().execute("INSERT INTO family_messages (message) VALUES (?)", (_dumps(message),))
+
+
+def take_family_messages() -> list:
+    """Every queued message, oldest first, removed from the queue."""
+    if not shared():
+        with _lock:
+            messages = list(family_messages)
+            family_messages.clear()
+        return messages
+    conn = _conn()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        rows = conn.execute("SELECT id, message FROM family_messages ORDER BY id").fetchall()
+        if rows:
+            conn.execute("DELETE FROM family_messages WHERE id <= ?", (rows[-1][0],))
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return [json.loads(message) for _, message in rows]
+
+
+def log_family_sms(entry: dict):
+    """Append a family SMS exchange to the audit trail."""
+    if not shared():
+        with _lock:
+            sms_log.append(entry)
+        return
+    _conn().execute("INSERT INTO family_sms_log (entry, logged) VALUES (?, ?)",
+                    (_dumps(entry), time.time()))
@@ -0,0 +1,78 @@
+"""diagnostics.py -- Run independent diagnostic probes concurrently.
+
+check_system_health, troubleshoot_printer and check_internet each ask
+several unrelated questions (memory, disk, processes; printers, default
+printer, print jobs; ping, WiFi). They used to ask them one after another,
+so the user waited for the sum of every probe. run_probes() starts them
+all at once and collects whatever has finished when a total deadline
+passes, so the wait is the slowest probe, capped by the deadline.
+
+Each result says whether the probe finished, failed, or timed out, so the
+report can tell the user which parts it skipped rather than guessing.
+
+Author: Gregory E. Schwartz
+Event:  Anthropic's Built with Opus 4.6: a Claude Code Hackathon
+Date:   February 2026
+"""
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+DEFAULT_DEADLINE = 20.0    # seconds for a whole report
+
+# Shared by every tool; probes mostly wait on PowerShell or the network
+_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="diagnostics")
+
+DONE = "done"
+FAILED = "failed"
+TIMED_OUT = "timed_out"
+
+
+def _timed(probe):
+    start = time.monotonic()
+    try:
+        return DONE, probe(), None, time.monotonic() - start
+    except Exception as e:
+        return FAILED, None, str(e), time.monotonic() - start
+
+
+def run_probes(probes: dict, deadline: float | None = None) -> dict:
+    """Run named zero-argument probes concurrently under one total deadline.
+
+    Returns {name: {"status", "value", "error", "seconds"}} in the order the
+    probes were given. status is DONE, FAILED (the probe raised) or
+    TIMED_OUT (still running at the deadline; it is left to finish in the
+    background and its result is ignored). deadline defaults to
+    DEFAULT_DEADLINE.
+    """
+    deadline = DEFAULT_DEADLINE if deadline is None else deadline
+    start = time.monotonic()
+    futures = {name: _pool.submit(_timed, probe) for name, probe in probes.items()}
+    wait(futures.values(), timeout=deadline)
+
+    results = {}
+    for name, future in futures.items():
+        if future.done():
+            status, value, error, seconds = future.result()
+        else:
+            status, value, error, seconds = TIMED_OUT, None, None, time.monotonic() - start
+        results[name] = {"status": status, "value": value, "error": error, "seconds": seconds}
+
+    timings = ", ".join(f"{name} {r['seconds']:.2f}s" + ("" if r["status"] == DONE else f" ({r['status']})")
+                        for name, r in results.items())
+    # stderr: stdout is the MCP server's JSON-RPC stream
+    print(f"[TechBuddy] Diagnostics in {time.monotonic() - start:.2f}s: {timings}", file=sys.stderr, flush=True)
+    return results
+
+
+def timed_out(results: dict) -> list[str]:
+    """Names of the probes that didn't finish before the deadline."""
+    return [name for name, r in results.items() if r["status"] == TIMED_OUT]
+
+
+def partial_note(results: dict) -> str:
+    """A line for the end of a report if some checks were skipped, else ""."""
+    if not timed_out(results):
+        return ""
+    return ("\n(Some of these checks took too long, so this report is missing a part. "
+            "Ask me again in a minute and I'll try once more.)")
@@ -0,0 +1,120 @@
+"""extraction.py -- One-pass entity extraction for the Scam Shield pipeline.
+
+Every pattern is compiled once at import. A single scan over the text
+tokenizes URLs, email addresses, and phone numbers into structured
+entities, so the scam scorer, web verification, and the video-call tools
+all read the same result instead of re-running their own regexes.
+
+Author: Gregory E. Schwartz
+Event:  Anthropic's Built with Opus 4.6: a Claude Code Hackathon
+Date:   February 2026
+"""
+import re
+from urllib.parse import urlsplit
+
+# One alternation, tried left to right at each position: emails before URLs
+# (so "claim@prize.xyz" isn't split), URLs before phones (so the digits in
+# "zoom.us/j/3678174163" stay part of the link).
+_ENTITY_RE = re.compile(
+    r"""
+    (?P<email>[\w.+-]+@(?:[a-z0-9-]+\.)+[a-z]{2,24})\b
+    |
+    (?P<url>
+        (?:https?://|www\.)[^\s<>"'()\[\]]+
+        |
+        (?<![\w@.-])(?:[a-z0-9-]+\.)+[a-z]{2,24}\b(?:/[^\s<>"'()\[\]]*)?
+    )
+    |
+    (?P<phone>(?<![\w/])(?:\+?1[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}(?!\d))
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+
+_NON_DIGIT_RE = re.compile(r"\D")
+
+# Trailing punctuation that belongs to the sentence, not the link
+_URL_TRAILING = ".,;:!?'\""
+
+# "Appointment_Details.pdf" is a filename, not a website
+_FILE_SUFFIXES = {
+    "pdf", "doc", "docx", "txt", "rtf", "odt", "jpg", "jpeg", "png", "gif",
+    "bmp", "tiff", "heic", "webp", "xls", "xlsx", "csv", "ppt", "pptx",
+    "exe", "bat", "cmd", "scr", "vbs", "js", "msi", "ps1", "pif", "reg",
+    "wsf", "hta", "zip", "md", "py",
+}
+
+
+def _parse_url(raw: str) -> dict | None:
+    """Split a matched URL into scheme, host, TLD, and path."""
+    url = raw.rstrip(_URL_TRAILING)
+    has_scheme = url.lower().startswith(("http://", "https://"))
+    parts = urlsplit(url if has_scheme else f"http://{url}")
+    host = (parts.hostname or "").lower().rstrip(".")
+    if "." not in host:
+        return None
+    tld = host.rsplit(".", 1)[1]
+    if not has_scheme and not url.lower().startswith("www.") and tld in _FILE_SUFFIXES:
+        return None
+    return {
+        "url": url,
+        "host": host,
+        "tld": tld,
+        "path": parts.path,
+        "has_scheme": has_scheme,
+    }
+
+
+def extract_entities(text: str) -> dict:
+    """Tokenize URLs, email addresses, and phone numbers in one pass.
+
+    Returns:
+        {"urls": [{"url", "host", "tld", "path", "has_scheme"}, ...],
+         "emails": [{"address", "host", "tld"}, ...],
+         "phones": [{"raw", "digits"}, ...]}
+    """
+    urls, emails, phones = [], [], []
+    for match in _ENTITY_RE.finditer(text or ""):
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "email":
+            host = value.rsplit("@", 1)[1].lower()
+            emails.append({"address": value, "host": host, "tld": host.rsplit(".", 1)[1]})
+        elif kind == "url":
+            parsed = _parse_url(value)
+            if parsed:
+                urls.append(parsed)
+        else:
+            phones.append({"raw": value.strip(), "digits": _NON_DIGIT_RE.sub("", value)})
+    return {"urls": urls, "emails": emails, "phones": phones}
+
+
+def entity_hosts(entities: dict) -> list[str]:
+    """All distinct hosts from URLs and email addresses, in order of appearance."""
+    seen = []
+    for item in entities["urls"] + entities["emails"]:
+        if item["host"] not in seen:
+            seen.append(item["host"])
+    return seen
+
+
+def host_matches(host: str, domain: str) -> bool:
+    """True if host is domain or a subdomain of it ("us02web.zoom.us" -> "zoom.us")."""
+    host = host.lower()
+    domain = domain.lower()
+    return host == domain or host.endswith("." + domain)
+
+
+def find_links(entities: dict, domains) -> list[str]:
+    """URLs whose host belongs to one of the given domains."""
+    return [u["url"] for u in entities["urls"]
+            if any(host_matches(u["host"], d) for d in domains)]
+
+
+def compile_phrases(phrases: list[str]) -> list[tuple[str, re.Pattern]]:
+    """Compile keyword phrases once, anchored at a word start.
+
+    The leading anchor stops short keywords matching inside longer words
+    ("irs" in "first", "ssa" in "message") while still allowing plurals
+    ("gift card" matches "gift cards").
+    """
+    return [(p, re.compile(r"(?<![a-z0-9])" + re.escape(p))) for p in phrases]
@@ -0,0 +1,296 @@
+"""health_history.py -- Background health sampler with a ring-buffer history.
+
+check_system_health used to take one snapshot on request, which adds load
+at the worst moment and can't answer "it's been slow all afternoon". This
+module samples memory, CPU, free disk space and the five biggest programs
+every INTERVAL seconds on a daemon thread. Samples go into a fixed-size
+ring buffer:
+
+- one bytearray of CAPACITY fixed-width struct records (184 bytes each);
+  with the defaults (30 s, 720 samples) that is six hours in about 130 KB;
+- saved to a small binary file every few samples and on stop(), written
+  to a temp file and renamed into place, and reloaded on start().
+
+The report can then use the latest sample instead of probing again, and
+trends() compares the oldest and newest samples in a time window.
+
+Settings (environment):
+    TECHBUDDY_HEALTH_INTERVAL   seconds between samples (default 30; 0 = off)
+    TECHBUDDY_HEALTH_FILE       history file (default ~/.techbuddy/health-history.bin)
+
+Author: Gregory E. Schwartz
+Event:  Anthropic's Built with Opus 4.6: a Claude Code Hackathon
+Date:   February 2026
+"""
+import math
+import os
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+
+from mcp_servers import health_probes
+
+INTERVAL = float(os.environ.get("TECHBUDDY_HEALTH_INTERVAL", "30"))
+CAPACITY = 720
+TOP_N = 5
+SAVE_EVERY = 10           # samples between writes to disk
+HISTORY_FILE = Path(os.environ.get(
+    "TECHBUDDY_HEALTH_FILE", Path.home() / ".techbuddy" / "health-history.bin"))
+
+# time, memory used/total, disk free/total (bytes), CPU %, then TOP_N x (name, MB)
+RECORD = struct.Struct("<dddddf" + "24sf" * TOP_N)
+# magic, format version, TOP_N, capacity, samples written so far
+HEADER = struct.Struct("<4sHHIQ")
+MAGIC = b"TBHH"
+VERSION = 1
+
+MIN_TREND_SPAN = 600      # seconds of history before trends() says anything
+
+_lock = threading.Lock()
+_ring = {"buffer": bytearray(CAPACITY * RECORD.size), "capacity": CAPACITY,
+         "written": 0, "path": None, "unsaved": 0}
+_thread = {"thread": None, "stop": None, "interval": INTERVAL}
+
+
+# ---------------------------------------------------------------------------
+# Ring buffer
+# ---------------------------------------------------------------------------
+
+def reset(capacity: int = CAPACITY, path: Path | None = None):
+    """Empty the buffer (and choose where it is saved; None = don't save)."""
+    with _lock:
+        _ring.update(buffer=bytearray(capacity * RECORD.size), capacity=capacity,
+                     written=0, path=path, unsaved=0)
+
+
+def _pack(sample: dict) -> bytes:
+    fields = [sample["time"], sample["mem_used"], sample["mem_total"],
+              sample["disk_free"], sample["disk_total"], sample["cpu"]]
+    procs = sample.get("processes", [])[:TOP_N]
+    for i in range(TOP_N):
+        if i < len(procs):
+            fields += [procs[i]["name"].encode("utf-8")[:24], procs[i]["rss"] / 1048576]
+        else:
+            fields += [b"", 0.0]
+    return RECORD.pack(*fields)
+
+
+def _unpack(raw: bytes) -> dict:
+    values = RECORD.unpack(raw)
+    procs = []
+    for i in range(TOP_N):
+        name, mb = values[6 + 2 * i], values[7 + 2 * i]
+        name = name.rstrip(b"\0").decode("utf-8", "ignore")
+        if name:
+            procs.append({"name": name, "rss": mb * 1048576})
+    return {"time": values[0], "mem_used": values[1], "mem_total": values[2],
+            "disk_free": values[3], "disk_total": values[4], "cpu": values[5],
+            "processes": procs}
+
+
+def record(sample: dict):
+    """Append one sample, overwriting the oldest once the buffer is full.
+
+    sample: {"time", "mem_used", "mem_total", "disk_free", "disk_total",
+    "cpu", "processes": [{"name", "rss"}]}; unknown numbers are NaN.
+    """
+    raw = _pack(sample)
+    with _lock:
+        slot = _ring["written"] % _ring["capacity"]
+        _ring["buffer"][slot * RECORD.size:(slot + 1) * RECORD.size] = raw
+        _ring["written"] += 1
+        _ring["unsaved"] += 1
+        due = _ring["path"] is not None and _ring["unsaved"] >= SAVE_EVERY
+    if due:
+        save()
+
+
+def samples(window: float | None = None) -> list[dict]:
+    """Samples oldest-first, optionally only those from the last `window` seconds."""
+    with _lock:
+        buffer, capacity, written = bytes(_ring["buffer"]), _ring["capacity"], _ring["written"]
+    found = []
+    for n in range(max(0, written - capacity), written):
+        slot = n % capacity
+        found.append(_unpack(buffer[slot * RECORD.size:(slot + 1) * RECORD.size]))
+    if window is not None:
+        cutoff = time.time() - window
+        found = [s for s in found if s["time"] >= cutoff]
+    return found
+
+
+# ---------------------------------------------------------------------------
+# Persistence
+# ---------------------------------------------------------------------------
+
+def save():
+    """Write the buffer to its history file (temp file + rename)."""
+    with _lock:
+        path = _ring["path"]
+        if path is None:
+            return
+        data = HEADER.pack(MAGIC, VERSION, TOP_N, _ring["capacity"], _ring["written"]) + bytes(_ring["buffer"])
+        _ring["unsaved"] = 0
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"[TechBuddy] Couldn't save health history: {e}", file=sys.stderr, flush=True)
+
+
+def load(path: Path) -> bool:
+    """Replace the buffer with a saved history file; False if it's missing or stale."""
+    try:
+        data = path.read_bytes()
+        magic, version, top_n, capacity, written = HEADER.unpack_from(data)
+    except (OSError, struct.error):
+        return False
+    if (magic, version, top_n) != (MAGIC, VERSION, TOP_N) or \
+            len(data) != HEADER.size + capacity * RECORD.size:
+        return False
+    with _lock:
+        _ring.update(buffer=bytearray(data[HEADER.size:]), capacity=capacity,
+                     written=written, path=path, unsaved=0)
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Sampling
+# ---------------------------------------------------------------------------
+
+def _probe(probe, default):
+    try:
+        return probe()
+    except Exception:
+        return default
+
+
+def take_sample() -> dict:
+    """Read the probes once (each probe that fails is recorded as NaN/empty)."""
+    nan = float("nan")
+    mem = _probe(health_probes.memory, {})
+    drive = _probe(health_probes.disk, {})
+    return {
+        "time": time.time(),
+        "mem_used": mem.get("used", nan), "mem_total": mem.get("total", nan),
+        "disk_free": drive.get("free", nan), "disk_total": drive.get("total", nan),
+        "cpu": _probe(health_probes.cpu_percent, nan),
+        "processes": _probe(lambda: health_probes.top_processes(TOP_N), []),
+    }
+
+
+def _loop(stop: threading.Event, interval: float):
+    while True:
+        try:
+            record(take_sample())
+        except Exception as e:
+            print(f"[TechBuddy] Health sample failed: {e}", file=sys.stderr, flush=True)
+        if stop.wait(interval):
+            return
+
+
+def start(interval: float | None = None, path: Path | None = None) -> bool:
+    """Load the saved history and start sampling in the background.
+
+    Does nothing (returns False) if already running or the interval is 0.
+    """
+    interval = INTERVAL if interval is None else interval
+    if interval <= 0 or running():
+        return False
+    path = path or HISTORY_FILE
+    if not load(path):
+        reset(path=path)
+    _probe(health_probes.cpu_percent, None)  # prime: the next reading covers one interval
+    stop = threading.Event()
+    thread = threading.Thread(target=_loop, args=(stop, interval), name="health-sampler", daemon=True)
+    _thread.update(thread=thread, stop=stop, interval=interval)
+    thread.start()
+    # stderr throughout: under the stdio MCP server, stdout is the JSON-RPC stream
+    print(f"[TechBuddy] Health sampler every {interval:g}s -> {path}", file=sys.stderr, flush=True)
+    return True
+
+
+def stop():
+    """Stop sampling and save the history."""
+    thread, event = _thread["thread"], _thread["stop"]
+    if thread is None:
+        return
+    event.set()
+    thread.join(timeout=5)
+    _thread.update(thread=None, stop=None)
+    save()
+
+
+def running() -> bool:
+    return _thread["thread"] is not None and _thread["thread"].is_alive()
+
+
+# ---------------------------------------------------------------------------
+# Answers
+# ---------------------------------------------------------------------------
+
+def latest_readings(max_age: float | None = None) -> dict | None:
+    """The newest sample in check_system_health's shape, if it's fresh enough.
+
+    Returns {"memory", "disk", "processes"} like the health_probes results,
+    or None when no sample is newer than max_age (default: two intervals).
+    """
+    max_age = 2 * _thread["interval"] if max_age is None else max_age
+    recent = samples(window=max_age)
+    if not recent:
+        return None
+    s = recent[-1]
+    memory = disk = None
+    if not math.isnan(s["mem_total"]) and s["mem_total"]:
+        memory = {"total": s["mem_total"], "used": s["mem_used"],
+                  "available": s["mem_total"] - s["mem_used"],
+                  "percent": round(s["mem_used"] / s["mem_total"] * 100)}
+    if not math.isnan(s["disk_total"]) and s["disk_total"]:
+        used = s["disk_total"] - s["disk_free"]
+        disk = {"total": s["disk_total"], "used": used, "free": s["disk_free"],
+                "percent": round(used / s["disk_total"] * 100)}
+    return {"memory": memory, "disk": disk, "processes": s["processes"] or None}
+
+
+def _mem_percent(s: dict) -> float:
+    return s["mem_used"] / s["mem_total"] * 100 if s["mem_total"] else float("nan")
+
+
+def trends(window: float = 3600, grow_mb: float = 300) -> dict | None:
+    """How things changed over the last `window` seconds.
+
+    Returns None until the samples span MIN_TREND_SPAN seconds, else
+    {"span", "memory": (first %, last %, max %), "cpu": (average %, max %),
+    "disk_free": (first, last bytes), "growing": [(name, first MB, last MB)]}.
+    A program is "growing" if it gained grow_mb and at least half again
+    between its first and last appearance in the window's top five.
+    """
+    recent = samples(window)
+    if len(recent) < 2 or recent[-1]["time"] - recent[0]["time"] < MIN_TREND_SPAN:
+        return None
+    first, last = recent[0], recent[-1]
+
+    mem = [p for p in (_mem_percent(s) for s in recent) if not math.isnan(p)]
+    cpu = [s["cpu"] for s in recent if not math.isnan(s["cpu"])]
+
+    seen = {}
+    for s in recent:
+        for proc in s["processes"]:
+            mb = proc["rss"] / 1048576
+            seen.setdefault(proc["name"], [mb, mb])[1] = mb
+    growing = sorted(
+        ((name, start, end) for name, (start, end) in seen.items()
+         if end - start >= grow_mb and end >= start * 1.5),
+        key=lambda g: g[2] - g[1], reverse=True)
+
+    return {
+        "span": last["time"] - first["time"],
+        "memory": (mem[0], mem[-1], max(mem)) if mem else None,
+        "cpu": (sum(cpu) / len(cpu), max(cpu)) if cpu else None,
+        "disk_free": (first["disk_free"], last["disk_free"]),
+        "growing": growing,
+    }
@@ -0,0 +1,189 @@
+"""health_probes.py -- In-process memory, CPU, disk, process and network probes.
+
+check_system_health and check_internet used to start PowerShell and parse
+JSON on Windows, and return canned advice everywhere else. These probes
+read the same numbers in milliseconds from inside the process:
+
+- psutil when it is installed (Windows, Linux, macOS);
+- /proc on Linux and WSL when it isn't;
+- shutil.disk_usage for disk space and plain TCP connects and a DNS lookup
+  for connectivity, which need nothing extra on any platform.
+
+A probe that can't work here raises ProbeUnavailable, so the caller can
+fall back to PowerShell on Windows. Printer and WiFi details still come
+from PowerShell, because no portable API reports them.
+
+Author: Gregory E. Schwartz
+Event:  Anthropic's Built with Opus 4.6: a Claude Code Hackathon
+Date:   February 2026
+"""
+import os
+import platform
+import shutil
+import socket
+import time
+from pathlib import Path
+
+IS_WINDOWS = platform.system() == "Windows"
+
+# TCP endpoints that answer from almost any network (DNS and HTTPS ports)
+CONNECT_TARGETS = [("1.1.1.1", 443), ("8.8.8.8", 53), ("208.67.222.222", 443)]
+CONNECT_TIMEOUT = 3.0
+DNS_TEST_HOST = "www.google.com"
+
+_PROC = Path("/proc")
+_cpu_last = {}     # previous /proc/stat reading for cpu_percent()
+
+
+class ProbeUnavailable(Exception):
+    """Neither psutil nor /proc can answer this probe on this machine."""
+
+
+def _psutil():
+    try:
+        import psutil
+        return psutil
+    except ImportError:
+        return None
+
+
+def memory() -> dict:
+    """Physical memory in bytes: {"total", "used", "available", "percent"}."""
+    psutil = _psutil()
+    if psutil is not None:
+        vm = psutil.virtual_memory()
+        total, available = vm.total, vm.available
+    else:
+        meminfo = _PROC / "meminfo"
+        if not meminfo.exists():
+            raise ProbeUnavailable("memory")
+        fields = {}
+        for line in meminfo.read_text().splitlines():
+            key, _, rest = line.partition(":")
+            fields[key] = int(rest.split()[0]) * 1024
+        total = fields["MemTotal"]
+        available = fields.get("MemAvailable", fields.get("MemFree", 0))
+    used = total - available
+    return {"total": total, "used": used, "available": available,
+            "percent": round(used / total * 100)}
+
+
+def _proc_cpu_times() -> tuple[int, int]:
+    """(idle, total) jiffies from the first line of /proc/stat."""
+    fields = [int(v) for v in (_PROC / "stat").read_text().split("\n", 1)[0].split()[1:]]
+    idle = fields[3] + (fields[4] if len(fields) > 4 else 0)  # idle + iowait
+    return idle, sum(fields)
+
+
+def cpu_percent() -> float:
+    """How busy the processor has been since the previous call (0-100).
+
+    The first call covers the time since boot (psutil: since import).
+    """
+    psutil = _psutil()
+    if psutil is not None:
+        return psutil.cpu_percent(interval=None)
+    if not (_PROC / "stat").exists():
+        raise ProbeUnavailable("cpu")
+    idle, total = _proc_cpu_times()
+    last_idle, last_total = _cpu_last.get("times", (0, 0))
+    _cpu_last["times"] = (idle, total)
+    if total <= last_total:
+        return 0.0
+    return round(100 * (1 - (idle - last_idle) / (total - last_total)), 1)
+
+
+def system_drive() -> str:
+    """Where the user's files live: C:\\ on Windows, /mnt/c on WSL, else /."""
+    if IS_WINDOWS:
+        return os.environ.get("SystemDrive", "C:") + "\\"
+    if Path("/mnt/c/Users").exists():
+        return "/mnt/c"
+    return "/"
+
+
+def disk(path: str | None = None) -> dict:
+    """Disk space in bytes for the system drive: {"total", "used", "free", "percent"}."""
+    usage = shutil.disk_usage(path or system_drive())
+    used = usage.total - usage.free
+    return {"total": usage.total, "used": used, "free": usage.free,
+            "percent": round(used / usage.total * 100) if usage.total else 0}
+
+
+def _process_memory_psutil(psutil) -> list[tuple[str, int]]:
+    found = []
+    for proc in psutil.process_iter(["name", "memory_info"]):
+        info = proc.info
+        if info.get("name") and info.get("memory_info"):
+            found.append((info["name"], info["memory_info"].rss))
+    return found
+
+
+def _process_memory_proc() -> list[tuple[str, int]]:
+    found = []
+    for status in _PROC.glob("[0-9]*/status"):
+        try:
+            name, rss = None, 0
+            for line in status.read_text().splitlines():
+                if line.startswith("Name:"):
+                    name = line.split(None, 1)[1].strip()
+                elif line.startswith("VmRSS:"):
+                    rss = int(line.split()[1]) * 1024
+                    break
+        except (OSError, ValueError, IndexError):
+            continue  # the process exited while we were reading it
+        if name and rss:
+            found.append((name, rss))
+    return found
+
+
+def top_processes(limit: int = 5) -> list[dict]:
+    """The programs using the most memory, grouped by program name.
+
+    Returns [{"name", "rss", "count"}] largest first; "chrome.exe" is
+    reported as "chrome", matching what PowerShell's Get-Process showed.
+    """
+    psutil = _psutil()
+    if psutil is not None:
+        found = _process_memory_psutil(psutil)
+    elif _PROC.exists():
+        found = _process_memory_proc()
+    else:
+        raise ProbeUnavailable("processes")
+
+    programs = {}
+    for name, rss in found:
+        if name.lower().endswith(".exe"):
+            name = name[:-4]
+        entry = programs.setdefault(name, {"name": name, "rss": 0, "count": 0})
+        entry["rss"] += rss
+        entry["count"] += 1
+    return sorted(programs.values(), key=lambda p: p["rss"], reverse=True)[:limit]
+
+
+def connectivity(targets: list[tuple[str, int]] | None = None,
+                 timeout: float = CONNECT_TIMEOUT) -> dict:
+    """Can we reach the internet? {"connected", "latency_ms"}.
+
+    connected means a TCP connection to a well-known public address
+    succeeded (ICMP ping is often blocked; these ports almost never are).
+    """
+    for host, port in targets or CONNECT_TARGETS:
+        start = time.monotonic()
+        try:
+            with socket.create_connection((host, port), timeout=timeout):
+                return {"connected": True,
+                        "latency_ms": round((time.monotonic() - start) * 1000)}
+        except OSError:
+            continue
+    return {"connected": False, "latency_ms": None}
+
+
+def dns_resolves(host: str = DNS_TEST_HOST) -> bool:
+    """Can we look up website names? Reachable-but-no-DNS is the "WiFi
+    works but no website loads" case."""
+    try:
+        socket.getaddrinfo(host, 443)
+        return True
+    except OSError:
+        return False
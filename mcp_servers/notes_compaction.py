@@ -0,0 +1,314 @@
+"""notes_compaction.py -- Keep append-only note files small and current.
+
+save_note only ever appends, so preferences.md and contacts.md grow
+forever and collect repeats and contradictions ("Doctor is Dr. Johnson"
+... later "Doctor is Dr. Patel"). Session files pile up one per day. This
+module compacts the notes:
+
+- inside each live note, a fact that appears again later is dropped, and
+  so is an older fact whose every attribute a newer line restates
+  ("Doctor: Dr. Johnson" -> "My doctor is Dr. Patel"). An attribute is a
+  subject with a short value ("Doctor: ...", "Sarah = daughter") or a
+  labelled field of it ("Sarah: ..., phone 555-0100"). A longer
+  description ("Sarah: visiting Sunday to fix the printer") states no
+  attribute, so it never replaces anything and is only dropped as an exact
+  repeat. A generic label such as "Phone:" or "Birthday:" on its own line
+  belongs to the person above it (the line or heading); with no person it
+  never replaces anything;
+- the oldest entries move out until the file is under MAX_LIVE_BYTES;
+- session files older than SESSION_MAX_AGE_DAYS (beyond the newest
+  KEEP_SESSIONS) roll into one archive/sessions-YYYY-MM.md per month.
+
+Nothing is thrown away. Removed lines and rolled sessions are appended to
+monthly files in archive/, which search_notes still searches. Every write
+goes to a temp file that is renamed over the original, and archives are
+written before the live file changes. A crash can leave a line in both
+places, but never a half-written note. A note that isn't valid UTF-8
+(typed in another program, say) is left exactly as it is: compaction
+skips it rather than rewrite it with replacement characters.
+
+Author: Gregory E. Schwartz
+Event:  Anthropic's Built with Opus 4.6: a Claude Code Hackathon
+Date:   February 2026
+"""
+import os
+import re
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from mcp_servers.notes_index import ARCHIVE_DIR, split_entries
+
+MAX_LIVE_BYTES = 16 * 1024
+KEEP_SESSIONS = 3
+SESSION_MAX_AGE_DAYS = 30
+RUN_EVERY = 24 * 3600               # seconds between automatic runs
+MARKER = ".last-compaction"
+MAX_VALUE_WORDS = 5                 # longer than this, a value is a description, not an attribute
+
+# "Doctor: Dr. Patel", "Sarah = daughter", "My doctor is Dr. Patel"
+_SUBJECT = re.compile(r"^(?P<subject>[\w'’ ]{2,40}?)\s*(?P<sep>:|=|\bis\b|\bare\b)\s*(?P<rest>\S)", re.IGNORECASE)
+
+# Labels that describe a person rather than name a subject: "Phone: ..." under
+# Dr. Patel and "Phone: ..." under Sarah are different facts
+FIELD_LABELS = {"phone", "cell", "mobile", "home", "work", "office", "fax", "email", "address",
+                "birthday", "bday", "anniversary", "age", "number", "website", "notes", "note"}
+
+
+def atomic_write(path: Path, text: str | bytes):
+    """Replace a file's contents in one step (temp file + fsync + rename)."""
+    tmp = path.with_name(f".{path.name}.tmp")
+    binary = isinstance(text, bytes)
+    with open(tmp, "wb" if binary else "w", encoding=None if binary else "utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _append_archive(path: Path, data: bytes):
+    """Add bytes to an archive as they are; nothing already there is decoded."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    existing = path.read_bytes() if path.exists() else b""
+    atomic_write(path, existing + data)
+
+
+def _key(line: str) -> str:
+    return re.sub(r"[^\w]+", " ", line.lower()).strip()
+
+
+def _match(line: str):
+    return _SUBJECT.match(line.strip().lstrip("-*•").strip())
+
+
+def subject(line: str) -> str | None:
+    """What a fact is about, if it reads like "X: ...", "X = ..." or "My X is ...".
+
+    A one-word "X is ..." only counts when a name follows ("Doctor is Dr.
+    Patel", "Plumber is Joe"), so "Sarah is my daughter" and "Sarah is
+    visiting Sunday" don't replace each other.
+    """
+    match = _match(line)
+    if not match:
+        return None
+    words = match.group("subject").lower().replace("’", "'").split()
+    one_word = len(words) < 2 and match.group("sep").lower() in ("is", "are")
+    if one_word and not match.group("rest").isupper():
+        return None
+    if words and words[0] == "my":
+        words = words[1:]
+    return " ".join(words) or None
+
+
+def attributes(line: str) -> set:
+    """The attributes a "subject: value" line states; None marks a description.
+
+    Each comma- or semicolon-separated part of the value is either a
+    labelled field ("phone 555-0100" -> "sarah: phone"), a short value
+    (the subject itself) or a description longer than MAX_VALUE_WORDS.
+    """
+    about = subject(line)
+    if not about:
+        return set()
+    match = _match(line)
+    found = set()
+    for part in re.split(r"[,;]", match.string[match.start("rest"):]):
+        words = part.split()
+        if not words:
+            continue
+        label = words[0].lower().rstrip(":")
+        if label in FIELD_LABELS and len(words) > 1:
+            found.add(f"{about}: {label}")
+        elif len(words) <= MAX_VALUE_WORDS:
+            found.add(about)
+        else:
+            found.add(None)
+    return found
+
+
+def _facts(lines: list[str]) -> list[dict]:
+    """{"key", "subject", "attributes", "label", "person"} for each line of an entry.
+
+    A field label ("label": True) belongs to the person above it: the
+    nearest heading or other fact in the same paragraph, which gets
+    "person": True. The label's attribute and repeat key carry that person,
+    so "Phone: 555-0100" under two people is neither a repeat nor a
+    replacement. A label with no person above it states no attribute.
+    """
+    person, facts = None, []
+    for line in lines:
+        fact = line.strip()
+        info = {"key": _key(fact), "subject": None, "attributes": set(), "label": False, "person": False}
+        if not fact:
+            person = None
+        elif fact.startswith("#"):
+            person = info
+        else:
+            about = subject(fact)
+            if about in FIELD_LABELS:
+                if person:
+                    name = person["subject"] or person["key"]
+                    info.update(key=f"{name}: {info['key']}", subject=f"{name}: {about}",
+                                attributes={f"{name}: {about}"}, label=True)
+                    person["person"] = True
+            else:
+                info.update(subject=about, attributes=attributes(fact))
+                person = info
+        facts.append(info)
+    return facts
+
+
+def _render(entries: list[dict]) -> str:
+    """Entries back in save_note's format (an undated first entry is a header)."""
+    parts = []
+    for i, entry in enumerate(entries):
+        if entry["date"]:
+            parts.append(f"\n---\n_Updated: {entry['date']}_\n\n{entry['text']}\n")
+        elif i == 0:
+            parts.append(f"{entry['text']}\n")
+        else:
+            parts.append(f"\n---\n\n{entry['text']}\n")
+    return "".join(parts)
+
+
+def _archive_block(entries: list[dict], reason: str) -> str:
+    now = datetime.now().strftime("%B %d, %Y at %I:%M %p")
+    lines = [f"\n---\n_Archived: {now} ({reason})_\n"]
+    for entry in entries:
+        lines.append(f"\n_{entry['date'] or 'Undated'}_\n{entry['text']}\n")
+    return "".join(lines)
+
+
+def _archive_path(notes_dir: Path, stem: str, when: float | None = None) -> Path:
+    month = datetime.fromtimestamp(when or time.time()).strftime("%Y-%m")
+    return notes_dir / ARCHIVE_DIR / f"{stem}-{month}.md"
+
+
+def compact_file(path: Path, max_bytes: int = MAX_LIVE_BYTES) -> dict:
+    """Drop repeated and superseded facts, then cap the size; archive what's removed.
+
+    Returns {"dropped_lines", "archived_entries", "before", "after"} (bytes),
+    plus "skipped" when the file isn't UTF-8 and was left untouched.
+    """
+    raw = path.read_bytes()
+    try:
+        text = raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return {"dropped_lines": 0, "archived_entries": 0, "before": len(raw), "after": len(raw),
+                "skipped": "not UTF-8"}
+    entries = split_entries(text)
+
+    # Walk newest to oldest: the first time we meet a fact or attribute, it's current
+    seen_facts, seen_attributes = set(), set()
+    kept_entries, removed = [], []
+    for entry in reversed(entries):
+        kept, dropped = [], []
+        lines = entry["text"].splitlines()
+        labels_kept = False     # a kept field label below needs its person line kept too
+        for line, info in zip(reversed(lines), reversed(_facts(lines))):
+            fact, key, stated = line.strip(), info["key"], info["attributes"]
+            if not fact or fact.startswith("#"):
+                kept.append(line)
+                labels_kept = False
+                continue
+            replaced = bool(stated) and None not in stated and stated <= seen_attributes
+            repeat = key in seen_facts or replaced
+            if info["person"]:
+                repeat, labels_kept = repeat and not labels_kept, False
+            elif info["label"] and not repeat:
+                labels_kept = True
+            if repeat:
+                dropped.append(line)
+                continue
+            seen_facts.add(key)
+            seen_attributes |= stated - {None}
+            kept.append(line)
+        body = "\n".join(reversed(kept)).strip()
+        has_fact = any(l.strip() and not l.strip().startswith("#") for l in kept)
+        # An entry left with only a heading goes too, unless it never had facts
+        if body and (has_fact or not dropped):
+            kept_entries.append({"date": entry["date"], "text": body})
+        if dropped:
+            removed.append({"date": entry["date"], "text": "\n".join(reversed(dropped))})
+    kept_entries.reverse()
+    removed.reverse()
+    dropped_lines = sum(len(r["text"].splitlines()) for r in removed)
+
+    # Still too big: move the oldest dated entries out
+    overflow = []
+    while len(_render(kept_entries).encode("utf-8")) > max_bytes:
+        oldest = next((i for i, e in enumerate(kept_entries) if e["date"]), None)
+        if oldest is None or len(kept_entries) == 1:
+            break
+        overflow.append(kept_entries.pop(oldest))
+
+    result = {"dropped_lines": dropped_lines, "archived_entries": len(overflow),
+              "before": len(text.encode("utf-8")), "after": None}
+    if not removed and not overflow:
+        result["after"] = result["before"]
+        return result
+
+    archive = _archive_path(path.parent, path.stem)
+    block = ""
+    if removed:
+        block += _archive_block(removed, "repeated or replaced by a newer note")
+    if overflow:
+        block += _archive_block(overflow, "older entries moved out to keep the note short")
+    _append_archive(archive, block.encode("utf-8"))
+
+    compacted = _render(kept_entries)
+    atomic_write(path, compacted)
+    result["after"] = len(compacted.encode("utf-8"))
+    return result
+
+
+def roll_sessions(notes_dir: Path, keep: int = KEEP_SESSIONS,
+                  max_age_days: float = SESSION_MAX_AGE_DAYS) -> list[str]:
+    """Move old session-*.md files into monthly archives; returns the names moved."""
+    sessions = sorted(notes_dir.glob("session-*.md"), key=lambda f: f.stat().st_mtime, reverse=True)
+    cutoff = time.time() - max_age_days * 86400
+    moved = []
+    for path in sessions[keep:]:
+        mtime = path.stat().st_mtime
+        if mtime >= cutoff:
+            continue
+        header = f"\n\n## {path.stem}\n\n".encode("utf-8")
+        _append_archive(_archive_path(notes_dir, "sessions", mtime), header + path.read_bytes().strip() + b"\n")
+        path.unlink()
+        moved.append(path.name)
+    return moved
+
+
+def compact_all(notes_dir: Path, max_bytes: int = MAX_LIVE_BYTES) -> dict:
+    """Compact every live note and roll old sessions. Returns what changed."""
+    summary = {"compacted": {}, "sessions_archived": []}
+    if not notes_dir.exists():
+        return summary
+    summary["sessions_archived"] = roll_sessions(notes_dir)
+    for path in sorted(notes_dir.glob("*.md")):
+        if path.name.startswith("session-"):
+            continue
+        result = compact_file(path, max_bytes)
+        if result["after"] != result["before"]:
+            summary["compacted"][path.name] = result
+    (notes_dir / MARKER).touch()
+    if summary["compacted"] or summary["sessions_archived"]:
+        print(f"[TechBuddy] Compacted notes: {len(summary['compacted'])} file(s), "
+              f"{len(summary['sessions_archived'])} old session(s) archived", file=sys.stderr, flush=True)
+    return summary
+
+
+def run_if_due(notes_dir: Path) -> dict | None:
+    """compact_all at most once per RUN_EVERY seconds (None if not due yet)."""
+    marker = notes_dir / MARKER
+    try:
+        if time.time() - marker.stat().st_mtime < RUN_EVERY:
+            return None
+    except OSError:
+        pass
+    try:
+        return compact_all(notes_dir)
+    except Exception as e:   # housekeeping must never break the tool that triggered it
+        print(f"[TechBuddy] Note compaction skipped: {e}", file=sys.stderr, flush=True)
+        return None
@@ -0,0 +1,209 @@
+"""notes_index.py -- Ranked full-text search over TechBuddy Notes.
+
+save_note appends entries separated by "---" lines, and read_notes and
+recall_user_context cut every file off at 2000-3000 characters. Once
+preferences.md gets long, facts like "my doctor is Dr. Patel" fall past
+that cutoff. This module keeps an in-memory inverted index of note entries
+and ranks them with BM25, so search_notes returns the handful of entries
+that match and recall stays small however big the notes get.
+
+The index is incremental:
+
+- add_entry() indexes the entry save_note just appended, without
+  re-reading the file;
+- refresh() stats the .md files (and the monthly archives under
+  archive/) and re-parses only files whose size or mtime changed (edited
+  by hand, by the family, or by compaction).
+
+Pure Python (no SQLite FTS5), because not every Python build's sqlite3
+ships FTS5.
+
+Author: Gregory E. Schwartz
+Event:  Anthropic's Built with Opus 4.6: a Claude Code Hackathon
+Date:   February 2026
+"""
+import math
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+
+ARCHIVE_DIR = "archive"      # monthly archives written by notes_compaction
+ENTRY_SEPARATOR = re.compile(r"\n---[ \t]*\n")
+UPDATED_LINE = re.compile(r"^_Updated: (?P<date>.+?)_\s*$", re.MULTILINE)
+WORD = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+# BM25 parameters (the usual defaults)
+K1 = 1.2
+B = 0.75
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by do does for from had has have he her his i if in "
+    "into is it its me my of on or our she so than that the their them they this to "
+    "was we were what when where which who will with you your".split()
+)
+
+_lock = threading.Lock()
+_index = {
+    "dir": None,
+    "files": {},       # file name -> {"stat": (size, mtime_ns), "docs": [doc ids]}
+    "docs": {},        # doc id -> {"file", "date", "text", "length", "terms": Counter}
+    "postings": {},    # term -> {doc id: term frequency}
+    "total_length": 0,
+    "next_id": 0,
+}
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase words minus stopwords, with possessives and plural -s trimmed."""
+    terms = []
+    for word in WORD.findall(text.lower()):
+        if word.endswith("'s"):
+            word = word[:-2]
+        elif len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        if word and word not in STOPWORDS:
+            terms.append(word)
+    return terms
+
+
+def split_entries(text: str) -> list[dict]:
+    """Split a note file into entries: [{"date", "text"}] in file order.
+
+    Text before the first separator (a hand-written header) is an entry too.
+    """
+    entries = []
+    for chunk in ENTRY_SEPARATOR.split("\n" + text):
+        match = UPDATED_LINE.search(chunk)
+        date = match.group("date") if match else ""
+        body = UPDATED_LINE.sub("", chunk).strip()
+        if body:
+            entries.append({"date": date, "text": body})
+    return entries
+
+
+def _stat(path: Path) -> tuple[int, int]:
+    st = path.stat()
+    return st.st_size, st.st_mtime_ns
+
+
+def _add_doc(file_name: str, entry: dict) -> int:
+    doc_id = _index["next_id"]
+    _index["next_id"] += 1
+    terms = Counter(tokenize(entry["text"]))
+    length = sum(terms.values())
+    _index["docs"][doc_id] = {"file": file_name, "date": entry["date"], "text": entry["text"],
+                              "length": length, "terms": terms}
+    _index["total_length"] += length
+    for term, tf in terms.items():
+        _index["postings"].setdefault(term, {})[doc_id] = tf
+    return doc_id
+
+
+def _drop_file(file_name: str):
+    record = _index["files"].pop(file_name, None)
+    if record is None:
+        return
+    for doc_id in record["docs"]:
+        doc = _index["docs"].pop(doc_id)
+        _index["total_length"] -= doc["length"]
+        for term in doc["terms"]:
+            postings = _index["postings"][term]
+            del postings[doc_id]
+            if not postings:
+                del _index["postings"][term]
+
+
+def _index_file(path: Path, name: str):
+    _drop_file(name)
+    try:
+        stat = _stat(path)
+        text = path.read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        return
+    docs = [_add_doc(name, entry) for entry in split_entries(text)]
+    _index["files"][name] = {"stat": stat, "docs": docs}
+
+
+def _use_dir(notes_dir: Path):
+    if _index["dir"] != notes_dir:
+        _index.update(dir=notes_dir, files={}, docs={}, postings={}, total_length=0)
+
+
+def refresh(notes_dir: Path) -> int:
+    """Bring the index up to date with the .md files; returns files re-read."""
+    notes_dir = Path(notes_dir)
+    with _lock:
+        _use_dir(notes_dir)
+        current = {}
+        if notes_dir.exists():
+            for path in [*notes_dir.glob("*.md"), *notes_dir.glob(f"{ARCHIVE_DIR}/*.md")]:
+                try:
+                    current[path.relative_to(notes_dir).as_posix()] = (path, _stat(path))
+                except OSError:
+                    continue
+        for name in list(_index["files"]):
+            if name not in current:
+                _drop_file(name)
+        changed = 0
+        for name, (path, stat) in current.items():
+            record = _index["files"].get(name)
+            if record is None or record["stat"] != stat:
+                _index_file(path, name)
+                changed += 1
+        return changed
+
+
+def add_entry(notes_dir: Path, path: Path, previous_size: int, date: str, text: str):
+    """Index an entry that was just appended to `path`.
+
+    previous_size is the file's size before the append (0 for a new file).
+    If that doesn't match what the index last saw, the file changed some
+    other way too, and the whole file is re-read instead.
+    """
+    with _lock:
+        _use_dir(Path(notes_dir))
+        record = _index["files"].get(path.name)
+        if record is None or record["stat"][0] != previous_size:
+            _index_file(path, path.name)
+            return
+        try:
+            record["stat"] = _stat(path)
+        except OSError:
+            return
+        record["docs"].append(_add_doc(path.name, {"date": date, "text": text.strip()}))
+
+
+def search(notes_dir: Path, query: str, limit: int = 5) -> list[dict]:
+    """Best-matching note entries for a query, highest score first.
+
+    Returns [{"file", "date", "text", "score"}]; empty if nothing matches.
+    """
+    refresh(notes_dir)
+    terms = set(tokenize(query))
+    with _lock:
+        n_docs = len(_index["docs"])
+        if not n_docs or not terms:
+            return []
+        avg_length = _index["total_length"] / n_docs or 1
+        scores = Counter()
+        for term in terms:
+            postings = _index["postings"].get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings.items():
+                length = _index["docs"][doc_id]["length"]
+                scores[doc_id] += idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / avg_length))
+        # Later entries win ties: the newest version of a fact comes first
+        ranked = sorted(scores.items(), key=lambda item: (item[1], item[0]), reverse=True)[:limit]
+        return [{"file": _index["docs"][doc_id]["file"], "date": _index["docs"][doc_id]["date"],
+                 "text": _index["docs"][doc_id]["text"], "score": round(score, 3)}
+                for doc_id, score in ranked]
+
+
+def stats() -> dict:
+    """Sizes of the current index (files, entries, distinct terms)."""
+    with _lock:
+        return {"files": len(_index["files"]), "entries": len(_index["docs"]),
+                "terms": len(_index["postings"])}
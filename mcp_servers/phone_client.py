@@ -0,0 +1,225 @@
+"""phone_client.py -- Pooled HTTP client for the iPhone screenshot server.
+
+The phone tools used to open a fresh urllib connection (a new TLS
+handshake through the Cloudflare Tunnel) for every screenshot, tap, and
+app launch, and screenshots arrived as base64 PNG inside JSON. This client:
+
+- keeps idle HTTP/1.1 connections per server and reuses them (keep-alive),
+  skipping any the server has already closed. If a reused connection
+  still fails, the request is retried on a fresh one only when that is
+  safe: a GET (or launch, which is harmless twice), or a request that
+  never went out. A tap that may have reached the phone is not resent;
+- asks for a binary image (Accept: image/png, image/jpeg) and still
+  understands the original {"image": "<base64>"} JSON reply;
+- downscales and recompresses screenshots on arrival with screen_capture,
+  remembering the scale so taps in screenshot coordinates land in the
+  right place on the phone;
+- sends tap+capture as one request ({"capture": true}) and falls back to
+  a separate GET /screenshot for servers that don't support it.
+
+Stdlib only (http.client), like the urllib code it replaces.
+
+Author: Gregory E. Schwartz
+Event:  Anthropic's Built with Opus 4.6: a Claude Code Hackathon
+Date:   February 2026
+"""
+import base64
+import http.client
+import io
+import json
+import os
+import select
+import threading
+from urllib.parse import urlsplit
+
+from mcp_servers.screen_capture import encode_image
+
+PHONE_SCREEN_TIER = os.environ.get("PHONE_SCREEN_TIER", "balanced")
+MAX_IDLE_CONNECTIONS = 4
+IMAGE_ACCEPT = "image/png, image/jpeg;q=0.9, application/json;q=0.5"
+
+# Errors that mean a kept-alive connection went stale before we used it
+_STALE_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+_idle = {}                # base_url -> [idle connections]
+_idle_lock = threading.Lock()
+stats = {"connections_opened": 0, "requests": 0}
+
+# Phone pixels per screenshot pixel for the last screenshot we sent to Claude
+_display = {"scale": 1.0}
+
+
+class PhoneServerError(Exception):
+    """The phone server answered with an HTTP error status."""
+
+
+def _open_connection(base_url: str, timeout: float):
+    parts = urlsplit(base_url)
+    cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    stats["connections_opened"] += 1
+    return cls(parts.hostname, parts.port, timeout=timeout)
+
+
+def _checkout(base_url: str, timeout: float):
+    """An idle pooled connection (reused=True) or a new one."""
+    with _idle_lock:
+        pool = _idle.get(base_url, [])
+        while pool:
+            conn = pool.pop()
+            conn.timeout = timeout
+            try:
+                if conn.sock is not None:
+                    # Readable while idle means the server closed it (or sent junk)
+                    if select.select([conn.sock], [], [], 0)[0]:
+                        conn.close()
+                        continue
+                    conn.sock.settimeout(timeout)
+            except (OSError, ValueError):
+                conn.close()
+                continue
+            return conn, True
+    return _open_connection(base_url, timeout), False
+
+
+def _checkin(base_url: str, conn):
+    with _idle_lock:
+        pool = _idle.setdefault(base_url, [])
+        if len(pool) < MAX_IDLE_CONNECTIONS:
+            pool.append(conn)
+            return
+    conn.close()
+
+
+def close_all():
+    """Close every pooled connection (tests, server shutdown, URL change)."""
+    with _idle_lock:
+        for pool in _idle.values():
+            for conn in pool:
+                conn.close()
+        _idle.clear()
+
+
+def request(base_url: str, method: str, path: str, payload: dict | None = None,
+            accept: str = "application/json", timeout: float = 30,
+            idempotent: bool | None = None) -> tuple[str, bytes]:
+    """Send one request over a pooled connection.
+
+    Args:
+        idempotent: safe to send twice (default: only GET). If not, a
+                    dropped connection is retried only when the request
+                    never went out, so the phone can't act on it twice.
+
+    Returns (content_type, body). Raises PhoneServerError on HTTP errors and
+    OSError/http.client errors if the server can't be reached.
+    """
+    if idempotent is None:
+        idempotent = method == "GET"
+    full_path = urlsplit(base_url).path.rstrip("/") + path
+    headers = {"Accept": accept, "Connection": "keep-alive"}
+    body = None
+    if payload is not None:
+        body = json.dumps(payload).encode()
+        headers["Content-Type"] = "application/json"
+
+    conn, reused = _checkout(base_url, timeout)
+    while True:
+        sent = False
+        try:
+            conn.request(method, full_path, body=body, headers=headers)
+            sent = True
+            resp = conn.getresponse()
+            data = resp.read()
+            break
+        except _STALE_ERRORS:
+            conn.close()
+            if not reused or (sent and not idempotent):
+                raise
+            # The server closed an idle keep-alive connection; retry once fresh
+            conn, reused = _open_connection(base_url, timeout), False
+        except Exception:
+            conn.close()
+            raise
+
+    stats["requests"] += 1
+    if resp.will_close:
+        conn.close()
+    else:
+        _checkin(base_url, conn)
+    if resp.status >= 400:
+        raise PhoneServerError(f"{method} {path} -> HTTP {resp.status}")
+    return resp.getheader("Content-Type", ""), data
+
+
+def _image_from_response(content_type: str, data: bytes):
+    """PIL image from a binary image reply or a {"image": base64} JSON reply.
+
+    None if the reply carries no screenshot.
+    """
+    from PIL import Image
+
+    if content_type.startswith("image/"):
+        raw = data
+    else:
+        reply = json.loads(data.decode() or "{}")
+        if not reply.get("image"):
+            return None
+        raw = base64.b64decode(reply["image"])
+    image = Image.open(io.BytesIO(raw))
+    image.load()
+    return image
+
+
+def prepare_screenshot(image, tier: str | None = None) -> dict:
+    """Downscale/recompress a phone screenshot and remember its scale."""
+    encoded = encode_image(image, tier or PHONE_SCREEN_TIER)
+    _display["scale"] = image.width / encoded["width"]
+    encoded["device_size"] = image.size
+    return encoded
+
+
+def to_device(x: int, y: int) -> tuple[int, int]:
+    """Map a point in the last screenshot sent to Claude onto the phone."""
+    scale = _display["scale"]
+    return round(x * scale), round(y * scale)
+
+
+def fetch_screenshot(base_url: str, tier: str | None = None) -> dict:
+    """GET /screenshot and return the encode_image result for it."""
+    content_type, data = request(base_url, "GET", "/screenshot", accept=IMAGE_ACCEPT)
+    image = _image_from_response(content_type, data)
+    if image is None:
+        raise PhoneServerError("screenshot reply had no image")
+    return prepare_screenshot(image, tier)
+
+
+def tap(base_url: str, x: int, y: int, capture: bool = False, tier: str | None = None) -> dict | None:
+    """Tap at screenshot coordinates (x, y); optionally return the new screen.
+
+    With capture=True the tap and the screenshot share one request when the
+    server supports it, and take two otherwise.
+    """
+    device_x, device_y = to_device(x, y)
+    payload = {"x": device_x, "y": device_y}
+    if capture:
+        payload["capture"] = True
+    content_type, data = request(base_url, "POST", "/tap", payload,
+                                 accept=IMAGE_ACCEPT if capture else "application/json", timeout=15)
+    if not capture:
+        return None
+    image = _image_from_response(content_type, data)
+    if image is None:
+        return fetch_screenshot(base_url, tier)
+    return prepare_screenshot(image, tier)
+
+
+def launch(base_url: str, app_name: str) -> dict:
+    """POST /launch and return the server's JSON reply."""
+    # Opening an app that's already open changes nothing, so a retry is safe
+    _, data = request(base_url, "POST", "/launch", {"app": app_name.lower()}, timeout=15,
+                      idempotent=True)
+    return json.loads(data.decode())
@@ -0,0 +1,208 @@
+"""powershell_host.py -- One long-lived PowerShell process for diagnostics.
+
+Every _run_powershell call used to start a fresh `powershell -NoProfile`
+process, and PowerShell startup alone is 300 ms to 1 s.
+check_system_health ran three of them in a row, printer troubleshooting
+three more, and fix_frozen_program two.
+
+This module keeps warm PowerShell workers (started on first use, up to
+MAX_WORKERS so concurrent diagnostics don't queue behind each other) and
+sends them scripts over a line-based JSON protocol:
+
+    stdin:  {"id": 7, "script": "Get-PSDrive C | ConvertTo-Json"}
+    stdout: {"id": 7, "ok": true, "stdout": "...", "error": ""}
+
+Each script runs in a worker's warm runspace. If a script outlives its
+timeout, that worker is killed and a later call starts a new one. If a
+worker dies mid-request, it is replaced and the script retried once.
+
+Author: Gregory E. Schwartz
+Event:  Anthropic's Built with Opus 4.6: a Claude Code Hackathon
+Date:   February 2026
+"""
+import atexit
+import base64
+import itertools
+import json
+import queue
+import subprocess
+import threading
+
+# The worker loop. Scripts run as script blocks so variables from one
+# request don't leak into the next; error records are dropped just as the
+# old one-shot calls ignored stderr.
+WORKER_SCRIPT = r"""
+$ProgressPreference = 'SilentlyContinue'
+[Console]::InputEncoding = [Text.Encoding]::UTF8
+[Console]::OutputEncoding = [Text.Encoding]::UTF8
+while ($true) {
+    $line = [Console]::In.ReadLine()
+    if ($line -eq $null) { break }
+    $req = $line | ConvertFrom-Json
+    $ok = $true
+    $err = ''
+    try {
+        $out = & ([ScriptBlock]::Create($req.script)) 2>$null | Out-String -Width 4096
+    } catch {
+        $ok = $false
+        $out = ''
+        $err = $_.Exception.Message
+    }
+    $resp = @{ id = $req.id; ok = $ok; stdout = $out; error = $err } | ConvertTo-Json -Compress
+    [Console]::Out.WriteLine($resp)
+    [Console]::Out.Flush()
+}
+"""
+
+MAX_WORKERS = 3
+
+_ids = itertools.count(1)
+_idle = []                      # warm workers waiting for a script
+_checked_out = {"count": 0}     # workers currently running a script
+_cond = threading.Condition()
+stats = {"starts": 0, "requests": 0, "timeouts": 0}
+
+
+class PowerShellError(Exception):
+    """The worker couldn't run the script (crashed, timed out, or threw)."""
+
+
+def worker_command() -> list[str]:
+    """Command line that starts the worker loop."""
+    encoded = base64.b64encode(WORKER_SCRIPT.encode("utf-16-le")).decode("ascii")
+    return ["powershell", "-NoProfile", "-NonInteractive", "-NoLogo",
+            "-ExecutionPolicy", "Bypass", "-EncodedCommand", encoded]
+
+
+def _pump(stream, lines: queue.Queue):
+    """Reader thread: forward worker stdout lines; None marks end of stream."""
+    for line in stream:
+        lines.put(line)
+    lines.put(None)
+
+
+def _start() -> dict:
+    proc = subprocess.Popen(
+        worker_command(),
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        text=True, encoding="utf-8", bufsize=1,
+        creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+    )
+    lines = queue.Queue()
+    threading.Thread(target=_pump, args=(proc.stdout, lines), daemon=True).start()
+    with _cond:
+        stats["starts"] += 1
+    return {"proc": proc, "lines": lines}
+
+
+def _usable(worker: dict) -> bool:
+    # poll() can still say "running" just after the pipe hit EOF, so workers
+    # that died mid-request are also flagged explicitly
+    return not worker.get("dead") and worker["proc"].poll() is None
+
+
+def _stop(worker: dict):
+    proc = worker["proc"]
+    if proc.poll() is None:
+        try:
+            proc.stdin.close()
+            proc.wait(timeout=2)
+        except Exception:
+            proc.kill()
+
+
+def _checkout() -> dict:
+    """A warm idle worker, or a new one if fewer than MAX_WORKERS exist."""
+    with _cond:
+        while True:
+            while _idle:
+                worker = _idle.pop()
+                if _usable(worker):
+                    _checked_out["count"] += 1
+                    return worker
+            if _checked_out["count"] < MAX_WORKERS:
+                _checked_out["count"] += 1
+                break
+            _cond.wait()
+    try:
+        return _start()
+    except Exception:
+        _checkin(None)
+        raise
+
+
+def _checkin(worker: dict | None):
+    with _cond:
+        _checked_out["count"] -= 1
+        if worker is not None and _usable(worker):
+            _idle.append(worker)
+        _cond.notify()
+
+
+def shutdown():
+    """Stop the idle workers (new ones start on the next request)."""
+    with _cond:
+        workers = list(_idle)
+        _idle.clear()
+    for worker in workers:
+        _stop(worker)
+
+
+atexit.register(shutdown)
+
+
+def _exchange(worker: dict, script: str, timeout: float) -> dict | None:
+    """Send one request; the reply dict, or None if the worker died first."""
+    request_id = next(_ids)
+    try:
+        worker["proc"].stdin.write(json.dumps({"id": request_id, "script": script}) + "\n")
+        worker["proc"].stdin.flush()
+    except (BrokenPipeError, OSError):
+        worker["dead"] = True
+        return None
+
+    while True:
+        try:
+            line = worker["lines"].get(timeout=timeout)
+        except queue.Empty:
+            worker["dead"] = True
+            worker["proc"].kill()
+            with _cond:
+                stats["timeouts"] += 1
+            raise PowerShellError(f"script timed out after {timeout}s")
+        if line is None:
+            worker["dead"] = True
+            return None
+        try:
+            reply = json.loads(line)
+        except json.JSONDecodeError:
+            continue  # stray output from a native command; not ours
+        if reply.get("id") == request_id:
+            return reply
+
+
+def run(script: str, timeout: float = 15) -> str:
+    """Run a script in a warm worker and return its output (stripped).
+
+    Safe to call from several threads; each call gets its own worker.
+    Raises PowerShellError on timeout, a terminating error, or a worker
+    that crashes twice; FileNotFoundError if PowerShell isn't installed.
+    """
+    worker = _checkout()
+    try:
+        reply = _exchange(worker, script, timeout)
+        if reply is None:
+            # Crashed mid-request — retry once on a new worker
+            _stop(worker)
+            worker = _start()
+            reply = _exchange(worker, script, timeout)
+        if reply is None:
+            raise PowerShellError("PowerShell worker exited unexpectedly")
+    finally:
+        _checkin(worker)
+
+    with _cond:
+        stats["requests"] += 1
+    if not reply.get("ok"):
+        raise PowerShellError(reply.get("error") or "script failed")
+    return (reply.get("stdout") or "").strip()
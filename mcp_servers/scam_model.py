@@ -0,0 +1,273 @@
+"""scam_model.py -- Weighted, explainable scam scoring for Scam Shield.
+
+Two stages, both local and fast:
+
+1. Rule score: each keyword flag from _scan_for_scam adds its category
+   weight (FEATURE_WEIGHTS). The total decides SAFE / SUSPICIOUS / DANGEROUS
+   and every point can be traced back to the phrase that earned it.
+2. Classifier: a small logistic regression over hashed word n-grams plus
+   the rule score, trained from a labeled corpus (data/scam_corpus.jsonl).
+   Its probability picks the escalation band — only the ambiguous middle
+   band is worth an Opus call in analyze_scam_risk.
+
+SGD on 80 rows fits the corpus almost perfectly, so its raw scores are
+overconfident. The probability is therefore Platt-scaled: the corpus is
+split into CALIBRATION_FOLDS folds, each fold is scored by a model
+trained on the others, and a sigmoid fitted to those held-out scores maps
+the final model's score to a probability. LOW_BAND and HIGH_BAND apply to
+that calibrated probability; tests check it on the separate held-out set
+in benchmarks/data/scam_eval.jsonl (Brier score and per-band scam rates).
+
+Pure Python (no NumPy): the corpus is small and training, including the
+calibration folds, takes well under a second on first use.
+
+Author: Gregory E. Schwartz
+Event:  Anthropic's Built with Opus 4.6: a Claude Code Hackathon
+Date:   February 2026
+"""
+import json
+import math
+import random
+import re
+import zlib
+from pathlib import Path
+
+CORPUS_PATH = Path(__file__).resolve().parent / "data" / "scam_corpus.jsonl"
+
+# Points per keyword flag. A single financial or tech-support hit reaches
+# DANGER_SCORE on its own; softer signals need to pile up.
+FEATURE_WEIGHTS = {
+    "urgency": 1.0,
+    "authority": 1.0,
+    "financial": 3.0,
+    "tech_support": 3.0,
+    "grandparent": 1.5,
+    "shortened_url": 1.0,
+    "suspicious_tld": 1.0,
+}
+DANGER_SCORE = 3.0
+
+# Classifier probability bands — below LOW or above HIGH we trust the local
+# verdict; in between, ask Opus.
+LOW_BAND = 0.2
+HIGH_BAND = 0.9
+
+CALIBRATION_FOLDS = 5
+
+_N_FEATURES = 2 ** 14
+_TOKEN_RE = re.compile(r"[a-z0-9$']+")
+
+_model = None
+
+
+def rule_score(flags: list[tuple[str, str]]) -> tuple[float, list[tuple[str, float]]]:
+    """Sum category weights for keyword flags.
+
+    Returns (total, [("category: phrase", points), ...]).
+    """
+    contributions = [(f"{cat}: {phrase}", FEATURE_WEIGHTS.get(cat, 1.0)) for cat, phrase in flags]
+    return sum(points for _, points in contributions), contributions
+
+
+def _ngrams(text: str) -> list[str]:
+    words = _TOKEN_RE.findall(text.lower())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def _hash(gram: str) -> int:
+    return zlib.crc32(gram.encode("utf-8")) % _N_FEATURES
+
+
+def _features(text: str) -> dict[int, float]:
+    """Binary hashed n-grams, L2-normalized so long emails don't dominate."""
+    idx = {_hash(g) for g in _ngrams(text)}
+    if not idx:
+        return {}
+    norm = 1.0 / math.sqrt(len(idx))
+    return {i: norm for i in idx}
+
+
+def _sigmoid(z: float) -> float:
+    if z < -30:
+        return 0.0
+    if z > 30:
+        return 1.0
+    return 1.0 / (1.0 + math.exp(-z))
+
+
+def load_corpus(path: Path = CORPUS_PATH) -> list[dict]:
+    """Read labeled examples: one {"text", "label", "kind"} object per line."""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def train_model(examples: list[tuple[str, float, int]], epochs: int = 40,
+                lr: float = 0.5, l2: float = 1e-3, seed: int = 0) -> dict:
+    """Fit logistic regression by SGD on (text, rule_score, label) triples.
+
+    Deterministic for a given seed, so the same corpus always yields the
+    same weights.
+    """
+    weights = [0.0] * _N_FEATURES
+    bias = 0.0
+    rule_weight = 0.0
+    rows = [(_features(text), score / DANGER_SCORE, label) for text, score, label in examples]
+    rng = random.Random(seed)
+    order = list(range(len(rows)))
+    for _ in range(epochs):
+        rng.shuffle(order)
+        for n in order:
+            feats, rule, label = rows[n]
+            z = bias + rule_weight * rule + sum(weights[i] * v for i, v in feats.items())
+            err = _sigmoid(z) - label
+            bias -= lr * err
+            rule_weight -= lr * (err * rule + l2 * rule_weight)
+            for i, v in feats.items():
+                weights[i] -= lr * (err * v + l2 * weights[i])
+    return {"weights": weights, "bias": bias, "rule_weight": rule_weight}
+
+
+def _score(model: dict, feats: dict[int, float], rule: float) -> float:
+    """Raw (uncalibrated) log-odds for one example."""
+    weights = model["weights"]
+    return model["bias"] + model["rule_weight"] * rule + sum(weights[i] * v for i, v in feats.items())
+
+
+def fit_platt(scores: list[float], labels: list[int], iterations: int = 100) -> tuple[float, float]:
+    """Platt scaling: (a, b) so that sigmoid(a * score + b) is calibrated.
+
+    Newton's method with a backtracking line search on the log loss, using
+    Platt's smoothed targets so a perfectly separated set doesn't push a
+    to infinity.
+    """
+    positives = sum(labels)
+    negatives = len(labels) - positives
+    hi, lo = (positives + 1) / (positives + 2), 1 / (negatives + 2)
+    targets = [hi if y else lo for y in labels]
+
+    def loss(a, b):
+        total = 0.0
+        for s, t in zip(scores, targets):
+            z = a * s + b
+            # log(1 + e^z) - t*z, written to stay finite for large |z|
+            total += max(z, 0.0) + math.log1p(math.exp(-abs(z))) - t * z
+        return total
+
+    a, b = 1.0, 0.0
+    current = loss(a, b)
+    for _ in range(iterations):
+        ga = gb = 0.0
+        haa, hab, hbb = 1e-9, 0.0, 1e-9
+        for s, t in zip(scores, targets):
+            p = _sigmoid(a * s + b)
+            d, w = p - t, p * (1 - p)
+            ga += d * s
+            gb += d
+            haa += w * s * s
+            hab += w * s
+            hbb += w
+        det = haa * hbb - hab * hab
+        step_a = (hbb * ga - hab * gb) / det
+        step_b = (haa * gb - hab * ga) / det
+        size = 1.0
+        while size > 1e-10:
+            trial = loss(a - size * step_a, b - size * step_b)
+            if trial < current:
+                break
+            size /= 2
+        else:
+            break   # no step lowers the loss: converged
+        a, b, current = a - size * step_a, b - size * step_b, trial
+        if abs(size * step_a) + abs(size * step_b) < 1e-9:
+            break
+    return a, b
+
+
+def calibrate(examples: list[tuple[str, float, int]], folds: int = CALIBRATION_FOLDS,
+              seed: int = 0) -> tuple[float, float]:
+    """Platt parameters from out-of-fold scores (each example scored by a model that never saw it)."""
+    rng = random.Random(seed)
+    by_label = {0: [], 1: []}
+    for n, (_, _, label) in enumerate(examples):
+        by_label[label].append(n)
+    fold_of = {}
+    for members in by_label.values():   # stratified: every fold gets both labels
+        rng.shuffle(members)
+        for k, n in enumerate(members):
+            fold_of[n] = k % folds
+    scores, labels = [], []
+    for fold in range(folds):
+        held_out = [n for n in range(len(examples)) if fold_of[n] == fold]
+        model = train_model([examples[n] for n in range(len(examples)) if fold_of[n] != fold], seed=seed)
+        for n in held_out:
+            text, score, label = examples[n]
+            scores.append(_score(model, _features(text), score / DANGER_SCORE))
+            labels.append(label)
+    return fit_platt(scores, labels)
+
+
+def set_model(model: dict | None):
+    """Install a trained model (or None to retrain lazily on next use)."""
+    global _model
+    _model = model
+
+
+def get_model(flagger) -> dict:
+    """Return the classifier, training it from CORPUS_PATH on first use.
+
+    Args:
+        flagger: callable(text) -> flags, used to compute the rule score
+                 for each corpus example (keeps this module free of the
+                 keyword tables in screen_dispatch).
+    """
+    global _model
+    if _model is None:
+        examples = []
+        for row in load_corpus():
+            score, _ = rule_score(flagger(row["text"]))
+            examples.append((row["text"], score, int(row["label"])))
+        model = train_model(examples)
+        model["platt"] = calibrate(examples)
+        _model = model
+    return _model
+
+
+def classify(model: dict, text: str, score: float) -> tuple[float, list[tuple[str, float]]]:
+    """Scam probability for text, plus the n-grams that pushed it the most.
+
+    Calibrated when the model carries Platt parameters (get_model's does).
+    """
+    weights = model["weights"]
+    grams = {}
+    for g in _ngrams(text):
+        grams.setdefault(_hash(g), g)
+    norm = 1.0 / math.sqrt(len(grams)) if grams else 0.0
+    z = model["bias"] + model["rule_weight"] * (score / DANGER_SCORE)
+    terms = []
+    for i, g in grams.items():
+        contribution = weights[i] * norm
+        z += contribution
+        terms.append((g, contribution))
+    terms.sort(key=lambda t: abs(t[1]), reverse=True)
+    a, b = model.get("platt", (1.0, 0.0))
+    return _sigmoid(a * z + b), [(g, round(c, 3)) for g, c in terms[:5]]
+
+
+def band_for(probability: float) -> str:
+    """Map a probability to "low", "ambiguous", or "high"."""
+    if probability < LOW_BAND:
+        return "low"
+    if probability >= HIGH_BAND:
+        return "high"
+    return "ambiguous"
+
+
+def needs_deep_check(scan: dict) -> bool:
+    """True when the local verdict is too uncertain to skip the LLM.
+
+    That is the ambiguous band, or a rule/classifier disagreement (keywords
+    say DANGEROUS but the classifier says low).
+    """
+    if scan["risk"] == "SAFE":
+        return False
+    return scan["band"] == "ambiguous" or (scan["risk"] == "DANGEROUS" and scan["band"] == "low")
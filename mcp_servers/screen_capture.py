@@ -0,0 +1,274 @@
+"""screen_capture.py -- Screenshot capture and encoding for Claude Vision.
+
+read_my_screen used to send a full-screen PNG (optimize=True), which is
+slow to encode on a photo-heavy desktop and easily runs to several MB of
+base64. This module picks the pixels and the format instead:
+
+- Capture: the whole screen, the active window, or an "x,y,width,height"
+  region.
+- Resolution: scaled to a vision-token budget. Claude charges about
+  (width * height) / 750 tokens per image and shrinks anything with a long
+  edge over 1568 px anyway, so extra pixels only cost upload time.
+- Encoding: named tiers (ENCODE_TIERS) trade speed, size, and fidelity.
+  Fast JPEG, WebP, lossless PNG, and a grayscale JPEG tier for text-only
+  checks.
+
+Every encode reports its size and time so tiers can be compared on real
+screens (see benchmarks/screen_encode_bench.py).
+
+Author: Gregory E. Schwartz
+Event:  Anthropic's Built with Opus 4.6: a Claude Code Hackathon
+Date:   February 2026
+"""
+import base64
+import io
+import math
+import os
+import platform
+import time
+
+IS_WINDOWS = platform.system() == "Windows"
+
+# Claude Vision sizing: ~1 token per 750 pixels, long edge capped at 1568 px
+PIXELS_PER_TOKEN = 750
+MAX_LONG_EDGE = 1568
+
+# format: Pillow encoder; quality: lossy quality (None for PNG);
+# max_tokens: pixel budget; grayscale: drop color (fine for reading text)
+ENCODE_TIERS = {
+    "fast": {"format": "JPEG", "quality": 60, "max_tokens": 700, "grayscale": False},
+    "balanced": {"format": "WEBP", "quality": 75, "max_tokens": 1200, "grayscale": False},
+    "detail": {"format": "PNG", "quality": None, "max_tokens": 1600, "grayscale": False},
+    "text": {"format": "JPEG", "quality": 80, "max_tokens": 1200, "grayscale": True},
+}
+DEFAULT_TIER = os.getenv("TECHBUDDY_SCREEN_TIER", "balanced")
+
+MEDIA_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp", "PNG": "image/png"}
+
+
+def fit_to_budget(width: int, height: int, max_tokens: int) -> tuple[int, int]:
+    """Largest size with the same aspect ratio that fits the token budget.
+
+    Never upscales.
+    """
+    scale = min(
+        1.0,
+        MAX_LONG_EDGE / max(width, height),
+        math.sqrt(max_tokens * PIXELS_PER_TOKEN / (width * height)),
+    )
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+def estimate_tokens(width: int, height: int) -> int:
+    """Approximate vision tokens Claude will bill for an image this size."""
+    return math.ceil(width * height / PIXELS_PER_TOKEN)
+
+
+def resolve_tier(tier: str | None) -> str:
+    """Known tier name, falling back to DEFAULT_TIER (then "balanced")."""
+    if tier in ENCODE_TIERS:
+        return tier
+    return DEFAULT_TIER if DEFAULT_TIER in ENCODE_TIERS else "balanced"
+
+
+def encode_image(image, tier: str | None = None) -> dict:
+    """Downscale and encode a PIL image according to an ENCODE_TIERS entry.
+
+    Returns:
+        {"data": base64 str, "media_type", "width", "height", "bytes",
+         "encode_ms", "tokens", "tier"}
+    """
+    tier = resolve_tier(tier)
+    spec = ENCODE_TIERS[tier]
+    start = time.perf_counter()
+
+    size = fit_to_budget(image.width, image.height, spec["max_tokens"])
+    if size != image.size:
+        # reducing_gap lets Pillow shrink by whole factors first — much
+        # faster than a straight resample on a 4K screen
+        image = image.resize(size, reducing_gap=2.0)
+
+    mode = "L" if spec["grayscale"] else "RGB"
+    if image.mode != mode:
+        image = image.convert(mode)
+
+    buffer = io.BytesIO()
+    if spec["format"] == "PNG":
+        image.save(buffer, format="PNG", compress_level=6)
+    elif spec["format"] == "WEBP":
+        image.save(buffer, format="WEBP", quality=spec["quality"], method=2)
+    else:
+        image.save(buffer, format="JPEG", quality=spec["quality"])
+    raw = buffer.getvalue()
+    data = base64.b64encode(raw).decode("utf-8")
+
+    return {
+        "data": data,
+        "media_type": MEDIA_TYPES[spec["format"]],
+        "width": image.width,
+        "height": image.height,
+        "bytes": len(raw),
+        "encode_ms": round((time.perf_counter() - start) * 1000, 1),
+        "tokens": estimate_tokens(image.width, image.height),
+        "tier": tier,
+    }
+
+
+def image_block(encoded: dict) -> dict:
+    """Claude API image content block for an encode_image result."""
+    return {
+        "type": "image",
+        "source": {
+            "type": "base64",
+            "media_type": encoded["media_type"],
+            "data": encoded["data"],
+        },
+    }
+
+
+def active_window_bbox() -> tuple[int, int, int, int] | None:
+    """Screen rectangle (left, top, right, bottom) of the foreground window.
+
+    None off Windows, or if the window is minimized or can't be read.
+    """
+    if not IS_WINDOWS:
+        return None
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        user32 = ctypes.windll.user32
+        hwnd = user32.GetForegroundWindow()
+        if not hwnd or user32.IsIconic(hwnd):
+            return None
+        rect = wintypes.RECT()
+        if not user32.GetWindowRect(hwnd, ctypes.byref(rect)):
+            return None
+        if rect.right - rect.left < 50 or rect.bottom - rect.top < 50:
+            return None
+        return max(rect.left, 0), max(rect.top, 0), rect.right, rect.bottom
+    except Exception:
+        return None
+
+
+def parse_area(area: str | None) -> tuple[int, int, int, int] | None:
+    """Turn an area description into a capture bounding box.
+
+    "screen" (or empty) -> None (whole screen); "window" -> active window;
+    "x,y,width,height" -> that rectangle. Anything unreadable -> None.
+    """
+    area = (area or "screen").strip().lower()
+    if area in ("screen", "full", "all"):
+        return None
+    if area in ("window", "active", "active window"):
+        return active_window_bbox()
+    try:
+        x, y, w, h = (int(float(p)) for p in area.split(","))
+    except ValueError:
+        return None
+    if w <= 0 or h <= 0:
+        return None
+    return x, y, x + w, y + h
+
+
+def grab_screen(bbox: tuple[int, int, int, int] | None = None):
+    """Capture the screen (or a bounding box of it) as a PIL image."""
+    from PIL import ImageGrab
+
+    return ImageGrab.grab(bbox=bbox)
+
+
+# ---------------------------------------------------------------------------
+# Screen-state cache — skip or shrink screenshots when little has changed
+# ---------------------------------------------------------------------------
+
+THUMB_SCALE = 4           # screen pixels per thumbnail pixel, at most: small text and
+                          # checkbox ticks stay visible on 2560- and 3840-wide screens
+TILE_SIZE = 32            # thumbnail pixels per diff tile (128 screen px)
+PIXEL_THRESHOLD = 16      # grayscale difference that counts as a changed pixel
+HASH_CUTOFF = 20          # dHash bits; beyond this, the whole screen changed
+CROP_MAX_FRACTION = 0.5   # send the full screen if the change covers more than this
+FRAME_TTL = 120           # seconds before the cached frame is too old to trust
+
+_last_frame = {}
+
+
+def _thumbnail(image):
+    """Small grayscale copy used for hashing and tile diffs, scaled to the screen width."""
+    width = min(image.width, -(-image.width // THUMB_SCALE))
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), reducing_gap=2.0).convert("L")
+
+
+def frame_hash(thumb) -> int:
+    """64-bit difference hash: is each pixel brighter than its right neighbor?"""
+    pixels = thumb.resize((9, 8)).tobytes()
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            left, right = pixels[row * 9 + col], pixels[row * 9 + col + 1]
+            bits = (bits << 1) | (left > right)
+    return bits
+
+
+def changed_tiles(before, after) -> list[tuple[int, int]]:
+    """(col, row) of every tile with at least one changed pixel."""
+    from PIL import Image, ImageChops
+
+    mask = ImageChops.difference(before, after).point(lambda v: 255 if v > PIXEL_THRESHOLD else 0)
+    cols = -(-mask.width // TILE_SIZE)
+    rows = -(-mask.height // TILE_SIZE)
+    # BOX-resampling to one pixel per tile averages each tile; any changed
+    # pixel leaves a non-zero mean
+    grid = mask.resize((cols, rows), Image.Resampling.BOX)
+    return [(n % cols, n // cols) for n, v in enumerate(grid.tobytes()) if v]
+
+
+def diff_against_last(image) -> dict:
+    """Compare a full-screen capture with the last one and remember it.
+
+    Returns:
+        {"status": "first" | "unchanged" | "region" | "full",
+         "bbox": (left, top, right, bottom) of the change for "region",
+         "age": seconds since the last frame (None for "first")}
+    """
+    last = dict(_last_frame)
+    remember_frame(image)
+    thumb, digest, now = _last_frame["thumb"], _last_frame["hash"], _last_frame["time"]
+
+    if not last or last["size"] != image.size or now - last["time"] > FRAME_TTL:
+        return {"status": "first", "bbox": None, "age": None}
+    age = round(now - last["time"])
+    if bin(last["hash"] ^ digest).count("1") > HASH_CUTOFF:
+        return {"status": "full", "bbox": None, "age": age}
+
+    tiles = changed_tiles(last["thumb"], thumb)
+    if not tiles:
+        return {"status": "unchanged", "bbox": None, "age": age}
+
+    # Bounding box of the changed tiles plus one tile of context, in screen pixels
+    scale = image.width / thumb.width
+    step = TILE_SIZE * scale
+    left = max(0, int((min(c for c, _ in tiles) - 1) * step))
+    top = max(0, int((min(r for _, r in tiles) - 1) * step))
+    right = min(image.width, int((max(c for c, _ in tiles) + 2) * step))
+    bottom = min(image.height, int((max(r for _, r in tiles) + 2) * step))
+    if (right - left) * (bottom - top) > CROP_MAX_FRACTION * image.width * image.height:
+        return {"status": "full", "bbox": None, "age": age}
+    return {"status": "region", "bbox": (left, top, right, bottom), "age": age}
+
+
+def remember_frame(image):
+    """Record a full-screen capture as the latest frame (no comparison)."""
+    thumb = _thumbnail(image)
+    _last_frame.update({
+        "thumb": thumb,
+        "hash": frame_hash(thumb),
+        "size": image.size,
+        "time": time.monotonic(),
+    })
+
+
+def forget_frame():
+    """Drop the cached frame so the next check sends a full screenshot."""
+    _last_frame.clear()
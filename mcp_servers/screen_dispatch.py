@@ -14,6 +14,8 @@ Author: Gregory E. Schwartz
 Event:  Anthropic's Built with Opus 4.6: a Claude Code Hackathon
 Date:   February 2026
 """
+import bisect
+import hashlib
 import json
 import os
 import re
@@ -22,13 +24,53 @@ import glob
 import shutil
 import subprocess
 import platform
-import imaplib
-import email as email_lib
-from email.header import decode_header
 from datetime import datetime, timedelta
 from pathlib import Path
-
-from mcp.server.fastmcp import FastMCP
+from typing import Literal
+
+# Make sibling modules importable when launched as `python mcp_servers/screen_dispatch.py`
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mcp_servers.extraction import (
+    extract_entities,
+    entity_hosts,
+    host_matches,
+    find_links,
+    compile_phrases,
+)
+from mcp_servers.scam_model import (
+    DANGER_SCORE,
+    HIGH_BAND,
+    band_for,
+    classify,
+    get_model,
+    needs_deep_check,
+    rule_score,
+)
+from mcp_servers.screen_capture import (
+    diff_against_last,
+    encode_image,
+    grab_screen,
+    image_block,
+    parse_area,
+    remember_frame,
+)
+from mcp_servers.screen_text import ocr_available, read_screen_text
+from mcp_servers import (
+    health_history,
+    health_probes,
+    notes_compaction,
+    notes_index,
+    phone_client,
+    powershell_host,
+    tool_registry,
+    user_context,
+    window_cache,
+    word_session,
+)
+from mcp_servers.diagnostics import partial_note, run_probes, timed_out
+from mcp_servers.tool_registry import tool
+from mcp_servers.waits import find_windows, wait_for_new_window, wait_until
 
 # Detect platform
 IS_WINDOWS = platform.system() == "Windows"
@@ -54,7 +96,6 @@ USER_FOLDERS = [
     WIN_HOME / "Videos",
 ]
 
-mcp = FastMCP("screen-dispatch")
 
 # ---------------------------------------------------------------------------
 # Anthropic client injection (set by app.py at startup)
@@ -104,21 +145,18 @@ def _search_web_raw(query: str, max_results: int = 3) -> list[dict]:
         return []
 
 
-def _web_verify_scam(content: str, matched_orgs: list[str]) -> str:
+def _web_verify_scam(content: str, matched_orgs: list[str], entities: dict | None = None) -> str:
     """Search the web to verify claims in suspicious content.
 
     Checks org phone numbers, suspicious domains, and reported scam numbers.
+    Pass the entities from _scan_for_scam to skip re-extracting them.
     Returns a summary of web verification findings.
     """
     findings = []
 
-    # Extract phone numbers from content
-    phone_pattern = r'1?[-.\s]?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-    phones_in_content = re.findall(phone_pattern, content)
-
-    # Extract domains from content
-    domain_pattern = r'(?:https?://)?([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})'
-    domains_in_content = re.findall(domain_pattern, content)
+    if entities is None:
+        entities = extract_entities(content)
+    domains_in_content = entity_hosts(entities)
 
     searches_done = 0
     max_searches = 6
@@ -140,24 +178,21 @@ def _web_verify_scam(content: str, matched_orgs: list[str]) -> str:
     for domain in domains_in_content[:2]:
         if searches_done >= max_searches:
             break
-        if domain.lower() not in safe_domains:
+        if not any(host_matches(domain, safe) for safe in safe_domains):
             results = _search_web_raw(f'"{domain}" scam report', max_results=2)
             if results:
                 findings.append(f"Web check for {domain}: {results[0]['body'][:200]}")
             searches_done += 1
 
     # 3. Check unknown phone numbers
-    for phone in phones_in_content[:2]:
+    for phone in entities["phones"][:2]:
         if searches_done >= max_searches:
             break
         # Skip known legitimate numbers
-        clean_phone = re.sub(r'[^\d]', '', phone)
-        known_numbers = {re.sub(r'[^\d]', '', org['phone'])
-                        for org in KNOWN_LEGITIMATE_CONTACTS.values()}
-        if clean_phone not in known_numbers and len(clean_phone) >= 10:
-            results = _search_web_raw(f'"{phone}" scam report', max_results=2)
+        if phone["digits"] not in _KNOWN_PHONE_DIGITS and len(phone["digits"]) >= 10:
+            results = _search_web_raw(f'"{phone["raw"]}" scam report', max_results=2)
             if results:
-                findings.append(f"Web check for {phone}: {results[0]['body'][:200]}")
+                findings.append(f"Web check for {phone['raw']}: {results[0]['body'][:200]}")
             searches_done += 1
 
     if not findings:
@@ -204,7 +239,14 @@ SCAM_GRANDPARENT_PHRASES = [
 ]
 
 SCAM_SUSPICIOUS_TLDS = [".xyz", ".info", ".top", ".click", ".buzz", ".tk", ".ml", ".ga"]
-SCAM_SHORTENED_URLS = ["bit.ly", "tinyurl", "t.co", "goo.gl", "is.gd", "buff.ly"]
+SCAM_SHORTENED_URLS = ["bit.ly", "tinyurl.com", "t.co", "goo.gl", "is.gd", "buff.ly"]
+
+# Compiled once at import — _scan_for_scam runs on every inbox row
+_URGENCY_PATTERNS = compile_phrases(SCAM_URGENCY_PHRASES)
+_AUTHORITY_PATTERNS = compile_phrases(SCAM_AUTHORITY_KEYWORDS)
+_FINANCIAL_PATTERNS = compile_phrases(SCAM_FINANCIAL_PHRASES)
+_TECH_SUPPORT_PATTERNS = compile_phrases(SCAM_TECH_SUPPORT_PHRASES)
+_GRANDPARENT_PATTERNS = compile_phrases(SCAM_GRANDPARENT_PHRASES)
 
 SAFE_ATTACHMENT_EXTENSIONS = {
     ".pdf", ".doc", ".docx", ".txt", ".rtf", ".odt",
@@ -252,69 +294,125 @@ KNOWN_LEGITIMATE_CONTACTS = {
     },
 }
 
+_KNOWN_PHONE_DIGITS = {re.sub(r"\D", "", org["phone"]) for org in KNOWN_LEGITIMATE_CONTACTS.values()}
 
-def _scan_for_scam(text: str) -> dict:
-    """Scan text for scam indicators. Returns dict with risk level and details.
 
-    Returns:
-        {"risk": "SAFE"|"SUSPICIOUS"|"DANGEROUS",
-         "flags": [...], "matched_orgs": [...]}
+_PHRASE_CATEGORIES = [
+    ("urgency", _URGENCY_PATTERNS),
+    ("authority", _AUTHORITY_PATTERNS),
+    ("financial", _FINANCIAL_PATTERNS),
+    ("tech_support", _TECH_SUPPORT_PATTERNS),
+    ("grandparent", _GRANDPARENT_PATTERNS),
+]
+
+# Joins texts for batch scanning — never part of a phrase, and not a word char
+_BATCH_SEPARATOR = "\n\x00\n"
+
+
+def _find_scam_flags_batch(texts: list[str], entities_list: list[dict]) -> list[tuple[list, list]]:
+    """Keyword and URL flags for many texts at once.
+
+    Each compiled phrase runs once over all texts joined together, and
+    matches are mapped back to their text by offset — so a 20-email inbox
+    costs one pass per phrase instead of twenty.
+    Returns [(flags, matched_orgs), ...] in the same order as texts.
     """
-    text_lower = text.lower()
-    flags = []
-    matched_orgs = []
-
-    # Check urgency phrases
-    for phrase in SCAM_URGENCY_PHRASES:
-        if phrase in text_lower:
-            flags.append(("urgency", phrase))
-
-    # Check authority impersonation
-    for keyword in SCAM_AUTHORITY_KEYWORDS:
-        if keyword in text_lower:
-            flags.append(("authority", keyword))
-            # Map to known org
-            for org_key in KNOWN_LEGITIMATE_CONTACTS:
-                if org_key in keyword or keyword in org_key:
-                    if org_key not in matched_orgs:
-                        matched_orgs.append(org_key)
-
-    # Check financial red flags
-    for phrase in SCAM_FINANCIAL_PHRASES:
-        if phrase in text_lower:
-            flags.append(("financial", phrase))
-
-    # Check tech support scam indicators
-    for phrase in SCAM_TECH_SUPPORT_PHRASES:
-        if phrase in text_lower:
-            flags.append(("tech_support", phrase))
-            if "microsoft" not in matched_orgs:
-                matched_orgs.append("microsoft")
-
-    # Check grandparent scam
-    for phrase in SCAM_GRANDPARENT_PHRASES:
-        if phrase in text_lower:
-            flags.append(("grandparent", phrase))
-
-    # Check suspicious URLs
-    for domain in SCAM_SHORTENED_URLS:
-        if domain in text_lower:
-            flags.append(("shortened_url", domain))
-
-    for tld in SCAM_SUSPICIOUS_TLDS:
-        if tld in text_lower:
-            flags.append(("suspicious_tld", tld))
-
-    # Determine risk level
-    categories = set(f[0] for f in flags)
+    results = [([], []) for _ in texts]
+    joined = _BATCH_SEPARATOR.join(texts).lower()
+    starts = []
+    offset = 0
+    for text in texts:
+        starts.append(offset)
+        offset += len(text) + len(_BATCH_SEPARATOR)
+
+    for category, patterns in _PHRASE_CATEGORIES:
+        for phrase, pattern in patterns:
+            hit = set()
+            for match in pattern.finditer(joined):
+                hit.add(bisect.bisect_right(starts, match.start()) - 1)
+            for n in sorted(hit):
+                flags, matched_orgs = results[n]
+                flags.append((category, phrase))
+                if category == "authority":
+                    # Map to known org
+                    for org_key in KNOWN_LEGITIMATE_CONTACTS:
+                        if org_key in phrase or phrase in org_key:
+                            if org_key not in matched_orgs:
+                                matched_orgs.append(org_key)
+                elif category == "tech_support" and "microsoft" not in matched_orgs:
+                    matched_orgs.append("microsoft")
+
+    # Check suspicious URLs — by parsed host, so ".info" never matches "information"
+    for (flags, _), entities in zip(results, entities_list):
+        hosts = entity_hosts(entities)
+        for domain in SCAM_SHORTENED_URLS:
+            if any(host_matches(host, domain) for host in hosts):
+                flags.append(("shortened_url", domain))
+
+        tlds = {host.rsplit(".", 1)[1] for host in hosts}
+        for tld in SCAM_SUSPICIOUS_TLDS:
+            if tld[1:] in tlds:
+                flags.append(("suspicious_tld", tld))
+
+    return results
+
+
+def _find_scam_flags(text: str, entities: dict) -> tuple[list, list]:
+    """Keyword and URL flags for text. Returns (flags, matched_orgs)."""
+    return _find_scam_flags_batch([text], [entities])[0]
+
+
+def _scam_classifier() -> dict:
+    """The local scam classifier, trained from the corpus on first use."""
+    return get_model(lambda t: _find_scam_flags(t, extract_entities(t))[0])
+
+
+def _assess_scam(text: str, entities: dict, flags: list, matched_orgs: list) -> dict:
+    """Weigh flags and run the classifier. Returns the _scan_for_scam dict."""
+    score, reasons = rule_score(flags)
+    probability, top_ngrams = classify(_scam_classifier(), text, score)
+
+    # No keyword hit, but the wording looks like the scams we've trained on
+    if not flags and probability >= HIGH_BAND:
+        flags.append(("model", "wording matches known scams"))
+
+    # Determine risk level from the weighted score
     if len(flags) == 0:
         risk = "SAFE"
-    elif len(flags) >= 3 or "financial" in categories or "tech_support" in categories:
+    elif score >= DANGER_SCORE:
         risk = "DANGEROUS"
     else:
         risk = "SUSPICIOUS"
 
-    return {"risk": risk, "flags": flags, "matched_orgs": matched_orgs}
+    return {
+        "risk": risk,
+        "flags": flags,
+        "matched_orgs": matched_orgs,
+        "entities": entities,
+        "score": score,
+        "probability": round(probability, 3),
+        "band": band_for(probability),
+        "reasons": reasons + [(f"wording: {g}", c) for g, c in top_ngrams],
+    }
+
+
+def _scan_for_scam(text: str, entities: dict | None = None) -> dict:
+    """Scan text for scam indicators. Returns dict with risk level and details.
+
+    Keyword flags are weighted into an explainable rule score (which sets the
+    risk level); the local classifier adds a probability and escalation band.
+    Pass pre-extracted entities (from extract_entities) to avoid rescanning.
+
+    Returns:
+        {"risk": "SAFE"|"SUSPICIOUS"|"DANGEROUS",
+         "flags": [...], "matched_orgs": [...], "entities": {...},
+         "score": float, "probability": float, "band": "low"|"ambiguous"|"high",
+         "reasons": [...]}
+    """
+    if entities is None:
+        entities = extract_entities(text)
+    flags, matched_orgs = _find_scam_flags(text, entities)
+    return _assess_scam(text, entities, flags, matched_orgs)
 
 
 # ---------------------------------------------------------------------------
@@ -347,7 +445,7 @@ def _search_matches(path: Path, name_lower: str, results: list, max_results: int
         pass
 
 
-@mcp.tool()
+@tool("files")
 def find_file(name: str, search_in: str = "common") -> str:
     """Find a file by partial name. Searches Desktop, Documents, Downloads, Pictures, and Recent files.
     This is the #1 thing elderly users need help with — they saved something and can't find it.
@@ -401,7 +499,7 @@ def find_file(name: str, search_in: str = "common") -> str:
     return "\n".join(lines)
 
 
-@mcp.tool()
+@tool("files")
 def find_recent_files(hours: int = 24, file_type: str = "all") -> str:
     """Find files that were recently saved or changed.
     Perfect for "I just saved it" or "where did it go?" requests.
@@ -470,7 +568,7 @@ def find_recent_files(hours: int = 24, file_type: str = "all") -> str:
     return "\n".join(lines)
 
 
-@mcp.tool()
+@tool("files")
 def open_file(file_path: str) -> str:
     """Open a file with the default application.
     Works for documents, pictures, PDFs — anything the computer knows how to open.
@@ -494,7 +592,43 @@ def open_file(file_path: str) -> str:
         return f"I had trouble opening that file. Let's try a different way."
 
 
-@mcp.tool()
+# Window titles that mean each app has opened (regex, case-insensitive)
+_WORD_TITLE = r"\bWord$"
+_APP_WINDOW_TITLES = {
+    "notepad.exe": r"Notepad",
+    "calc.exe": r"Calculator",
+    "excel.exe": r"Excel",
+    "mspaint.exe": r"Paint",
+    "powerpnt.exe": r"PowerPoint",
+    "outlook.exe": r"Outlook",
+}
+
+# Titles are localized ("Rechner", "Editor"), so a new window owned by the
+# app's own process counts too. Store Calculator runs as CalculatorApp.exe
+# inside an ApplicationFrameHost.exe window.
+_APP_PROCESSES = {
+    "calc.exe": ("calc.exe", "calculatorapp.exe", "applicationframehost.exe"),
+}
+
+
+def _word_document_window(existing: set[int]):
+    """A new Word window showing a document (not the start screen), or None."""
+    for hwnd, title in find_windows(_WORD_TITLE):
+        if hwnd in existing:
+            continue
+        lowered = title.lower()
+        if "start" not in lowered and any(kw in lowered for kw in ["document", "doc", ".docx"]):
+            return hwnd, title
+    return None
+
+
+def _log_launch(app_label: str, seconds: float, ready: bool):
+    state = "ready" if ready else "not ready yet"
+    # stderr: stdout is the MCP server's JSON-RPC stream
+    print(f"[TechBuddy] {app_label} launch: {state} after {seconds:.2f}s", file=sys.stderr, flush=True)
+
+
+@tool("documents")
 def open_application(app_name: str) -> str:
     """Open an application by name. Handles Word, Notepad, Calculator, Excel, Paint.
     For Word, this creates a blank document automatically — no start screen.
@@ -512,44 +646,43 @@ def open_application(app_name: str) -> str:
     if name in ("word", "microsoft word", "ms word"):
         # Tier 1: win32com — creates blank doc, skips start screen entirely
         try:
-            import win32com.client
-            word = win32com.client.Dispatch("Word.Application")
-            word.Visible = True
-            word.Documents.Add()
+            word_session.new_document()
             return "Word is open with a blank document. You can start typing!"
         except Exception:
             pass
 
         # Tier 2: Launch with /n flag (new blank doc) + pywinauto start screen bypass
         try:
-            import time as _time
+            existing = {hwnd for hwnd, _ in find_windows(_WORD_TITLE)}
             subprocess.Popen(["cmd", "/c", "start", "", "winword", "/n"], shell=False)
-            _time.sleep(5)
-            # Check if we landed on start screen and click Blank document
-            try:
-                import pywinauto
-                app = pywinauto.Application(backend="uia").connect(title_re=".*Word.*", timeout=10)
-                window = app.top_window()
-                title = window.window_text()
-                if "start" in title.lower() or not any(
-                    kw in title.lower() for kw in ["document", "doc", ".docx"]
-                ):
+            found, waited = wait_for_new_window(_WORD_TITLE, existing, timeout=20)
+            if not found:
+                _log_launch("Word", waited, ready=False)
+                return "Word is starting up — it's taking a little while. It should appear on your screen in a moment."
+
+            # /n usually lands on "Document1 - Word"; give it a moment before
+            # deciding we're stuck on the start screen
+            document, more = wait_until(lambda: _word_document_window(existing), timeout=3)
+            waited += more
+            if not document:
+                hwnd, _ = found
+                try:
+                    import pywinauto
+                    app = pywinauto.Application(backend="uia").connect(handle=hwnd)
+                    window = app.window(handle=hwnd)
                     # On start screen — click Blank document
-                    try:
-                        blank_btn = window.child_window(title="Blank document", control_type="ListItem")
+                    blank_btn = window.child_window(title="Blank document", control_type="ListItem")
+                    if wait_until(lambda: blank_btn.exists(timeout=0), timeout=5)[0]:
                         blank_btn.click_input()
-                        _time.sleep(2)
-                    except Exception:
+                    else:
                         # Try alternative: press Escape then Ctrl+N for new doc
-                        try:
-                            window.type_keys("{ESC}")
-                            _time.sleep(1)
-                            window.type_keys("^n")
-                            _time.sleep(2)
-                        except Exception:
-                            pass
-            except Exception:
-                pass
+                        window.type_keys("{ESC}")
+                        window.type_keys("^n")
+                    document, more = wait_until(lambda: _word_document_window(existing), timeout=5)
+                    waited += more
+                except Exception:
+                    pass
+            _log_launch("Word", waited, ready=bool(document))
             return "Word is open with a blank document. You can start typing!"
         except Exception:
             return "I couldn't open Word. Is Microsoft Office installed?"
@@ -572,15 +705,23 @@ def open_application(app_name: str) -> str:
         return f"I don't know how to open '{app_name}'. Try asking me to open Word, Notepad, Calculator, Excel, or Paint."
 
     try:
+        title = _APP_WINDOW_TITLES[exe]
+        processes = _APP_PROCESSES.get(exe, (exe,))
+        existing = {hwnd for hwnd, _ in find_windows(title, processes)}
         os.startfile(exe)
-        import time
-        time.sleep(2)
+        # Already-running apps (Outlook, tabbed Notepad) may reuse their
+        # window instead of opening a new one, so don't wait long for it
+        found, waited = wait_for_new_window(title, existing, timeout=3 if existing else 15,
+                                            processes=processes)
+        _log_launch(app_name.title(), waited, ready=bool(found))
+        if found:
+            return f"{app_name.title()} is open and ready."
         return f"{app_name.title()} is opening now. You should see it on your screen in a moment."
     except Exception:
         return f"I had trouble opening {app_name}. It might not be installed on this computer."
 
 
-@mcp.tool()
+@tool("files")
 def list_folder(folder_path: str = "Desktop") -> str:
     """Show what's in a folder. Defaults to Desktop.
     Helps elderly users see what files they have.
@@ -634,10 +775,10 @@ def list_folder(folder_path: str = "Desktop") -> str:
     return "\n".join(lines)
 
 
-@mcp.tool()
+@tool("documents")
 def print_document(file_path: str, copies: int = 1) -> str:
     """Send a document to the printer.
-    Confirms settings before printing to avoid waste.
+    Always confirm with the user before printing.
 
     Args:
         file_path: Full path to the file to print
@@ -671,7 +812,7 @@ def print_document(file_path: str, copies: int = 1) -> str:
         return "Something went wrong with printing. Is the printer turned on?"
 
 
-@mcp.tool()
+@tool("system")
 def troubleshoot_printer() -> str:
     """Check why the printer isn't working. Diagnoses common problems like
     offline printer, stuck print jobs, or wrong default printer.
@@ -687,16 +828,29 @@ def _troubleshoot_printer_windows() -> str:
     """Check printer status on Windows using PowerShell."""
     report_lines = ["Let me check your printer...\n"]
 
+    # The three checks are independent — run them side by side
+    results = run_probes({
+        "printers": lambda: _run_powershell(
+            "Get-Printer | Select-Object Name, PrinterStatus, Type, PortName | ConvertTo-Json"
+        ),
+        "default": lambda: _run_powershell(
+            "(Get-CimInstance -ClassName Win32_Printer | Where-Object {$_.Default}).Name",
+            timeout=10,
+        ),
+        "jobs": lambda: _run_powershell(
+            "Get-PrintJob -PrinterName * -ErrorAction SilentlyContinue | "
+            "Select-Object PrinterName, JobStatus, DocumentName | ConvertTo-Json",
+            timeout=10,
+        ),
+    }, deadline=15)
+    slow = timed_out(results)
+
     # 1. List printers and their status
     try:
-        result = subprocess.run(
-            ["powershell", "-Command",
-             "Get-Printer | Select-Object Name, PrinterStatus, Type, PortName | ConvertTo-Json"],
-            capture_output=True, text=True, timeout=15,
-        )
-        if result.returncode == 0 and result.stdout.strip():
+        printers_out = results["printers"]["value"]
+        if printers_out:
             import json
-            printers = json.loads(result.stdout)
+            printers = json.loads(printers_out)
             if not isinstance(printers, list):
                 printers = [printers]
 
@@ -712,6 +866,8 @@ def _troubleshoot_printer_windows() -> str:
                 report_lines.append(f"  Printer: {name}")
                 report_lines.append(f"  Status: {status_text}")
                 report_lines.append("")
+        elif "printers" in slow:
+            report_lines.append("Listing the printers took too long, so I skipped it.\n")
         else:
             report_lines.append("I couldn't get printer information.\n")
     except Exception:
@@ -719,14 +875,11 @@ def _troubleshoot_printer_windows() -> str:
 
     # 2. Check default printer
     try:
-        result = subprocess.run(
-            ["powershell", "-Command",
-             "(Get-CimInstance -ClassName Win32_Printer | Where-Object {$_.Default}).Name"],
-            capture_output=True, text=True, timeout=10,
-        )
-        default = result.stdout.strip()
+        default = results["default"]["value"]
         if default:
             report_lines.append(f"Your default printer is: {default}\n")
+        elif "default" in slow:
+            report_lines.append("Checking the default printer took too long, so I skipped it.\n")
         else:
             report_lines.append("No default printer is set! That could be the problem.\n")
     except Exception:
@@ -734,19 +887,16 @@ def _troubleshoot_printer_windows() -> str:
 
     # 3. Check for stuck print jobs
     try:
-        result = subprocess.run(
-            ["powershell", "-Command",
-             "Get-PrintJob -PrinterName * -ErrorAction SilentlyContinue | "
-             "Select-Object PrinterName, JobStatus, DocumentName | ConvertTo-Json"],
-            capture_output=True, text=True, timeout=10,
-        )
-        if result.returncode == 0 and result.stdout.strip():
+        jobs_out = results["jobs"]["value"]
+        if jobs_out:
             import json
-            jobs = json.loads(result.stdout)
+            jobs = json.loads(jobs_out)
             if not isinstance(jobs, list):
                 jobs = [jobs]
             if jobs:
                 report_lines.append(f"Stuck print jobs: {len(jobs)} job(s) waiting\n")
+        elif "jobs" in slow:
+            report_lines.append("Checking the print queue took too long, so I skipped it.\n")
         else:
             report_lines.append("No stuck print jobs. That's good!\n")
     except Exception:
@@ -760,8 +910,9 @@ def _troubleshoot_printer_windows() -> str:
     report_lines.append("  4. Make sure there's paper in the tray")
     report_lines.append("  5. If it still doesn't work, we can try clearing the print queue")
     report_lines.append("\nLet me know what you find and I'll help from there!")
+    report_lines.append(partial_note(results))
 
-    return "\n".join(report_lines)
+    return "\n".join(report_lines).rstrip()
 
 
 def _troubleshoot_printer_generic() -> str:
@@ -798,120 +949,183 @@ def _troubleshoot_printer_generic() -> str:
 
 
 # ---------------------------------------------------------------------------
-# System Troubleshooting — Terminal-based diagnostics (PowerShell on Windows)
+# System Troubleshooting — in-process probes, PowerShell for printer/WiFi details
 # ---------------------------------------------------------------------------
 
 
 def _run_powershell(script: str, timeout: int = 15) -> str | None:
-    """Run a PowerShell command and return stdout, or None on failure."""
+    """Run a PowerShell command in the shared worker and return stdout, or None on failure."""
     try:
-        result = subprocess.run(
-            ["powershell", "-NoProfile", "-Command", script],
-            capture_output=True, text=True, timeout=timeout,
-        )
-        if result.returncode == 0 and result.stdout.strip():
-            return result.stdout.strip()
-    except (FileNotFoundError, subprocess.TimeoutExpired, Exception):
-        pass
-    return None
+        return powershell_host.run(script, timeout=timeout) or None
+    except Exception as e:
+        print(f"[TechBuddy] PowerShell failed: {e}", file=sys.stderr, flush=True)  # stdout is the MCP stream
+        return None
+
+
+_GB = 1073741824
+
+_MEMORY_SCRIPT = (
+    "Get-CimInstance Win32_OperatingSystem | "
+    "Select-Object FreePhysicalMemory, TotalVisibleMemorySize | "
+    "ConvertTo-Json"
+)
+_PROCESS_SCRIPT = (
+    "Get-Process | Sort-Object -Property WorkingSet64 -Descending | "
+    "Select-Object -First 5 ProcessName, "
+    "@{Name='MemoryMB';Expression={[math]::Round($_.WorkingSet64/1MB)}} | "
+    "ConvertTo-Json"
+)
+
+
+def _memory_probe() -> dict | None:
+    """Memory in bytes from psutil or /proc; PowerShell only as a Windows fallback."""
+    try:
+        return health_probes.memory()
+    except health_probes.ProbeUnavailable:
+        if not IS_WINDOWS:
+            raise
+    out = _run_powershell(_MEMORY_SCRIPT)
+    if not out:
+        return None
+    data = json.loads(out)
+    total = int(data["TotalVisibleMemorySize"]) * 1024
+    free = int(data["FreePhysicalMemory"]) * 1024
+    return {"total": total, "used": total - free, "available": free,
+            "percent": round((total - free) / total * 100)}
+
+
+def _process_probe() -> list[dict] | None:
+    """Top programs by memory from psutil or /proc; PowerShell only as a Windows fallback."""
+    try:
+        return health_probes.top_processes(5)
+    except health_probes.ProbeUnavailable:
+        if not IS_WINDOWS:
+            raise
+    out = _run_powershell(_PROCESS_SCRIPT)
+    if not out:
+        return None
+    procs = json.loads(out)
+    if not isinstance(procs, list):
+        procs = [procs]
+    return [{"name": p.get("ProcessName", "Unknown"), "rss": p.get("MemoryMB", 0) * 1048576, "count": 1}
+            for p in procs]
 
 
+@tool("system")
 def check_system_health() -> str:
     """Check why the computer is slow or acting up. Shows memory usage,
-    hard drive space, and which programs are using the most resources.
+    hard drive space, and which programs are using the most resources,
+    plus how those changed over the last hour of background samples.
     Use when the user says 'my computer is slow', 'everything is freezing',
-    or 'am I running out of space?'
+    'it's been slow all afternoon', or 'am I running out of space?'
     """
-    if not IS_WINDOWS:
-        return (
-            "I can't check your computer's health from here, but here are common fixes:\n"
-            "  1. Close programs you're not using (they use memory)\n"
-            "  2. Restart your computer — this fixes most slowness\n"
-            "  3. Make sure your hard drive isn't full — delete old files you don't need\n"
-            "Would you like help with any of these?"
-        )
-
     report = ["Here's how your computer is doing:\n"]
 
+    # The background sampler usually has a reading from the last minute
+    readings = health_history.latest_readings()
+    if readings is not None:
+        slow, note = [], ""
+    else:
+        results = run_probes({
+            "memory": _memory_probe,
+            "disk": health_probes.disk,
+            "processes": _process_probe,
+        })
+        readings = {name: r["value"] for name, r in results.items()}
+        slow, note = timed_out(results), partial_note(results)
+
     # 1. Memory usage
-    mem_script = (
-        "Get-CimInstance Win32_OperatingSystem | "
-        "Select-Object FreePhysicalMemory, TotalVisibleMemorySize | "
-        "ConvertTo-Json"
-    )
-    mem_out = _run_powershell(mem_script)
-    if mem_out:
-        try:
-            data = json.loads(mem_out)
-            total_kb = int(data["TotalVisibleMemorySize"])
-            free_kb = int(data["FreePhysicalMemory"])
-            total_gb = round(total_kb / 1048576, 1)
-            used_gb = round((total_kb - free_kb) / 1048576, 1)
-            pct = round((total_kb - free_kb) / total_kb * 100)
-            report.append(f"MEMORY: Using {used_gb} of {total_gb} GB ({pct}% full)")
-            if pct > 85:
-                report.append("  ⚠ Memory is very high — closing some programs would help!")
-            elif pct > 70:
-                report.append("  Getting a bit full — close programs you're not using.")
-            else:
-                report.append("  Looks good!")
-        except (json.JSONDecodeError, KeyError, ValueError):
-            report.append("MEMORY: I couldn't check memory usage.")
+    mem = readings["memory"]
+    if mem:
+        used_gb = round(mem["used"] / _GB, 1)
+        total_gb = round(mem["total"] / _GB, 1)
+        pct = mem["percent"]
+        report.append(f"MEMORY: Using {used_gb} of {total_gb} GB ({pct}% full)")
+        if pct > 85:
+            report.append("  ⚠ Memory is very high — closing some programs would help!")
+        elif pct > 70:
+            report.append("  Getting a bit full — close programs you're not using.")
+        else:
+            report.append("  Looks good!")
+    elif "memory" in slow:
+        report.append("MEMORY: That check took too long, so I skipped it.")
     else:
         report.append("MEMORY: I couldn't check memory usage.")
 
     # 2. Disk space
-    disk_script = (
-        "Get-PSDrive C | Select-Object Used, Free | ConvertTo-Json"
-    )
-    disk_out = _run_powershell(disk_script)
-    if disk_out:
-        try:
-            data = json.loads(disk_out)
-            used_bytes = int(data["Used"])
-            free_bytes = int(data["Free"])
-            total_bytes = used_bytes + free_bytes
-            free_gb = round(free_bytes / 1073741824, 1)
-            pct_used = round(used_bytes / total_bytes * 100)
-            report.append(f"\nHARD DRIVE: {pct_used}% full — {free_gb} GB free")
-            if free_gb < 10:
-                report.append("  ⚠ Running low on space! Delete files you don't need.")
-            elif free_gb < 30:
-                report.append("  Getting a little full — keep an eye on it.")
-            else:
-                report.append("  Plenty of space!")
-        except (json.JSONDecodeError, KeyError, ValueError):
-            report.append("\nHARD DRIVE: I couldn't check disk space.")
+    drive = readings["disk"]
+    if drive:
+        free_gb = round(drive["free"] / _GB, 1)
+        report.append(f"\nHARD DRIVE: {drive['percent']}% full — {free_gb} GB free")
+        if free_gb < 10:
+            report.append("  ⚠ Running low on space! Delete files you don't need.")
+        elif free_gb < 30:
+            report.append("  Getting a little full — keep an eye on it.")
+        else:
+            report.append("  Plenty of space!")
+    elif "disk" in slow:
+        report.append("\nHARD DRIVE: That check took too long, so I skipped it.")
     else:
         report.append("\nHARD DRIVE: I couldn't check disk space.")
 
-    # 3. Top CPU-hungry programs
-    proc_script = (
-        "Get-Process | Sort-Object -Property WorkingSet64 -Descending | "
-        "Select-Object -First 5 ProcessName, "
-        "@{Name='MemoryMB';Expression={[math]::Round($_.WorkingSet64/1MB)}} | "
-        "ConvertTo-Json"
-    )
-    proc_out = _run_powershell(proc_script)
-    if proc_out:
-        try:
-            procs = json.loads(proc_out)
-            if not isinstance(procs, list):
-                procs = [procs]
-            report.append("\nBIGGEST PROGRAMS RUNNING:")
-            for p in procs:
-                name = p.get("ProcessName", "Unknown")
-                mb = p.get("MemoryMB", 0)
-                report.append(f"  • {name} — using {mb} MB")
-        except (json.JSONDecodeError, KeyError):
-            report.append("\nPROGRAMS: I couldn't list running programs.")
+    # 3. Top memory-hungry programs
+    procs = readings["processes"]
+    if procs:
+        report.append("\nBIGGEST PROGRAMS RUNNING:")
+        for p in procs:
+            report.append(f"  • {p['name']} — using {round(p['rss'] / 1048576)} MB")
+    elif "processes" in slow:
+        report.append("\nPROGRAMS: Listing programs took too long, so I skipped it.")
     else:
         report.append("\nPROGRAMS: I couldn't list running programs.")
 
-    report.append("\nWould you like me to close any of these programs to free up memory?")
-    return "\n".join(report)
+    # 4. How things have changed (from the background sampler's history)
+    report.extend(_health_trend_lines(health_history.trends()))
+
+    if IS_WINDOWS:
+        report.append("\nWould you like me to close any of these programs to free up memory?")
+    else:
+        report.append("\nClosing programs you're not using, or restarting, usually helps when things feel slow.")
+    report.append(note)
+    return "\n".join(report).rstrip()
+
 
+def _format_mb(mb: float) -> str:
+    return f"{mb / 1024:.1f} GB" if mb >= 1024 else f"{round(mb)} MB"
 
+
+def _health_trend_lines(trend: dict | None) -> list[str]:
+    """Plain-language lines about the last hour of samples (none if too little history)."""
+    if not trend:
+        return []
+    minutes = round(trend["span"] / 60)
+    period = "the last hour" if minutes >= 55 else f"the last {minutes} minutes"
+    lines = [f"\nOVER {period.upper()}:"]
+
+    if trend["memory"]:
+        first, last, peak = trend["memory"]
+        if last - first >= 15:
+            lines.append(f"  Memory went from {round(first)}% to {round(last)}% full.")
+        elif peak >= 90 and last < 90:
+            lines.append(f"  Memory got very full ({round(peak)}%) for a while, but it's better now.")
+    if trend["cpu"]:
+        average, peak = trend["cpu"]
+        if average >= 70:
+            lines.append(f"  The computer has been working hard the whole time (about {round(average)}% busy).")
+        elif peak >= 90:
+            lines.append("  The computer had some very busy moments.")
+    for name, first_mb, last_mb in trend["growing"][:3]:
+        lines.append(f"  {name} has grown from {_format_mb(first_mb)} to {_format_mb(last_mb)}.")
+    first_free, last_free = trend["disk_free"]
+    if first_free - last_free >= 2 * 1073741824:
+        lines.append(f"  {round((first_free - last_free) / 1073741824, 1)} GB of hard drive space got used up.")
+
+    if len(lines) == 1:
+        lines.append("  Things have been steady — nothing unusual.")
+    return lines
+
+
+@tool("system")
 def fix_frozen_program(program_name: str, confirm: bool = False) -> str:
     """Close a program that is frozen or not responding. Use when the user says
     'Word is frozen', 'my browser won't close', or 'this program is stuck'.
@@ -994,36 +1208,43 @@ def fix_frozen_program(program_name: str, confirm: bool = False) -> str:
     )
 
 
+@tool("system")
 def check_internet() -> str:
     """Check if the internet is working and diagnose connection problems.
     Use when the user says 'internet isn't working', 'WiFi is down',
     'I can't get online', or 'pages won't load'.
     """
-    if not IS_WINDOWS:
-        return (
-            "I can't check your internet from here, but here's what to try:\n"
-            "  1. Look for the WiFi icon in the bottom-right corner of your screen\n"
-            "  2. If there's an X on it, click it and pick your WiFi network\n"
-            "  3. Try turning WiFi OFF, wait 10 seconds, turn it back ON\n"
-            "  4. If nothing works, unplug your router, wait 30 seconds, plug it back in\n"
-            "Would you like me to walk you through any of these?"
-        )
-
     report = []
 
-    # 1. Ping test — is internet reachable?
-    ping_script = "Test-Connection -ComputerName 8.8.8.8 -Count 2 -Quiet"
-    ping_out = _run_powershell(ping_script, timeout=20)
-    is_connected = ping_out and ping_out.strip().lower() == "true"
-
-    if is_connected:
+    # Connectivity and name lookup are in-process; only WiFi details need PowerShell
+    probes = {
+        "connection": health_probes.connectivity,
+        "dns": health_probes.dns_resolves,
+    }
+    if IS_WINDOWS:
+        probes["wifi"] = lambda: _run_powershell("netsh wlan show interfaces")
+    results = run_probes(probes)
+    slow = timed_out(results)
+
+    # 1. Connection test — is internet reachable?
+    connection = results["connection"]["value"] or {}
+    is_connected = connection.get("connected", False)
+    dns_ok = results["dns"]["value"]
+
+    if is_connected and dns_ok is False:
+        report.append("INTERNET: ⚠ You're connected, but I can't look up websites right now.")
+        report.append("  Unplugging your router for 30 seconds usually fixes this.")
+    elif is_connected:
         report.append("INTERNET: Your internet is working!")
+        if connection.get("latency_ms") and connection["latency_ms"] > 300:
+            report.append("  It's responding slowly, so pages may take a while to load.")
+    elif "connection" in slow:
+        report.append("INTERNET: ⚠ The internet test took too long — your connection may be very slow.")
     else:
         report.append("INTERNET: ⚠ I can't reach the internet right now.")
 
-    # 2. WiFi info
-    wifi_script = "netsh wlan show interfaces"
-    wifi_out = _run_powershell(wifi_script)
+    # 2. WiFi info (Windows only)
+    wifi_out = results["wifi"]["value"] if "wifi" in results else None
     if wifi_out:
         # Parse key fields
         ssid = ""
@@ -1057,7 +1278,9 @@ def check_internet() -> str:
             report.append("  Click the WiFi icon in the bottom-right corner to connect.")
         else:
             report.append(f"\nWIFI: Status is '{state}'")
-    else:
+    elif "wifi" in slow:
+        report.append("\nWIFI: That check took too long, so I skipped it.")
+    elif IS_WINDOWS:
         report.append("\nWIFI: I couldn't check WiFi status.")
 
     # Suggest fixes if not connected
@@ -1068,10 +1291,11 @@ def check_internet() -> str:
         report.append("  3. If that doesn't work, unplug your router for 30 seconds, then plug it back in")
         report.append("  4. If WiFi is on but nothing loads, try restarting your computer")
 
-    return "\n".join(report)
+    report.append(partial_note(results))
+    return "\n".join(report).rstrip()
 
 
-@mcp.tool()
+@tool("core")
 def analyze_scam_risk(content: str, content_type: str = "email") -> str:
     """Analyze any content for scam indicators and return a safety assessment.
     Use this whenever you encounter suspicious emails, links, phone calls, or popups.
@@ -1090,14 +1314,15 @@ def analyze_scam_risk(content: str, content_type: str = "email") -> str:
     if risk == "SAFE":
         return "This looks safe. I didn't find any scam indicators."
 
-    # --- Web verification: search the internet to verify claims ---
-    web_evidence = _web_verify_scam(content, matched_orgs)
-
-    # --- Extended Thinking: deep scam analysis when suspicious/dangerous ---
+    # --- Extended Thinking: deep scam analysis, only when the local verdict is unsure ---
     # Uses Opus 4.6 extended thinking to REASON about why this is a scam
     # instead of just keyword matching. Judges see the thinking trace.
-    if _anthropic_client is not None:
+    # Clear-cut cases (classifier probability outside the ambiguous band)
+    # are answered locally below — no web search, no API call.
+    if _anthropic_client is not None and needs_deep_check(scan):
         try:
+            # --- Web verification: search the internet to verify claims ---
+            web_evidence = _web_verify_scam(content, matched_orgs, scan["entities"])
             web_context = f"\n\n{web_evidence}" if web_evidence else ""
             thinking_result = _anthropic_client.messages.create(
                 model="claude-opus-4-6",
@@ -1186,6 +1411,8 @@ def analyze_scam_risk(content: str, content_type: str = "email") -> str:
                 lines.append(f"  - Hidden link: \"{phrase}\" — Scammers hide dangerous links behind shortened URLs")
             elif category == "suspicious_tld":
                 lines.append(f"  - Suspicious website: \"{phrase}\" — Legitimate organizations don't use these web addresses")
+            elif category == "model":
+                lines.append("  - The wording is very similar to scams I've seen before")
 
     # Provide legitimate contact info
     if matched_orgs:
@@ -1221,9 +1448,33 @@ def analyze_scam_risk(content: str, content_type: str = "email") -> str:
 # Stubbed on Linux — returns instructions instead
 # ---------------------------------------------------------------------------
 
-@mcp.tool()
+def _with_cached_window(window_title: str, find, act):
+    """Find a window or control on cached handles, then act on it exactly once.
+
+    If the lookup fails on a stale cached handle, forget the window and look
+    it up once more from scratch. The action itself (a click, keystrokes) is
+    never replayed: it may have partly run before failing, and clicking Send
+    twice is worse than asking the user. A failed action still drops the
+    cached window so the next call starts fresh.
+    """
+    try:
+        target = find()
+    except ImportError:
+        raise
+    except Exception:
+        window_cache.forget(window_title)
+        target = find()
+    try:
+        return act(target)
+    except Exception:
+        window_cache.forget(window_title)
+        raise
+
+
+@tool("documents")
 def click_button(window_title: str, button_name: str) -> str:
     """Click a button in any open window by its name.
+    Use for Zoom 'Join', Outlook 'Send', etc.
     Uses the accessibility tree to find the right button.
 
     Args:
@@ -1236,12 +1487,11 @@ def click_button(window_title: str, button_name: str) -> str:
             f"Here's how: Look for the '{button_name}' button in the {window_title} window and click it."
         )
 
+    def find():
+        return window_cache.get_control(window_title, button_name, "Button")
+
     try:
-        import pywinauto
-        app = pywinauto.Application(backend="uia").connect(title_re=f".*{window_title}.*")
-        window = app.top_window()
-        button = window.child_window(title=button_name, control_type="Button")
-        button.click()
+        _with_cached_window(window_title, find, lambda button: button.click())
         return f"Done! I clicked '{button_name}' in {window_title}."
     except ImportError:
         return f"Please click the '{button_name}' button in {window_title}."
@@ -1249,9 +1499,10 @@ def click_button(window_title: str, button_name: str) -> str:
         return f"I couldn't find the '{button_name}' button. Can you see it on your screen?"
 
 
-@mcp.tool()
+@tool("documents")
 def type_text(window_title: str, text: str, field_name: str = "") -> str:
     """Type text into a field in any open window.
+    Use for filling in email recipients, search boxes, etc.
 
     Args:
         window_title: Title of the window
@@ -1263,31 +1514,31 @@ def type_text(window_title: str, text: str, field_name: str = "") -> str:
             return f"Please click on the '{field_name}' field in {window_title} and type: {text}"
         return f"Please type this in {window_title}: {text}"
 
-    # For Word: use win32com Selection.TypeText (most reliable — bypasses focus issues)
+    # For Word: insert through COM in one call (most reliable — bypasses focus issues)
     _word_names = ("word", "microsoft word", "ms word", "document")
     if not field_name and window_title.lower().strip() in _word_names:
         try:
-            import win32com.client
-            word = win32com.client.GetActiveObject("Word.Application")
-            word.Activate()
-            word.Selection.TypeText(text)
+            word_session.insert_text(text)
             return f"Done! I typed that into Word."
         except Exception:
             pass  # Fall through to pywinauto
 
     # For other apps: use pywinauto
-    try:
-        import pywinauto
-        import time as _time
-        app = pywinauto.Application(backend="uia").connect(title_re=f".*{window_title}.*", timeout=10)
-        window = app.top_window()
-        window.set_focus()
-        _time.sleep(0.5)
+    def find():
+        if field_name:
+            return window_cache.get_control(window_title, field_name, "Edit")
+        return window_cache.get_window(window_title)
+
+    def type_into(target):
         if field_name:
-            field = window.child_window(title=field_name, control_type="Edit")
-            field.set_text(text)
+            # set_text goes through UI Automation — no focus or delay needed
+            target.set_text(text)
         else:
-            window.type_keys(text, with_spaces=True)
+            target.set_focus()
+            target.type_keys(text, with_spaces=True)
+
+    try:
+        _with_cached_window(window_title, find, type_into)
         return f"Done! I typed that into {window_title}."
     except ImportError:
         return f"Please type '{text}' in {window_title}."
@@ -1295,7 +1546,7 @@ def type_text(window_title: str, text: str, field_name: str = "") -> str:
         return f"I couldn't type into {window_title}. Is the window open and visible?"
 
 
-@mcp.tool()
+@tool("documents")
 def save_document_as_pdf(save_path: str) -> str:
     """Save the currently open Word document as a PDF file.
     Use when the user wants to convert their Word document to PDF.
@@ -1315,16 +1566,7 @@ def save_document_as_pdf(save_path: str) -> str:
         )
 
     try:
-        import win32com.client
-        word = win32com.client.GetActiveObject("Word.Application")
-        doc = word.ActiveDocument
-
-        # Ensure save_path ends with .pdf
-        if not save_path.lower().endswith(".pdf"):
-            save_path = save_path + ".pdf"
-
-        # FileFormat 17 = wdFormatPDF
-        doc.SaveAs2(save_path, FileFormat=17)
+        save_path = word_session.save_active_document(save_path, "pdf")
         return (
             f"Done! I saved your document as a PDF.\n\n"
             f"File: {save_path}\n\n"
@@ -1345,7 +1587,7 @@ def save_document_as_pdf(save_path: str) -> str:
         )
 
 
-@mcp.tool()
+@tool("documents")
 def save_document_as_word(save_path: str) -> str:
     """Save the currently open Word document as a Word (.docx) file.
     Use when the user wants to save their Word document to a specific location.
@@ -1364,16 +1606,7 @@ def save_document_as_word(save_path: str) -> str:
         )
 
     try:
-        import win32com.client
-        word = win32com.client.GetActiveObject("Word.Application")
-        doc = word.ActiveDocument
-
-        # Ensure save_path ends with .docx
-        if not save_path.lower().endswith(".docx"):
-            save_path = save_path + ".docx"
-
-        # FileFormat 16 = wdFormatDocumentDefault (.docx)
-        doc.SaveAs2(save_path, FileFormat=16)
+        save_path = word_session.save_active_document(save_path, "docx")
         return (
             f"Done! I saved your document as a Word file.\n\n"
             f"File: {save_path}\n\n"
@@ -1393,10 +1626,12 @@ def save_document_as_word(save_path: str) -> str:
         )
 
 
+@tool("files")
 def smart_save_document(content: str, doc_type: str = "note", title: str = "") -> str:
     """Save content as a clearly named document with date and time stamp.
     Use whenever the user creates, downloads, or works on a document.
-    Automatically picks a clear filename with today's date so they can find it later.
+    Puts it in Documents/TechBuddy Saved with a clear filename and today's
+    date so they can find it later.
 
     Args:
         content: The text content to save
@@ -1446,7 +1681,7 @@ def smart_save_document(content: str, doc_type: str = "note", title: str = "") -
 # Tier 4: Claude Vision fallback — text instructions for unknown UI
 # ---------------------------------------------------------------------------
 
-@mcp.tool()
+@tool("core")
 def describe_screen_action(task: str, app_name: str) -> str:
     """When automated methods aren't available, provide clear step-by-step
     instructions the user can follow themselves.
@@ -1506,13 +1741,72 @@ def describe_screen_action(task: str, app_name: str) -> str:
 # Tier 4b: Claude Vision — read the user's actual screen
 # ---------------------------------------------------------------------------
 
-@mcp.tool()
-def read_my_screen() -> str | list:
+def _encode_screenshot(image, quality: str = "") -> dict:
+    """Encode a capture with screen_capture and log its size and timing."""
+    encoded = encode_image(image, quality)
+    print(
+        f"[TechBuddy] Screenshot ({encoded['tier']}): {encoded['width']}x{encoded['height']} "
+        f"{encoded['media_type']}, {encoded['bytes'] // 1024} KB, "
+        f"~{encoded['tokens']} tokens, encoded in {encoded['encode_ms']} ms",
+        file=sys.stderr, flush=True,   # stdout is the MCP server's JSON-RPC stream
+    )
+    return encoded
+
+
+def _describe_screen_text(screen_text: dict) -> str:
+    """Tool result for a screen that was read as text instead of a picture.
+
+    Runs the Scam Shield scanner over the words first, so a fake virus
+    warning is flagged without ever sending the image.
+    """
+    text = "\n".join(screen_text["lines"])
+    if screen_text["source"] == "uia":
+        where = f"the \"{screen_text['title']}\" window" if screen_text["title"] else "the window in front"
+        others = [t for t in screen_text.get("windows", [])[1:] if t]
+        if others:
+            where += " in front, then " + ", ".join(f"\"{t}\"" for t in others)
+        header = f"I read the words in {where} directly (no picture needed):"
+    else:
+        header = "I read the words on the screen with text recognition (no picture needed):"
+
+    warning = ""
+    scan = _scan_for_scam(text)
+    if scan["risk"] != "SAFE":
+        signs = ", ".join(f"{cat.replace('_', ' ')}: \"{phrase}\"" for cat, phrase in scan["flags"][:5])
+        warning = (
+            f"⚠️ SCAM SHIELD: this screen shows {scan['risk']} warning signs ({signs}). "
+            "Warn the user first: do not call any number, click any link, or let anyone "
+            "connect to the computer.\n\n"
+        )
+
+    return (
+        f"{warning}{header}\n\n{text}\n\n"
+        "Explain what this says in simple, plain language. "
+        "If there's a popup or error, explain what it means and what they should do. "
+        "Items in [brackets] are buttons, links, and boxes the user can click. "
+        "If you need to see colors, pictures, or where things are, "
+        "call read_my_screen again with look=\"picture\"."
+    )
+
+
+@tool("core")
+def read_my_screen(area: str = "screen",
+                   quality: Literal["", "fast", "balanced", "detail", "text"] = "",
+                   look: Literal["auto", "picture"] = "auto") -> str | list:
     """Take a screenshot of the user's screen so you can SEE what they see.
     Use when the user says 'what's on my screen?', 'I see a popup',
     'something appeared', 'what does this error say?', 'what should I click?',
     or 'I don't know what I'm looking at'.
     This lets you actually look at their screen and give specific help.
+
+    Args:
+        area: "screen" for everything, "window" for just the window in front,
+              or "x,y,width,height" for one part of the screen
+        quality: "fast" (quick look), "balanced", "detail" (small print,
+                 exact colors), or "text" (black-and-white, for reading
+                 messages and error text). Empty uses TECHBUDDY_SCREEN_TIER.
+        look: "auto" reads the words on screen first and only sends a picture
+              if there isn't enough text; "picture" always sends the picture
     """
     if not IS_WINDOWS:
         return (
@@ -1522,35 +1816,30 @@ def read_my_screen() -> str | list:
         )
 
     try:
-        import io
-        import base64
-        from PIL import ImageGrab
-
-        # Capture the screen
-        screenshot = ImageGrab.grab()
-
-        # Resize if very large (cap at 1920px width to save tokens)
-        max_width = 1920
-        if screenshot.width > max_width:
-            ratio = max_width / screenshot.width
-            new_size = (max_width, int(screenshot.height * ratio))
-            screenshot = screenshot.resize(new_size)
-
-        # Convert to PNG bytes then base64
-        buffer = io.BytesIO()
-        screenshot.save(buffer, format="PNG", optimize=True)
-        base64_data = base64.b64encode(buffer.getvalue()).decode("utf-8")
+        bbox = parse_area(area)
+        screenshot = grab_screen(bbox)
+        if bbox is None:
+            remember_frame(screenshot)  # lets verify_screen_step skip unchanged screens
+
+        # Text first: accessibility tree or local OCR, picture only if needed
+        if look != "picture":
+            custom_region = bbox is not None and "," in (area or "")
+            screen_text = read_screen_text(screenshot, use_uia=not custom_region,
+                                           scope="screen" if bbox is None else "window")
+            if screen_text:
+                return _describe_screen_text(screen_text)
+
+        encoded = _encode_screenshot(screenshot, quality)
+        no_ocr = ""
+        if look != "picture" and not ocr_available():
+            no_ocr = (
+                " (Local text recognition is optional and not installed here "
+                "— pytesseract plus the Tesseract program — so a picture was sent instead.)"
+            )
 
         # Return structured content (image + text) for the tool result
         return [
-            {
-                "type": "image",
-                "source": {
-                    "type": "base64",
-                    "media_type": "image/png",
-                    "data": base64_data,
-                },
-            },
+            image_block(encoded),
             {
                 "type": "text",
                 "text": (
@@ -1558,6 +1847,7 @@ def read_my_screen() -> str | list:
                     "Describe what you see in simple, plain language. "
                     "If there's a popup or error, explain what it means and what they should do. "
                     "If it looks like a scam popup, warn them immediately."
+                    + no_ocr
                 ),
             },
         ]
@@ -1574,25 +1864,75 @@ def read_my_screen() -> str | list:
         )
 
 
+@tool("core")
 def verify_screen_step(expected: str) -> str | list:
     """Take a screenshot to verify the user completed a step correctly.
     Use after giving instructions to check that the expected result is visible.
     For example, after telling them to open Word, verify Word is on screen.
     After telling them to click Send, verify the email was sent.
     This is your way of checking their work — like looking over their shoulder.
+    If nothing changed since your last look, it says so instead of sending a
+    new picture; if only part of the screen changed, only that part is sent.
+
+    Args:
+        expected: What should be visible (e.g., "Word document is open",
+                  "email was sent", "printer dialog appeared")
     """
     if not expected or not expected.strip():
         return "I need to know what to look for. What should be on the screen?"
 
-    # Reuse read_my_screen for the actual screenshot
-    result = read_my_screen()
+    not_visible = (
+        f"I was checking if this worked: \"{expected}\"\n"
+        "I can't see your screen from here. "
+        "Can you tell me — do you see what we expected? "
+        "Describe what's on your screen and I'll help from there!"
+    )
+    if not IS_WINDOWS:
+        return not_visible
+
+    try:
+        screenshot = grab_screen()
+        change = diff_against_last(screenshot)
+    except Exception:
+        return not_visible
+
+    # Nothing moved since the last look — answer without sending a picture
+    if change["status"] == "unchanged":
+        return (
+            f"The screen looks unchanged since your last look {change['age']} seconds ago, "
+            f"so I didn't take a new picture. I was checking whether this step was completed: "
+            f"\"{expected}\"\n\n"
+            "Start from what you saw last time: the user may not have done the step yet, "
+            "or may need a simpler hint. A very small change (a tick in a box, a few letters) "
+            "can slip past this check, so if the user says they did it, ask to look again "
+            "with read_my_screen. Use plain, friendly language — no jargon."
+        )
+
+    # Only part of the screen changed — send just that part
+    if change["status"] == "region":
+        left, top, right, bottom = change["bbox"]
+        image = screenshot.crop(change["bbox"])
+        intro = (
+            f"Only part of the user's screen changed since your last look "
+            f"{change['age']} seconds ago. Here is just that part "
+            f"(from x={left}, y={top}, {right - left}x{bottom - top} pixels); "
+            f"the rest of the screen looks the same as before. "
+        )
+    else:
+        image = screenshot
+        intro = "Here is a screenshot of the user's screen. "
 
-    # If we got a screenshot (list with image + text), enhance the text prompt
-    if isinstance(result, list) and len(result) >= 2:
-        result[1] = {
+    try:
+        encoded = _encode_screenshot(image)
+    except Exception:
+        return not_visible
+
+    return [
+        image_block(encoded),
+        {
             "type": "text",
             "text": (
-                f"Here is a screenshot of the user's screen. "
+                f"{intro}"
                 f"I was checking whether this step was completed: \"{expected}\"\n\n"
                 f"Look at the screen and tell me:\n"
                 f"1. Is the expected result visible? (yes/no)\n"
@@ -1600,31 +1940,36 @@ def verify_screen_step(expected: str) -> str | list:
                 f"3. Give a simple, encouraging next step.\n\n"
                 f"Use plain, friendly language — no jargon."
             ),
-        }
-        return result
-
-    # Non-Windows fallback — ask the user to describe what they see
-    return (
-        f"I was checking if this worked: \"{expected}\"\n"
-        "I can't see your screen from here. "
-        "Can you tell me — do you see what we expected? "
-        "Describe what's on your screen and I'll help from there!"
-    )
+        },
+    ]
 
 
 # ---------------------------------------------------------------------------
 # Email Module — Real Gmail via IMAP (with simulated fallback)
 # ---------------------------------------------------------------------------
 
-# Gmail IMAP configuration — set in .env to enable real Gmail
-GMAIL_USER = os.getenv("GMAIL_USER", "")
-GMAIL_APP_PASSWORD = os.getenv("GMAIL_APP_PASSWORD", "")
-GMAIL_FOLDER = os.getenv("GMAIL_FOLDER", "INBOX")
-USE_REAL_GMAIL = bool(GMAIL_USER and GMAIL_APP_PASSWORD)
-if USE_REAL_GMAIL:
-    print(f"[TechBuddy] Gmail IMAP enabled for {GMAIL_USER}, folder: {GMAIL_FOLDER}", flush=True)
-else:
-    print("[TechBuddy] Gmail not configured — using simulated inbox", flush=True)
+# Gmail IMAP configuration — set in .env to enable real Gmail. Read on the
+# first email tool call, not at import (None = not read yet)
+GMAIL_USER = ""
+GMAIL_APP_PASSWORD = ""
+GMAIL_FOLDER = "INBOX"
+USE_REAL_GMAIL = None
+
+
+def _use_real_gmail() -> bool:
+    """Whether Gmail is configured; reads the environment on first call."""
+    global GMAIL_USER, GMAIL_APP_PASSWORD, GMAIL_FOLDER, USE_REAL_GMAIL
+    if USE_REAL_GMAIL is None:
+        GMAIL_USER = os.getenv("GMAIL_USER", "")
+        GMAIL_APP_PASSWORD = os.getenv("GMAIL_APP_PASSWORD", "")
+        GMAIL_FOLDER = os.getenv("GMAIL_FOLDER", "INBOX")
+        USE_REAL_GMAIL = bool(GMAIL_USER and GMAIL_APP_PASSWORD)
+        if USE_REAL_GMAIL:
+            print(f"[TechBuddy] Gmail IMAP enabled for {GMAIL_USER}, folder: {GMAIL_FOLDER}",
+                  file=sys.stderr, flush=True)
+        else:
+            print("[TechBuddy] Gmail not configured — using simulated inbox", file=sys.stderr, flush=True)
+    return USE_REAL_GMAIL
 
 
 def _select_gmail_folder(mail, folder: str) -> bool:
@@ -1644,8 +1989,23 @@ def _select_gmail_folder(mail, folder: str) -> bool:
     return False
 
 
+def _gmail_preview(text_raw: bytes) -> str:
+    """The first 2 KB of a message's body text, tags and runs of space removed.
+
+    Raw (possibly MIME-encoded) text — good enough for scanning, and the
+    same for the inbox listing and the full message, so triage verdicts
+    can be matched to either.
+    """
+    preview = re.sub(r'<[^>]+>', ' ', text_raw[:2048].decode("utf-8", errors="replace"))
+    return re.sub(r'\s+', ' ', preview).strip()
+
+
 def _fetch_gmail_inbox(max_emails: int = 10) -> list[dict]:
     """Fetch recent emails from Gmail via IMAP. Returns list of email dicts."""
+    import imaplib
+    import email as email_lib
+    from email.header import decode_header
+
     try:
         mail = imaplib.IMAP4_SSL("imap.gmail.com")
         mail.login(GMAIL_USER, GMAIL_APP_PASSWORD)
@@ -1653,9 +2013,10 @@ def _fetch_gmail_inbox(max_emails: int = 10) -> list[dict]:
             mail.logout()
             return []
 
-        # Search recent emails only (3-day window to avoid >1MB crash on large mailboxes)
+        # Search recent emails only (3-day window to avoid >1MB crash on large mailboxes).
+        # UIDs, not sequence numbers: they don't shift when a message is deleted
         since_date = (datetime.now() - timedelta(days=1)).strftime("%d-%b-%Y")
-        status, data = mail.search(None, f"SINCE {since_date}")
+        status, data = mail.uid("SEARCH", None, f"SINCE {since_date}")
         if status != "OK" or not data[0]:
             mail.logout()
             return []
@@ -1667,16 +2028,32 @@ def _fetch_gmail_inbox(max_emails: int = 10) -> list[dict]:
 
         emails = []
         for idx, eid in enumerate(recent_ids, 1):
-            status, msg_data = mail.fetch(eid, "(FLAGS RFC822.SIZE BODY.PEEK[HEADER.FIELDS (FROM SUBJECT DATE)])")
+            # Headers plus the first 2 KB of body text, so triage_inbox can scan bodies
+            status, msg_data = mail.uid(
+                "FETCH", eid, "(FLAGS RFC822.SIZE BODY.PEEK[HEADER.FIELDS (FROM SUBJECT DATE)] BODY.PEEK[TEXT]<0.2048>)"
+            )
             if status != "OK":
                 continue
 
+            # Split the response into header and body-text literals
+            header_raw = b""
+            text_raw = b""
+            descriptors = []
+            for part in msg_data:
+                if isinstance(part, tuple):
+                    descriptors.append(part[0])
+                    if b"HEADER" in part[0].upper():
+                        header_raw = part[1]
+                    elif b"TEXT" in part[0].upper():
+                        text_raw = part[1]
+                elif isinstance(part, bytes):
+                    descriptors.append(part)
+
             # Parse flags for read/unread
-            flags_raw = msg_data[0][0].decode() if isinstance(msg_data[0][0], bytes) else str(msg_data[0][0])
+            flags_raw = b" ".join(descriptors).decode(errors="replace")
             is_read = "\\Seen" in flags_raw
 
             # Parse header
-            header_raw = msg_data[0][1]
             msg = email_lib.message_from_bytes(header_raw)
 
             # Decode subject
@@ -1711,6 +2088,7 @@ def _fetch_gmail_inbox(max_emails: int = 10) -> list[dict]:
                 "from": sender,
                 "subject": subject,
                 "date": date_str,
+                "preview": _gmail_preview(text_raw),
                 "is_read": is_read,
             })
 
@@ -1723,6 +2101,10 @@ def _fetch_gmail_inbox(max_emails: int = 10) -> list[dict]:
 
 def _fetch_gmail_message(email_id: int) -> dict | None:
     """Fetch a single email's full content by its position index (1-based)."""
+    import imaplib
+    import email as email_lib
+    from email.header import decode_header
+
     try:
         mail = imaplib.IMAP4_SSL("imap.gmail.com")
         mail.login(GMAIL_USER, GMAIL_APP_PASSWORD)
@@ -1730,7 +2112,7 @@ def _fetch_gmail_message(email_id: int) -> dict | None:
             mail.logout()
             return None
 
-        status, data = mail.search(None, "ALL")
+        status, data = mail.uid("SEARCH", None, "ALL")
         if status != "OK" or not data[0]:
             mail.logout()
             return None
@@ -1745,7 +2127,7 @@ def _fetch_gmail_message(email_id: int) -> dict | None:
         uid = email_ids[email_id - 1]
 
         # Fetch full message and mark as read
-        status, msg_data = mail.fetch(uid, "(RFC822)")
+        status, msg_data = mail.uid("FETCH", uid, "(RFC822)")
         if status != "OK":
             mail.logout()
             return None
@@ -1754,7 +2136,7 @@ def _fetch_gmail_message(email_id: int) -> dict | None:
         msg = email_lib.message_from_bytes(raw_msg)
 
         # Mark as read
-        mail.store(uid, "+FLAGS", "\\Seen")
+        mail.uid("STORE", uid, "+FLAGS", "\\Seen")
 
         # Decode subject
         subject = ""
@@ -1826,25 +2208,18 @@ def _fetch_gmail_message(email_id: int) -> dict | None:
                     attachments.append({"name": filename, "size_kb": round(size / 1024, 1)})
 
         # Check for meeting links in body
-        meeting_link = None
-        meeting_patterns = [
-            r'https?://[\w.-]*zoom\.us/\S+',
-            r'https?://meet\.google\.com/\S+',
-            r'https?://teams\.microsoft\.com/\S+',
-        ]
-        for pattern in meeting_patterns:
-            match = re.search(pattern, body)
-            if match:
-                meeting_link = match.group(0)
-                break
+        meeting_links = find_links(extract_entities(body), TRUSTED_MEETING_DOMAINS)
+        meeting_link = meeting_links[0] if meeting_links else None
 
         mail.logout()
         return {
             "id": email_id,
+            "uid": uid.decode() if isinstance(uid, bytes) else str(uid),
             "from": sender,
             "subject": subject,
             "date": date_str,
             "body": body,
+            "preview": _gmail_preview(re.split(rb"\r?\n\r?\n", raw_msg, maxsplit=1)[-1]),
             "is_read": True,
             "attachments": attachments,
             "meeting_link": meeting_link,
@@ -1974,23 +2349,199 @@ SIMULATED_INBOX = [
 _deleted_ids: set[int] = set()
 _sent_emails: list[dict] = []
 
+# Per-message scam verdicts from triage_inbox, keyed by _message_key(),
+# least recently used first
+_scam_verdicts: dict[str, dict] = {}
+MAX_SCAM_VERDICTS = 500
+
+
+def _message_key(email: dict) -> str:
+    """Stable cache key: the IMAP uid for Gmail, the list id for the simulated inbox."""
+    return f"uid-{email['uid']}" if email.get("uid") else f"sim-{email['id']}"
+
+
+def _message_digest(email: dict) -> str:
+    """What a verdict was computed from: sender, subject and body.
+
+    Gmail messages use the 2 KB preview both fetchers read, since the
+    inbox listing never has the full body.
+    """
+    text = email.get("preview", "") if email.get("uid") else email.get("body") or email.get("preview", "")
+    return hashlib.sha1(f"{email['from']}\x00{email['subject']} {text}".encode("utf-8")).hexdigest()
+
 
-@mcp.tool()
+def _cached_verdict(key: str, digest: str) -> dict | None:
+    """A stored verdict for this exact message, marked as recently used."""
+    verdict = _scam_verdicts.pop(key, None)
+    if verdict is None or verdict["digest"] != digest:
+        return None
+    _scam_verdicts[key] = verdict
+    return verdict
+
+
+def _store_verdict(key: str, verdict: dict):
+    """Store a verdict, dropping the least recently used past MAX_SCAM_VERDICTS."""
+    _scam_verdicts.pop(key, None)
+    _scam_verdicts[key] = verdict
+    while len(_scam_verdicts) > MAX_SCAM_VERDICTS:
+        del _scam_verdicts[next(iter(_scam_verdicts))]
+
+
+def _triage_llm_batch(items: list[dict]) -> dict[int, dict]:
+    """One Opus call that rates every ambiguous message at once.
+
+    Args:
+        items: [{"n": int, "from": str, "subject": str, "text": str, "flags": [...]}, ...]
+
+    Returns {n: {"risk": "HIGH"|"MEDIUM"|"LOW", "type": str, "reason": str}};
+    empty if there's no client or the reply can't be parsed.
+    """
+    if _anthropic_client is None or not items:
+        return {}
+
+    blocks = []
+    for item in items:
+        blocks.append(
+            f"### Message {item['n']}\n"
+            f"From: {item['from']}\nSubject: {item['subject']}\n"
+            f"Keyword flags: {item['flags']}\n"
+            f"Text:\n{item['text'][:1500]}"
+        )
+    prompt = (
+        "You are a scam detection expert protecting an elderly person. "
+        "Rate each message below for scam risk.\n\n"
+        + "\n\n".join(blocks)
+        + "\n\nReply with ONLY a JSON array, one object per message, like:\n"
+        '[{"n": 1, "risk": "HIGH", "type": "phishing", "reason": "one short sentence"}]\n'
+        "risk must be HIGH, MEDIUM, or LOW."
+    )
+    try:
+        response = _anthropic_client.messages.create(
+            model="claude-opus-4-6",
+            max_tokens=200 + 120 * len(items),
+            messages=[{"role": "user", "content": prompt}],
+        )
+        text = "".join(b.text for b in response.content if b.type == "text")
+        match = re.search(r'\[.*\]', text, re.DOTALL)
+        rows = json.loads(match.group(0)) if match else []
+    except Exception:
+        return {}
+
+    verdicts = {}
+    for row in rows:
+        try:
+            risk = str(row["risk"]).upper()
+            if risk in ("HIGH", "MEDIUM", "LOW"):
+                verdicts[int(row["n"])] = {
+                    "risk": risk,
+                    "type": str(row.get("type", "")),
+                    "reason": str(row.get("reason", "")),
+                }
+        except (KeyError, TypeError, ValueError):
+            continue
+    return verdicts
+
+
+def triage_inbox(emails: list[dict]) -> dict[str, dict]:
+    """Scam-check a whole inbox listing in one pass.
+
+    Each unique sender is scanned once, all message bodies go through the
+    batch keyword scanner together, and every message the local classifier
+    can't decide on goes into a single batched Opus request. Verdicts are
+    cached in _scam_verdicts, so repeat calls cost nothing — except for an
+    ambiguous message the LLM didn't answer (no client, API error), which
+    is returned with "retry": True and checked again next time.
+
+    Args:
+        emails: inbox rows with "from", "subject", and "body" or "preview"
+
+    Returns:
+        {message_key: {"risk", "flags", "matched_orgs", "probability", "band",
+                       "source": "local"|"llm", "llm": {...}|None, "retry": bool}}
+    """
+    verdicts = {}
+    pending = []
+    for e in emails:
+        text = f"{e['subject']} {e.get('body') or e.get('preview', '')}"
+        digest = _message_digest(e)
+        key = _message_key(e)
+        cached = _cached_verdict(key, digest)
+        if cached:
+            verdicts[key] = cached
+        else:
+            pending.append((key, digest, e, text))
+
+    if not pending:
+        return verdicts
+
+    # 1. Senders — scan each unique From line once
+    sender_flags = {}
+    for _, _, e, _ in pending:
+        if e["from"] not in sender_flags:
+            sender_flags[e["from"]] = _find_scam_flags(e["from"], extract_entities(e["from"]))
+
+    # 2. Bodies — one batch keyword pass over every pending message
+    entities_list = [extract_entities(text) for _, _, _, text in pending]
+    body_flags = _find_scam_flags_batch([text for _, _, _, text in pending], entities_list)
+
+    # 3. Combine and score locally
+    scans = []
+    for (key, digest, e, text), entities, (flags, orgs) in zip(pending, entities_list, body_flags):
+        s_flags, s_orgs = sender_flags[e["from"]]
+        flags = flags + [f for f in s_flags if f not in flags]
+        orgs = orgs + [o for o in s_orgs if o not in orgs]
+        scans.append(_assess_scam(f"{e['from']} {text}", entities, flags, orgs))
+
+    # 4. One LLM request for everything the classifier is unsure about
+    ambiguous = [n for n, scan in enumerate(scans) if needs_deep_check(scan)]
+    llm = _triage_llm_batch([
+        {
+            "n": n + 1,
+            "from": pending[n][2]["from"],
+            "subject": pending[n][2]["subject"],
+            "text": pending[n][3],
+            "flags": scans[n]["flags"],
+        }
+        for n in ambiguous
+    ])
+
+    llm_risk = {"HIGH": "DANGEROUS", "MEDIUM": "SUSPICIOUS", "LOW": "SAFE"}
+    for n, ((key, digest, _, _), scan) in enumerate(zip(pending, scans)):
+        deep = llm.get(n + 1)
+        verdict = {
+            "risk": llm_risk[deep["risk"]] if deep else scan["risk"],
+            "flags": scan["flags"],
+            "matched_orgs": scan["matched_orgs"],
+            "probability": scan["probability"],
+            "band": scan["band"],
+            "source": "llm" if deep else "local",
+            "llm": deep,
+            "digest": digest,
+            "retry": deep is None and n in ambiguous,
+        }
+        if not verdict["retry"]:
+            _store_verdict(key, verdict)
+        verdicts[key] = verdict
+
+    return verdicts
+
+
+@tool("email")
 def check_email() -> str:
     """Check the email inbox. Shows recent emails with sender, subject, and date.
     Use when the user says "check my email" or "do I have any messages?"
     """
     # Use real Gmail if configured, fall back to simulated inbox if it fails
-    if USE_REAL_GMAIL:
+    if _use_real_gmail():
         emails = _fetch_gmail_inbox(max_emails=10)
         if emails:
             unread = sum(1 for e in emails if not e["is_read"])
+            verdicts = triage_inbox(emails)
             lines = [f"You have {len(emails)} emails ({unread} unread):\n"]
             for e in emails:
                 status = "NEW" if not e["is_read"] else "READ"
-                scan_text = f"{e['from']} {e['subject']}"
-                scan = _scan_for_scam(scan_text)
-                warning = " ⚠️ SUSPICIOUS" if scan["risk"] != "SAFE" else ""
+                verdict = verdicts[_message_key(e)]
+                warning = " ⚠️ SUSPICIOUS" if verdict["risk"] != "SAFE" else ""
                 sender = e["from"].split("<")[0].strip()
                 try:
                     dt = datetime.strptime(e["date"], "%B %d, %Y at %I:%M %p")
@@ -2010,14 +2561,14 @@ def check_email() -> str:
         return "Your inbox is empty! No new messages right now."
 
     unread = sum(1 for e in active if not e["is_read"])
+    # Scan the whole inbox for scam indicators in one pass
+    verdicts = triage_inbox(active)
     lines = [f"You have {len(active)} emails ({unread} unread):\n"]
 
     for e in active:
         status = "NEW" if not e["is_read"] else "READ"
-        # Scan for scam indicators
-        scan_text = f"{e['from']} {e['subject']} {e.get('preview', '')}"
-        scan = _scan_for_scam(scan_text)
-        warning = " ⚠️ SUSPICIOUS" if scan["risk"] != "SAFE" else ""
+        verdict = verdicts[_message_key(e)]
+        warning = " ⚠️ SUSPICIOUS" if verdict["risk"] != "SAFE" else ""
         sender = e["from"].split("<")[0].strip()
         # Shorten date: "February 12, 2026 at 10:15 AM" -> "Feb 12, 10:15 AM"
         try:
@@ -2030,7 +2581,7 @@ def check_email() -> str:
     return "\n".join(lines)
 
 
-@mcp.tool()
+@tool("email")
 def read_email(email_id: int) -> str:
     """Read a specific email by its number. Shows the full message.
     Use when the user wants to read a particular email from the inbox list.
@@ -2040,7 +2591,7 @@ def read_email(email_id: int) -> str:
     """
     # Use real Gmail if configured, fall back to simulated if it fails
     email = None
-    if USE_REAL_GMAIL:
+    if _use_real_gmail():
         email = _fetch_gmail_message(email_id)
         if not email:
             print(f"[TechBuddy] Gmail message #{email_id} failed", flush=True)
@@ -2060,6 +2611,16 @@ def read_email(email_id: int) -> str:
     full_text = f"{email['from']} {email['subject']} {email.get('body', '')}"
     scan = _scan_for_scam(full_text)
 
+    # What check_email showed can only raise the risk: triage saw at most
+    # the first 2 KB of raw MIME, so the full-body scan here is the floor
+    verdict = _cached_verdict(_message_key(email), _message_digest(email))
+    severity = ("SAFE", "SUSPICIOUS", "DANGEROUS")
+    if verdict and severity.index(verdict["risk"]) > severity.index(scan["risk"]):
+        flags = scan["flags"] + [f for f in verdict["flags"] if f not in scan["flags"]]
+        if verdict["source"] == "llm" and verdict["llm"].get("reason"):
+            flags.append(("llm", verdict["llm"]["reason"]))
+        scan = {**scan, "risk": verdict["risk"], "flags": flags}
+
     lines = []
 
     # Prepend scam warning if risky
@@ -2086,6 +2647,10 @@ def read_email(email_id: int) -> str:
                     lines.append(f"  - Hidden link: \"{phrase}\"")
                 elif category == "suspicious_tld":
                     lines.append(f"  - Suspicious website: \"{phrase}\"")
+                elif category == "model":
+                    lines.append("  - Wording matches known scams")
+                elif category == "llm":
+                    lines.append(f"  - {phrase}")
         lines.append("")
         # Show matched org contacts if any
         if scan["matched_orgs"]:
@@ -2128,7 +2693,7 @@ def read_email(email_id: int) -> str:
     return "\n".join(lines)
 
 
-@mcp.tool()
+@tool("email")
 def send_email(to: str, subject: str, body: str, attachment: str = "") -> str:
     """Send an email to someone. Always confirm with the user before sending.
     Use when the user wants to write and send an email. Can include a file attachment.
@@ -2161,7 +2726,7 @@ def send_email(to: str, subject: str, body: str, attachment: str = "") -> str:
     )
 
 
-@mcp.tool()
+@tool("email")
 def delete_email(email_id: int) -> str:
     """Delete an email from the inbox. Always confirm with the user first.
     Use when the user wants to remove an email.
@@ -2180,7 +2745,7 @@ def delete_email(email_id: int) -> str:
     return f"Done! I deleted the email '{email['subject']}' from {email['from'].split('<')[0].strip()}."
 
 
-@mcp.tool()
+@tool("email")
 def download_attachment(email_id: int, attachment_name: str = "") -> str:
     """Download an attachment from an email and save it to the Downloads folder.
     Use when the user wants to open or save a file that came with an email.
@@ -2296,7 +2861,7 @@ def _generate_demo_attachment(email: dict, att: dict) -> str:
 PHOTO_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tiff", ".heic", ".webp"}
 
 
-@mcp.tool()
+@tool("files")
 def find_photos(search_term: str = "", days_back: int = 0, search_in: str = "common") -> str:
     """Find photos on the computer. Search by name or find recent photos.
     Use when the user says "find my photos" or "where are my vacation pictures?"
@@ -2368,7 +2933,7 @@ def find_photos(search_term: str = "", days_back: int = 0, search_in: str = "com
     return "\n".join(lines)
 
 
-@mcp.tool()
+@tool("email")
 def share_photo(photo_path: str, to_email: str) -> str:
     """Share a photo by emailing it to someone. Always confirm with the user first.
     Use when the user wants to send a photo to family or friends.
@@ -2401,7 +2966,7 @@ def share_photo(photo_path: str, to_email: str) -> str:
 # Video Call Module — Help join and manage video calls
 # ---------------------------------------------------------------------------
 
-@mcp.tool()
+@tool("email")
 def check_for_meeting_links() -> str:
     """Check emails for video call meeting links (Zoom, Google Meet, Teams).
     Use when the user says "do I have any meetings?" or "how do I join my call?"
@@ -2414,11 +2979,12 @@ def check_for_meeting_links() -> str:
         if email.get("meeting_link"):
             meeting_emails.append(email)
             continue
-        # Then check body/subject text for meeting keywords
-        body_lower = email["body"].lower()
-        subject_lower = email["subject"].lower()
-        full_text = f"{subject_lower} {body_lower}"
-        if any(kw in full_text for kw in ["zoom", "meet.google", "teams", "meeting link", "join the call"]):
+        # Then look for a real meeting URL in the text, or meeting wording
+        full_text = f"{email['subject']} {email['body']}"
+        links = find_links(extract_entities(full_text), TRUSTED_MEETING_DOMAINS)
+        if links:
+            meeting_emails.append({**email, "meeting_link": links[0]})
+        elif any(kw in full_text.lower() for kw in ["meeting link", "join the call"]):
             meeting_emails.append(email)
 
     if not meeting_emails:
@@ -2438,7 +3004,7 @@ def check_for_meeting_links() -> str:
     return "\n".join(lines)
 
 
-@mcp.tool()
+@tool("email")
 def join_video_call(meeting_link: str) -> str:
     """Help the user join a video call by opening the meeting link.
     Use when the user has a Zoom, Google Meet, or Teams link to join.
@@ -2446,10 +3012,10 @@ def join_video_call(meeting_link: str) -> str:
     Args:
         meeting_link: The meeting URL (Zoom, Meet, or Teams link)
     """
-    link_lower = meeting_link.lower()
-
-    # Validate the meeting URL domain
-    is_trusted = any(domain in link_lower for domain in TRUSTED_MEETING_DOMAINS)
+    # Validate the meeting URL by its parsed host — "evil.com/zoom.us" is not Zoom
+    urls = extract_entities(meeting_link)["urls"]
+    host = urls[0]["host"] if urls else ""
+    is_trusted = any(host_matches(host, domain) for domain in TRUSTED_MEETING_DOMAINS)
     if not is_trusted:
         return (
             f"I'm not sure this is a real meeting link: {meeting_link}\n\n"
@@ -2460,7 +3026,7 @@ def join_video_call(meeting_link: str) -> str:
             "If you're sure this is from someone you trust, let me know and I'll open it."
         )
 
-    if "zoom" in link_lower:
+    if host_matches(host, "zoom.us"):
         app_name = "Zoom"
         steps = [
             "I'm opening the Zoom link now.",
@@ -2469,7 +3035,7 @@ def join_video_call(meeting_link: str) -> str:
             "Click the blue 'Join' button.",
             "You're in! If you can't hear anyone, check that your speaker is on.",
         ]
-    elif "meet.google" in link_lower:
+    elif host_matches(host, "meet.google.com"):
         app_name = "Google Meet"
         steps = [
             "I'm opening Google Meet in your browser.",
@@ -2477,7 +3043,7 @@ def join_video_call(meeting_link: str) -> str:
             "Click the big 'Join now' button.",
             "You're in! If your microphone is muted, click the microphone icon at the bottom.",
         ]
-    elif "teams" in link_lower:
+    elif any(host_matches(host, domain) for domain in ("teams.microsoft.com", "teams.live.com")):
         app_name = "Microsoft Teams"
         steps = [
             "I'm opening the Teams meeting link.",
@@ -2514,11 +3080,12 @@ def join_video_call(meeting_link: str) -> str:
 # Web Search — Tool #22
 # ---------------------------------------------------------------------------
 
-@mcp.tool()
+@tool("core")
 def search_web(query: str, num_results: int = 3) -> str:
     """Search the internet for information. Use when the user asks a question
     you don't know the answer to, when you need to verify something (like a
     phone number or organization), or when the user asks 'look this up for me'.
+    Always summarize results in simple language.
 
     Args:
         query: What to search for (e.g., "IRS phone number", "CVS pharmacy hours Main Street")
@@ -2546,10 +3113,10 @@ def search_web(query: str, num_results: int = 3) -> str:
 
 
 # ---------------------------------------------------------------------------
-# Local Memory — Tools #23, #24, #25
+# Local Memory — Tools #23, #24, #25 (+ search_notes)
 # ---------------------------------------------------------------------------
 
-@mcp.tool()
+@tool("core")
 def save_note(filename: str, content: str) -> str:
     """Save a note about the user on their computer. Use this to remember
     preferences, contacts, routines, and what you worked on together.
@@ -2575,15 +3142,54 @@ def save_note(filename: str, content: str) -> str:
         safe_name = "note.md"
 
     filepath = NOTES_DIR / safe_name
+    previous_size = filepath.stat().st_size if filepath.exists() else 0
+    updated = datetime.now().strftime('%B %d, %Y at %I:%M %p')
 
     with open(filepath, "a", encoding="utf-8") as f:
-        f.write(f"\n---\n_Updated: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}_\n\n")
+        f.write(f"\n---\n_Updated: {updated}_\n\n")
         f.write(content.strip() + "\n")
 
+    notes_index.add_entry(NOTES_DIR, filepath, previous_size, updated, content)
+    user_context.note_saved(NOTES_DIR, filepath, previous_size, updated, content)
+    if filepath.stat().st_size > notes_compaction.MAX_LIVE_BYTES:
+        try:
+            notes_compaction.compact_file(filepath)
+        except Exception as e:   # the note is saved; compaction can wait for the next run
+            print(f"[TechBuddy] Note compaction skipped: {e}", file=sys.stderr, flush=True)
+
     return f"Saved to {filepath.name}. This note is stored safely on your computer — not in the cloud."
 
 
-@mcp.tool()
+@tool("core")
+def search_notes(query: str, max_results: int = 5) -> str:
+    """Search everything saved in the user's notes and return the most relevant entries.
+    Use this to find a specific fact — a doctor's name, a grandchild's birthday,
+    how they like their email set up — instead of reading whole note files.
+
+    Args:
+        query: What to look for (e.g., "doctor", "Sarah's birthday", "printer")
+        max_results: How many matching entries to return (default 5)
+    """
+    if not query.strip():
+        return "What should I look for in your notes?"
+    if not NOTES_DIR.exists():
+        return "No notes yet — this looks like our first time working together!"
+
+    matches = notes_index.search(NOTES_DIR, query, limit=max(1, min(max_results, 20)))
+    if not matches:
+        return f"I didn't find anything about '{query}' in the notes."
+
+    parts = [f"Here's what I found in the notes about '{query}':"]
+    for match in matches:
+        text = match["text"]
+        if len(text) > 600:
+            text = text[:600] + " ..."
+        source = match["file"] + (f", {match['date']}" if match["date"] else "")
+        parts.append(f"[{source}]\n{text}")
+    return "\n\n".join(parts)
+
+
+@tool("core")
 def read_notes(filename: str = "") -> str:
     """Read a note file from the user's computer, or list all available notes.
     Use to recall what you know about the user — their preferences, contacts, past sessions.
@@ -2617,37 +3223,22 @@ def read_notes(filename: str = "") -> str:
     return f"=== {filename} ===\n{text}"
 
 
-@mcp.tool()
+@tool("core")
 def recall_user_context() -> str:
     """Remember what you know about this person by reading saved notes.
     Call this at the start of each conversation to restore context.
-    Reads preferences, contacts, and the most recent session notes.
+    Returns a short, deduplicated digest of preferences, contacts, and the
+    most recent session; use search_notes for anything else.
     """
-    if not NOTES_DIR.exists():
+    notes_compaction.run_if_due(NOTES_DIR)   # at most once a day
+    snap = user_context.snapshot(NOTES_DIR)
+    if snap is None:
         return "No notes yet — this is our first conversation! I'll start keeping notes about what we work on together."
-
-    files = sorted(NOTES_DIR.glob("*.md"), key=lambda f: f.stat().st_mtime, reverse=True)
-    if not files:
+    if not snap["files"]:
         return "No notes yet — this is our first conversation!"
 
-    context_parts = []
-
-    # Read preferences and contacts first (most important)
-    for priority in ["preferences.md", "contacts.md"]:
-        pf = NOTES_DIR / priority
-        if pf.exists():
-            context_parts.append(f"=== {priority} ===\n{pf.read_text(encoding='utf-8')[:2000]}")
-
-    # Then most recent session file
-    session_files = [f for f in files if f.name.startswith("session-")]
-    if session_files:
-        latest = session_files[0]
-        context_parts.append(f"=== {latest.name} (most recent) ===\n{latest.read_text(encoding='utf-8')[:2000]}")
-
-    # List all available note files
-    context_parts.append(f"\nAll note files: {', '.join(f.name for f in files)}")
-
-    return "\n\n".join(context_parts)
+    # A compact digest kept up to date by save_note — no folder scan per conversation
+    return user_context.render(snap)
 
 
 # --- iPhone / iOS Simulator Remote Control ---
@@ -2655,7 +3246,23 @@ def recall_user_context() -> str:
 PHONE_SERVER_URL = os.environ.get("PHONE_SERVER_URL", "")
 
 
-@mcp.tool()
+def _phone_screenshot_result(encoded: dict, intro: str) -> list:
+    """Tool result blocks for a phone screenshot from phone_client."""
+    return [
+        image_block(encoded),
+        {
+            "type": "text",
+            "text": (
+                f"{intro} "
+                "Describe what you see in simple, plain language. "
+                "If there's a suspicious message or scam, warn them immediately. "
+                "Give step-by-step guidance: 'Tap the blue button that says Settings.'"
+            ),
+        },
+    ]
+
+
+@tool("phone")
 def capture_phone_screen() -> str | list:
     """Take a screenshot of the user's iPhone screen so you can SEE what's on their phone.
     Use when they say 'look at my phone', 'what's on my phone screen?',
@@ -2666,43 +3273,17 @@ def capture_phone_screen() -> str | list:
         return "Phone screen capture isn't set up yet. I can help with your computer screen instead — just say 'read my screen'."
 
     try:
-        import urllib.request
-        import json
-
-        req = urllib.request.Request(f"{PHONE_SERVER_URL}/screenshot")
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            data = json.loads(resp.read().decode())
-
-        base64_data = data["image"]
-
-        return [
-            {
-                "type": "image",
-                "source": {
-                    "type": "base64",
-                    "media_type": "image/png",
-                    "data": base64_data,
-                },
-            },
-            {
-                "type": "text",
-                "text": (
-                    "Here is a screenshot of the user's iPhone screen. "
-                    "Describe what you see in simple, plain language. "
-                    "If there's a suspicious message or scam, warn them immediately. "
-                    "Give step-by-step guidance: 'Tap the blue button that says Settings.'"
-                ),
-            },
-        ]
-    except Exception as e:
+        encoded = phone_client.fetch_screenshot(PHONE_SERVER_URL)
+        return _phone_screenshot_result(encoded, "Here is a screenshot of the user's iPhone screen.")
+    except Exception:
         return (
             "I couldn't connect to the phone right now. "
             "Make sure the phone server is running and try again."
         )
 
 
-@mcp.tool()
-def tap_phone_screen(x: int, y: int) -> str:
+@tool("phone")
+def tap_phone_screen(x: int, y: int, show_result: bool = False) -> str | list:
     """Tap a specific location on the user's iPhone screen. Use this AFTER viewing
     a phone screenshot with capture_phone_screen to interact with the phone.
     Provide x,y coordinates based on where you want to tap in the screenshot image.
@@ -2711,30 +3292,25 @@ def tap_phone_screen(x: int, y: int) -> str:
     Args:
         x: X coordinate to tap (pixels from left edge of phone screen)
         y: Y coordinate to tap (pixels from top edge of phone screen)
+        show_result: Also return a screenshot of the phone after the tap
+                     (saves a separate capture_phone_screen call)
     """
     if not PHONE_SERVER_URL:
         return "Phone control isn't set up yet."
 
     try:
-        import urllib.request
-        import json
-
-        payload = json.dumps({"x": x, "y": y}).encode()
-        req = urllib.request.Request(
-            f"{PHONE_SERVER_URL}/tap",
-            data=payload,
-            headers={"Content-Type": "application/json"},
-            method="POST",
-        )
-        with urllib.request.urlopen(req, timeout=15) as resp:
-            data = json.loads(resp.read().decode())
+        encoded = phone_client.tap(PHONE_SERVER_URL, x, y, capture=show_result)
+    except Exception:
+        return "I couldn't tap the phone screen. The phone server might not be running."
 
+    if encoded is None:
         return f"Tapped the phone screen at ({x}, {y}). Use capture_phone_screen to see what happened."
-    except Exception as e:
-        return "I couldn't tap the phone screen. The phone server might not be running."
+    return _phone_screenshot_result(
+        encoded, f"I tapped the phone screen at ({x}, {y}). Here is the iPhone screen right after the tap."
+    )
 
 
-@mcp.tool()
+@tool("phone")
 def open_phone_app(app_name: str) -> str:
     """Open an app on the user's iPhone. Use when they say 'open Settings on my phone',
     'go to Messages', 'open Safari', etc. Available apps: Settings, Messages, Safari,
@@ -2747,26 +3323,16 @@ def open_phone_app(app_name: str) -> str:
         return "Phone control isn't set up yet."
 
     try:
-        import urllib.request
-        import json
-
-        payload = json.dumps({"app": app_name.lower()}).encode()
-        req = urllib.request.Request(
-            f"{PHONE_SERVER_URL}/launch",
-            data=payload,
-            headers={"Content-Type": "application/json"},
-            method="POST",
-        )
-        with urllib.request.urlopen(req, timeout=15) as resp:
-            data = json.loads(resp.read().decode())
+        data = phone_client.launch(PHONE_SERVER_URL, app_name)
 
         if data.get("status") == "launched":
             return f"Opened {app_name} on the phone. Use capture_phone_screen to see what's showing now."
         else:
             return f"Couldn't open {app_name}: {data.get('message', 'unknown error')}"
-    except Exception as e:
+    except Exception:
         return "I couldn't open the app. The phone server might not be running."
 
 
 if __name__ == "__main__":
-    mcp.run()
+    health_history.start()
+    tool_registry.mcp_server("screen-dispatch").run()
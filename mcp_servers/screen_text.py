@@ -0,0 +1,195 @@
+"""screen_text.py -- Text-first screen reading before Claude Vision.
+
+Most "what does this popup say?" questions are about words, not pictures.
+This module tries to read the words locally first:
+
+1. Accessibility tree (Windows): UI Automation elements via pywinauto,
+   for the foreground window ("window") or for it and every other visible
+   top-level window ("screen"). This gives exact text plus control types,
+   so buttons and links can be named ("[Button] Call Microsoft Support").
+   The tree is walked lazily, one element at a time from a UIA tree
+   walker, and stops at MAX_ELEMENTS or MAX_DEPTH, so a browser or a big
+   spreadsheet costs no more than the cap.
+2. OCR (CPU-only): pytesseract on the captured image, when installed along
+   with the Tesseract program. Used for custom regions and for windows
+   that expose no accessibility text (remote desktops, games, some browsers).
+   Both are optional and not in requirements.txt (Tesseract isn't a pip
+   package): `pip install pytesseract`, plus the Tesseract installer on
+   Windows, `apt install tesseract-ocr` or `brew install tesseract`.
+   Without them this stage is skipped and ocr_available() says so.
+
+read_my_screen only sends the screenshot to Claude when neither stage
+returns enough readable text.
+
+Author: Gregory E. Schwartz
+Event:  Anthropic's Built with Opus 4.6: a Claude Code Hackathon
+Date:   February 2026
+"""
+import platform
+
+IS_WINDOWS = platform.system() == "Windows"
+
+MIN_CHARS = 40              # less text than this is probably an icon-only screen
+MIN_LINES = 2
+MIN_OCR_CONFIDENCE = 70     # tesseract word confidence, 0-100
+
+_ocr = {}                   # "available": bool, once checked
+MAX_ELEMENTS = 400          # cap the UIA walk on huge windows (browsers, Excel)
+MAX_DEPTH = 12              # nesting levels below a window worth reading
+MAX_CHARS = 4000            # longer than this, the picture is cheaper anyway
+
+# Control types worth labeling so Claude can say "click the X button"
+_LABELED_CONTROLS = {"Button", "Hyperlink", "MenuItem", "CheckBox", "RadioButton", "Edit", "TabItem"}
+
+
+def _dedupe(lines: list[str]) -> list[str]:
+    seen = set()
+    unique = []
+    for line in lines:
+        if line and line not in seen:
+            seen.add(line)
+            unique.append(line)
+    return unique
+
+
+def _walk(info, depth: int):
+    """Element infos below info, depth-first, fetched lazily from the UIA tree walker."""
+    if depth <= 0:
+        return
+    for child in info.iter_children():
+        yield child
+        yield from _walk(child, depth - 1)
+
+
+def _window_lines(info, title: str, budget: list) -> list[str]:
+    """Named elements of one window, spending from a shared element budget."""
+    lines = []
+    for ctrl in _walk(info, MAX_DEPTH):
+        if budget[0] <= 0:
+            break
+        budget[0] -= 1
+        name = (ctrl.name or "").strip()
+        if not name or name == title:
+            continue
+        if ctrl.control_type in _LABELED_CONTROLS:
+            name = f"[{ctrl.control_type}] {name}"
+        lines.append(name)
+    return lines
+
+
+def uia_text(scope: str = "window") -> dict | None:
+    """Visible text from the UI Automation tree.
+
+    Args:
+        scope: "window" for the foreground window; "screen" for it and then
+               the other visible top-level windows, sharing MAX_ELEMENTS
+
+    Returns {"source": "uia", "title", "windows", "lines", "confidence"}
+    (title is the foreground window's; windows lists every window read) or
+    None when not on Windows, pywinauto is missing, or nothing can be read.
+    """
+    if not IS_WINDOWS:
+        return None
+    try:
+        import ctypes
+        from pywinauto import Desktop
+
+        hwnd = ctypes.windll.user32.GetForegroundWindow()
+        if not hwnd:
+            return None
+        desktop = Desktop(backend="uia")
+        windows = [desktop.window(handle=hwnd).wrapper_object()]
+        if scope == "screen":
+            windows += [w for w in desktop.windows(visible_only=True)
+                        if w.handle != hwnd and not w.is_minimized() and w.window_text()]
+        budget = [MAX_ELEMENTS]
+        lines, titles = [], []
+        for window in windows:
+            if budget[0] <= 0:
+                break
+            title = window.window_text()
+            found = _window_lines(window.element_info, title, budget)
+            if window is not windows[0]:
+                found = [f"— {title} —"] + found if found else []
+            if found or window is windows[0]:
+                titles.append(title)
+            lines += found
+        return {"source": "uia", "title": titles[0], "windows": titles,
+                "lines": _dedupe(lines), "confidence": 100.0}
+    except Exception:
+        return None
+
+
+def ocr_available() -> bool:
+    """True if pytesseract and the Tesseract program are both installed (checked once)."""
+    if "available" not in _ocr:
+        try:
+            import pytesseract
+            pytesseract.get_tesseract_version()
+            _ocr["available"] = True
+        except Exception:
+            _ocr["available"] = False
+    return _ocr["available"]
+
+
+def ocr_text(image) -> dict | None:
+    """OCR a PIL image with pytesseract, grouped into lines.
+
+    Returns {"source": "ocr", "title": "", "lines", "confidence"} or None
+    when pytesseract (or the Tesseract program) isn't available.
+    """
+    try:
+        import pytesseract
+    except ImportError:
+        return None
+    try:
+        data = pytesseract.image_to_data(image.convert("L"), output_type=pytesseract.Output.DICT)
+    except Exception:
+        return None
+
+    lines = {}
+    confidences = []
+    for i, word in enumerate(data["text"]):
+        word = word.strip()
+        conf = float(data["conf"][i])
+        if not word or conf < 0:
+            continue
+        key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        lines.setdefault(key, []).append(word)
+        confidences.append(conf)
+    return {
+        "source": "ocr",
+        "title": "",
+        "lines": _dedupe([" ".join(words) for words in lines.values()]),
+        "confidence": sum(confidences) / len(confidences) if confidences else 0.0,
+    }
+
+
+def is_readable(result: dict | None) -> bool:
+    """True if the extracted text is enough to answer without the picture."""
+    if not result:
+        return False
+    chars = sum(len(line) for line in result["lines"])
+    if chars < MIN_CHARS or chars > MAX_CHARS or len(result["lines"]) < MIN_LINES:
+        return False
+    return result["source"] == "uia" or result["confidence"] >= MIN_OCR_CONFIDENCE
+
+
+def read_screen_text(image=None, use_uia: bool = True, scope: str = "window") -> dict | None:
+    """Best local text for the screen: accessibility tree first, then OCR.
+
+    Args:
+        image: the captured screenshot (needed for OCR)
+        use_uia: False for custom regions, where the windows' trees
+                 wouldn't match what was captured
+        scope: "window" (foreground window) or "screen" (every visible window)
+    """
+    if use_uia:
+        result = uia_text(scope)
+        if is_readable(result):
+            return result
+    if image is not None:
+        result = ocr_text(image)
+        if is_readable(result):
+            return result
+    return None
@@ -0,0 +1,279 @@
+"""tool_registry.py -- One source of truth for TechBuddy's tools.
+
+Tools used to be declared three times: @mcp.tool() in screen_dispatch, a
+hand-written TOOLS schema list and a TOOL_FUNCTIONS dict in app.py. The
+copies drifted: some functions weren't MCP tools, and schema wording
+differed from the docstrings. Now a function is registered once with
+@tool("<group>"), and everything else is derived from it:
+
+- the Claude API schema, built at registration from the signature (types,
+  defaults, required parameters, Literal choices) and the docstring (the
+  summary and its Args: section);
+- the name -> function map app.py dispatches through;
+- the FastMCP server, built only when screen_dispatch runs as one.
+
+Schemas are serialized once per tool set into a compact JSON blob. The
+tools are the first thing in the prompt-cache prefix, so the same tool set
+always gives byte-for-byte the same blob, and tests compare it with a
+checked-in snapshot (mcp_servers/data/tool_schemas.json) so an edit to a
+docstring can't change the prefix without anyone noticing.
+
+select() picks the tool groups a conversation needs (email, files,
+system, ...) from the user's messages, so most conversations send a
+fraction of the schemas. "core" tools always go, and so does every group
+the conversation has used. If the first message doesn't clearly match a
+group, all tools are sent from then on; a later unclear message ("Thanks!")
+keeps the groups already chosen. Set TECHBUDDY_TOOL_SUBSETS=0 to always
+send everything.
+
+Tool definitions come before the system prompt in the cache prefix, so a
+different tool list also re-writes the cached system prompt. The set a
+conversation gets therefore only grows: each message can add groups,
+never remove them, and the cost is one cache write per group added (at
+most one per group). Measured on the 36 tools
+(`python -m mcp_servers.tool_registry` prints the sizes): all schemas are
+about 17 KB (~4,300 tokens), core alone 5.4 KB, core plus one group
+7-8.4 KB, and the system prompt about 7.6 KB (~1,900 tokens). Adding a
+group re-writes about 4,000 tokens at 1.25x the input price, while a
+group left out saves 0.1x of ~2,300 tokens on each cached turn (and the
+full price on an uncached first turn). A list that changed back and forth
+every turn cost far more than it saved; growing only, the cost is bounded
+by the groups a conversation actually uses.
+
+Regenerate the snapshot after changing a tool on purpose:
+    python -m mcp_servers.tool_registry --write-snapshot
+
+Author: Gregory E. Schwartz
+Event:  Anthropic's Built with Opus 4.6: a Claude Code Hackathon
+Date:   February 2026
+"""
+import hashlib
+import inspect
+import json
+import os
+import re
+import sys
+import threading
+import typing
+from pathlib import Path
+
+SNAPSHOT = Path(__file__).resolve().parent / "data" / "tool_schemas.json"
+
+SUBSETS_ENABLED = os.getenv("TECHBUDDY_TOOL_SUBSETS", "1").lower() not in ("0", "false", "off", "no")
+
+# Group -> words (matched at the start of a word) that mean a turn needs it
+GROUPS = {
+    "core": (),    # scam checks, screen reading, web search, notes: always sent
+    "files": ("file", "folder", "document", "doc", "photo", "picture", "pic", "desktop",
+              "download", "save", "saved", "lost", "find", "where", "open", "pdf", "recipe",
+              "list"),
+    "documents": ("word", "letter", "document", "type", "typing", "write", "print", "pdf",
+                  "excel", "notepad", "calculator", "paint", "click", "button", "app",
+                  "program", "save"),
+    "email": ("email", "e-mail", "mail", "inbox", "message", "attachment", "attach", "send",
+              "sent", "reply", "zoom", "meeting", "video call", "call", "teams", "meet",
+              "share", "grandkid"),
+    "system": ("slow", "frozen", "freez", "stuck", "crash", "hang", "not responding",
+               "internet", "wifi", "wi-fi", "online", "connect", "network", "printer",
+               "print", "memory", "space", "disk", "drive", "running", "fan", "computer"),
+    "phone": ("phone", "iphone", "text message", "texts", "ipad", "tap"),
+}
+
+_JSON_TYPES = {str: "string", int: "integer", bool: "boolean", float: "number"}
+_SECTION = re.compile(r"^(Args|Arguments|Returns|Raises|Examples?|Notes?):\s*$")
+_ARG = re.compile(r"^(\w+)\s*:\s*(.*)$")
+
+_lock = threading.Lock()
+_tools = {}       # name -> {"fn", "group", "description", "schema"}
+_serialized = {}  # tuple of groups -> {"schemas": [...], "blob": str}
+_patterns = {group: re.compile(r"\b(?:" + "|".join(re.escape(w) for w in words) + ")")
+             for group, words in GROUPS.items() if words}
+
+
+def _parse_docstring(doc: str) -> tuple[str, dict]:
+    """(summary as one line, {parameter: description}) from a Google-style docstring."""
+    summary, params, section, current = [], {}, None, None
+    for line in inspect.cleandoc(doc or "").splitlines():
+        stripped = line.strip()
+        header = _SECTION.match(stripped)
+        if header and not line.startswith(" "):
+            section, current = header.group(1), None
+            continue
+        if section is None:
+            summary.append(stripped)
+        elif section in ("Args", "Arguments") and stripped:
+            match = _ARG.match(stripped)
+            if match and line.startswith("    ") and not line.startswith("     "):
+                current = match.group(1)
+                params[current] = match.group(2)
+            elif current:
+                params[current] += " " + stripped
+    return " ".join(" ".join(summary).split()), params
+
+
+def _param_schema(name: str, annotation, default, description: str) -> dict:
+    if typing.get_origin(annotation) is typing.Literal:
+        choices = list(typing.get_args(annotation))
+        prop = {"type": _JSON_TYPES[type(choices[0])], "enum": choices}
+    elif annotation in _JSON_TYPES:
+        prop = {"type": _JSON_TYPES[annotation]}
+    else:
+        raise TypeError(f"parameter {name!r} needs a str/int/bool/float or Literal annotation")
+    prop["description"] = description
+    if default is not inspect.Parameter.empty:
+        prop["default"] = default
+    return prop
+
+
+def build_schema(fn) -> dict:
+    """The Claude API tool definition for a function, from its signature and docstring."""
+    description, param_docs = _parse_docstring(fn.__doc__)
+    if not description:
+        raise ValueError(f"tool {fn.__name__} has no docstring")
+    hints = typing.get_type_hints(fn)
+    properties, required = {}, []
+    for name, param in inspect.signature(fn).parameters.items():
+        if name not in param_docs:
+            raise ValueError(f"tool {fn.__name__}: parameter {name!r} isn't described under Args:")
+        properties[name] = _param_schema(name, hints.get(name), param.default, param_docs[name])
+        if param.default is inspect.Parameter.empty:
+            required.append(name)
+    input_schema = {"type": "object", "properties": properties}
+    if required:
+        input_schema["required"] = required
+    return {"name": fn.__name__, "description": description, "input_schema": input_schema}
+
+
+def tool(group: str):
+    """Register a function as a TechBuddy tool in `group` (a key of GROUPS)."""
+    if group not in GROUPS:
+        raise ValueError(f"unknown tool group {group!r}")
+
+    def register(fn):
+        schema = build_schema(fn)
+        with _lock:
+            _tools[fn.__name__] = {"fn": fn, "group": group,
+                                   "description": schema["description"], "schema": schema}
+            _serialized.clear()
+        return fn
+    return register
+
+
+def functions() -> dict:
+    """Tool name -> function, in registration order."""
+    with _lock:
+        return {name: entry["fn"] for name, entry in _tools.items()}
+
+
+def group_of(name: str) -> str | None:
+    entry = _tools.get(name)
+    return entry["group"] if entry else None
+
+
+def _serialize(groups: tuple) -> dict:
+    with _lock:
+        cached = _serialized.get(groups)
+        if cached is None:
+            chosen = [entry["schema"] for entry in _tools.values()
+                      if not groups or entry["group"] in groups]
+            blob = json.dumps(chosen, ensure_ascii=False, separators=(",", ":"))
+            # Decoded from the blob, so what we send is exactly what was fingerprinted
+            cached = {"schemas": json.loads(blob), "blob": blob}
+            _serialized[groups] = cached
+        return cached
+
+
+def _key(groups) -> tuple:
+    return () if groups is None else tuple(sorted(set(groups) | {"core"}))
+
+
+def schemas(groups=None) -> list[dict]:
+    """Tool definitions for the API (all tools, or just these groups plus core).
+
+    The list is cached and shared between turns; don't modify it.
+    """
+    return _serialize(_key(groups))["schemas"]
+
+
+def schema_blob(groups=None) -> str:
+    """The serialized tool definitions: identical bytes for an identical tool set."""
+    return _serialize(_key(groups))["blob"]
+
+
+def fingerprint(groups=None) -> str:
+    return hashlib.sha256(schema_blob(groups).encode("utf-8")).hexdigest()[:16]
+
+
+def groups_for(text: str) -> set:
+    """Tool groups a message seems to need (empty if nothing matched)."""
+    text = text.lower()
+    return {group for group, pattern in _patterns.items() if pattern.search(text)}
+
+
+def _requests(history: list) -> list[str]:
+    """What the user typed, oldest first (tool results aren't requests)."""
+    return [msg["content"] for msg in history
+            if msg["role"] == "user" and isinstance(msg.get("content"), str)]
+
+
+def _groups_used(history: list) -> set:
+    used = set()
+    for msg in history:
+        if msg["role"] == "assistant" and isinstance(msg.get("content"), list):
+            for block in msg["content"]:
+                if isinstance(block, dict) and block.get("type") == "tool_use":
+                    used.add(group_of(block["name"]))
+    used.discard(None)
+    return used
+
+
+def select(history: list) -> list[dict]:
+    """Tool definitions for the next turn of a conversation.
+
+    Derived from the whole history, so a later turn never drops a group an
+    earlier one had (which would move the cache prefix back and forth).
+    """
+    if not SUBSETS_ENABLED:
+        return schemas()
+    wanted = set()
+    for request in _requests(history):
+        found = groups_for(request)
+        if not found and not wanted:
+            return schemas()   # everything was sent already
+        wanted |= found
+    if not wanted:
+        return schemas()
+    return schemas(wanted | _groups_used(history))
+
+
+def mcp_server(name: str):
+    """A FastMCP server exposing every registered tool (imports FastMCP on demand)."""
+    from mcp.server.fastmcp import FastMCP
+    server = FastMCP(name)
+    with _lock:
+        entries = list(_tools.values())
+    for entry in entries:
+        server.tool(description=entry["description"])(entry["fn"])
+    return server
+
+
+def write_snapshot(path: Path = SNAPSHOT):
+    path.write_text(json.dumps(schemas(), ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    # Run as a script this file is __main__; the tools register with the
+    # imported mcp_servers.tool_registry, so report from that one
+    import mcp_servers.screen_dispatch  # noqa: F401
+    from mcp_servers import tool_registry as registry
+
+    if "--write-snapshot" in sys.argv:
+        registry.write_snapshot()
+        print(f"Wrote {len(registry.functions())} tool schemas to {SNAPSHOT} ({registry.fingerprint()})")
+    else:
+        print(f"{len(registry.functions())} tools, schema fingerprint {registry.fingerprint()}")
+        print(f"  all: {len(registry.schema_blob())} chars")
+        for group in GROUPS:
+            print(f"  {'core' if group == 'core' else 'core + ' + group}: "
+                  f"{len(registry.schema_blob([group]))} chars")
@@ -0,0 +1,185 @@
+"""user_context.py -- Compact, deduplicated digest of the user's notes.
+
+recall_user_context runs at the start of every conversation. It used to
+list and stat the whole notes folder, then send up to ~6 KB of raw
+markdown: preferences.md and contacts.md (repeats and all) plus the
+newest session file. This module keeps a digest in memory instead:
+
+- preferences and contacts as one line per fact, exact repeats removed
+  (the newest copy wins), capped at the newest MAX_FACTS of each;
+- the last few things done in the most recent session-*.md;
+- the names of the other note files (details are one search_notes away).
+
+save_note calls note_saved(), which folds the new entry into the digest.
+snapshot() checks the digest with a few stat() calls: the notes folder's
+mtime (files added or removed) and each source file's size and mtime
+(edited outside TechBuddy). It only re-reads the folder if one of those
+changed.
+
+Author: Gregory E. Schwartz
+Event:  Anthropic's Built with Opus 4.6: a Claude Code Hackathon
+Date:   February 2026
+"""
+import re
+import threading
+from pathlib import Path
+
+from mcp_servers.notes_index import split_entries
+
+FACT_FILES = {"preferences.md": "preferences", "contacts.md": "contacts"}
+MAX_FACTS = 25            # per section, newest kept
+MAX_RECENT = 10           # lines from the latest session
+MAX_FACT_CHARS = 240
+
+_lock = threading.Lock()
+_cache = {"dir": None, "snapshot": None}
+stats = {"builds": 0, "incremental": 0}
+
+
+def _stat(path: Path) -> tuple[int, int]:
+    st = path.stat()
+    return st.st_size, st.st_mtime_ns
+
+
+def _facts(text: str) -> list[str]:
+    """One line per fact from note entries, minus headings and bullets."""
+    found = []
+    for entry in split_entries(text):
+        for line in entry["text"].splitlines():
+            line = line.strip().lstrip("-*•").strip()
+            if not line or line.startswith("#"):
+                continue
+            if len(line) > MAX_FACT_CHARS:
+                line = line[:MAX_FACT_CHARS].rstrip() + "…"
+            found.append(line)
+    return found
+
+
+def _key(fact: str) -> str:
+    return re.sub(r"[^\w]+", " ", fact.lower()).strip()
+
+
+def _merge(existing: list[str], new: list[str], limit: int) -> list[str]:
+    """Append facts, dropping older copies of repeats; keep the newest `limit`."""
+    merged = {}
+    for fact in existing + new:
+        key = _key(fact)
+        merged.pop(key, None)   # re-inserting moves the fact to the end
+        merged[key] = fact
+    return list(merged.values())[-limit:]
+
+
+def _last_date(text: str) -> str:
+    entries = split_entries(text)
+    return entries[-1]["date"] if entries else ""
+
+
+def _build(notes_dir: Path) -> dict:
+    files = sorted(notes_dir.glob("*.md"), key=lambda f: f.stat().st_mtime, reverse=True)
+    snap = {
+        "dir_mtime": notes_dir.stat().st_mtime_ns,
+        "files": [f.name for f in files],
+        "sources": {},
+        "preferences": [], "contacts": [],
+        "recent": {"file": None, "date": "", "items": []},
+    }
+    for name, section in FACT_FILES.items():
+        path = notes_dir / name
+        if path.exists():
+            snap["sources"][name] = _stat(path)
+            snap[section] = _merge([], _facts(path.read_text(encoding="utf-8", errors="replace")), MAX_FACTS)
+    sessions = [f for f in files if f.name.startswith("session-")]
+    if sessions:
+        latest = sessions[0]
+        text = latest.read_text(encoding="utf-8", errors="replace")
+        snap["sources"][latest.name] = _stat(latest)
+        snap["recent"] = {"file": latest.name, "date": _last_date(text),
+                          "items": _merge([], _facts(text), MAX_RECENT)}
+    stats["builds"] += 1
+    return snap
+
+
+def _is_current(notes_dir: Path, snap: dict) -> bool:
+    try:
+        if notes_dir.stat().st_mtime_ns != snap["dir_mtime"]:
+            return False
+        return all(_stat(notes_dir / name) == stat for name, stat in snap["sources"].items())
+    except OSError:
+        return False
+
+
+def snapshot(notes_dir: Path) -> dict | None:
+    """The digest for a notes folder (None if the folder doesn't exist)."""
+    notes_dir = Path(notes_dir)
+    with _lock:
+        snap = _cache["snapshot"] if _cache["dir"] == notes_dir else None
+        if snap is not None and _is_current(notes_dir, snap):
+            return snap
+        if not notes_dir.exists():
+            _cache.update(dir=notes_dir, snapshot=None)
+            return None
+        snap = _build(notes_dir)
+        _cache.update(dir=notes_dir, snapshot=snap)
+        return snap
+
+
+def note_saved(notes_dir: Path, path: Path, previous_size: int, date: str, text: str):
+    """Fold an entry save_note just appended into the cached digest.
+
+    Falls back to dropping the cache (rebuilt on the next snapshot) when
+    the digest is stale or the change can't be applied in place.
+    """
+    notes_dir = Path(notes_dir)
+    with _lock:
+        snap = _cache["snapshot"] if _cache["dir"] == notes_dir else None
+        if snap is None:
+            return
+        name = path.name
+        is_session = name.startswith("session-")
+        digested = name in FACT_FILES or is_session
+        # A digested file must be exactly what we read before this append
+        # (an untracked session file must be brand new to become the latest)
+        recorded = snap["sources"].get(name)
+        if digested and (recorded[0] if recorded else 0) != previous_size:
+            _cache["snapshot"] = None
+            return
+
+        facts = _facts(f"\n---\n_Updated: {date}_\n\n{text}")
+        if name in FACT_FILES:
+            section = FACT_FILES[name]
+            snap[section] = _merge(snap[section], facts, MAX_FACTS)
+        elif is_session:
+            if name != snap["recent"]["file"]:
+                if snap["recent"]["file"]:
+                    snap["sources"].pop(snap["recent"]["file"], None)
+                snap["recent"] = {"file": name, "date": date, "items": []}
+            snap["recent"]["date"] = date
+            snap["recent"]["items"] = _merge(snap["recent"]["items"], facts, MAX_RECENT)
+        try:
+            if digested:
+                snap["sources"][name] = _stat(path)
+            snap["dir_mtime"] = notes_dir.stat().st_mtime_ns
+        except OSError:
+            _cache["snapshot"] = None
+            return
+        if name in snap["files"]:
+            snap["files"].remove(name)
+        snap["files"].insert(0, name)
+        stats["incremental"] += 1
+
+
+def render(snap: dict) -> str:
+    """The digest as compact text for the model."""
+    parts = []
+    if snap["preferences"]:
+        parts.append("PREFERENCES:\n" + "\n".join(f"- {fact}" for fact in snap["preferences"]))
+    if snap["contacts"]:
+        parts.append("CONTACTS:\n" + "\n".join(f"- {fact}" for fact in snap["contacts"]))
+    recent = snap["recent"]
+    if recent["items"]:
+        when = f", {recent['date']}" if recent["date"] else ""
+        parts.append(f"MOST RECENT SESSION ({recent['file']}{when}):\n"
+                     + "\n".join(f"- {item}" for item in recent["items"]))
+    parts.append(f"All note files: {', '.join(snap['files'])}\n"
+                 "(Use search_notes to look up anything not shown here.)")
+    return "\n\n".join(parts)
@@ -0,0 +1,118 @@
+"""waits.py -- Poll-until-ready waits for launching and driving Windows apps.
+
+open_application used to sleep a fixed 2-8 seconds after every launch.
+That was too long on a fast PC and sometimes too short on a slow one.
+These helpers poll with short, growing intervals until a condition holds
+or a deadline passes, so a launch costs its real startup time.
+
+Top-level windows are found with EnumWindows through ctypes. That takes
+about a millisecond and needs no UI Automation connection. A window can
+match on its title or on the executable that owns it, since titles are
+localized ("Rechner" is German Calculator) and executable names are not.
+Slower checks (UIA elements inside a window) are passed in as predicates.
+
+Author: Gregory E. Schwartz
+Event:  Anthropic's Built with Opus 4.6: a Claude Code Hackathon
+Date:   February 2026
+"""
+import platform
+import re
+import time
+
+IS_WINDOWS = platform.system() == "Windows"
+
+FIRST_INTERVAL = 0.05     # seconds between the first polls
+MAX_INTERVAL = 0.5        # polling slows down to this for slow starts
+
+
+def wait_until(predicate, timeout: float = 10.0, interval: float = FIRST_INTERVAL):
+    """Call predicate until it returns something truthy or the deadline passes.
+
+    Exceptions from predicate count as "not yet" (windows and UIA elements
+    raise while they're still being created).
+
+    Returns:
+        (result, seconds waited): result is None on timeout.
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    while True:
+        try:
+            result = predicate()
+        except Exception:
+            result = None
+        now = time.monotonic()
+        if result:
+            return result, now - start
+        if now >= deadline:
+            return None, now - start
+        time.sleep(min(interval, deadline - now))
+        interval = min(interval * 1.5, MAX_INTERVAL)
+
+
+def _process_name(hwnd) -> str:
+    """Lower-case executable name of the process that owns a window ("" if unknown)."""
+    import ctypes
+    from ctypes import wintypes
+
+    kernel32, user32 = ctypes.windll.kernel32, ctypes.windll.user32
+    pid = wintypes.DWORD()
+    user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+    process = kernel32.OpenProcess(0x1000, False, pid.value)   # PROCESS_QUERY_LIMITED_INFORMATION
+    if not process:
+        return ""
+    try:
+        buffer = ctypes.create_unicode_buffer(260)
+        size = wintypes.DWORD(len(buffer))
+        if not kernel32.QueryFullProcessImageNameW(process, 0, buffer, ctypes.byref(size)):
+            return ""
+        return buffer.value.rsplit("\\", 1)[-1].lower()
+    finally:
+        kernel32.CloseHandle(process)
+
+
+def find_windows(title_pattern: str, processes: tuple = ()) -> list[tuple[int, str]]:
+    """Visible top-level windows whose title matches a regex (case-insensitive),
+    or that belong to one of `processes` (executable names, e.g. "calc.exe").
+
+    Returns [(hwnd, title), ...]; always empty off Windows.
+    """
+    if not IS_WINDOWS:
+        return []
+    import ctypes
+    from ctypes import wintypes
+
+    user32 = ctypes.windll.user32
+    pattern = re.compile(title_pattern, re.IGNORECASE)
+    found = []
+
+    @ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+    def on_window(hwnd, _):
+        if user32.IsWindowVisible(hwnd):
+            length = user32.GetWindowTextLengthW(hwnd)
+            if length:
+                buffer = ctypes.create_unicode_buffer(length + 1)
+                user32.GetWindowTextW(hwnd, buffer, length + 1)
+                if pattern.search(buffer.value) or (processes and _process_name(hwnd) in processes):
+                    found.append((hwnd, buffer.value))
+        return True
+
+    user32.EnumWindows(on_window, 0)
+    return found
+
+
+def wait_for_new_window(title_pattern: str, existing: set[int], timeout: float = 15.0,
+                        processes: tuple = ()):
+    """Wait for a matching window that wasn't in `existing` (hwnds from before launch).
+
+    A window matches on its title or its owning executable (see find_windows).
+
+    Returns ((hwnd, title), seconds) or (None, seconds) on timeout.
+    """
+    def new_window():
+        for hwnd, title in find_windows(title_pattern, processes):
+            if hwnd not in existing:
+                return hwnd, title
+        return None
+
+    return wait_until(new_window, timeout)
@@ -0,0 +1,100 @@
+"""window_cache.py -- Reuse pywinauto windows and controls between actions.
+
+click_button and type_text used to run Application(backend="uia").connect()
+and top_window() on every call. That's a process scan plus a UI Automation
+tree walk, hundreds of milliseconds each time, repeated for every field in
+a form. This cache keeps:
+
+- the connected application and its top window per title pattern. Before
+  each use the application's current top window is looked up again (a
+  cheap enumeration of its top-level windows, no process scan); if a newer
+  window such as an Outlook compose window or a dialog is on top now, that
+  window replaces the cached one, just as a fresh connect would pick it;
+- each control already found in that window, keyed by (name, control type).
+
+A stale entry (window closed, dialog rebuilt) is dropped and looked up
+again, so the cache can only save time, never click the wrong thing.
+
+Author: Gregory E. Schwartz
+Event:  Anthropic's Built with Opus 4.6: a Claude Code Hackathon
+Date:   February 2026
+"""
+import threading
+
+_windows = {}   # title pattern -> {"app", "spec", "window", "controls"}
+_lock = threading.Lock()
+stats = {"connects": 0, "control_lookups": 0}
+
+
+def _key(window_title: str) -> str:
+    return window_title.strip().lower()
+
+
+def _entry_for(app, window) -> dict:
+    # A handle-based spec makes child lookups start from exactly this window
+    return {"app": app, "spec": app.window(handle=window.handle), "window": window, "controls": {}}
+
+
+def _connect(window_title: str, timeout: float) -> dict:
+    import pywinauto
+
+    app = pywinauto.Application(backend="uia")
+    app.connect(title_re=f".*{window_title}.*", timeout=timeout)
+    stats["connects"] += 1
+    return _entry_for(app, app.top_window().wrapper_object())
+
+
+def _entry(window_title: str, timeout: float) -> dict:
+    """The cache entry for a title pattern, checked against the app's top window."""
+    key = _key(window_title)
+    with _lock:
+        entry = _windows.get(key)
+    if entry is not None:
+        try:
+            top = entry["app"].top_window().wrapper_object()
+            if top.handle == entry["window"].handle:
+                return entry
+            # A newer window is on top now (compose window, dialog): use it
+            entry = _entry_for(entry["app"], top)
+        except Exception:
+            entry = None    # the window or its process is gone
+    if entry is None:
+        entry = _connect(window_title, timeout)
+    with _lock:
+        _windows[key] = entry
+    return entry
+
+
+def get_window(window_title: str, timeout: float = 10):
+    """Connected pywinauto wrapper for the top window of the app matching a title pattern."""
+    return _entry(window_title, timeout)["window"]
+
+
+def get_control(window_title: str, name: str, control_type: str):
+    """A control inside the cached window, found once and then reused."""
+    entry = _entry(window_title, 10)
+    with _lock:
+        control = entry["controls"].get((name, control_type))
+    if control is not None:
+        try:
+            if control.is_visible():
+                return control
+        except Exception:
+            pass
+    control = entry["spec"].child_window(title=name, control_type=control_type).wrapper_object()
+    stats["control_lookups"] += 1
+    with _lock:
+        entry["controls"][(name, control_type)] = control
+    return control
+
+
+def forget(window_title: str):
+    """Drop one window (and its controls) from the cache."""
+    with _lock:
+        _windows.pop(_key(window_title), None)
+
+
+def clear():
+    """Drop every cached window."""
+    with _lock:
+        _windows.clear()
@@ -0,0 +1,164 @@
+"""word_session.py -- One warm Word COM connection shared by the Word tools.
+
+open_application("word"), type_text into Word, save_document_as_pdf and
+save_document_as_word each used to Dispatch/GetActiveObject
+"Word.Application" on their own. This module keeps the connection and
+offers bulk operations:
+
+- get_word(): the cached Word.Application, checked with one cheap
+  property read and reacquired if Word was closed or restarted;
+- insert_text(): a whole multi-paragraph letter in one Range.InsertAfter
+  instead of Selection.TypeText;
+- save_active_document(): PDF (ExportAsFixedFormat) or DOCX (SaveAs2) in
+  one call.
+
+COM references belong to the thread (apartment) that made them, and the
+Flask server handles each request on a new thread. So one dedicated "word"
+thread owns the process's only Word reference (and its CoInitialize), and
+every operation is submitted to it with run(): one warm connection per
+process, whichever thread the tool was called from.
+
+Author: Gregory E. Schwartz
+Event:  Anthropic's Built with Opus 4.6: a Claude Code Hackathon
+Date:   February 2026
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# HRESULTs meaning the Word process behind a reference is gone
+_DISCONNECTED = {
+    -2147023174,  # RPC_S_SERVER_UNAVAILABLE — Word was closed
+    -2147417848,  # RPC_E_DISCONNECTED — object disconnected from its clients
+    -2147023170,  # RPC_S_CALL_FAILED
+}
+
+WD_FORMAT_DOCX = 16      # wdFormatDocumentDefault
+WD_EXPORT_PDF = 17       # wdExportFormatPDF
+WD_COLLAPSE_END = 0
+
+# Everything below runs on this one thread; _state is only touched there
+_state = {"com_ready": False, "word": None, "thread": None}
+_com_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="word",
+                                 initializer=lambda: _state.update(thread=threading.get_ident()))
+stats = {"connects": 0}
+
+
+def _is_disconnected(error: Exception) -> bool:
+    args = getattr(error, "args", ())
+    return bool(args) and args[0] in _DISCONNECTED
+
+
+def _acquire(create: bool):
+    import pythoncom
+    import win32com.client
+
+    if not _state["com_ready"]:
+        pythoncom.CoInitialize()
+        _state["com_ready"] = True
+    try:
+        word = win32com.client.GetActiveObject("Word.Application")
+    except Exception:
+        if not create:
+            raise
+        word = win32com.client.Dispatch("Word.Application")
+    stats["connects"] += 1
+    return word
+
+
+def _on_com_thread() -> bool:
+    return _state["thread"] == threading.get_ident()
+
+
+def get_word(create: bool = False):
+    """The cached Word.Application, reconnecting if Word went away.
+
+    Only valid on the Word thread: use it inside an action passed to run().
+
+    Args:
+        create: start Word if it isn't running (otherwise raise)
+    """
+    word = _state["word"]
+    if word is not None:
+        try:
+            word.Name  # one round-trip; raises if the Word process is gone
+            return word
+        except Exception:
+            _state["word"] = None
+    _state["word"] = _acquire(create)
+    return _state["word"]
+
+
+def _forget():
+    _state["word"] = None
+
+
+def reset():
+    """Forget the Word reference (released on the Word thread)."""
+    _com_thread.submit(_forget).result()
+
+
+def _run_here(action, create: bool):
+    try:
+        return action(get_word(create))
+    except Exception as e:
+        if not _is_disconnected(e):
+            raise
+        _forget()
+        return action(get_word(create))
+
+
+def run(action, create: bool = False):
+    """Call action(word) on the Word thread, reconnecting once if the reference went stale.
+
+    Blocks until it's done and returns its result (or raises its error).
+    Don't return COM objects out of action; they only work on the Word thread.
+    """
+    if _on_com_thread():
+        return _run_here(action, create)
+    return _com_thread.submit(_run_here, action, create).result()
+
+
+def new_document():
+    """Show Word with a new blank document (starting Word if needed)."""
+    def add(word):
+        word.Visible = True
+        word.Documents.Add()
+
+    return run(add, create=True)
+
+
+def insert_text(text: str):
+    """Type text at the cursor with one Range.InsertAfter, replacing any selection.
+
+    Newlines become Word paragraph marks; the cursor ends up after the text.
+    """
+    body = text.replace("\r\n", "\n").replace("\n", "\r")
+
+    def insert(word):
+        word.Activate()
+        rng = word.Selection.Range
+        if rng.Start != rng.End:
+            rng.Text = ""
+        rng.InsertAfter(body)
+        rng.Collapse(WD_COLLAPSE_END)
+        rng.Select()
+
+    run(insert)
+
+
+def save_active_document(save_path: str, fmt: str) -> str:
+    """Save the active document as "pdf" or "docx"; returns the final path."""
+    extension = f".{fmt}"
+    if not save_path.lower().endswith(extension):
+        save_path = save_path + extension
+
+    def save(word):
+        doc = word.ActiveDocument
+        if fmt == "pdf":
+            # Export keeps the open document's own file name and format
+            doc.ExportAsFixedFormat(save_path, WD_EXPORT_PDF)
+        else:
+            doc.SaveAs2(save_path, FileFormat=WD_FORMAT_DOCX)
+
+    run(save)
+    return save_path
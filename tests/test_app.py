@@ -204,3 +204,67 @@ def test_execute_tool_smart_save_document():
     result = execute_tool("smart_save_document", {"content": "test", "title": "Test"})
     assert isinstance(result, str)
     assert "saved" in result.lower()
+
+
+# ---------- In-turn screenshot lifecycle ----------
+
+def _screenshot(tag):
+    return [
+        {"type": "image", "source": {"type": "base64", "media_type": "image/jpeg", "data": tag * 5000}},
+        {"type": "text", "text": "Here is a screenshot of the user's screen."},
+    ]
+
+def test_call_claude_resends_only_newest_screenshot():
+    """Multi-round vision turns keep one image in the request, not one per round."""
+    import json
+    from types import SimpleNamespace
+    from unittest.mock import MagicMock, patch
+    from frontend.app import call_claude
+
+    def tool_round(n):
+        block = SimpleNamespace(type="tool_use", id=f"tu_{n}", name="verify_screen_step",
+                                input={"expected": f"step {n}"})
+        return SimpleNamespace(content=[block])
+
+    final = SimpleNamespace(content=[SimpleNamespace(type="text", text="All done!")])
+    replies = iter([tool_round(1), tool_round(2), tool_round(3), final])
+    sent = []
+
+    def create(**kwargs):
+        sent.append(json.dumps(kwargs["messages"]))
+        return next(replies)
+
+    fake = MagicMock()
+    fake.messages.create.side_effect = create
+
+    shots = iter([_screenshot("A"), _screenshot("B"), _screenshot("C")])
+    with patch("frontend.app.client", fake), \
+         patch("frontend.app.execute_tool", side_effect=lambda name, args: next(shots)):
+        reply, _, history = call_claude([{"role": "user", "content": "did it work?"}])
+
+    assert reply == "All done!"
+    last_request = sent[-1]
+    assert last_request.count('"type": "image"') == 1
+    assert "C" * 5000 in last_request and "A" * 5000 not in last_request
+    assert "Earlier screenshot from verify_screen_step (expected: step 1)" in last_request
+    # Payload stays roughly flat instead of growing by a screenshot per round
+    assert len(sent[-1]) < len(sent[1]) + 1000
+
+def test_screenshots_from_the_same_round_all_reach_the_model():
+    import json
+    from frontend.app import _retire_old_screenshots
+
+    def calls(*ids):
+        return {"role": "assistant", "content": [
+            {"type": "tool_use", "id": i, "name": "read_my_screen", "input": {}} for i in ids]}
+
+    def results(*pairs):
+        return {"role": "user", "content": [
+            {"type": "tool_result", "tool_use_id": i, "content": _screenshot(tag)} for i, tag in pairs]}
+
+    history = [{"role": "user", "content": "what's on my screens?"},
+               calls("tu_1"), results(("tu_1", "A")),
+               calls("tu_2", "tu_3"), results(("tu_2", "B"), ("tu_3", "C"))]
+    kept = json.dumps(_retire_old_screenshots(history))
+    assert kept.count('"type": "image"') == 2
+    assert "B" * 5000 in kept and "C" * 5000 in kept and "A" * 5000 not in kept
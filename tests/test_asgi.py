@@ -0,0 +1,190 @@
+"""Tests for the async (ASGI) serving mode (frontend/asgi.py)."""
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from starlette.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from frontend import app as shared
+from frontend import asgi
+from mcp_servers import health_history
+
+
+def _block(**fields):
+    return SimpleNamespace(**fields)
+
+
+def _text(text):
+    return SimpleNamespace(content=[_block(type="text", text=text)])
+
+
+def _tool_call(name, tool_id="t1", **args):
+    return SimpleNamespace(content=[_block(type="tool_use", id=tool_id, name=name, input=args)])
+
+
+class FakeAsyncClient:
+    """AsyncAnthropic stand-in: replays scripted responses after a network-like wait."""
+
+    def __init__(self, script, delay=0.0):
+        self.script = script
+        self.delay = delay
+        self.requests = []
+        self.messages = self
+
+    async def create(self, **kwargs):
+        self.requests.append(kwargs)
+        await asyncio.sleep(self.delay)
+        return self.script(kwargs)
+
+
+@pytest.fixture(autouse=True)
+def no_sampler(monkeypatch):
+    # The app's lifespan starts the health sampler; keep it off the real history file
+    monkeypatch.setattr(health_history, "start", lambda *a, **k: False)
+    monkeypatch.setattr(health_history, "stop", lambda: None)
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    def install(script, delay=0.0):
+        client = FakeAsyncClient(script, delay)
+        monkeypatch.setattr(asgi, "async_client", client)
+        return client
+    return install
+
+
+def test_chat_runs_tool_rounds_off_the_event_loop(fake):
+    ran_on = []
+
+    def check_email():
+        ran_on.append(threading.current_thread().name)
+        return "3 new emails"
+
+    def script(request):
+        return _text("You have 3 new emails.") if len(request["messages"]) > 1 else _tool_call("check_email")
+
+    fake(script)
+    with patch.dict(shared.TOOL_FUNCTIONS, {"check_email": check_email}), TestClient(asgi.app) as client:
+        client.get("/")
+        resp = client.post("/chat", json={"message": "check my email"})
+    assert resp.json() == {"reply": "You have 3 new emails."}
+    assert ran_on and ran_on[0].startswith("tools")
+
+
+def test_state_store_calls_stay_off_the_event_loop(fake, monkeypatch):
+    from frontend import state_store
+    ran_on = []
+    real = {name: getattr(state_store, name) for name in ("get_history", "put_history", "take_family_messages")}
+
+    def spy(name):
+        def call(*args):
+            ran_on.append(threading.current_thread().name)
+            return real[name](*args)
+        return call
+
+    for name in real:
+        monkeypatch.setattr(state_store, name, spy(name))
+    fake(lambda request: _text("hello"))
+    with TestClient(asgi.app) as client:
+        client.get("/")
+        client.post("/chat", json={"message": "hi"})
+        client.get("/family/messages")
+    assert len(ran_on) >= 4 and all(name.startswith("state") for name in ran_on)
+
+
+def test_history_is_kept_per_session(fake):
+    client_fake = fake(lambda request: _text(f"seen {len(request['messages'])}"))
+    with TestClient(asgi.app) as client:
+        client.post("/chat", json={"message": "hi"})
+        resp = client.post("/chat", json={"message": "again"})
+    assert resp.json()["reply"] == "seen 3"
+    assert client_fake.requests[-1]["messages"][0]["content"] == "hi"
+
+
+def test_empty_message(fake):
+    with TestClient(asgi.app) as client:
+        resp = client.post("/chat", json={"message": "  "})
+    assert resp.json()["reply"] == shared.EMPTY_MESSAGE_REPLY
+
+
+def test_api_failure_gives_friendly_reply(fake):
+    def script(request):
+        raise RuntimeError("boom")
+
+    fake(script)
+    with TestClient(asgi.app) as client:
+        resp = client.post("/chat", json={"message": "hello"})
+    assert resp.json()["reply"] == "Something went wrong on my end. Let's try that again."
+
+
+def test_many_conversations_share_one_thread(fake):
+    fake(lambda request: _text("done"), delay=0.3)
+
+    async def burst():
+        before = threading.active_count()
+        start = time.perf_counter()
+        replies = await asyncio.gather(*(asgi.call_claude_async([{"role": "user", "content": f"hi {i}"}])
+                                         for i in range(200)))
+        return replies, time.perf_counter() - start, threading.active_count() - before
+
+    replies, elapsed, new_threads = asyncio.run(burst())
+    assert all(reply == "done" for reply, _, _ in replies)
+    assert elapsed < 2.0          # 200 x 0.3 s of API wait, overlapped
+    assert new_threads == 0
+
+
+def test_async_tools_are_awaited_directly():
+    async def ping():
+        await asyncio.sleep(0)
+        return "pong"
+
+    with patch.dict(shared.TOOL_FUNCTIONS, {"ping": ping}):
+        assert asyncio.run(asgi.execute_tool_async("ping", {})) == "pong"
+    assert asyncio.run(asgi.execute_tool_async("nonexistent_tool", {})).startswith("Unknown tool")
+
+
+def test_sms_simulate_acknowledges_then_delivers(fake):
+    fake(lambda request: _text("Sarah, her printer is back online."), delay=0.05)
+    shared._pending_family_messages.clear()
+    with TestClient(asgi.app) as client:
+        resp = client.post("/sms/simulate", json={"from_number": "+15551234567",
+                                                  "message": "is mom's printer working?"})
+        assert resp.json()["reply"] == shared.SMS_ACK_REPLY
+        for _ in range(50):
+            messages = client.get("/family/messages").json()["messages"]
+            if messages:
+                break
+            time.sleep(0.02)
+    assert messages[0]["from_name"] == "Sarah"
+    assert "printer is back online" in messages[0]["result"]
+
+
+def test_sms_simulate_refuses_unauthorized_delete(fake):
+    with TestClient(asgi.app) as client:
+        resp = client.post("/sms/simulate", json={"from_number": "+15551234567",
+                                                  "message": "delete all her emails"})
+    assert "can't do that through SMS" in resp.json()["reply"]
+
+
+def test_sms_incoming_returns_twiml(fake):
+    fake(lambda request: _text("All good, Michael."))
+    with TestClient(asgi.app) as client:
+        resp = client.post("/sms/incoming", data={"From": "+15559876543", "Body": "check on mom"})
+        unknown = client.post("/sms/incoming", data={"From": "+19999999999", "Body": "hi"})
+    assert resp.headers["content-type"].startswith("text/xml")
+    assert "<Message>All good, Michael.</Message>" in resp.text
+    assert "isn't authorized" in unknown.text
+
+
+def test_index_serves_chat_page():
+    with TestClient(asgi.app) as client:
+        resp = client.get("/")
+    assert resp.status_code == 200
+    assert "<html" in resp.text.lower()
@@ -0,0 +1,86 @@
+"""Tests for concurrent diagnostics (mcp_servers/diagnostics.py) and the
+Windows reports built on them, with PowerShell replaced by fakes."""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mcp_servers import diagnostics
+from mcp_servers import screen_dispatch as sd
+
+
+def _slow(value, seconds):
+    def probe():
+        time.sleep(seconds)
+        return value
+    return probe
+
+
+def test_probes_run_concurrently():
+    start = time.monotonic()
+    results = diagnostics.run_probes({name: _slow(name, 0.3) for name in ("a", "b", "c")})
+    assert time.monotonic() - start < 0.8
+    assert [r["value"] for r in results.values()] == ["a", "b", "c"]
+    assert all(r["status"] == diagnostics.DONE for r in results.values())
+
+
+def test_timings_go_to_stderr(capsys):
+    diagnostics.run_probes({"a": _slow("a", 0)})
+    out, err = capsys.readouterr()
+    assert out == "" and "Diagnostics in" in err
+
+
+def test_deadline_returns_partial_results():
+    def broken():
+        raise RuntimeError("no printer service")
+
+    start = time.monotonic()
+    results = diagnostics.run_probes(
+        {"fast": _slow("ok", 0), "slow": _slow("late", 2), "broken": broken}, deadline=0.3)
+    assert time.monotonic() - start < 1.0
+    assert results["fast"]["value"] == "ok"
+    assert results["slow"]["status"] == diagnostics.TIMED_OUT
+    assert results["broken"]["status"] == diagnostics.FAILED
+    assert "no printer service" in results["broken"]["error"]
+    assert diagnostics.timed_out(results) == ["slow"]
+    assert "took too long" in diagnostics.partial_note(results)
+
+
+def test_partial_note_empty_when_everything_finished():
+    assert diagnostics.partial_note(diagnostics.run_probes({"a": _slow(1, 0)})) == ""
+
+
+def _fake_probes(monkeypatch, delays):
+    """Replace the native health probes with fixed readings and per-probe delays."""
+    readings = {
+        "memory": {"total": 16 * 2**30, "used": 12 * 2**30, "available": 4 * 2**30, "percent": 75},
+        "disk": {"total": 300 * 2**30, "used": 100 * 2**30, "free": 200 * 2**30, "percent": 33},
+        "top_processes": [{"name": "chrome", "rss": 1800 * 2**20, "count": 12}],
+    }
+    for name, value in readings.items():
+        def probe(*args, _value=value, _delay=delays.get(name, 0)):
+            time.sleep(_delay)
+            return _value
+        monkeypatch.setattr(sd.health_probes, name, probe)
+
+
+def test_system_health_waits_for_slowest_probe_not_the_sum(monkeypatch):
+    _fake_probes(monkeypatch, {"memory": 0.3, "disk": 0.3, "top_processes": 0.3})
+    start = time.monotonic()
+    report = sd.check_system_health()
+    assert time.monotonic() - start < 0.8
+    assert "Using 12.0 of 16.0 GB (75% full)" in report
+    assert "200.0 GB free" in report
+    assert "chrome — using 1800 MB" in report
+    assert "took too long" not in report
+
+
+def test_system_health_marks_probe_that_missed_deadline(monkeypatch):
+    monkeypatch.setattr(diagnostics, "DEFAULT_DEADLINE", 0.3)
+    _fake_probes(monkeypatch, {"top_processes": 2})
+    report = sd.check_system_health()
+    assert "MEMORY: Using" in report
+    assert "HARD DRIVE:" in report and "GB free" in report
+    assert "PROGRAMS: Listing programs took too long, so I skipped it." in report
+    assert "missing a part" in report
@@ -486,10 +486,11 @@ def test_check_system_health_returns_report():
     assert len(result) > 20  # Should have meaningful content
 
 def test_check_system_health_non_windows():
-    """On non-Windows, should return helpful fallback tips."""
+    """On non-Windows, should report real numbers plus a helpful tip."""
     from mcp_servers.screen_dispatch import check_system_health, IS_WINDOWS
     result = check_system_health()
     if not IS_WINDOWS:
+        assert "MEMORY:" in result
         assert "try" in result.lower() or "restart" in result.lower()
 
 def test_fix_frozen_program_empty_name():
@@ -514,11 +515,11 @@ def test_check_internet_returns_status():
     assert len(result) > 20
 
 def test_check_internet_non_windows():
-    """On non-Windows, should return WiFi troubleshooting steps."""
+    """On non-Windows, should run the socket checks and report on the connection."""
     from mcp_servers.screen_dispatch import check_internet, IS_WINDOWS
     result = check_internet()
     if not IS_WINDOWS:
-        assert "wifi" in result.lower()
+        assert "INTERNET:" in result
 
 
 # ---------- smart_save_document ----------
@@ -565,3 +566,226 @@ def test_smart_save_document_has_header(tmp_path, monkeypatch):
     files = list(saved_dir.glob("*.txt"))
     content = files[0].read_text()
     assert "Saved by TechBuddy" in content
+
+
+# ---------- Inbox scam triage ----------
+
+def _fake_triage_client(reply_text):
+    from unittest.mock import MagicMock
+    block = MagicMock(type="text", text=reply_text)
+    client = MagicMock()
+    client.messages.create.return_value = MagicMock(content=[block])
+    return client
+
+def _triage_rows():
+    return [
+        {"id": 201, "from": "Library <news@library.org>", "subject": "Urgent: book club moved",
+         "body": "The meeting moved to 3pm Tuesday."},
+        {"id": 202, "from": "Library <news@library.org>", "subject": "New arrivals",
+         "body": "Final notice: your books are overdue."},
+        {"id": 203, "from": "Sarah <sarah@gmail.com>", "subject": "Dinner", "body": "See you Sunday!"},
+        {"id": 204, "from": "Prize <win@prize-now.xyz>", "subject": "You have won",
+         "body": "Send your bank account number and SSN to claim your prize."},
+    ]
+
+def test_triage_inbox_one_llm_call_for_ambiguous(monkeypatch):
+    import mcp_servers.screen_dispatch as sd
+    monkeypatch.setattr(sd, "_scam_verdicts", {})
+    client = _fake_triage_client(
+        '[{"n": 1, "risk": "LOW", "type": "none", "reason": "Routine library update."},'
+        ' {"n": 2, "risk": "MEDIUM", "type": "other", "reason": "Pushy wording."}]'
+    )
+    set_anthropic_client(client)
+    try:
+        verdicts = sd.triage_inbox(_triage_rows())
+    finally:
+        set_anthropic_client(None)
+    # Two ambiguous library emails, one request
+    assert client.messages.create.call_count == 1
+    assert verdicts["sim-201"]["source"] == "llm"
+    assert verdicts["sim-201"]["risk"] == "SAFE"
+    assert verdicts["sim-202"]["risk"] == "SUSPICIOUS"
+    # Clear-cut messages never reach the LLM
+    assert verdicts["sim-203"]["risk"] == "SAFE"
+    assert verdicts["sim-204"]["risk"] == "DANGEROUS"
+    assert verdicts["sim-204"]["source"] == "local"
+
+def test_triage_inbox_caches_verdicts(monkeypatch):
+    import mcp_servers.screen_dispatch as sd
+    monkeypatch.setattr(sd, "_scam_verdicts", {})
+    rows = _triage_rows()
+    set_anthropic_client(_fake_triage_client(
+        '[{"n": 1, "risk": "LOW", "type": "none", "reason": "ok"},'
+        ' {"n": 2, "risk": "LOW", "type": "none", "reason": "ok"}]'))
+    try:
+        first = sd.triage_inbox(rows)
+    finally:
+        set_anthropic_client(None)
+    with patch("mcp_servers.screen_dispatch._find_scam_flags_batch") as batch:
+        second = sd.triage_inbox(rows)
+    batch.assert_not_called()
+    assert first == second
+
+def test_triage_inbox_retries_ambiguous_the_llm_missed(monkeypatch):
+    import mcp_servers.screen_dispatch as sd
+    monkeypatch.setattr(sd, "_scam_verdicts", {})
+    rows = _triage_rows()
+    offline = sd.triage_inbox(rows)          # no client: ambiguous ones stay local
+    assert offline["sim-201"]["retry"] and not offline["sim-203"]["retry"]
+    assert "sim-201" not in sd._scam_verdicts and "sim-203" in sd._scam_verdicts
+    client = _fake_triage_client(
+        '[{"n": 1, "risk": "LOW", "type": "none", "reason": "ok"},'
+        ' {"n": 2, "risk": "HIGH", "type": "phishing", "reason": "Fake overdue notice."}]')
+    set_anthropic_client(client)
+    try:
+        online = sd.triage_inbox(rows)
+    finally:
+        set_anthropic_client(None)
+    assert client.messages.create.call_count == 1
+    assert online["sim-202"]["source"] == "llm" and online["sim-202"]["risk"] == "DANGEROUS"
+
+def test_scam_verdict_cache_is_capped(monkeypatch):
+    import mcp_servers.screen_dispatch as sd
+    monkeypatch.setattr(sd, "_scam_verdicts", {})
+    monkeypatch.setattr(sd, "MAX_SCAM_VERDICTS", 3)
+    rows = [{"id": 300 + i, "from": "Sarah <sarah@gmail.com>", "subject": "Hi", "body": f"Lunch {i}?"}
+            for i in range(5)]
+    sd.triage_inbox(rows[:3])
+    sd.triage_inbox(rows[:1])                # sim-300 is now the most recently used
+    sd.triage_inbox(rows[3:])
+    assert list(sd._scam_verdicts) == ["sim-300", "sim-303", "sim-304"]
+
+def test_read_email_agrees_with_triage(monkeypatch):
+    import mcp_servers.screen_dispatch as sd
+    monkeypatch.setattr(sd, "_scam_verdicts", {})
+    monkeypatch.setattr(sd, "USE_REAL_GMAIL", False)
+    row = {"id": 205, "from": "Library <news@library.org>", "subject": "New arrivals",
+           "date": "February 12, 2026 at 9:00 AM", "body": "Final notice: your books are overdue.",
+           "is_read": False}
+    monkeypatch.setattr(sd, "SIMULATED_INBOX", sd.SIMULATED_INBOX + [row])
+    set_anthropic_client(_fake_triage_client(
+        '[{"n": 1, "risk": "HIGH", "type": "phishing", "reason": "Fake overdue notice."}]'))
+    try:
+        sd.triage_inbox([row])
+    finally:
+        set_anthropic_client(None)
+    result = read_email(205)
+    assert "DANGER" in result and "Fake overdue notice." in result
+
+def test_read_email_triage_never_lowers_full_body_risk(monkeypatch):
+    import mcp_servers.screen_dispatch as sd
+    monkeypatch.setattr(sd, "_scam_verdicts", {})
+    monkeypatch.setattr(sd, "USE_REAL_GMAIL", False)
+    row = {"id": 206, "from": "Prize <win@prize-now.xyz>", "subject": "You have won",
+           "date": "February 12, 2026 at 9:00 AM", "is_read": False,
+           "body": "Send your bank account number and SSN to claim your prize."}
+    monkeypatch.setattr(sd, "SIMULATED_INBOX", sd.SIMULATED_INBOX + [row])
+    sd._store_verdict("sim-206", {"risk": "SAFE", "flags": [], "source": "llm",
+                                  "llm": {"reason": "Looks fine."}, "digest": sd._message_digest(row)})
+    result = read_email(206)
+    assert "DANGER" in result and "Looks fine." not in result
+
+def test_read_email_ignores_verdict_for_a_different_message(monkeypatch):
+    import mcp_servers.screen_dispatch as sd
+    monkeypatch.setattr(sd, "_scam_verdicts", {})
+    monkeypatch.setattr(sd, "USE_REAL_GMAIL", False)
+    row = {"id": 207, "from": "Sarah <sarah@gmail.com>", "subject": "Dinner",
+           "date": "February 12, 2026 at 9:00 AM", "body": "See you Sunday!", "is_read": False}
+    monkeypatch.setattr(sd, "SIMULATED_INBOX", sd.SIMULATED_INBOX + [row])
+    sd._store_verdict("sim-207", {"risk": "DANGEROUS", "flags": [("financial", "gift card")],
+                                  "source": "local", "llm": None, "digest": "stale"})
+    assert "DANGER" not in read_email(207)
+    assert "sim-207" not in sd._scam_verdicts
+
+class _FakeIMAP:
+    """Just enough of imaplib.IMAP4_SSL for the Gmail fetchers; sequence calls fail."""
+    RAW = (b"From: Library <news@library.org>\r\nSubject: New arrivals\r\n"
+           b"Date: Thu, 12 Feb 2026 09:00:00 +0000\r\n\r\n"
+           b"Final notice: your books are overdue.\r\n")
+
+    def __init__(self, host):
+        self.calls = []
+
+    def login(self, user, password):
+        return "OK", []
+
+    def select(self, folder):
+        return "OK", [b"2"]
+
+    def logout(self):
+        pass
+
+    def search(self, *args):
+        raise AssertionError("sequence numbers shift after a delete; use UID SEARCH")
+
+    fetch = store = search
+
+    def uid(self, command, *args):
+        self.calls.append(command)
+        if command == "SEARCH":
+            return "OK", [b"7001 7002"]
+        if command == "FETCH" and args[1] == "(RFC822)":
+            return "OK", [(b"1 (UID %s RFC822 {99}" % args[0], self.RAW), b")"]
+        if command == "FETCH":
+            header, text = self.RAW.split(b"\r\n\r\n", 1)
+            return "OK", [(b"1 (UID %s FLAGS () BODY[HEADER.FIELDS (FROM SUBJECT DATE)] {9}" % args[0], header),
+                          (b" BODY[TEXT]<0> {9}", text), b")"]
+        return "OK", []
+
+def test_gmail_fetchers_use_uids_and_share_triage_verdicts(monkeypatch):
+    import imaplib
+    import mcp_servers.screen_dispatch as sd
+    monkeypatch.setattr(imaplib, "IMAP4_SSL", _FakeIMAP)
+    monkeypatch.setattr(sd, "_scam_verdicts", {})
+    monkeypatch.setattr(sd, "USE_REAL_GMAIL", True)
+    inbox = sd._fetch_gmail_inbox()
+    assert [e["uid"] for e in inbox] == ["7002", "7001"]
+    message = sd._fetch_gmail_message(1)
+    assert message["uid"] == "7002"
+    assert sd._message_digest(message) == sd._message_digest(inbox[0])
+    set_anthropic_client(_fake_triage_client(
+        '[{"n": 1, "risk": "HIGH", "type": "phishing", "reason": "Fake overdue notice."},'
+        ' {"n": 2, "risk": "HIGH", "type": "phishing", "reason": "Fake overdue notice."}]'))
+    try:
+        sd.triage_inbox(inbox)
+    finally:
+        set_anthropic_client(None)
+    assert "Fake overdue notice." in read_email(1)
+
+def test_triage_inbox_rescans_changed_message(monkeypatch):
+    import mcp_servers.screen_dispatch as sd
+    monkeypatch.setattr(sd, "_scam_verdicts", {})
+    rows = _triage_rows()
+    sd.triage_inbox(rows)
+    rows[2] = {**rows[2], "body": "Please buy a gift card and send me the code."}
+    assert sd.triage_inbox(rows)["sim-203"]["risk"] == "DANGEROUS"
+
+def test_triage_inbox_scans_each_sender_once(monkeypatch):
+    import mcp_servers.screen_dispatch as sd
+    monkeypatch.setattr(sd, "_scam_verdicts", {})
+    calls = []
+    real = sd._find_scam_flags
+    def spy(text, entities):
+        calls.append(text)
+        return real(text, entities)
+    monkeypatch.setattr(sd, "_find_scam_flags", spy)
+    sd.triage_inbox(_triage_rows())
+    assert calls.count("Library <news@library.org>") == 1
+
+def test_find_scam_flags_batch_matches_single():
+    import mcp_servers.screen_dispatch as sd
+    from mcp_servers.extraction import extract_entities
+    texts = [r["body"] for r in _triage_rows()] + ["Call 1-888-555-0123, virus detected! bit.ly/x"]
+    batch = sd._find_scam_flags_batch(texts, [extract_entities(t) for t in texts])
+    single = [sd._find_scam_flags(t, extract_entities(t)) for t in texts]
+    assert batch == single
+
+def test_triage_inbox_survives_bad_llm_reply(monkeypatch):
+    import mcp_servers.screen_dispatch as sd
+    monkeypatch.setattr(sd, "_scam_verdicts", {})
+    set_anthropic_client(_fake_triage_client("Sorry, I can't help with that."))
+    try:
+        verdicts = sd.triage_inbox(_triage_rows())
+    finally:
+        set_anthropic_client(None)
+    assert all(v["source"] == "local" for v in verdicts.values())
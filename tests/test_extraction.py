@@ -0,0 +1,125 @@
+"""Tests for extraction.py — one-pass URL/email/phone tokenizing for Scam Shield."""
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mcp_servers.extraction import (
+    extract_entities,
+    entity_hosts,
+    host_matches,
+    find_links,
+)
+from mcp_servers.screen_dispatch import (
+    _scan_for_scam,
+    _web_verify_scam,
+    check_for_meeting_links,
+    join_video_call,
+    TRUSTED_MEETING_DOMAINS,
+)
+
+
+def test_extracts_url_with_scheme():
+    ents = extract_entities("Join here: https://zoom.us/j/3678174163.")
+    assert ents["urls"][0]["url"] == "https://zoom.us/j/3678174163"
+    assert ents["urls"][0]["host"] == "zoom.us"
+    assert ents["phones"] == []  # meeting ID digits belong to the link
+
+def test_extracts_bare_domain_with_path():
+    ents = extract_entities("Click here to claim: bit.ly/claim-prize-now")
+    assert ents["urls"][0]["host"] == "bit.ly"
+    assert ents["urls"][0]["tld"] == "ly"
+
+def test_extracts_email_before_domain():
+    ents = extract_entities("Send this to claim@free-prizes-now.xyz today")
+    assert ents["emails"][0]["host"] == "free-prizes-now.xyz"
+    assert ents["urls"] == []
+
+def test_extracts_phone_formats():
+    ents = extract_entities("Call 1-800-829-1040 or (555) 234-5678 now")
+    digits = [p["digits"] for p in ents["phones"]]
+    assert digits == ["18008291040", "5552345678"]
+
+def test_filename_is_not_a_domain():
+    ents = extract_entities("See the attached Appointment_Details.pdf")
+    assert ents["urls"] == []
+
+def test_entity_hosts_dedupes():
+    ents = extract_entities("a@cvs.com and https://cvs.com/rx and cvs.com")
+    assert entity_hosts(ents) == ["cvs.com"]
+
+def test_host_matches_subdomain_only():
+    assert host_matches("us02web.zoom.us", "zoom.us")
+    assert not host_matches("notzoom.us", "zoom.us")
+    assert not host_matches("zoom.us.evil.com", "zoom.us")
+
+def test_find_links_by_domain():
+    ents = extract_entities("https://evil.com/zoom.us and https://meet.google.com/abc-defg-hij")
+    assert find_links(ents, TRUSTED_MEETING_DOMAINS) == ["https://meet.google.com/abc-defg-hij"]
+
+
+# --- Scam scanner uses parsed hosts, not substrings ---
+
+def test_info_tld_does_not_match_information():
+    scan = _scan_for_scam("Here is more information about the book club.")
+    assert scan["risk"] == "SAFE"
+
+def test_info_tld_matches_real_domain():
+    scan = _scan_for_scam("Visit prize-center.info to collect")
+    assert ("suspicious_tld", ".info") in scan["flags"]
+
+def test_authority_keyword_needs_word_start():
+    scan = _scan_for_scam("First, please read this message carefully.")
+    assert not any(cat == "authority" for cat, _ in scan["flags"])
+
+def test_scan_returns_entities():
+    scan = _scan_for_scam("Call 1-888-555-0123 about tinyurl.com/x")
+    assert scan["entities"]["phones"][0]["digits"] == "18885550123"
+    assert ("shortened_url", "tinyurl.com") in scan["flags"]
+
+def test_web_verify_reuses_entities():
+    ents = extract_entities("Call 1-888-555-0123")
+    with patch("mcp_servers.screen_dispatch._search_web_raw", return_value=[]) as search, \
+         patch("mcp_servers.screen_dispatch.extract_entities") as extract:
+        _web_verify_scam("Call 1-888-555-0123", [], ents)
+    extract.assert_not_called()
+    search.assert_called_once()
+
+def test_web_verify_skips_known_numbers():
+    with patch("mcp_servers.screen_dispatch._search_web_raw", return_value=[]) as search:
+        _web_verify_scam("The IRS number is 1-800-829-1040", [])
+    search.assert_not_called()
+
+
+# --- Video call tools ---
+
+def test_join_rejects_trusted_domain_in_path():
+    result = join_video_call("https://evil.com/zoom.us/j/123")
+    assert "not sure" in result.lower()
+
+def test_join_accepts_zoom_subdomain():
+    with patch("mcp_servers.screen_dispatch.subprocess.Popen"):
+        result = join_video_call("https://us02web.zoom.us/j/123456789")
+    assert "Zoom" in result
+
+def test_join_rejects_lookalike_teams_host():
+    result = join_video_call("https://teams.evil-support.com/l/meetup-join/123")
+    assert "not sure" in result.lower()
+
+def test_join_accepts_teams_live():
+    with patch("mcp_servers.screen_dispatch.subprocess.Popen"):
+        result = join_video_call("https://teams.live.com/meet/123456")
+    assert "Microsoft Teams" in result
+
+@patch("mcp_servers.screen_dispatch.USE_REAL_GMAIL", False)
+def test_check_meeting_links_extracts_from_body():
+    import mcp_servers.screen_dispatch as sd
+    extra = {
+        "id": 99, "from": "Carol <carol@gmail.com>", "subject": "Family call",
+        "date": "February 12, 2026 at 1:00 PM",
+        "body": "Let's talk Sunday: https://meet.google.com/abc-defg-hij", "is_read": False,
+    }
+    with patch.object(sd, "SIMULATED_INBOX", sd.SIMULATED_INBOX + [extra]):
+        result = check_for_meeting_links()
+    assert "https://meet.google.com/abc-defg-hij" in result
@@ -0,0 +1,129 @@
+"""Tests for the background health sampler (mcp_servers/health_history.py)."""
+import math
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mcp_servers import health_history as hh
+from mcp_servers import screen_dispatch as sd
+
+GB = 2**30
+MB = 2**20
+
+
+@pytest.fixture(autouse=True)
+def empty_history(monkeypatch):
+    hh.reset()
+    monkeypatch.setitem(hh._thread, "interval", 30)
+    yield
+    hh.stop()
+    hh.reset()
+
+
+def _sample(t, mem_pct=50.0, cpu=10.0, disk_free=100 * GB, processes=()):
+    return {"time": t, "mem_used": mem_pct / 100 * 16 * GB, "mem_total": 16 * GB,
+            "disk_free": disk_free, "disk_total": 500 * GB, "cpu": cpu,
+            "processes": [{"name": name, "rss": mb * MB} for name, mb in processes]}
+
+
+def test_ring_keeps_newest_samples_oldest_first():
+    hh.reset(capacity=3)
+    for t in range(5):
+        hh.record(_sample(1000.0 + t))
+    assert [s["time"] for s in hh.samples()] == [1002.0, 1003.0, 1004.0]
+
+
+def test_samples_roundtrip_through_file(tmp_path):
+    path = tmp_path / "history.bin"
+    hh.reset(capacity=4, path=path)
+    hh.record(_sample(time.time(), cpu=float("nan"), processes=[("chrome", 1500), ("WINWORD", 200)]))
+    hh.save()
+    assert path.stat().st_size == hh.HEADER.size + 4 * hh.RECORD.size
+
+    hh.reset()
+    assert hh.load(path)
+    (restored,) = hh.samples()
+    assert math.isnan(restored["cpu"])
+    assert restored["processes"] == [{"name": "chrome", "rss": 1500 * MB},
+                                     {"name": "WINWORD", "rss": 200 * MB}]
+
+
+def test_load_rejects_foreign_or_truncated_files(tmp_path):
+    bad = tmp_path / "history.bin"
+    bad.write_bytes(b"not a history file")
+    assert not hh.load(bad)
+    assert not hh.load(tmp_path / "missing.bin")
+
+
+def test_trends_need_ten_minutes_of_history():
+    now = time.time()
+    hh.record(_sample(now - 120))
+    hh.record(_sample(now))
+    assert hh.trends() is None
+
+
+def test_trends_spot_growing_program_and_memory():
+    now = time.time()
+    for i in range(13):   # one sample every five minutes for an hour
+        grow = i / 12
+        hh.record(_sample(now - 3590 + i * 300, mem_pct=45 + 43 * grow, cpu=20,
+                          processes=[("chrome", 800 + 2200 * grow), ("python", 100)]))
+    trend = hh.trends()
+    assert trend["span"] == pytest.approx(3600)
+    assert trend["memory"][0] == pytest.approx(45) and trend["memory"][1] == pytest.approx(88)
+    assert [g[0] for g in trend["growing"]] == ["chrome"]
+
+    lines = "\n".join(sd._health_trend_lines(trend))
+    assert "OVER THE LAST HOUR:" in lines
+    assert "Memory went from 45% to 88% full." in lines
+    assert "chrome has grown from 800 MB to 2.9 GB." in lines
+
+
+def test_steady_history_says_so():
+    now = time.time()
+    for i in range(4):
+        hh.record(_sample(now - 1200 + i * 400, processes=[("chrome", 800)]))
+    assert "Things have been steady" in "\n".join(sd._health_trend_lines(hh.trends()))
+
+
+def test_system_health_answers_from_fresh_sample_without_probing(monkeypatch):
+    hh.record(_sample(time.time(), mem_pct=75, processes=[("chrome", 1800)]))
+
+    def no_probe(*args, **kwargs):
+        raise AssertionError("should have used the sampler's reading")
+
+    monkeypatch.setattr(sd, "run_probes", no_probe)
+    report = sd.check_system_health()
+    assert "Using 12.0 of 16.0 GB (75% full)" in report
+    assert "HARD DRIVE: 80% full — 100.0 GB free" in report
+    assert "chrome — using 1800 MB" in report
+
+
+def test_stale_sample_is_not_used():
+    hh.record(_sample(time.time() - 3600))
+    assert hh.latest_readings(max_age=60) is None
+
+
+def test_sampler_thread_records_and_saves(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(hh, "SAVE_EVERY", 1)
+    path = tmp_path / "history.bin"
+    assert hh.start(interval=0.05, path=path)
+    assert not hh.start(interval=0.05, path=path)   # already running
+    deadline = time.time() + 5
+    while len(hh.samples()) < 3 and time.time() < deadline:
+        time.sleep(0.02)
+    hh.stop()
+    assert len(hh.samples()) >= 3
+    assert path.exists()
+    assert hh.samples()[-1]["mem_total"] > 0
+    out, err = capsys.readouterr()
+    assert out == "" and "Health sampler every" in err   # stdout is the MCP stream
+
+
+def test_zero_interval_disables_sampler(tmp_path):
+    assert not hh.start(interval=0, path=tmp_path / "history.bin")
+    assert not hh.running()
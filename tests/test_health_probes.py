@@ -0,0 +1,148 @@
+"""Tests for the in-process health probes (mcp_servers/health_probes.py)
+and the reports check_system_health / check_internet build from them."""
+import socket
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mcp_servers import health_probes as hp
+from mcp_servers import screen_dispatch as sd
+
+# The real probes (conftest.py stubs them for every test to keep the suite offline)
+connectivity = hp.connectivity
+
+MEMINFO = """MemTotal:       16384000 kB
+MemFree:         1024000 kB
+MemAvailable:    4096000 kB
+Buffers:          100000 kB
+"""
+
+
+@pytest.fixture
+def fake_proc(tmp_path, monkeypatch):
+    """A /proc with meminfo and three processes, and no psutil."""
+    (tmp_path / "meminfo").write_text(MEMINFO)
+    for pid, name, rss_kb in [(1, "chrome", 900000), (2, "chrome", 300000), (3, "python3", 50000)]:
+        (tmp_path / str(pid)).mkdir()
+        (tmp_path / str(pid) / "status").write_text(
+            f"Name:\t{name}\nState:\tS (sleeping)\nVmRSS:\t  {rss_kb} kB\n")
+    (tmp_path / "4").mkdir()  # kernel thread: no VmRSS line
+    (tmp_path / "4" / "status").write_text("Name:\tkthreadd\nState:\tS\n")
+    monkeypatch.setattr(hp, "_PROC", tmp_path)
+    monkeypatch.setattr(hp, "_psutil", lambda: None)
+    return tmp_path
+
+
+def test_memory_from_proc(fake_proc):
+    mem = hp.memory()
+    assert mem["total"] == 16384000 * 1024
+    assert mem["available"] == 4096000 * 1024
+    assert mem["percent"] == 75
+
+
+def test_top_processes_groups_by_name(fake_proc):
+    procs = hp.top_processes()
+    assert procs[0] == {"name": "chrome", "rss": 1200000 * 1024, "count": 2}
+    assert [p["name"] for p in procs] == ["chrome", "python3"]
+
+
+def test_probes_unavailable_without_psutil_or_proc(tmp_path, monkeypatch):
+    monkeypatch.setattr(hp, "_PROC", tmp_path / "missing")
+    monkeypatch.setattr(hp, "_psutil", lambda: None)
+    with pytest.raises(hp.ProbeUnavailable):
+        hp.memory()
+    with pytest.raises(hp.ProbeUnavailable):
+        hp.top_processes()
+
+
+def test_psutil_names_lose_exe_suffix(monkeypatch):
+    class Info:
+        def __init__(self, name, rss):
+            self.info = {"name": name, "memory_info": type("M", (), {"rss": rss})()}
+
+    fake = type("psutil", (), {"process_iter": staticmethod(
+        lambda attrs: [Info("chrome.exe", 700), Info("chrome.exe", 300), Info("WINWORD.EXE", 500)])})
+    monkeypatch.setattr(hp, "_psutil", lambda: fake)
+    assert hp.top_processes() == [{"name": "chrome", "rss": 1000, "count": 2},
+                                  {"name": "WINWORD", "rss": 500, "count": 1}]
+
+
+def test_disk_reports_free_space(tmp_path):
+    drive = hp.disk(str(tmp_path))
+    assert drive["total"] >= drive["free"] > 0
+    assert 0 <= drive["percent"] <= 100
+
+
+def test_connectivity_against_local_listener():
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen()
+    try:
+        result = connectivity([("127.0.0.1", 1), server.getsockname()], timeout=1)
+    finally:
+        server.close()
+    assert result["connected"] is True
+    assert result["latency_ms"] is not None
+
+
+def test_connectivity_fails_cleanly():
+    assert connectivity([("127.0.0.1", 1)], timeout=0.5) == {"connected": False, "latency_ms": None}
+
+
+def test_system_health_works_off_windows(fake_proc, monkeypatch):
+    monkeypatch.setattr(sd, "IS_WINDOWS", False)
+    report = sd.check_system_health()
+    assert "MEMORY: Using 11.7 of 15.6 GB (75% full)" in report
+    assert "• chrome — using 1172 MB" in report
+    assert "HARD DRIVE:" in report
+
+
+def test_system_health_falls_back_to_powershell_on_windows(monkeypatch, tmp_path):
+    monkeypatch.setattr(sd, "IS_WINDOWS", True)
+    monkeypatch.setattr(hp, "_PROC", tmp_path / "missing")
+    monkeypatch.setattr(hp, "_psutil", lambda: None)
+    monkeypatch.setattr(hp, "disk", lambda: {"total": 100 * 2**30, "used": 50 * 2**30,
+                                             "free": 50 * 2**30, "percent": 50})
+    scripts = []
+
+    def fake_powershell(script, timeout=15):
+        scripts.append(script)
+        if "Win32_OperatingSystem" in script:
+            return '{"FreePhysicalMemory": 4194304, "TotalVisibleMemorySize": 16777216}'
+        return '{"ProcessName": "WINWORD", "MemoryMB": 300}'
+
+    monkeypatch.setattr(sd, "_run_powershell", fake_powershell)
+    report = sd.check_system_health()
+    assert len(scripts) == 2
+    assert "Using 12.0 of 16.0 GB (75% full)" in report
+    assert "• WINWORD — using 300 MB" in report
+
+
+@pytest.mark.parametrize("connected, dns, expected", [
+    (True, True, "Your internet is working!"),
+    (True, False, "can't look up websites"),
+    (False, False, "I can't reach the internet"),
+])
+def test_check_internet_off_windows_uses_sockets(monkeypatch, connected, dns, expected):
+    monkeypatch.setattr(sd, "IS_WINDOWS", False)
+    monkeypatch.setattr(hp, "connectivity", lambda: {"connected": connected, "latency_ms": 20})
+    monkeypatch.setattr(hp, "dns_resolves", lambda: dns)
+    monkeypatch.setattr(sd, "_run_powershell", lambda *a, **k: pytest.fail("no PowerShell off Windows"))
+    report = sd.check_internet()
+    assert expected in report
+    assert ("Here's what to try" in report) == (not connected)
+
+
+def test_check_internet_windows_keeps_wifi_details(monkeypatch):
+    monkeypatch.setattr(sd, "IS_WINDOWS", True)
+    monkeypatch.setattr(hp, "connectivity", lambda: {"connected": True, "latency_ms": 20})
+    monkeypatch.setattr(hp, "dns_resolves", lambda: True)
+    monkeypatch.setattr(sd, "_run_powershell", lambda script, timeout=15: (
+        "    State                  : connected\n    SSID                   : HomeNet\n"
+        "    BSSID                  : aa:bb\n    Signal                 : 82%\n"))
+    report = sd.check_internet()
+    assert "WIFI: Connected to 'HomeNet'" in report
+    assert "Signal: Strong (82%)" in report
@@ -0,0 +1,82 @@
+"""Tests for the load benchmark (benchmarks/load_bench.py) and the scripted fake API."""
+import copy
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks import fake_anthropic
+from benchmarks.load_bench import compare, format_report, run_benchmark
+from frontend import app as shared
+from mcp_servers import screen_dispatch as sd
+
+SCRIPT = fake_anthropic.load_script(Path(__file__).resolve().parent.parent
+                                    / "benchmarks" / "data" / "load_conversations.json")
+
+
+def _reply(messages):
+    return fake_anthropic.scripted_reply({"messages": messages}, SCRIPT,
+                                         fake_anthropic._script_turns(SCRIPT))
+
+
+def test_scripted_turn_calls_its_tool_then_answers():
+    delay, response, kind = _reply([{"role": "user", "content": "Can you check my email?"}])
+    assert kind == "tool" and delay == 2.4
+    assert response["stop_reason"] == "tool_use"
+    assert response["content"][0]["name"] == "check_email"
+
+    history = [{"role": "user", "content": "Can you check my email?"},
+               {"role": "assistant", "content": response["content"]},
+               {"role": "user", "content": [{"type": "tool_result", "tool_use_id": "t", "content": "6 emails"}]}]
+    _, response, kind = _reply(history)
+    assert kind == "text"
+    assert [b["type"] for b in response["content"]] == ["thinking", "text"]
+
+
+def test_family_text_and_tool_prompts_are_matched():
+    wrapped = "[FAMILY REMOTE REQUEST from Michael]\nTheir message: Is mom's computer running ok?\n"
+    _, response, kind = _reply([{"role": "user", "content": wrapped}])
+    assert response["content"][0]["name"] == "check_system_health"
+    _, response, kind = _reply([{"role": "user", "content": "Return a JSON array of verdicts"}])
+    assert kind == "other" and response["content"][0]["text"] == "[]"
+
+
+@pytest.fixture(scope="module")
+def report():
+    return run_benchmark(households=3, duration=3, think=0, time_scale=0.01)
+
+
+def test_load_run_exercises_every_endpoint(report):
+    for endpoint, r in report["endpoints"].items():
+        assert r["requests"] > 0 and r["errors"] == 0, endpoint
+        assert r["p50_ms"] <= r["p95_ms"] <= r["p99_ms"]
+    assert report["wrong_replies"] == 0
+    assert report["api_calls"]["tool"] > 0          # tools really ran in the app
+    assert report["family"]["sent"] > 0
+    histories = report["server"]["histories"]
+    assert histories["end"]["conversations"] > histories["start"]["conversations"]
+    assert histories["bytes_per_conversation"] > 0
+    assert report["server"]["threads"]["peak"] >= report["server"]["threads"]["start"]
+    assert "TechBuddy Load Benchmark" in format_report(report)
+
+
+def test_load_run_leaves_the_app_as_it_found_it(report):
+    assert sd.NOTES_DIR.name == "TechBuddy Notes" and "tmp" not in str(sd.NOTES_DIR)
+    assert type(shared.client).__name__ == "_LazyAnthropic"
+
+
+def test_compare_flags_regressions(report):
+    assert compare(report, report) == []
+    faster = copy.deepcopy(report)
+    faster["endpoints"]["/chat"]["per_s"] *= 2
+    faster["endpoints"]["/chat"]["p99_ms"] /= 2
+    faster["server"]["histories"]["bytes_per_conversation"] //= 2
+    problems = compare(report, faster)
+    assert any("/chat throughput" in p for p in problems)
+    assert any("/chat p99_ms" in p for p in problems)
+    assert any("bytes per conversation" in p for p in problems)
+    other = copy.deepcopy(report)
+    other["config"]["households"] += 1
+    assert compare(report, other)[0].startswith("config differs")
@@ -0,0 +1,213 @@
+"""Tests for note compaction and session rollover (mcp_servers/notes_compaction.py)."""
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mcp_servers import notes_compaction as nc
+from mcp_servers import notes_index
+from mcp_servers import screen_dispatch as sd
+
+
+@pytest.fixture
+def notes(tmp_path, monkeypatch):
+    monkeypatch.setattr(sd, "NOTES_DIR", tmp_path)
+    return tmp_path
+
+
+def _archives(notes):
+    return sorted(p.name for p in (notes / nc.ARCHIVE_DIR).glob("*.md"))
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("Doctor: Dr. Patel", "doctor"),
+    ("- Sarah = daughter", "sarah"),
+    ("My doctor is Dr. Patel", "doctor"),
+    ("Sarah's birthday is June 3rd", "sarah's birthday"),
+    ("Doctor is Dr. Johnson", "doctor"),
+    ("Sarah is my daughter", None),
+    ("Prefers large text", None),
+])
+def test_subject(line, expected):
+    assert nc.subject(line) == expected
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("Doctor: Dr. Patel, Mercy Hospital", {"doctor"}),
+    ("- Sarah: daughter, phone 555-1234", {"sarah", "sarah: phone"}),
+    ("- Sarah: visiting on Sunday to fix the printer", {None}),
+    ("Prefers large text", set()),
+])
+def test_attributes(line, expected):
+    assert nc.attributes(line) == expected
+
+
+def test_compaction_keeps_newest_facts_and_archives_the_rest(notes):
+    sd.save_note("contacts", "Doctor is Dr. Johnson\nDaughter Sarah, 555-0100")
+    sd.save_note("contacts", "Plumber: Joe")
+    sd.save_note("contacts", "My doctor is Dr. Patel")
+    sd.save_note("contacts", "daughter sarah 555-0100")
+    sd.save_note("contacts", "Plumber: Frank")
+
+    result = nc.compact_file(notes / "contacts.md")
+    assert result["dropped_lines"] == 3
+    live = (notes / "contacts.md").read_text(encoding="utf-8")
+    for gone in ("Johnson", "Joe", "Daughter Sarah, 555-0100"):
+        assert gone not in live
+    for kept in ("My doctor is Dr. Patel", "daughter sarah 555-0100", "Plumber: Frank"):
+        assert kept in live
+    assert live.count("_Updated:") == 3   # entries that lost every fact are gone
+
+    (archive,) = _archives(notes)
+    assert archive.startswith("contacts-")
+    archived = (notes / nc.ARCHIVE_DIR / archive).read_text(encoding="utf-8")
+    assert "Dr. Johnson" in archived and "Plumber: Joe" in archived
+
+
+def test_shared_field_labels_only_replace_facts_about_the_same_person(notes):
+    sd.save_note("contacts", "Dr. Patel (cardiologist)\nPhone: 555-0199\nBirthday: March 2")
+    sd.save_note("contacts", "Sarah (daughter)\nPhone: 555-0100\nBirthday: June 3")
+    sd.save_note("contacts", "Dr. Patel (cardiologist)\nPhone: 555-0142")
+    sd.save_note("contacts", "Phone: 555-0000")
+
+    result = nc.compact_file(notes / "contacts.md")
+    assert result["dropped_lines"] == 1
+    live = (notes / "contacts.md").read_text(encoding="utf-8")
+    assert "555-0199" not in live
+    for kept in ("Birthday: March 2", "Phone: 555-0100", "Birthday: June 3",
+                 "Phone: 555-0142", "Phone: 555-0000"):
+        assert kept in live
+    # The older entry keeps its person line, so "Birthday: March 2" still says whose it is
+    assert live.count("Dr. Patel (cardiologist)") == 2
+
+
+def test_different_facts_about_the_same_subject_are_both_kept(notes):
+    sd.save_note("contacts", "- Sarah: daughter, phone 555-1234")
+    sd.save_note("contacts", "- Sarah: visiting on Sunday to fix the printer")
+    sd.save_note("contacts", "- Sarah: phone 555-9876")
+
+    result = nc.compact_file(notes / "contacts.md")
+    assert result["dropped_lines"] == 0
+    live = (notes / "contacts.md").read_text(encoding="utf-8")
+    for kept in ("daughter, phone 555-1234", "fix the printer", "phone 555-9876"):
+        assert kept in live
+    assert "555-1234" in sd.recall_user_context()
+
+    sd.save_note("contacts", "- Sarah: daughter, phone 555-9876")
+    assert nc.compact_file(notes / "contacts.md")["dropped_lines"] == 2
+    live = (notes / "contacts.md").read_text(encoding="utf-8")
+    assert "555-1234" not in live and "fix the printer" in live
+
+
+def test_compacted_file_still_parses_like_save_note_output(notes):
+    (notes / "preferences.md").write_text("# Preferences\n", encoding="utf-8")
+    sd.save_note("preferences", "Font: large")
+    sd.save_note("preferences", "Font: extra large")
+    nc.compact_file(notes / "preferences.md")
+    entries = notes_index.split_entries((notes / "preferences.md").read_text(encoding="utf-8"))
+    assert [e["text"] for e in entries] == ["# Preferences", "Font: extra large"]
+    assert entries[1]["date"]
+
+
+def test_size_cap_moves_oldest_entries_out(notes):
+    for i in range(300):
+        sd.save_note("routines", f"Routine number {i}: walk to the mailbox at {i} o'clock")
+    # save_note compacts once the file passes the cap
+    assert (notes / "routines.md").stat().st_size <= nc.MAX_LIVE_BYTES
+    live = (notes / "routines.md").read_text(encoding="utf-8")
+    assert "Routine number 299:" in live and "Routine number 0:" not in live
+    assert "Routine number 0:" in (notes / nc.ARCHIVE_DIR / _archives(notes)[0]).read_text(encoding="utf-8")
+
+
+def test_archived_facts_are_still_searchable(notes):
+    sd.save_note("contacts", "Doctor: Dr. Johnson")
+    sd.save_note("contacts", "Doctor: Dr. Patel")
+    nc.compact_file(notes / "contacts.md")
+    files = [m["file"] for m in notes_index.search(notes, "Johnson")]
+    assert files and files[0].startswith("archive/contacts-")
+
+
+def test_old_sessions_roll_into_monthly_archive(notes):
+    old = time.time() - 90 * 86400
+    for day in range(1, 6):
+        path = notes / f"session-11_{day}_25.md"
+        path.write_text(f"Helped with email on day {day}\n", encoding="utf-8")
+        os.utime(path, (old + day, old + day))
+    sd.save_note("session-2_12_26", "Printed boarding pass")
+
+    moved = nc.roll_sessions(notes)
+    assert len(moved) == 3   # the newest three session files stay live
+    remaining = sorted(p.name for p in notes.glob("session-*.md"))
+    assert remaining == ["session-11_4_25.md", "session-11_5_25.md", "session-2_12_26.md"]
+    (archive,) = _archives(notes)
+    assert archive.startswith("sessions-")
+    text = (notes / nc.ARCHIVE_DIR / archive).read_text(encoding="utf-8")
+    assert "## session-11_1_25" in text and "day 3" in text
+
+
+def test_run_if_due_runs_once_a_day(notes, capsys):
+    sd.save_note("contacts", "Plumber: Joe")
+    sd.save_note("contacts", "Plumber: Frank")
+    assert nc.run_if_due(notes)["compacted"]
+    assert nc.run_if_due(notes) is None
+    out, err = capsys.readouterr()
+    assert out == "" and "Compacted notes" in err   # stdout is the MCP stream
+
+
+def test_atomic_write_leaves_no_temp_file(notes):
+    target = notes / "contacts.md"
+    target.write_text("old", encoding="utf-8")
+    nc.atomic_write(target, "new")
+    assert target.read_text(encoding="utf-8") == "new"
+    assert [p.name for p in notes.iterdir()] == ["contacts.md"]
+
+
+def test_failed_write_keeps_original(notes, monkeypatch):
+    target = notes / "contacts.md"
+    target.write_text("Plumber: Joe\n", encoding="utf-8")
+
+    def crash(src, dst):
+        raise OSError("power cut")
+
+    monkeypatch.setattr(nc.os, "replace", crash)
+    with pytest.raises(OSError):
+        nc.atomic_write(target, "half")
+    assert target.read_text(encoding="utf-8") == "Plumber: Joe\n"
+
+
+def test_non_utf8_note_does_not_break_recall_or_save(notes):
+    (notes / "contacts.md").write_bytes(b"Caf\xe9 on Main St: Tuesdays\n" + b"Plumber: Joe\n" * 2000)
+    sd.save_note("contacts", "Plumber: Frank")
+    raw = (notes / "contacts.md").read_bytes()
+    assert b"Plumber: Frank" in raw
+    assert "Caf" in sd.recall_user_context()
+    # Compaction leaves the file alone rather than write replacement characters back
+    assert raw.startswith(b"Caf\xe9 on Main St") and "\ufffd".encode("utf-8") not in raw
+    assert nc.compact_file(notes / "contacts.md")["skipped"] == "not UTF-8"
+    assert (notes / "contacts.md").read_bytes() == raw
+    assert not (notes / nc.ARCHIVE_DIR).exists()
+
+
+def test_rolled_session_keeps_its_original_bytes(notes):
+    path = notes / "session-11_1_25.md"
+    path.write_bytes(b"Met at the caf\xe9\n")
+    old = time.time() - 90 * 86400
+    os.utime(path, (old, old))
+    assert nc.roll_sessions(notes, keep=0) == ["session-11_1_25.md"]
+    (archive,) = _archives(notes)
+    assert b"Met at the caf\xe9" in (notes / nc.ARCHIVE_DIR / archive).read_bytes()
+
+
+def test_save_note_survives_a_failed_compaction(notes, monkeypatch):
+    def broken(path, max_bytes=nc.MAX_LIVE_BYTES):
+        raise ValueError("unexpected")
+
+    monkeypatch.setattr(nc, "compact_file", broken)
+    monkeypatch.setattr(nc, "MAX_LIVE_BYTES", 10)
+    assert sd.save_note("contacts", "Plumber: Frank").startswith("Saved to contacts.md")
+    monkeypatch.setattr(nc, "compact_all", lambda notes_dir: broken(notes_dir))
+    assert nc.run_if_due(notes) is None
@@ -0,0 +1,90 @@
+"""Tests for the notes search index (mcp_servers/notes_index.py) and search_notes."""
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mcp_servers import notes_index
+from mcp_servers import screen_dispatch as sd
+
+
+@pytest.fixture
+def notes(tmp_path, monkeypatch):
+    monkeypatch.setattr(sd, "NOTES_DIR", tmp_path)
+    return tmp_path
+
+
+def test_split_entries_on_save_note_separators():
+    text = ("# Contacts\n\n---\n_Updated: February 12, 2026 at 03:00 PM_\n\n"
+            "Doctor is Dr. Patel\n\n---\n_Updated: February 13, 2026 at 09:15 AM_\n\n"
+            "Daughter Sarah visits on Sundays\n")
+    entries = notes_index.split_entries(text)
+    assert [e["text"] for e in entries] == ["# Contacts", "Doctor is Dr. Patel",
+                                            "Daughter Sarah visits on Sundays"]
+    assert entries[1]["date"] == "February 12, 2026 at 03:00 PM"
+
+
+def test_tokenize_trims_plurals_possessives_and_stopwords():
+    assert notes_index.tokenize("Sarah's grandkids visit the doctors") == [
+        "sarah", "grandkid", "visit", "doctor"]
+
+
+def test_fact_past_the_old_truncation_point_is_found(notes):
+    for i in range(200):
+        sd.save_note("preferences", f"Likes crossword puzzle number {i} in the morning paper")
+    sd.save_note("preferences", "My doctor is Dr. Patel at Riverside Clinic")
+    assert (notes / "preferences.md").stat().st_size > 10000
+
+    result = sd.search_notes("who is my doctor")
+    first = result.split("\n\n")[1]
+    assert "Dr. Patel" in first
+    assert first.startswith("[preferences.md, ")
+
+
+def test_ranking_prefers_rarer_terms(notes):
+    sd.save_note("contacts", "Sarah is my daughter")
+    sd.save_note("contacts", "Sarah's birthday is June 3rd")
+    sd.save_note("session-2_12_26", "Helped with email from Sarah")
+    top = notes_index.search(notes, "Sarah birthday", limit=3)
+    assert "June 3rd" in top[0]["text"]
+    assert len(top) == 3
+
+
+def test_save_note_indexes_incrementally(notes):
+    sd.save_note("contacts", "Plumber is Joe, 555-0100")
+    notes_index.refresh(notes)
+    sd.save_note("contacts", "Electrician is Maria, 555-0199")
+    assert notes_index.refresh(notes) == 0   # nothing left to re-read
+    assert "Maria" in notes_index.search(notes, "electrician")[0]["text"]
+
+
+def test_hand_edited_file_is_reindexed(notes):
+    sd.save_note("contacts", "Plumber is Joe")
+    notes_index.search(notes, "plumber")
+    time.sleep(0.01)
+    (notes / "contacts.md").write_text("Plumber is Frank now\n", encoding="utf-8")
+    (notes / "family.md").write_text("Grandson Leo plays soccer\n", encoding="utf-8")
+    assert "Frank" in notes_index.search(notes, "plumber")[0]["text"]
+    assert notes_index.search(notes, "soccer")[0]["file"] == "family.md"
+
+    (notes / "family.md").unlink()
+    assert notes_index.search(notes, "soccer") == []
+
+
+def test_search_notes_messages(notes):
+    assert "what should i look for" in sd.search_notes("  ").lower()
+    sd.save_note("preferences", "Likes large text")
+    assert "didn't find anything" in sd.search_notes("telescope")
+
+
+def test_search_is_fast_on_large_notes(notes):
+    with open(notes / "session-archive.md", "w", encoding="utf-8") as f:
+        for i in range(5000):
+            f.write(f"\n---\n_Updated: day {i}_\n\nWorked on email attachment {i} and printer queue\n")
+    notes_index.refresh(notes)
+    start = time.perf_counter()
+    notes_index.search(notes, "printer attachment 4321")
+    assert time.perf_counter() - start < 0.5
@@ -0,0 +1,214 @@
+"""Tests for phone_client.py against a local Flask stand-in for the iPhone server."""
+import base64
+import functools
+import io
+import socket
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from flask import Flask, Response, jsonify, request
+from PIL import Image
+
+from mcp_servers import phone_client
+import mcp_servers.screen_dispatch as sd
+
+PHONE_SIZE = (1179, 2556)
+
+
+@functools.cache
+def _png(size=PHONE_SIZE, color=(0, 122, 255)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _make_phone_server(binary: bool, combined: bool):
+    """Flask stand-in for the Mac-side xcrun server."""
+    app = Flask("phone-stand-in")
+    app.calls = []
+    app.ports = set()
+    app.sockets = []
+
+    @app.before_request
+    def track():
+        app.calls.append(request.path)
+
+    def screenshot_reply():
+        if binary and "image/png" in request.headers.get("Accept", ""):
+            return Response(_png(), mimetype="image/png")
+        return jsonify({"image": base64.b64encode(_png()).decode()})
+
+    @app.get("/screenshot")
+    def screenshot():
+        return screenshot_reply()
+
+    @app.post("/tap")
+    def tap():
+        body = request.get_json()
+        app.taps = getattr(app, "taps", []) + [(body["x"], body["y"])]
+        if combined and body.get("capture"):
+            return screenshot_reply()
+        return jsonify({"status": "tapped"})
+
+    @app.post("/launch")
+    def launch():
+        return jsonify({"status": "launched", "app": request.get_json()["app"]})
+
+    return app
+
+
+def _serve(app):
+    """Serve the Flask app over HTTP/1.1 keep-alive.
+
+    Werkzeug's dev server closes every connection, which would hide
+    whether the client reuses them, so requests go through a tiny
+    http.server front end into app.test_client().
+    """
+    client = app.test_client()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _forward(self):
+            app.ports.add(self.client_address[1])
+            app.sockets.append(self.connection)
+            length = int(self.headers.get("Content-Length") or 0)
+            resp = client.open(self.path, method=self.command, data=self.rfile.read(length),
+                               headers=dict(self.headers))
+            body = resp.get_data()
+            self.send_response(resp.status_code)
+            self.send_header("Content-Type", resp.content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_GET = do_POST = _forward
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    return server
+
+
+@pytest.fixture(params=[(True, True), (False, False)], ids=["binary-combined", "json-legacy"])
+def phone_server(request):
+    binary, combined = request.param
+    app = _make_phone_server(binary, combined)
+    server = _serve(app)
+    url = f"http://127.0.0.1:{server.server_port}"
+    phone_client.close_all()
+    phone_client._display["scale"] = 1.0
+    yield url, app, combined
+    phone_client.close_all()
+    server.shutdown()
+    server.server_close()
+
+
+def test_screenshot_is_downscaled_on_arrival(phone_server):
+    url, _, _ = phone_server
+    encoded = phone_client.fetch_screenshot(url)
+    assert encoded["device_size"] == PHONE_SIZE
+    assert encoded["width"] < PHONE_SIZE[0]
+    assert encoded["media_type"] != "image/png"
+
+
+def test_connections_are_reused(phone_server):
+    url, app, _ = phone_server
+    opened = phone_client.stats["connections_opened"]
+    phone_client.fetch_screenshot(url)
+    phone_client.launch(url, "Settings")
+    phone_client.fetch_screenshot(url)
+    assert phone_client.stats["connections_opened"] == opened + 1
+    assert len(app.ports) == 1
+
+
+def test_taps_map_back_to_phone_pixels(phone_server):
+    url, app, _ = phone_server
+    encoded = phone_client.fetch_screenshot(url)
+    scale = PHONE_SIZE[0] / encoded["width"]
+    phone_client.tap(url, 100, 200)
+    assert app.taps[-1] == (round(100 * scale), round(200 * scale))
+
+
+def test_tap_and_capture(phone_server):
+    url, app, combined = phone_server
+    encoded = phone_client.tap(url, 10, 10, capture=True)
+    assert encoded["device_size"] == PHONE_SIZE
+    # One round-trip when the server supports it, a fallback GET otherwise
+    assert app.calls == (["/tap"] if combined else ["/tap", "/screenshot"])
+
+
+def test_stale_connection_is_retried(phone_server):
+    url, app, _ = phone_server
+    phone_client.launch(url, "Settings")
+    for sock in app.sockets:
+        sock.shutdown(socket.SHUT_RDWR)  # the server drops the idle connection
+    opened = phone_client.stats["connections_opened"]
+    assert phone_client.launch(url, "Maps")["status"] == "launched"
+    assert phone_client.stats["connections_opened"] == opened + 1
+
+
+class _DroppedAfterSend:
+    """A reused connection the server closes after reading the request."""
+
+    def __init__(self):
+        self.sent = []
+
+    def request(self, method, path, body=None, headers=None):
+        self.sent.append((method, path))
+
+    def getresponse(self):
+        raise phone_client.http.client.RemoteDisconnected("closed without response")
+
+    def close(self):
+        pass
+
+
+def test_tap_is_not_resent_after_a_dropped_connection(monkeypatch):
+    conn = _DroppedAfterSend()
+    monkeypatch.setattr(phone_client, "_checkout", lambda base_url, timeout: (conn, True))
+    opened = []
+    monkeypatch.setattr(phone_client, "_open_connection", lambda *a: opened.append(a) or conn)
+    with pytest.raises(phone_client.http.client.RemoteDisconnected):
+        phone_client.tap("http://phone.test", 10, 10)
+    assert conn.sent == [("POST", "/tap")] and not opened
+    # A GET is safe to send again on a fresh connection
+    with pytest.raises(phone_client.http.client.RemoteDisconnected):
+        phone_client.request("http://phone.test", "GET", "/screenshot")
+    assert len(opened) == 1 and conn.sent[-2:] == [("GET", "/screenshot")] * 2
+
+
+def test_tap_after_idle_drop_uses_a_fresh_connection(phone_server, monkeypatch):
+    url, app, _ = phone_server
+    monkeypatch.setitem(phone_client._display, "scale", 1.0)
+    phone_client.tap(url, 1, 1)
+    for sock in app.sockets:
+        sock.shutdown(socket.SHUT_RDWR)
+    phone_client.tap(url, 2, 2)
+    assert app.taps[-2:] == [(1, 1), (2, 2)]
+
+
+def test_tools_use_phone_client(phone_server):
+    url, _, _ = phone_server
+    with patch.object(sd, "PHONE_SERVER_URL", url):
+        shot = sd.capture_phone_screen()
+        tapped = sd.tap_phone_screen(50, 60, show_result=True)
+        opened = sd.open_phone_app("Settings")
+    assert shot[0]["type"] == "image"
+    assert tapped[0]["type"] == "image" and "(50, 60)" in tapped[1]["text"]
+    assert opened.startswith("Opened Settings")
+
+
+def test_tools_report_unreachable_server():
+    with patch.object(sd, "PHONE_SERVER_URL", "http://127.0.0.1:9"):
+        assert "couldn't connect" in sd.capture_phone_screen()
+        assert "couldn't tap" in sd.tap_phone_screen(1, 2)
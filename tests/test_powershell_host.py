@@ -0,0 +1,93 @@
+"""Tests for the persistent PowerShell worker (mcp_servers/powershell_host.py).
+
+PowerShell isn't available on the test machines, so worker_command is
+pointed at a small Python worker that speaks the same JSON-lines protocol.
+Its "scripts" are commands: echo:<text>, pid, sleep:<seconds>, die,
+die_once:<marker file>, fail:<msg>.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mcp_servers import powershell_host as ph
+from mcp_servers import screen_dispatch as sd
+
+FAKE_WORKER = r"""
+import json, os, sys, time
+for line in sys.stdin:
+    req = json.loads(line)
+    cmd, _, arg = req["script"].partition(":")
+    reply = {"id": req["id"], "ok": True, "stdout": "", "error": ""}
+    if cmd == "echo":
+        reply["stdout"] = arg + "\r\n"
+    elif cmd == "pid":
+        reply["stdout"] = str(os.getpid())
+    elif cmd == "sleep":
+        time.sleep(float(arg))
+    elif cmd == "die":
+        sys.exit(1)
+    elif cmd == "die_once" and not os.path.exists(arg):
+        open(arg, "w").close()
+        sys.exit(1)
+    elif cmd == "fail":
+        reply.update(ok=False, error=arg)
+    print("noise from a native command", flush=True)
+    print(json.dumps(reply), flush=True)
+"""
+
+
+@pytest.fixture(autouse=True)
+def fake_worker(monkeypatch):
+    monkeypatch.setattr(ph, "worker_command", lambda: [sys.executable, "-u", "-c", FAKE_WORKER])
+    monkeypatch.setitem(ph.stats, "starts", 0)
+    ph.shutdown()
+    yield
+    ph.shutdown()
+
+
+def test_worker_is_reused_between_scripts():
+    first = ph.run("pid")
+    assert ph.run("echo:hello") == "hello"
+    assert ph.run("pid") == first
+    assert ph.stats["starts"] == 1
+
+
+def test_timeout_kills_worker_and_next_call_restarts():
+    before = ph.run("pid")
+    with pytest.raises(ph.PowerShellError, match="timed out"):
+        ph.run("sleep:5", timeout=0.3)
+    assert ph.run("pid") != before
+    assert ph.stats["starts"] == 2
+
+
+def test_crash_mid_request_is_retried_on_new_worker(tmp_path):
+    before = ph.run("pid")
+    assert ph.run(f"die_once:{tmp_path / 'crashed'}") == ""
+    assert ph.run("pid") != before
+    assert ph.stats["starts"] == 2
+
+
+def test_worker_that_keeps_crashing_gives_up_after_one_retry():
+    with pytest.raises(ph.PowerShellError, match="exited"):
+        ph.run("die")
+    assert ph.stats["starts"] == 2
+    assert ph.run("echo:back") == "back"
+
+
+def test_script_error_is_reported():
+    with pytest.raises(ph.PowerShellError, match="no such printer"):
+        ph.run("fail:no such printer")
+    assert ph.run("echo:still alive") == "still alive"
+    assert ph.stats["starts"] == 1
+
+
+def test_run_powershell_returns_none_on_failure_or_empty_output(capsys):
+    assert sd._run_powershell("echo:ok") == "ok"
+    assert sd._run_powershell("echo:") is None
+    assert sd._run_powershell("fail:boom") is None
+    assert sd._run_powershell("sleep:5", timeout=0.3) is None
+    out, err = capsys.readouterr()
+    assert out == "" and "PowerShell failed" in err
@@ -0,0 +1,39 @@
+"""Regression test for Scam Shield accuracy on the held-out benchmark corpus."""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from benchmarks.scam_bench import compare, load_eval_corpus, run_benchmark
+
+
+@pytest.fixture(scope="module")
+def report():
+    return run_benchmark(load_eval_corpus(), repeats=1)
+
+
+def test_eval_corpus_covers_every_kind():
+    rows = load_eval_corpus()
+    kinds = {r["kind"] for r in rows}
+    assert kinds == {"email", "popup", "sms", "phone"}
+    for kind in kinds:
+        assert {r["label"] for r in rows if r["kind"] == kind} == {0, 1}
+
+def test_every_scam_is_caught(report):
+    for kind, metrics in report["by_kind"].items():
+        assert metrics["recall"] == 1.0, f"{kind}: {report['misses']}"
+
+def test_precision_floor(report):
+    assert report["overall"]["precision"] >= 0.9
+    for metrics in report["by_kind"].values():
+        assert metrics["precision"] >= 0.85
+
+def test_most_flags_resolved_locally(report):
+    assert report["escalation_rate"] <= 0.5
+
+def test_compare_flags_regressions(report):
+    worse = {**report, "overall": {**report["overall"], "recall": report["overall"]["recall"] - 0.1}}
+    assert compare(report, report) == []
+    assert any("recall" in p for p in compare(worse, report))
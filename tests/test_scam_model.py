@@ -0,0 +1,109 @@
+"""Tests for scam_model.py — weighted rule score + local classifier bands."""
+import math
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mcp_servers.scam_model import (
+    FEATURE_WEIGHTS,
+    DANGER_SCORE,
+    LOW_BAND,
+    HIGH_BAND,
+    fit_platt,
+    load_corpus,
+    rule_score,
+    train_model,
+    classify,
+    band_for,
+    needs_deep_check,
+)
+from mcp_servers.screen_dispatch import (
+    _scan_for_scam,
+    analyze_scam_risk,
+    set_anthropic_client,
+)
+
+HELD_OUT = Path(__file__).resolve().parent.parent / "benchmarks" / "data" / "scam_eval.jsonl"
+
+
+def test_rule_score_sums_weights():
+    score, reasons = rule_score([("urgency", "act now"), ("financial", "gift card")])
+    assert score == FEATURE_WEIGHTS["urgency"] + FEATURE_WEIGHTS["financial"]
+    assert ("financial: gift card", FEATURE_WEIGHTS["financial"]) in reasons
+
+def test_single_financial_flag_is_dangerous():
+    assert FEATURE_WEIGHTS["financial"] >= DANGER_SCORE
+    scan = _scan_for_scam("Please buy a gift card for me")
+    assert scan["risk"] == "DANGEROUS"
+
+def test_corpus_has_all_kinds_and_labels():
+    rows = load_corpus()
+    assert {r["kind"] for r in rows} >= {"email", "popup", "sms", "phone"}
+    assert {r["label"] for r in rows} == {0, 1}
+
+def test_training_is_deterministic():
+    examples = [("send gift cards now", 3.0, 1), ("dinner on sunday", 0.0, 0)]
+    assert train_model(examples, epochs=5) == train_model(examples, epochs=5)
+
+def test_classifier_separates_examples():
+    examples = [("send gift cards now", 3.0, 1), ("dinner on sunday", 0.0, 0)] * 5
+    model = train_model(examples)
+    p_scam, top = classify(model, "send gift cards now", 3.0)
+    p_safe, _ = classify(model, "dinner on sunday", 0.0)
+    assert p_scam > 0.5 > p_safe
+    assert top  # explains which n-grams drove the score
+
+def test_platt_scaling_tempers_overconfident_scores():
+    # Raw scores of +/-4 claim 98% certainty, but only 7 in 10 are right
+    scores = [4.0] * 10 + [-4.0] * 10
+    labels = [1] * 7 + [0] * 3 + [1] * 3 + [0] * 7
+    a, b = fit_platt(scores, labels)
+    assert 0 < a < 1
+    assert abs(1 / (1 + math.exp(-(a * 4.0 + b))) - 0.7) < 0.05
+
+def test_calibrated_probabilities_hold_on_held_out_messages():
+    rows = load_corpus(HELD_OUT)
+    scans = [(_scan_for_scam(r["text"]), r["label"]) for r in rows]
+    brier = sum((scan["probability"] - label) ** 2 for scan, label in scans) / len(scans)
+    assert brier < 0.05
+    # Reliability: the bands that skip Opus must be as sure as they claim
+    high = [label for scan, label in scans if scan["probability"] >= HIGH_BAND]
+    low = [label for scan, label in scans if scan["probability"] < LOW_BAND]
+    assert high and sum(high) / len(high) >= HIGH_BAND
+    assert low and sum(low) / len(low) <= LOW_BAND
+
+def test_band_for_thresholds():
+    assert band_for(0.05) == "low"
+    assert band_for(0.5) == "ambiguous"
+    assert band_for(0.99) == "high"
+
+def test_scan_reports_probability_and_reasons():
+    scan = _scan_for_scam("CONGRATULATIONS! You have won! Send your SSN and bank account number now!")
+    assert scan["band"] == "high"
+    assert 0.0 <= scan["probability"] <= 1.0
+    assert any(r.startswith("financial:") for r, _ in scan["reasons"])
+
+def test_safe_text_is_low_band():
+    scan = _scan_for_scam("Hi, dinner at 5pm on Sunday!")
+    assert scan["risk"] == "SAFE"
+    assert scan["band"] == "low"
+
+def test_needs_deep_check_only_for_ambiguous():
+    assert not needs_deep_check({"risk": "SAFE", "band": "ambiguous"})
+    assert not needs_deep_check({"risk": "DANGEROUS", "band": "high"})
+    assert needs_deep_check({"risk": "SUSPICIOUS", "band": "ambiguous"})
+    assert needs_deep_check({"risk": "DANGEROUS", "band": "low"})
+
+def test_confident_scam_skips_llm():
+    fake = MagicMock()
+    set_anthropic_client(fake)
+    try:
+        result = analyze_scam_risk(
+            "This is the IRS. Your Social Security Number has been suspended. "
+            "Send gift cards immediately.", "phone")
+    finally:
+        set_anthropic_client(None)
+    fake.messages.create.assert_not_called()
+    assert "DANGER" in result
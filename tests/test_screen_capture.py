@@ -0,0 +1,308 @@
+"""Tests for screen_capture.py — screenshot tiers, token budgets, and region crops."""
+import base64
+import io
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+from PIL import Image
+
+from mcp_servers.screen_capture import (
+    ENCODE_TIERS,
+    MAX_LONG_EDGE,
+    encode_image,
+    estimate_tokens,
+    fit_to_budget,
+    parse_area,
+    resolve_tier,
+)
+import mcp_servers.screen_dispatch as sd
+
+
+def _desktop(width=2560, height=1440):
+    return Image.linear_gradient("L").resize((width, height)).convert("RGB")
+
+
+def test_fit_to_budget_respects_tokens_and_long_edge():
+    w, h = fit_to_budget(3840, 2160, 1200)
+    assert estimate_tokens(w, h) <= 1200
+    assert max(w, h) <= MAX_LONG_EDGE
+    assert abs(w / h - 16 / 9) < 0.01
+
+def test_fit_to_budget_never_upscales():
+    assert fit_to_budget(400, 300, 1600) == (400, 300)
+
+def test_each_tier_encodes_its_format():
+    image = _desktop()
+    for tier, spec in ENCODE_TIERS.items():
+        encoded = encode_image(image, tier)
+        decoded = Image.open(io.BytesIO(base64.b64decode(encoded["data"])))
+        assert decoded.format == spec["format"]
+        assert decoded.size == (encoded["width"], encoded["height"])
+        assert encoded["tokens"] <= spec["max_tokens"]
+        assert encoded["bytes"] > 0 and encoded["encode_ms"] >= 0
+
+def test_text_tier_is_grayscale():
+    encoded = encode_image(_desktop(), "text")
+    decoded = Image.open(io.BytesIO(base64.b64decode(encoded["data"])))
+    assert decoded.mode == "L"
+
+def test_unknown_tier_falls_back():
+    assert resolve_tier("ultra") in ENCODE_TIERS
+    assert encode_image(_desktop(800, 600), "ultra")["tier"] in ENCODE_TIERS
+
+def test_screenshot_log_goes_to_stderr(capsys):
+    sd._encode_screenshot(_desktop(800, 600))
+    out, err = capsys.readouterr()
+    assert out == "" and "Screenshot (" in err
+
+def test_parse_area():
+    assert parse_area("screen") is None
+    assert parse_area("") is None
+    assert parse_area("100, 50, 400, 300") == (100, 50, 500, 350)
+    assert parse_area("0,0,0,10") is None
+    assert parse_area("the top bit") is None
+
+def test_read_my_screen_uses_tier_and_region(monkeypatch):
+    monkeypatch.setattr(sd, "IS_WINDOWS", True)
+    with patch.object(sd, "grab_screen", return_value=_desktop()) as grab:
+        result = sd.read_my_screen(area="10,20,300,200", quality="fast", look="picture")
+    grab.assert_called_once_with((10, 20, 310, 220))
+    assert result[0]["source"]["media_type"] == "image/jpeg"
+    assert result[1]["type"] == "text"
+
+
+# --- Frame diff for verify_screen_step ---
+
+def _draw_box(image, box, color):
+    from PIL import ImageDraw
+    image = image.copy()
+    ImageDraw.Draw(image).rectangle(box, fill=color)
+    return image
+
+
+def test_frame_hash_ignores_identical_frames():
+    from mcp_servers.screen_capture import _thumbnail, frame_hash, changed_tiles
+    a, b = _thumbnail(_desktop()), _thumbnail(_desktop())
+    assert frame_hash(a) == frame_hash(b)
+    assert changed_tiles(a, b) == []
+
+def test_verify_unchanged_screen_skips_picture(monkeypatch):
+    from mcp_servers.screen_capture import forget_frame
+    forget_frame()
+    monkeypatch.setattr(sd, "IS_WINDOWS", True)
+    with patch.object(sd, "grab_screen", return_value=_desktop()):
+        first = sd.verify_screen_step("Word is open")
+        second = sd.verify_screen_step("Word is open")
+    assert first[0]["type"] == "image"
+    assert isinstance(second, str)
+    assert "looks unchanged" in second and "Word is open" in second
+
+def test_diff_finds_changed_region():
+    from mcp_servers.screen_capture import diff_against_last, forget_frame
+    forget_frame()
+    before = _desktop()
+    after = _draw_box(before, (1000, 600, 1300, 800), (255, 0, 0))
+    assert diff_against_last(before)["status"] == "first"
+    change = diff_against_last(after)
+    assert change["status"] == "region"
+    left, top, right, bottom = change["bbox"]
+    assert left <= 1000 and top <= 600 and right >= 1300 and bottom >= 800
+    assert (right - left) * (bottom - top) < before.width * before.height / 4
+
+@pytest.mark.parametrize("width, height", [(2560, 1440), (3840, 2160)])
+def test_diff_sees_small_changes_on_large_screens(width, height):
+    from PIL import ImageDraw
+    from mcp_servers.screen_capture import diff_against_last, forget_frame
+    before = Image.new("RGB", (width, height), (255, 255, 255))
+    ImageDraw.Draw(before).rectangle((1200, 700, 1213, 713), outline=(0, 0, 0))   # empty checkbox
+    ticked = before.copy()
+    ImageDraw.Draw(ticked).line((1203, 707, 1206, 710, 1211, 702), fill=(0, 0, 0), width=1)
+    typed = before.copy()
+    ImageDraw.Draw(typed).text((1500, 900), "ok", fill=(0, 0, 0))
+    for after in (ticked, typed):
+        forget_frame()
+        diff_against_last(before)
+        assert diff_against_last(after)["status"] == "region"
+
+def test_verify_sends_only_changed_region(monkeypatch):
+    from mcp_servers.screen_capture import forget_frame
+    forget_frame()
+    monkeypatch.setattr(sd, "IS_WINDOWS", True)
+    before = _desktop()
+    after = _draw_box(before, (1000, 600, 1300, 800), (255, 0, 0))
+    with patch.object(sd, "grab_screen", side_effect=[before, after]), \
+         patch.object(sd, "encode_image", wraps=encode_image) as encode:
+        sd.verify_screen_step("dialog appeared")
+        result = sd.verify_screen_step("dialog appeared")
+    assert "Only part" in result[1]["text"]
+    sent = encode.call_args[0][0]
+    assert sent.width < before.width and sent.height < before.height
+
+def test_verify_sends_full_screen_after_big_change(monkeypatch):
+    from mcp_servers.screen_capture import forget_frame
+    forget_frame()
+    monkeypatch.setattr(sd, "IS_WINDOWS", True)
+    before = _desktop()
+    after = Image.new("RGB", before.size, (255, 255, 255))
+    with patch.object(sd, "grab_screen", side_effect=[before, after]):
+        sd.verify_screen_step("Word is open")
+        result = sd.verify_screen_step("Word is open")
+    assert result[1]["text"].startswith("Here is a screenshot")
+
+def test_read_my_screen_counts_as_last_look(monkeypatch):
+    from mcp_servers.screen_capture import forget_frame
+    forget_frame()
+    monkeypatch.setattr(sd, "IS_WINDOWS", True)
+    with patch.object(sd, "grab_screen", return_value=_desktop()):
+        sd.read_my_screen()
+        assert isinstance(sd.verify_screen_step("Word is open"), str)
+
+
+# --- Text-first screen reading ---
+
+def _uia(lines, title="Warning"):
+    return {"source": "uia", "title": title, "lines": lines, "confidence": 100.0}
+
+
+def test_is_readable_thresholds():
+    from mcp_servers.screen_text import is_readable
+    assert not is_readable(None)
+    assert not is_readable(_uia(["OK"]))
+    assert is_readable(_uia(["Your printer is out of paper.", "[Button] OK"]))
+    ocr = {"source": "ocr", "title": "", "lines": ["Your printer is out of paper.", "Add paper and press OK"], "confidence": 40.0}
+    assert not is_readable(ocr)
+    assert is_readable({**ocr, "confidence": 90.0})
+
+def test_ocr_groups_words_into_lines(monkeypatch):
+    import types
+    from mcp_servers.screen_text import ocr_text
+    fake = types.SimpleNamespace(
+        Output=types.SimpleNamespace(DICT="dict"),
+        image_to_data=lambda image, output_type: {
+            "text": ["Call", "Microsoft", "", "now"],
+            "conf": [95, 90, -1, 85],
+            "block_num": [1, 1, 1, 2], "par_num": [1, 1, 1, 1], "line_num": [1, 1, 1, 1],
+        },
+    )
+    monkeypatch.setitem(sys.modules, "pytesseract", fake)
+    result = ocr_text(_desktop(200, 100))
+    assert result["lines"] == ["Call Microsoft", "now"]
+    assert result["confidence"] == 90.0
+
+def test_read_my_screen_answers_from_text(monkeypatch):
+    monkeypatch.setattr(sd, "IS_WINDOWS", True)
+    text = _uia(["Your document was saved to Documents.", "[Button] OK"], title="Microsoft Word")
+    with patch.object(sd, "grab_screen", return_value=_desktop()), \
+         patch.object(sd, "read_screen_text", return_value=text), \
+         patch.object(sd, "encode_image") as encode:
+        result = sd.read_my_screen()
+    encode.assert_not_called()
+    assert isinstance(result, str)
+    assert "Microsoft Word" in result and "[Button] OK" in result
+    assert "SCAM" not in result
+
+def test_read_my_screen_flags_scam_text_locally(monkeypatch):
+    monkeypatch.setattr(sd, "IS_WINDOWS", True)
+    text = _uia(["WARNING! Your computer has a virus.", "Call Microsoft support at 1-888-555-0123 immediately",
+                 "[Button] Close"])
+    with patch.object(sd, "grab_screen", return_value=_desktop()), \
+         patch.object(sd, "read_screen_text", return_value=text):
+        result = sd.read_my_screen()
+    assert result.startswith("⚠️ SCAM SHIELD")
+
+def test_read_my_screen_falls_back_to_picture(monkeypatch):
+    monkeypatch.setattr(sd, "IS_WINDOWS", True)
+    with patch.object(sd, "grab_screen", return_value=_desktop()), \
+         patch.object(sd, "read_screen_text", return_value=None):
+        result = sd.read_my_screen()
+    assert result[0]["type"] == "image"
+
+def test_picture_fallback_says_when_ocr_is_not_installed(monkeypatch):
+    monkeypatch.setattr(sd, "IS_WINDOWS", True)
+    for installed in (False, True):
+        with patch.object(sd, "grab_screen", return_value=_desktop()), \
+             patch.object(sd, "read_screen_text", return_value=None), \
+             patch.object(sd, "ocr_available", return_value=installed):
+            result = sd.read_my_screen()
+        assert ("pytesseract" in result[1]["text"]) is not installed
+
+class _Element:
+    """UIA element info stand-in that counts how many elements were fetched."""
+    fetched = 0
+
+    def __init__(self, name, control_type="Text", children=()):
+        self.name, self.control_type, self.children = name, control_type, children
+
+    def iter_children(self):
+        for child in self.children:
+            _Element.fetched += 1
+            yield child
+
+
+def _fake_desktop(monkeypatch, windows):
+    import ctypes
+    import types
+    from mcp_servers import screen_text
+
+    def wrapper(handle, title, info):
+        return types.SimpleNamespace(handle=handle, element_info=info, window_text=lambda: title,
+                                     is_minimized=lambda: False)
+
+    wrappers = [wrapper(n + 1, title, info) for n, (title, info) in enumerate(windows)]
+
+    class Desktop:
+        def __init__(self, backend):
+            pass
+
+        def window(self, handle):
+            return types.SimpleNamespace(wrapper_object=lambda: wrappers[handle - 1])
+
+        def windows(self, visible_only):
+            return wrappers
+
+    monkeypatch.setitem(sys.modules, "pywinauto", types.SimpleNamespace(Desktop=Desktop))
+    monkeypatch.setattr(ctypes, "windll", types.SimpleNamespace(
+        user32=types.SimpleNamespace(GetForegroundWindow=lambda: 1)), raising=False)
+    monkeypatch.setattr(screen_text, "IS_WINDOWS", True)
+
+def test_uia_walk_stops_at_the_element_cap(monkeypatch):
+    from mcp_servers import screen_text
+    # A browser-sized tree: 50 rows of 100 cells
+    rows = [_Element(f"row {r}", children=[_Element(f"cell {r}.{c}") for c in range(100)]) for r in range(50)]
+    _fake_desktop(monkeypatch, [("Excel", _Element("Excel", children=rows))])
+    _Element.fetched = 0
+    result = screen_text.uia_text()
+    assert len(result["lines"]) == screen_text.MAX_ELEMENTS
+    assert _Element.fetched <= screen_text.MAX_ELEMENTS + 1
+
+def test_uia_walk_stops_at_max_depth(monkeypatch):
+    from mcp_servers import screen_text
+    node = _Element("deepest")
+    for depth in range(screen_text.MAX_DEPTH + 5, 0, -1):
+        node = _Element(f"level {depth}", children=[node])
+    _fake_desktop(monkeypatch, [("Deep", _Element("Deep", children=[node]))])
+    assert len(screen_text.uia_text()["lines"]) == screen_text.MAX_DEPTH
+
+def test_screen_scope_reads_other_windows_too(monkeypatch):
+    from mcp_servers import screen_text
+    _fake_desktop(monkeypatch, [
+        ("Mail", _Element("Mail", children=[_Element("Inbox"), _Element("Send", "Button")])),
+        ("Virus Alert", _Element("Virus Alert", children=[_Element("Call 1-888-555-0123 now")])),
+    ])
+    window = screen_text.uia_text("window")
+    assert window["lines"] == ["Inbox", "[Button] Send"]
+    screen = screen_text.uia_text("screen")
+    assert screen["windows"] == ["Mail", "Virus Alert"]
+    assert screen["lines"][-2:] == ["— Virus Alert —", "Call 1-888-555-0123 now"]
+    assert '"Mail" window in front, then "Virus Alert"' in sd._describe_screen_text(screen)
+
+def test_custom_region_skips_accessibility_tree(monkeypatch):
+    monkeypatch.setattr(sd, "IS_WINDOWS", True)
+    with patch.object(sd, "grab_screen", return_value=_desktop()), \
+         patch.object(sd, "read_screen_text", return_value=None) as reader:
+        sd.read_my_screen(area="0,0,400,300")
+    assert reader.call_args.kwargs["use_uia"] is False
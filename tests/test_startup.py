@@ -0,0 +1,83 @@
+"""Startup-time regression tests: heavy dependencies stay out of the import path."""
+import asyncio
+import subprocess
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mcp_servers import screen_dispatch as sd
+from mcp_servers import tool_registry
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Loaded on first use, never at import
+DEFERRED = ("anthropic", "mcp", "imaplib", "PIL", "ddgs", "duckduckgo_search",
+            "pywinauto", "win32com", "pytesseract", "psutil")
+
+# Generous enough for a slow CI box; a regression (anthropic or FastMCP
+# back at import time) costs well over a second on its own
+IMPORT_BUDGET_SECONDS = 1.0
+
+
+def _importtime(module: str) -> dict:
+    """Run `python -X importtime -c "import <module>"` -> {module: cumulative µs}."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=60,
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def _top_level(times: dict) -> set:
+    return {name.split(".")[0] for name in times}
+
+
+def test_screen_dispatch_import_skips_heavy_dependencies():
+    loaded = _top_level(_importtime("mcp_servers.screen_dispatch"))
+    assert not loaded & set(DEFERRED), sorted(loaded & set(DEFERRED))
+
+
+def test_app_import_is_within_budget():
+    times = _importtime("frontend.app")
+    assert not _top_level(times) & set(DEFERRED), sorted(_top_level(times) & set(DEFERRED))
+    assert times["frontend.app"] / 1e6 < IMPORT_BUDGET_SECONDS
+
+
+def test_screen_dispatch_import_is_silent_on_stdout():
+    # stdout is the MCP server's JSON-RPC stream
+    proc = subprocess.run([sys.executable, "-c", "import mcp_servers.screen_dispatch"],
+                          cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=60)
+    assert proc.returncode == 0 and proc.stdout == ""
+
+
+def test_gmail_settings_are_read_on_first_use(monkeypatch):
+    monkeypatch.setattr(sd, "USE_REAL_GMAIL", None)
+    for name in ("GMAIL_USER", "GMAIL_APP_PASSWORD", "GMAIL_FOLDER"):
+        monkeypatch.setattr(sd, name, getattr(sd, name))
+    monkeypatch.setenv("GMAIL_USER", "margaret@gmail.com")
+    monkeypatch.setenv("GMAIL_APP_PASSWORD", "app-password")
+    assert sd._use_real_gmail() is True
+    assert sd.GMAIL_USER == "margaret@gmail.com"
+    monkeypatch.delenv("GMAIL_USER")
+    assert sd._use_real_gmail() is True   # read once
+
+
+def test_mcp_server_registers_every_tool_on_run():
+    server = tool_registry.mcp_server("screen-dispatch")
+    names = {tool.name for tool in asyncio.run(server.list_tools())}
+    assert names == set(tool_registry.functions())
+    assert {"check_email", "search_notes", "check_system_health"} <= names
+
+
+def test_decorated_tools_are_plain_functions():
+    assert callable(sd.search_notes)
+    assert sd.search_notes.__module__ == "mcp_servers.screen_dispatch"
@@ -0,0 +1,167 @@
+"""Tests for the shared state store (frontend/state_store.py) and the production run mode."""
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks import fake_anthropic, worker_scaling
+from frontend import app as shared
+from frontend import serve, state_store
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def shared_db(tmp_path):
+    state_store.configure(tmp_path / "state.db")
+    yield tmp_path / "state.db"
+    state_store.configure(None)
+
+
+def test_in_process_store_is_what_app_exports():
+    assert shared._conversation_histories is state_store.histories
+    assert shared._pending_family_messages is state_store.family_messages
+    state_store.put_history("sid-1", [{"role": "user", "content": "hi"}])
+    assert shared._conversation_histories["sid-1"] == [{"role": "user", "content": "hi"}]
+    assert state_store.get_history("missing") is None
+
+
+def test_history_round_trip(shared_db):
+    history = [{"role": "user", "content": "Is this email from my bank real? 🏦"},
+               {"role": "assistant", "content": [{"type": "text", "text": "Let me look."}]}]
+    state_store.put_history("abc", history)
+    assert state_store.get_history("abc") == history
+    state_store.put_history("abc", history[:1])
+    assert state_store.get_history("abc") == history[:1]
+    assert state_store.get_history("nope") is None
+    assert "abc" not in state_store.histories
+
+
+def test_history_written_by_one_process_is_read_by_another(shared_db):
+    state_store.put_history("abc", [{"role": "user", "content": "hello"}])
+    code = ("from frontend import state_store; import json; "
+            "print(json.dumps(state_store.get_history('abc')))")
+    proc = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True,
+                          text=True, timeout=60, env={**os.environ, "TECHBUDDY_STATE_DB": str(shared_db)})
+    assert json.loads(proc.stdout) == [{"role": "user", "content": "hello"}]
+
+
+def test_expired_histories_are_pruned(shared_db, monkeypatch):
+    monkeypatch.setattr(state_store, "PRUNE_EVERY", 1)
+    state_store.put_history("old", [])
+    later = time.time() + state_store.HISTORY_TTL + 60
+    monkeypatch.setattr(state_store.time, "time", lambda: later)
+    state_store.put_history("new", [])
+    assert state_store.get_history("old") is None
+    assert state_store.get_history("new") == []
+
+
+def test_family_queue_drains_in_order(shared_db):
+    for i in range(3):
+        state_store.push_family_message({"n": i})
+    assert state_store.take_family_messages() == [{"n": 0}, {"n": 1}, {"n": 2}]
+    assert state_store.take_family_messages() == []
+
+
+def test_each_family_message_reaches_exactly_one_worker(shared_db):
+    # Three "workers" poll while this process queues messages
+    code = ("import json, time; from frontend import state_store; got = []; "
+            "end = time.time() + 3\n"
+            "while time.time() < end: got += [m['n'] for m in state_store.take_family_messages()]\n"
+            "print(json.dumps(got))")
+    env = {**os.environ, "TECHBUDDY_STATE_DB": str(shared_db)}
+    state_store.take_family_messages()   # create the schema before the pollers start
+    pollers = [subprocess.Popen([sys.executable, "-c", code], cwd=PROJECT_ROOT, env=env,
+                                stdout=subprocess.PIPE, text=True) for _ in range(3)]
+    time.sleep(0.5)
+    for n in range(200):
+        state_store.push_family_message({"n": n})
+        time.sleep(0.002)
+    received = [n for proc in pollers for n in json.loads(proc.communicate(timeout=60)[0])]
+    received += [m["n"] for m in state_store.take_family_messages()]
+    assert sorted(received) == list(range(200))
+
+
+def test_family_reply_is_logged_and_queued_in_the_shared_store(shared_db):
+    contact = shared.FAMILY_CONTACTS["+15551234567"]
+    in_process = len(shared._pending_family_messages)
+    shared._record_family_reply(contact, "is the printer ok?", "Yes, it's printing.")
+    messages = state_store.take_family_messages()
+    assert messages[0]["from_name"] == "Sarah" and messages[0]["result"] == "Yes, it's printing."
+    assert len(shared._pending_family_messages) == in_process
+
+
+def test_secret_key_comes_from_the_environment():
+    code = "from frontend import app; print(app.app.secret_key)"
+    proc = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True,
+                          text=True, timeout=60, env={**os.environ, "TECHBUDDY_SECRET_KEY": "stable-key"})
+    assert proc.stdout.strip().splitlines()[-1] == "stable-key"
+
+
+def test_production_env_requires_a_secret(monkeypatch, tmp_path):
+    monkeypatch.delenv("TECHBUDDY_SECRET_KEY", raising=False)
+    with pytest.raises(SystemExit):
+        serve.production_env(2)
+
+    monkeypatch.setenv("TECHBUDDY_SECRET_KEY", "k")
+    monkeypatch.delenv("TECHBUDDY_STATE_DB", raising=False)
+    monkeypatch.delenv("TECHBUDDY_HEALTH_INTERVAL", raising=False)
+    serve.production_env(4)
+    assert os.environ["TECHBUDDY_STATE_DB"] == str(serve.DEFAULT_STATE_DB)
+    assert os.environ["TECHBUDDY_HEALTH_INTERVAL"] == "0"
+
+
+def test_production_env_reads_the_secret_from_dotenv(tmp_path):
+    # serve.py loads .env next to frontend/, so run a copy in a throwaway project
+    (tmp_path / "frontend").mkdir()
+    (tmp_path / "frontend" / "serve.py").write_bytes((PROJECT_ROOT / "frontend" / "serve.py").read_bytes())
+    (tmp_path / ".env").write_text("TECHBUDDY_SECRET_KEY=from-dotenv\n", encoding="utf-8")
+    code = ("import os, runpy; serve = runpy.run_path('frontend/serve.py'); serve['production_env'](2); "
+            "print(os.environ['TECHBUDDY_SECRET_KEY'])")
+    env = {k: v for k, v in os.environ.items() if k != "TECHBUDDY_SECRET_KEY"}
+    env["TECHBUDDY_STATE_DB"] = str(tmp_path / "state.db")
+    proc = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, capture_output=True,
+                          text=True, timeout=60, env=env)
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.strip() == "from-dotenv"
+
+
+def test_conversation_and_family_queue_survive_across_workers(tmp_path):
+    api = fake_anthropic.start(latency=0.01)
+    proc, base = worker_scaling.launch("uvicorn", 2, api.url, tmp_path / "state.db")
+    try:
+        with httpx.Client(base_url=base, timeout=30) as person:
+            person.get("/")
+            replies = [person.post("/chat", json={"message": f"turn {i}"}).json()["reply"]
+                       for i in range(6)]
+            ack = person.post("/sms/simulate", json={"from_number": "+15551234567",
+                                                     "message": "is mom's printer working?"})
+            messages = []
+            for _ in range(100):
+                messages += person.get("/family/messages").json()["messages"]
+                if messages:
+                    break
+                time.sleep(0.05)
+    finally:
+        worker_scaling.stop(proc)
+        api.shutdown()
+    # Each turn arrived with the whole conversation, whichever worker served it
+    assert replies == [f"seen {n} messages" for n in (1, 3, 5, 7, 9, 11)]
+    assert ack.json()["reply"] == shared.SMS_ACK_REPLY
+    assert len(messages) == 1 and messages[0]["from_name"] == "Sarah"
+
+
+def test_history_stats_in_both_stores(shared_db):
+    state_store.put_history("a", [{"role": "user", "content": "hi"}])
+    state_store.put_history("b", [])
+    on_disk = state_store.history_stats()
+    assert on_disk == {"conversations": 2, "bytes": len('[{"role":"user","content":"hi"}]') + 2}
+    state_store.configure(None)
+    assert state_store.history_stats()["conversations"] == len(state_store.histories)
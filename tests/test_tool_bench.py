@@ -0,0 +1,74 @@
+"""Tests for the per-tool benchmark (benchmarks/tool_bench.py) and its synthetic home folders."""
+import copy
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks import tool_bench
+from mcp_servers import screen_dispatch as sd
+
+
+@pytest.fixture(scope="module")
+def tree(tmp_path_factory):
+    return tool_bench.build_tree(tmp_path_factory.mktemp("bench") / "home", 2000)
+
+
+def _files(root):
+    return [p for p in root.rglob("*") if p.is_file() and p.name != tool_bench.MARKER]
+
+
+def test_tree_looks_like_a_home(tree):
+    files = _files(tree)
+    notes = [p for p in files if p.parent.name == "TechBuddy Notes"]
+    photos = [p for p in files if p.suffix in tool_bench.PHOTO_EXTENSIONS]
+    assert 1950 <= len(files) - len(notes) <= 2050
+    assert 0.25 < len(photos) / len(files) < 0.4
+    assert max(len(p.relative_to(tree / "Documents").parts) for p in files
+               if p.is_relative_to(tree / "Documents")) > 4      # deeper than the tools look
+    assert sum(p.stat().st_size for p in notes) >= 2000 * tool_bench.NOTE_BYTES_PER_FILE
+
+
+def test_tree_is_reused_not_rebuilt(tree):
+    before = (tree / tool_bench.MARKER).stat().st_mtime_ns
+    tool_bench.build_tree(tree, 2000)
+    assert (tree / tool_bench.MARKER).stat().st_mtime_ns == before
+    with pytest.raises(FileExistsError):
+        tool_bench.build_tree(tree, 3000)
+
+
+def test_cases_exercise_the_tools_on_the_tree(tree):
+    saved = sd.NOTES_DIR
+    with tool_bench.home_at(tree):
+        results = {name: fn() for name, fn in tool_bench.cases(2000).items()}
+    assert sd.NOTES_DIR == saved
+    assert results["find_file"].startswith("I found")
+    assert results["find_file_missing"].startswith("I couldn't find")
+    assert "photo(s)" in results["find_photos"]
+    assert "Desktop folder" in results["list_folder"]
+    assert "sessions.md" in results["read_notes_list"]
+    assert results["read_notes"].startswith("=== sessions.md ===")
+    assert results["_scan_for_scam_long"]["risk"] in ("SAFE", "SUSPICIOUS", "DANGEROUS")
+
+
+def test_report_and_compare(tree):
+    report = tool_bench.run_benchmark({"home": 2000}, tree.parent, repeats=1,
+                                      only=["find_file", "read_notes"])
+    timings = report["sizes"]["home"]["tools"]
+    assert set(timings) == {"find_file", "read_notes"}
+    assert all(t["median_ms"] >= t["min_ms"] > 0 and t["peak_kb"] > 0 for t in timings.values())
+    assert "find_file" in tool_bench.format_report(report)
+
+    assert tool_bench.compare(report, report) == []
+    slow = copy.deepcopy(report)
+    slow["sizes"]["home"]["tools"]["find_file"]["median_ms"] = timings["find_file"]["median_ms"] * 3 + 10
+    assert tool_bench.compare(slow, report) == [
+        f"home find_file median: {timings['find_file']['median_ms']} ms -> "
+        f"{slow['sizes']['home']['tools']['find_file']['median_ms']} ms"]
+    jitter = copy.deepcopy(report)
+    jitter["sizes"]["home"]["tools"]["read_notes"]["median_ms"] = timings["read_notes"]["median_ms"] + 1
+    assert tool_bench.compare(jitter, report) == []     # under the noise floor
+    del slow["sizes"]["home"]["tools"]["read_notes"]
+    assert "home read_notes: missing from this run" in tool_bench.compare(slow, report)
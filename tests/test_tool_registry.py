@@ -0,0 +1,184 @@
+"""Tests for the tool registry (mcp_servers/tool_registry.py) and per-turn tool subsets."""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Literal
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mcp_servers import tool_registry
+from frontend.app import TOOLS, TOOL_FUNCTIONS, call_claude
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _names(schemas):
+    return {s["name"] for s in schemas}
+
+
+def test_tools_and_functions_come_from_one_registry():
+    assert len(TOOLS) == 36
+    assert [t["name"] for t in TOOLS] == list(TOOL_FUNCTIONS)
+    # Once app-only, now MCP tools too
+    assert {"check_system_health", "smart_save_document", "verify_screen_step"} <= set(TOOL_FUNCTIONS)
+
+
+def test_schemas_match_checked_in_snapshot():
+    snapshot = json.loads(tool_registry.SNAPSHOT.read_text(encoding="utf-8"))
+    assert tool_registry.schemas() == snapshot, (
+        "Tool schemas changed; this changes the prompt-cache prefix. If intended, run "
+        "`python -m mcp_servers.tool_registry --write-snapshot`.")
+
+
+@pytest.mark.parametrize("name, wording", [
+    ("print_document", "Always confirm with the user before printing"),
+    ("send_email", "Always confirm with the user before sending"),
+    ("delete_email", "Always confirm with the user first"),
+    ("share_photo", "Always confirm with the user first"),
+    ("fix_frozen_program", "Always ask the user to confirm before closing"),
+    ("analyze_scam_risk", "Always use this BEFORE opening links"),
+    ("smart_save_document", "Documents/TechBuddy Saved"),
+    ("click_button", "Use for Zoom 'Join', Outlook 'Send'"),
+    ("type_text", "Use for filling in email recipients, search boxes"),
+])
+def test_descriptions_keep_safety_and_usage_instructions(name, wording):
+    (schema,) = [t for t in TOOLS if t["name"] == name]
+    assert wording in schema["description"]
+
+
+def test_print_document_makes_no_settings_claim():
+    (schema,) = [t for t in TOOLS if t["name"] == "print_document"]
+    assert "Confirms settings" not in schema["description"]
+
+
+def test_blob_is_byte_stable_across_processes():
+    code = ("import mcp_servers.screen_dispatch; from mcp_servers import tool_registry as r; "
+            "print(r.fingerprint(), r.fingerprint(['email']))")
+    outputs = set()
+    for seed in ("1", "2"):
+        proc = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True,
+                              text=True, timeout=60, env={**os.environ, "PYTHONHASHSEED": seed})
+        outputs.add(proc.stdout.strip().splitlines()[-1])
+    assert outputs == {f"{tool_registry.fingerprint()} {tool_registry.fingerprint(['email'])}"}
+
+
+def test_schema_from_signature_and_docstring():
+    def look_up(query: str, limit: int = 3, mode: Literal["quick", "deep"] = "quick",
+                exact: bool = False) -> str:
+        """Look something up.
+        Use when the user asks.
+
+        Args:
+            query: What to look for,
+                   continued on a second line
+            limit: How many results
+            mode: How hard to look
+            exact: Match the whole phrase
+        """
+
+    schema = tool_registry.build_schema(look_up)
+    assert schema["description"] == "Look something up. Use when the user asks."
+    props = schema["input_schema"]["properties"]
+    assert props["query"] == {"type": "string",
+                              "description": "What to look for, continued on a second line"}
+    assert props["limit"] == {"type": "integer", "description": "How many results", "default": 3}
+    assert props["mode"]["enum"] == ["quick", "deep"]
+    assert props["exact"]["type"] == "boolean"
+    assert schema["input_schema"]["required"] == ["query"]
+
+
+def test_undocumented_parameter_is_rejected():
+    def bad(name: str) -> str:
+        """Does something."""
+
+    with pytest.raises(ValueError, match="name"):
+        tool_registry.build_schema(bad)
+
+
+@pytest.mark.parametrize("message, groups", [
+    ("Can you check my email?", {"email"}),
+    ("My computer is so slow today", {"system"}),
+    ("Look at my phone, I got a weird text", {"phone"}),
+    ("Where is the recipe I saved?", {"files"}),
+    ("Hi there!", set()),
+])
+def test_groups_for(message, groups):
+    found = tool_registry.groups_for(message)
+    assert groups <= found if groups else found == set()
+
+
+def test_select_sends_core_plus_matching_group():
+    tools = tool_registry.select([{"role": "user", "content": "check my email please"}])
+    names = _names(tools)
+    assert {"check_email", "recall_user_context", "analyze_scam_risk"} <= names
+    assert "capture_phone_screen" not in names and "check_internet" not in names
+    assert len(tool_registry.schema_blob(["email"])) < len(tool_registry.schema_blob()) * 0.6
+
+
+def test_select_sends_everything_when_unsure():
+    assert tool_registry.select([{"role": "user", "content": "Good morning!"}]) is tool_registry.schemas()
+
+
+def test_select_keeps_groups_the_conversation_just_used():
+    history = [
+        {"role": "user", "content": "Is my internet working?"},
+        {"role": "assistant", "content": [{"type": "tool_use", "id": "t1", "name": "check_internet",
+                                           "input": {}}]},
+        {"role": "user", "content": [{"type": "tool_result", "tool_use_id": "t1", "content": "ok"}]},
+        {"role": "assistant", "content": "It's working!"},
+        {"role": "user", "content": "Great, now check my email"},
+    ]
+    assert {"check_internet", "check_email"} <= _names(tool_registry.select(history))
+
+
+def test_select_never_drops_a_group_within_a_conversation():
+    history = [{"role": "user", "content": "check my email"}]
+    first = _names(tool_registry.select(history))
+    history += [{"role": "assistant", "content": "You have 3 new emails."},
+                {"role": "user", "content": "My computer is slow"}]
+    second = _names(tool_registry.select(history))
+    assert "check_email" in first and first < second
+    assert "check_system_health" in second
+    history += [{"role": "assistant", "content": "Let me look."},
+                {"role": "user", "content": "Thanks!"}]
+    assert _names(tool_registry.select(history)) == second
+    opened_unclear = [{"role": "user", "content": "Good morning!"},
+                      {"role": "assistant", "content": "Good morning!"},
+                      {"role": "user", "content": "check my email"}]
+    assert tool_registry.select(opened_unclear) is tool_registry.schemas()
+
+
+def test_select_can_be_turned_off(monkeypatch):
+    monkeypatch.setattr(tool_registry, "SUBSETS_ENABLED", False)
+    assert tool_registry.select([{"role": "user", "content": "check my email"}]) is tool_registry.schemas()
+
+
+def test_same_group_set_reuses_the_same_schemas():
+    assert tool_registry.schemas(["email", "files"]) is tool_registry.schemas(["files", "email", "core"])
+
+
+def test_call_claude_sends_one_subset_for_the_whole_turn():
+    def block(**fields):
+        b = MagicMock()
+        for key, value in fields.items():
+            setattr(b, key, value)
+        return b
+
+    tool_round = MagicMock(content=[block(type="tool_use", id="t1", name="check_email", input={})])
+    final = MagicMock(content=[block(type="text", text="You have 3 new emails.")])
+    fake = MagicMock()
+    fake.messages.create.side_effect = [tool_round, final]
+
+    with patch("frontend.app.client", fake), \
+         patch("frontend.app.execute_tool", return_value="inbox"):
+        reply, _, _ = call_claude([{"role": "user", "content": "check my email"}])
+
+    assert reply == "You have 3 new emails."
+    sent = [call.kwargs["tools"] for call in fake.messages.create.call_args_list]
+    assert sent[0] is sent[1]
+    assert "check_email" in _names(sent[0]) and len(sent[0]) < len(TOOLS)
@@ -0,0 +1,89 @@
+"""Tests for the recall_user_context digest (mcp_servers/user_context.py)."""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mcp_servers import user_context
+from mcp_servers import screen_dispatch as sd
+
+
+@pytest.fixture
+def notes(tmp_path, monkeypatch):
+    monkeypatch.setattr(sd, "NOTES_DIR", tmp_path)
+    monkeypatch.setattr(user_context, "_cache", {"dir": None, "snapshot": None})
+    return tmp_path
+
+
+def _builds():
+    return user_context.stats["builds"]
+
+
+def test_digest_dedupes_and_keeps_newest_copy(notes):
+    sd.save_note("preferences", "Prefers large text")
+    sd.save_note("preferences", "Checks email after breakfast")
+    sd.save_note("preferences", "prefers LARGE text!")
+    result = sd.recall_user_context()
+    prefs = result.split("\n\n")[0].splitlines()
+    assert prefs == ["PREFERENCES:", "- Checks email after breakfast", "- prefers LARGE text!"]
+
+
+def test_digest_is_smaller_than_raw_notes(notes):
+    for _ in range(50):
+        sd.save_note("contacts", "Daughter Sarah, 555-0100\nDoctor is Dr. Patel")
+    raw = (notes / "contacts.md").stat().st_size
+    result = sd.recall_user_context()
+    assert len(result) < raw / 10
+    assert "- Daughter Sarah, 555-0100" in result and "- Doctor is Dr. Patel" in result
+
+
+def test_save_note_updates_cached_digest_without_rebuilding(notes):
+    sd.save_note("preferences", "Likes large text")
+    sd.recall_user_context()
+    builds = _builds()
+
+    sd.save_note("contacts", "Son Mike lives in Ohio")
+    sd.save_note("session-2_12_26", "Set up video call with Mike")
+    sd.save_note("session-2_13_26", "Printed the church newsletter")
+    sd.save_note("medications", "Blood pressure pill at 8am")
+    result = sd.recall_user_context()
+
+    assert _builds() == builds
+    assert "- Son Mike lives in Ohio" in result
+    assert "MOST RECENT SESSION (session-2_13_26.md, " in result
+    assert "church newsletter" in result and "video call" not in result
+    assert result.splitlines()[-2].startswith("All note files: medications.md, session-2_13_26.md")
+
+
+def test_outside_edit_invalidates_digest(notes):
+    sd.save_note("contacts", "Plumber is Joe")
+    sd.recall_user_context()
+    builds = _builds()
+
+    path = notes / "contacts.md"
+    path.write_text("Plumber is Frank\n", encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    result = sd.recall_user_context()
+    assert _builds() == builds + 1
+    assert "Frank" in result and "Joe" not in result
+
+
+def test_new_file_from_outside_is_listed(notes):
+    sd.save_note("preferences", "Likes large text")
+    sd.recall_user_context()
+    (notes / "family.md").write_text("Grandson Leo plays soccer\n", encoding="utf-8")
+    os.utime(notes, ns=(0, notes.stat().st_mtime_ns + 1_000_000))
+    assert "family.md" in sd.recall_user_context()
+
+
+def test_repeat_calls_do_not_rebuild(notes):
+    sd.save_note("preferences", "Likes large text")
+    sd.recall_user_context()
+    builds = _builds()
+    for _ in range(5):
+        sd.recall_user_context()
+    assert _builds() == builds
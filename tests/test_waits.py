@@ -0,0 +1,91 @@
+"""Tests for waits.py and open_application's poll-until-ready launch."""
+import re
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mcp_servers.waits import wait_until, wait_for_new_window
+import mcp_servers.screen_dispatch as sd
+
+
+def test_wait_until_returns_as_soon_as_ready():
+    ready_at = time.monotonic() + 0.1
+    result, waited = wait_until(lambda: time.monotonic() >= ready_at and "ready", timeout=5)
+    assert result == "ready"
+    assert 0.1 <= waited < 0.5
+
+def test_wait_until_times_out():
+    result, waited = wait_until(lambda: None, timeout=0.2)
+    assert result is None
+    assert waited >= 0.2
+
+def test_wait_until_treats_errors_as_not_ready():
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise RuntimeError("window still loading")
+        return True
+
+    assert wait_until(flaky, timeout=2)[0] is True
+
+def test_wait_for_new_window_ignores_existing():
+    snapshots = iter([[(1, "Notes - Notepad")], [(1, "Notes - Notepad"), (2, "Untitled - Notepad")]])
+    with patch("mcp_servers.waits.find_windows", side_effect=lambda pattern, processes=(): next(snapshots)):
+        found, _ = wait_for_new_window("Notepad", {1}, timeout=2)
+    assert found == (2, "Untitled - Notepad")
+
+
+def _launch_with_windows(monkeypatch, app_name, snapshots):
+    monkeypatch.setattr(sd, "IS_WINDOWS", True)
+    monkeypatch.setattr(sd.os, "startfile", lambda exe: None, raising=False)
+    frames = iter(snapshots)
+    last = []
+
+    def windows(pattern, processes=()):
+        nonlocal last
+        last = next(frames, last)
+        # Entries are (hwnd, title) or (hwnd, title, owning executable)
+        return [(w[0], w[1]) for w in last
+                if re.search(pattern, w[1], re.IGNORECASE) or (len(w) > 2 and w[2] in processes)]
+
+    with patch.object(sd, "find_windows", side_effect=windows), \
+         patch("mcp_servers.waits.find_windows", side_effect=windows):
+        start = time.monotonic()
+        result = sd.open_application(app_name)
+        return result, time.monotonic() - start
+
+def test_open_application_returns_when_window_appears(monkeypatch):
+    result, elapsed = _launch_with_windows(
+        monkeypatch, "notepad", [[], [], [(7, "Untitled - Notepad")]])
+    assert result == "Notepad is open and ready."
+    assert elapsed < 1.0  # no fixed 2-second sleep
+
+def test_launch_log_goes_to_stderr(monkeypatch, capsys):
+    _launch_with_windows(monkeypatch, "notepad", [[], [(7, "Untitled - Notepad")]])
+    out, err = capsys.readouterr()
+    assert out == "" and "Notepad launch: ready" in err
+
+def test_open_application_already_running_gives_up_quickly(monkeypatch):
+    outlook = [(3, "Inbox - Outlook")]
+    result, elapsed = _launch_with_windows(monkeypatch, "outlook", [outlook])
+    assert "opening now" in result
+    assert elapsed < 4
+
+def test_open_word_waits_for_document_window(monkeypatch):
+    # Tier 1 (win32com) unavailable here, so Tier 2 launches winword /n
+    monkeypatch.setattr(sd.subprocess, "Popen", lambda *a, **k: None)
+    result, elapsed = _launch_with_windows(
+        monkeypatch, "word", [[], [], [(5, "Word")], [(5, "Document1 - Word")]])
+    assert "blank document" in result
+    assert elapsed < 1.0
+
+def test_open_application_accepts_a_localized_window_from_the_app(monkeypatch):
+    result, elapsed = _launch_with_windows(
+        monkeypatch, "calculator", [[], [(8, "Rechner", "applicationframehost.exe")]])
+    assert result == "Calculator is open and ready."
+    assert elapsed < 1.0   # not the full 15-second title wait
@@ -0,0 +1,116 @@
+"""Tests for window_cache.py — reuse pywinauto windows/controls across actions."""
+import sys
+import types
+from pathlib import Path
+from unittest.mock import MagicMock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from mcp_servers import window_cache
+import mcp_servers.screen_dispatch as sd
+
+
+@pytest.fixture
+def fake_pywinauto(monkeypatch):
+    """Stand-in pywinauto whose Application records every connect()."""
+    apps = []
+
+    def application(backend):
+        app = MagicMock(name="Application")
+        app.top_window.return_value.wrapper_object.return_value.handle = 1234
+        apps.append(app)
+        return app
+
+    monkeypatch.setitem(sys.modules, "pywinauto", types.SimpleNamespace(Application=application))
+    monkeypatch.setattr(sd, "IS_WINDOWS", True)
+    window_cache.clear()
+    yield apps
+    window_cache.clear()
+
+
+def test_repeated_clicks_connect_once(fake_pywinauto):
+    for _ in range(3):
+        assert sd.click_button("Zoom", "Join").startswith("Done!")
+    assert len(fake_pywinauto) == 1
+    spec = fake_pywinauto[0].window.return_value
+    spec.child_window.assert_called_once_with(title="Join", control_type="Button")
+    button = spec.child_window.return_value.wrapper_object.return_value
+    assert button.click.call_count == 3
+
+def test_closed_window_reconnects(fake_pywinauto):
+    sd.click_button("Zoom", "Join")
+    fake_pywinauto[0].top_window.side_effect = RuntimeError("no windows for that process")
+    sd.click_button("Zoom", "Join")
+    assert len(fake_pywinauto) == 2
+
+def test_newer_top_window_replaces_the_cached_one(fake_pywinauto):
+    sd.type_text("Outlook", "x")
+    app = fake_pywinauto[0]
+    inbox = app.top_window.return_value.wrapper_object.return_value
+    compose = MagicMock(name="compose window", handle=5678)
+    app.top_window.return_value.wrapper_object.return_value = compose
+    sd.type_text("Outlook", "Dear Sarah")
+    compose.type_keys.assert_called_once_with("Dear Sarah", with_spaces=True)
+    assert [c.args[0] for c in inbox.type_keys.call_args_list] == ["x"]
+    assert len(fake_pywinauto) == 1   # same app, no reconnect
+    app.window.assert_called_with(handle=5678)
+
+def test_control_lookup_survives_a_concurrent_forget(fake_pywinauto):
+    window_cache.get_window("Zoom")
+    spec = fake_pywinauto[0].window.return_value
+    found = spec.child_window.return_value
+
+    def forget_meanwhile(**criteria):
+        window_cache.forget("Zoom")
+        return found
+
+    spec.child_window.side_effect = forget_meanwhile
+    assert window_cache.get_control("Zoom", "Join", "Button") is found.wrapper_object.return_value
+
+def test_stale_control_is_looked_up_again(fake_pywinauto):
+    sd.type_text("Signup Form", "Margaret", field_name="First name")
+    spec = fake_pywinauto[0].window.return_value
+    field = spec.child_window.return_value.wrapper_object.return_value
+    field.is_visible.return_value = False
+    sd.type_text("Signup Form", "Smith", field_name="First name")
+    assert spec.child_window.call_count == 2
+    field.set_text.assert_called_with("Smith")
+
+def test_failed_lookup_retries_with_fresh_window(fake_pywinauto):
+    lookups, acted = [], []
+
+    def find():
+        lookups.append(1)
+        if len(lookups) == 1:
+            raise RuntimeError("element not available")
+        return "button"
+
+    assert sd._with_cached_window("Zoom", find, lambda target: acted.append(target) or "ok") == "ok"
+    assert len(lookups) == 2 and acted == ["button"]
+
+def test_failed_click_is_not_replayed(fake_pywinauto):
+    sd.click_button("Outlook", "Send")
+    spec = fake_pywinauto[0].window.return_value
+    button = spec.child_window.return_value.wrapper_object.return_value
+    button.click.side_effect = RuntimeError("COM error after the click went out")
+    assert "couldn't" in sd.click_button("Outlook", "Send")
+    assert button.click.call_count == 2   # once per call, never retried
+    # The failure dropped the cached window, so the next call reconnects
+    button.click.side_effect = None
+    sd.click_button("Outlook", "Send")
+    assert len(fake_pywinauto) == 2
+
+def test_failed_typing_is_not_replayed(fake_pywinauto):
+    sd.type_text("Notepad", "x")
+    window = fake_pywinauto[0].top_window.return_value.wrapper_object.return_value
+    window.type_keys.side_effect = RuntimeError("lost focus halfway")
+    sd.type_text("Notepad", "Dear Sarah")
+    assert [c.args[0] for c in window.type_keys.call_args_list] == ["x", "Dear Sarah"]
+
+def test_type_text_without_field_uses_keys(fake_pywinauto):
+    result = sd.type_text("Notepad", "hello there")
+    window = fake_pywinauto[0].top_window.return_value.wrapper_object.return_value
+    window.type_keys.assert_called_once_with("hello there", with_spaces=True)
+    assert result.startswith("Done!")
@@ -0,0 +1,115 @@
+"""Tests for word_session.py — one warm Word COM connection for the Word tools."""
+import sys
+import types
+from pathlib import Path
+from unittest.mock import MagicMock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+from mcp_servers import word_session
+import mcp_servers.screen_dispatch as sd
+
+RPC_SERVER_UNAVAILABLE = -2147023174
+
+
+class ComError(Exception):
+    """Stand-in for pywintypes.com_error (args[0] is the HRESULT)."""
+
+
+class DeadWord:
+    """A Word.Application reference whose process has exited."""
+
+    def __getattr__(self, name):
+        raise ComError(RPC_SERVER_UNAVAILABLE, "The RPC server is unavailable.")
+
+
+@pytest.fixture
+def fake_com(monkeypatch):
+    """Fake win32com/pythoncom; yields the list of Word objects handed out."""
+    handed_out = []
+
+    def get_active(prog_id):
+        word = MagicMock(name="Word.Application")
+        word.Selection.Range.Start = word.Selection.Range.End = 0
+        handed_out.append(word)
+        return word
+
+    client = types.SimpleNamespace(GetActiveObject=get_active, Dispatch=get_active)
+    monkeypatch.setitem(sys.modules, "win32com", types.SimpleNamespace(client=client))
+    monkeypatch.setitem(sys.modules, "win32com.client", client)
+    monkeypatch.setitem(sys.modules, "pythoncom", types.SimpleNamespace(CoInitialize=lambda: None))
+    monkeypatch.setattr(sd, "IS_WINDOWS", True)
+    word_session.reset()
+    yield handed_out
+    word_session.reset()
+
+
+def test_word_tools_share_one_connection(fake_com):
+    assert "blank document" in sd.open_application("word")
+    assert sd.type_text("Word", "Dear Sarah,").startswith("Done!")
+    assert "saved" in sd.save_document_as_pdf(r"C:\Users\me\Desktop\Letter")
+    assert "saved" in sd.save_document_as_word(r"C:\Users\me\Desktop\Letter")
+    assert len(fake_com) == 1
+
+def test_letter_is_inserted_in_one_call(fake_com):
+    sd.type_text("Word", "Dear Sarah,\nThank you!\n\nLove, Grandma")
+    rng = fake_com[0].Selection.Range
+    rng.InsertAfter.assert_called_once_with("Dear Sarah,\rThank you!\r\rLove, Grandma")
+    fake_com[0].Selection.TypeText.assert_not_called()
+
+def test_selected_text_is_replaced(fake_com):
+    word = word_session.run(lambda w: w)
+    word.Selection.Range.End = 5
+    word_session.insert_text("Hello")
+    assert word.Selection.Range.Text == ""
+
+def test_pdf_uses_export_and_adds_extension(fake_com):
+    path = word_session.save_active_document(r"C:\Docs\Letter", "pdf")
+    assert path == r"C:\Docs\Letter.pdf"
+    doc = fake_com[0].ActiveDocument
+    doc.ExportAsFixedFormat.assert_called_once_with(path, word_session.WD_EXPORT_PDF)
+    doc.SaveAs2.assert_not_called()
+
+def test_restarted_word_is_reconnected(fake_com):
+    word_session.run(lambda w: w)
+    word_session._com_thread.submit(word_session._state.update, word=DeadWord()).result()  # Word was restarted
+    word = word_session.run(lambda w: w)
+    assert word is fake_com[-1] and len(fake_com) == 2
+
+def test_disconnect_mid_call_retries_once(fake_com):
+    calls = []
+
+    def action(word):
+        calls.append(word)
+        if len(calls) == 1:
+            raise ComError(RPC_SERVER_UNAVAILABLE, "The RPC server is unavailable.")
+        return "ok"
+
+    assert word_session.run(action) == "ok"
+    assert len(fake_com) == 2
+
+def test_every_thread_shares_one_connection_on_the_word_thread(fake_com):
+    import threading
+    seen = []
+
+    def request():   # Flask handles each request on a new thread
+        word_session.run(lambda word: seen.append((word, threading.get_ident())))
+
+    threads = [threading.Thread(target=request) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(fake_com) == 1
+    assert {word for word, _ in seen} == {fake_com[0]}
+    assert {ident for _, ident in seen} == {word_session._state["thread"]}
+
+def test_other_errors_are_not_retried(fake_com):
+    def action(word):
+        raise ComError(-2147352567, "This command is not available because no document is open.")
+
+    with pytest.raises(ComError):
+        word_session.run(action)
+    assert len(fake_com) == 1